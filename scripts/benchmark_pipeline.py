@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Pipeline benchmark for python-gpr batch conversion.
+
+Compares two ways of converting a batch of files with the same number of
+conversion threads:
+
+* blocking: each worker reads a file, converts it in memory and writes the
+  result before taking the next one, so a worker waiting for storage does
+  not convert anything;
+* pipeline: batch_convert(backend="pipeline"), where I/O threads read
+  ahead and write behind through bounded queues while the workers convert.
+
+Inputs and outputs live on a RAM-backed directory (/dev/shm when
+available) and storage speed is simulated by throttling every read and
+write: a device serves one request at a time and each request costs a
+fixed access latency plus its size divided by the bandwidth. The "hdd"
+profile models a spinning disk, "nvme" a fast SSD and "tmpfs" applies no
+throttling.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    from python_gpr import _core
+except ImportError as e:
+    print(f"ERROR: python_gpr._core is not available: {e}")
+    print("Build the C++ extension first: pip install -e .")
+    sys.exit(1)
+
+from python_gpr import batch
+
+
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / "tests" / "data"
+
+# (access latency in seconds, bandwidth in bytes per second)
+STORAGE_PROFILES = {
+    "hdd": (8e-3, 150e6),
+    "nvme": (5e-5, 2000e6),
+    "tmpfs": (0.0, None),
+}
+
+
+class ThrottledStorage:
+    """Reads and writes whole files at the speed of a simulated device."""
+
+    def __init__(self, latency, bandwidth):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self._device = threading.Lock()
+
+    def _wait(self, nbytes):
+        if self.bandwidth is None:
+            return
+        with self._device:
+            time.sleep(self.latency + nbytes / self.bandwidth)
+
+    def read(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        self._wait(len(data))
+        return data
+
+    def write(self, path, data):
+        self._wait(len(data))
+        with open(path, "wb") as f:
+            f.write(data)
+
+
+def find_input_files(paths):
+    """Collect GPR files from the given files or directories."""
+    files = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            files.extend(sorted(p for p in path.iterdir() if p.suffix.lower() == ".gpr"))
+        elif path.is_file():
+            files.append(path)
+    return files
+
+
+def usable_files(files):
+    """Filter out files the native library cannot convert (e.g. synthetic fixtures)."""
+    usable = []
+    for path in files:
+        try:
+            _core.convert_gpr_to_dng_bytes(path.read_bytes())
+            usable.append(path)
+        except Exception as e:
+            print(f"  skipping {path.name}: {e}")
+    return usable
+
+
+def stage_inputs(files, repeat, work_dir):
+    """Copy the inputs to the RAM-backed work directory and return (input, output) pairs."""
+    pairs = []
+    for i in range(repeat):
+        for path in files:
+            input_path = os.path.join(work_dir, f"{i}_{path.name}")
+            shutil.copyfile(path, input_path)
+            pairs.append((input_path, os.path.join(work_dir, f"{i}_{path.stem}.dng")))
+    return pairs
+
+
+def run_blocking(pairs, storage, workers):
+    """Read, convert and write each file in turn on every worker; return elapsed seconds."""
+    def task(pair):
+        input_path, output_path = pair
+        storage.write(output_path, _core.convert_gpr_to_dng_bytes(storage.read(input_path)))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(task, pairs))
+    return time.perf_counter() - start
+
+
+def run_pipeline(pairs, storage, workers, io_threads, read_ahead, write_behind):
+    """Convert with the pipeline backend; return elapsed seconds."""
+    with patch.object(batch, "_read_file", storage.read), patch.object(batch, "_write_file", storage.write):
+        start = time.perf_counter()
+        results = list(batch.batch_convert(pairs, workers=workers, backend="pipeline",
+                                           io_threads=io_threads, read_ahead=read_ahead,
+                                           write_behind=write_behind))
+        elapsed = time.perf_counter() - start
+    failed = [r for r in results if not r.ok]
+    if failed:
+        raise RuntimeError(f"{len(failed)} conversion(s) failed, first: {failed[0].error}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare blocking and pipelined batch conversion")
+    parser.add_argument("paths", nargs="*", default=[str(DEFAULT_DATA_DIR)],
+                        help="GPR files or directories (default: tests/data)")
+    parser.add_argument("--storage", choices=sorted(STORAGE_PROFILES), action="append",
+                        help="Simulated storage profile; may be repeated (default: all)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Conversion threads (default: CPU count)")
+    parser.add_argument("--io-threads", type=int, default=batch.DEFAULT_IO_THREADS,
+                        help=f"Pipeline reader and writer threads (default: {batch.DEFAULT_IO_THREADS})")
+    parser.add_argument("--read-ahead", type=int, default=None,
+                        help="Pipeline read queue depth (default: 2 per worker)")
+    parser.add_argument("--write-behind", type=int, default=None,
+                        help="Pipeline write queue depth (default: 2 per worker)")
+    parser.add_argument("--repeat", type=int, default=8,
+                        help="Number of copies of each input file (default: 8)")
+    args = parser.parse_args()
+
+    files = find_input_files(args.paths)
+    if not files:
+        print("ERROR: no GPR input files found")
+        return 1
+
+    print(f"Checking {len(files)} candidate file(s)...")
+    files = usable_files(files)
+    if not files:
+        print("ERROR: none of the input files could be converted")
+        return 1
+
+    work_root = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    with tempfile.TemporaryDirectory(prefix="python-gpr-pipeline-", dir=work_root) as work_dir:
+        pairs = stage_inputs(files, args.repeat, work_dir)
+        print(f"\nFiles: {len(pairs)}, workers: {args.workers}, io threads: {args.io_threads}, "
+              f"work dir: {work_dir}")
+        print(f"{'storage':>8} {'blocking s':>11} {'pipeline s':>11} {'files/s':>10} {'speedup':>9}")
+
+        for name in args.storage or sorted(STORAGE_PROFILES):
+            storage = ThrottledStorage(*STORAGE_PROFILES[name])
+            blocking = run_blocking(pairs, storage, args.workers)
+            pipelined = run_pipeline(pairs, storage, args.workers, args.io_threads,
+                                     args.read_ahead, args.write_behind)
+            rate = len(pairs) / pipelined if pipelined > 0 else 0.0
+            speedup = blocking / pipelined if pipelined > 0 else 0.0
+            print(f"{name:>8} {blocking:>11.3f} {pipelined:>11.3f} {rate:>10.1f} {speedup:>8.2f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
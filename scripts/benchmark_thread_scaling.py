@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Thread-scaling benchmark for python-gpr.
+
+The native conversion and decode entry points release the GIL while they
+read, convert and write, so a ThreadPoolExecutor over many files should
+scale close to linearly with the number of cores. This script measures
+that by running the same workload with an increasing number of threads
+and reporting the speedup and parallel efficiency relative to one thread.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    from python_gpr import _core
+except ImportError as e:
+    print(f"ERROR: python_gpr._core is not available: {e}")
+    print("Build the C++ extension first: pip install -e .")
+    sys.exit(1)
+
+
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / "tests" / "data"
+
+
+def find_input_files(paths):
+    """Collect GPR files from the given files or directories."""
+    files = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            files.extend(sorted(p for p in path.iterdir() if p.suffix.lower() == ".gpr"))
+        elif path.is_file():
+            files.append(path)
+    return files
+
+
+def make_task(operation, output_dir):
+    """Return a callable performing one unit of work on a single file."""
+    if operation == "decode":
+        def task(index, path):
+            _core.get_raw_image_data(str(path), "uint16")
+    elif operation == "dng":
+        def task(index, path):
+            output_path = os.path.join(output_dir, f"{index}_{path.stem}.dng")
+            _core.convert_gpr_to_dng(str(path), output_path)
+    elif operation == "raw":
+        def task(index, path):
+            output_path = os.path.join(output_dir, f"{index}_{path.stem}.raw")
+            _core.convert_gpr_to_raw(str(path), output_path)
+    else:
+        raise ValueError(f"Unknown operation: {operation}")
+    return task
+
+
+def usable_files(files, task):
+    """Filter out files the native library cannot process (e.g. synthetic fixtures)."""
+    usable = []
+    for index, path in enumerate(files):
+        try:
+            task(index, path)
+            usable.append(path)
+        except Exception as e:
+            print(f"  skipping {path.name}: {e}")
+    return usable
+
+
+def run_workload(task, files, threads, repeat):
+    """Run the workload with the given number of threads and return elapsed seconds."""
+    work = [(i, path) for i, path in enumerate(files * repeat)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lambda item: task(*item), work))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure python-gpr thread scaling")
+    parser.add_argument("paths", nargs="*", default=[str(DEFAULT_DATA_DIR)],
+                        help="GPR files or directories (default: tests/data)")
+    parser.add_argument("--operation", choices=["decode", "dng", "raw"], default="decode",
+                        help="Work performed per file (default: decode)")
+    parser.add_argument("--max-threads", type=int, default=os.cpu_count() or 1,
+                        help="Largest thread count to measure (default: CPU count)")
+    parser.add_argument("--repeat", type=int, default=4,
+                        help="Number of times each file is processed per run (default: 4)")
+    args = parser.parse_args()
+
+    files = find_input_files(args.paths)
+    if not files:
+        print("ERROR: no GPR input files found")
+        return 1
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        task = make_task(args.operation, output_dir)
+
+        print(f"Checking {len(files)} candidate file(s)...")
+        files = usable_files(files, task)
+        if not files:
+            print("ERROR: none of the input files could be processed")
+            return 1
+
+        thread_counts = []
+        threads = 1
+        while threads < args.max_threads:
+            thread_counts.append(threads)
+            threads *= 2
+        thread_counts.append(args.max_threads)
+
+        print(f"\nOperation: {args.operation}, files: {len(files)}, repeat: {args.repeat}")
+        print(f"{'threads':>8} {'seconds':>10} {'files/s':>10} {'speedup':>9} {'efficiency':>11}")
+
+        baseline = None
+        for threads in thread_counts:
+            elapsed = run_workload(task, files, threads, args.repeat)
+            if baseline is None:
+                baseline = elapsed
+            speedup = baseline / elapsed if elapsed > 0 else 0.0
+            rate = len(files) * args.repeat / elapsed if elapsed > 0 else 0.0
+            print(f"{threads:>8} {elapsed:>10.3f} {rate:>10.1f} {speedup:>8.2f}x {speedup / threads:>10.0%}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
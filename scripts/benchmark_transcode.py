@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+GPR re-encoding benchmark for python-gpr.
+
+Re-encoding a GPR file with different parameters used to take two
+conversions through a DNG file on disk (GPR -> DNG -> GPR). This script
+compares that path with the direct re-encode, which decodes to raw pixels
+in memory and encodes again:
+
+* two-step: convert_gpr_to_dng to a temporary DNG, then convert_dng_to_gpr;
+* direct: convert_gpr_to_gpr from file to file;
+* in-memory: convert_gpr_to_gpr_bytes on the file contents;
+* batch: batch_convert of GPR -> GPR pairs on a thread pool.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    from python_gpr import _core  # noqa: F401
+except ImportError as e:
+    print(f"ERROR: python_gpr._core is not available: {e}")
+    print("Build the C++ extension first: pip install -e .")
+    sys.exit(1)
+
+from python_gpr.batch import batch_convert
+from python_gpr.conversion import (
+    GPRParameters,
+    convert_dng_to_gpr,
+    convert_gpr_to_dng,
+    convert_gpr_to_gpr,
+    convert_gpr_to_gpr_bytes,
+)
+
+
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / "tests" / "data"
+
+
+def find_input_files(paths):
+    """Collect GPR files from the given files or directories."""
+    files = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            files.extend(sorted(p for p in path.iterdir() if p.suffix.lower() == ".gpr"))
+        elif path.is_file():
+            files.append(path)
+    return files
+
+
+def usable_files(files, parameters):
+    """Filter out files the native library cannot re-encode (e.g. synthetic fixtures)."""
+    usable = []
+    for path in files:
+        try:
+            convert_gpr_to_gpr_bytes(path.read_bytes(), parameters)
+            usable.append(path)
+        except Exception as e:
+            print(f"  skipping {path.name}: {e}")
+    return usable
+
+
+def run_two_step(files, output_dir, parameters):
+    for i, path in enumerate(files):
+        dng_path = os.path.join(output_dir, f"{i}.dng")
+        convert_gpr_to_dng(str(path), dng_path)
+        convert_dng_to_gpr(dng_path, os.path.join(output_dir, f"{i}.GPR"), parameters)
+        os.remove(dng_path)
+
+
+def run_direct(files, output_dir, parameters):
+    for i, path in enumerate(files):
+        convert_gpr_to_gpr(str(path), os.path.join(output_dir, f"{i}.GPR"), parameters)
+
+
+def run_in_memory(files, output_dir, parameters):
+    for path in files:
+        convert_gpr_to_gpr_bytes(path.read_bytes(), parameters)
+
+
+def run_batch(files, output_dir, parameters, workers):
+    pairs = [(str(path), os.path.join(output_dir, f"{i}.GPR")) for i, path in enumerate(files)]
+    results = list(batch_convert(pairs, workers=workers, parameters=parameters))
+    failed = [r for r in results if not r.ok]
+    if failed:
+        raise RuntimeError(f"{len(failed)} conversion(s) failed, first: {failed[0].error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare GPR re-encoding paths")
+    parser.add_argument("paths", nargs="*", default=[str(DEFAULT_DATA_DIR)],
+                        help="GPR files or directories (default: tests/data)")
+    parser.add_argument("--repeat", type=int, default=4,
+                        help="Number of times each file is processed per run (default: 4)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Threads for the batch run (default: CPU count)")
+    parser.add_argument("--fast", action="store_true", help="Re-encode with fast_encoding")
+    args = parser.parse_args()
+
+    parameters = GPRParameters(fast_encoding=args.fast)
+    files = find_input_files(args.paths)
+    if not files:
+        print("ERROR: no GPR input files found")
+        return 1
+
+    print(f"Checking {len(files)} candidate file(s)...")
+    files = usable_files(files, parameters)
+    if not files:
+        print("ERROR: none of the input files could be re-encoded")
+        return 1
+    files = files * args.repeat
+
+    runs = [
+        ("two-step", lambda output_dir: run_two_step(files, output_dir, parameters)),
+        ("direct", lambda output_dir: run_direct(files, output_dir, parameters)),
+        ("in-memory", lambda output_dir: run_in_memory(files, output_dir, parameters)),
+        (f"batch x{args.workers}", lambda output_dir: run_batch(files, output_dir, parameters, args.workers)),
+    ]
+
+    print(f"\nFiles: {len(files)}, fast_encoding: {args.fast}")
+    print(f"{'method':>12} {'seconds':>10} {'files/s':>10} {'speedup':>9}")
+    baseline = None
+    for name, run in runs:
+        with tempfile.TemporaryDirectory() as output_dir:
+            start = time.perf_counter()
+            run(output_dir)
+            elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline = elapsed
+        rate = len(files) / elapsed if elapsed > 0 else 0.0
+        speedup = baseline / elapsed if elapsed > 0 else 0.0
+        print(f"{name:>12} {elapsed:>10.3f} {rate:>10.1f} {speedup:>8.2f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
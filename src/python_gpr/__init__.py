@@ -30,11 +30,22 @@ except ImportError as e:
 
 # Import main functionality when available
 try:
+    # Import C++ core module first, so the Python wrappers imported below
+    # replace native functions of the same name
+    try:
+        from ._core import *
+        _core_import_error = None
+    except ImportError as e:
+        _core_import_error = e
     from .core import *
     from .conversion import *
     from .metadata import *
-    # Import C++ core module
-    from ._core import *
+    from .allocator import *
+    from .cache import *
+    from .batch import *
+    from .sync import *
+    if _core_import_error is not None:
+        raise _core_import_error
     _bindings_available = True
 except ImportError as e:
     # Bindings not yet available - this is expected during initial development
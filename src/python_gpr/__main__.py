@@ -0,0 +1,7 @@
+"""Run the python-gpr command line with ``python -m python_gpr``."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
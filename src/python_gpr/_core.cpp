@@ -4,6 +4,34 @@
 #include <string>
 #include <fstream>
 #include <stdexcept>
+#include <vector>
+#include <algorithm>
+#include <array>
+#include <limits>
+#include <cstring>
+#include <cstdint>
+#include <atomic>
+#include <cmath>
+#include <exception>
+#include <functional>
+#include <map>
+#include <mutex>
+#include <cstdlib>
+#include <memory>
+#include <thread>
+
+#ifdef _WIN32
+#ifndef NOMINMAX
+#define NOMINMAX
+#endif
+#include <windows.h>
+#else
+#include <cerrno>
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
 
 // Include GPR headers
 extern "C" {
@@ -91,11 +119,220 @@ private:
     std::string format_;
 };
 
+// Native allocator
+//
+// All buffers handed to the GPR SDK come from native_alloc/native_free. Each
+// block carries a small header with its capacity so that, with the "pool"
+// allocator selected, freed blocks can be kept in per-size-class free lists
+// and reused by later calls instead of being returned to the system. Batch
+// decodes allocate the same 20-50 MB buffers over and over, which malloc
+// would otherwise hand back to the OS and map again every time. The "system"
+// allocator uses the same block format without caching, so the allocator
+// can be switched while buffers are still alive.
+
+// Header in front of every block; its size keeps the payload 16-byte aligned
+struct BlockHeader {
+    size_t capacity;
+    size_t poolable;
+    size_t reserved[2];
+};
+
+// Blocks smaller than this are never pooled
+const size_t POOL_MIN_BLOCK = 64 * 1024;
+const size_t POOL_DEFAULT_MAX_BYTES = static_cast<size_t>(512) * 1024 * 1024;
+
+// Round a request up to its size class: multiples of 1/8 of the largest
+// power of two not above it, so at most 12.5% of a block is wasted.
+size_t pool_size_class(size_t size) {
+    if (size <= POOL_MIN_BLOCK) {
+        return POOL_MIN_BLOCK;
+    }
+    size_t power = POOL_MIN_BLOCK;
+    while (power <= size / 2) {
+        power *= 2;
+    }
+    size_t step = power / 8;
+    return (size + step - 1) / step * step;
+}
+
+struct AllocatorState {
+    std::mutex mutex;
+    bool pooling = false;
+    size_t max_bytes = POOL_DEFAULT_MAX_BYTES;
+    std::map<size_t, std::vector<BlockHeader*>> free_lists;
+    size_t cached_bytes = 0;
+    size_t cached_blocks = 0;
+    size_t in_use_bytes = 0;
+    size_t peak_in_use_bytes = 0;
+    uint64_t allocations = 0;
+    uint64_t frees = 0;
+    uint64_t hits = 0;
+    uint64_t misses = 0;
+    uint64_t evictions = 0;
+};
+
+AllocatorState& allocator_state() {
+    static AllocatorState* state = new AllocatorState();  // Never destroyed: blocks may outlive module teardown
+    return *state;
+}
+
+// Free cached blocks until at most limit bytes remain cached. Caller holds the mutex.
+void trim_pool_locked(AllocatorState& state, size_t limit) {
+    while (state.cached_bytes > limit && !state.free_lists.empty()) {
+        // Release the largest blocks first
+        auto it = std::prev(state.free_lists.end());
+        while (!it->second.empty() && state.cached_bytes > limit) {
+            BlockHeader* header = it->second.back();
+            it->second.pop_back();
+            state.cached_bytes -= header->capacity;
+            state.cached_blocks -= 1;
+            state.evictions += 1;
+            std::free(header);
+        }
+        if (it->second.empty()) {
+            state.free_lists.erase(it);
+        }
+    }
+}
+
+void* native_alloc(size_t size) {
+    AllocatorState& state = allocator_state();
+    const bool poolable = size >= POOL_MIN_BLOCK;
+    const size_t capacity = poolable ? pool_size_class(size) : size;
+    BlockHeader* header = nullptr;
+    
+    {
+        std::lock_guard<std::mutex> lock(state.mutex);
+        state.allocations += 1;
+        if (poolable) {
+            auto it = state.free_lists.find(capacity);
+            if (state.pooling && it != state.free_lists.end() && !it->second.empty()) {
+                header = it->second.back();
+                it->second.pop_back();
+                state.cached_bytes -= capacity;
+                state.cached_blocks -= 1;
+                state.hits += 1;
+            } else {
+                state.misses += 1;
+            }
+        }
+        if (header != nullptr) {
+            state.in_use_bytes += capacity;
+            state.peak_in_use_bytes = std::max(state.peak_in_use_bytes, state.in_use_bytes);
+        }
+    }
+    
+    if (header == nullptr) {
+        if (capacity > std::numeric_limits<size_t>::max() - sizeof(BlockHeader)) {
+            return nullptr;
+        }
+        header = static_cast<BlockHeader*>(std::malloc(sizeof(BlockHeader) + capacity));
+        if (header == nullptr) {
+            return nullptr;
+        }
+        header->capacity = capacity;
+        header->poolable = poolable ? 1 : 0;
+        std::lock_guard<std::mutex> lock(state.mutex);
+        state.in_use_bytes += capacity;
+        state.peak_in_use_bytes = std::max(state.peak_in_use_bytes, state.in_use_bytes);
+    }
+    return header + 1;
+}
+
+void native_free(void* block) {
+    if (block == nullptr) {
+        return;
+    }
+    AllocatorState& state = allocator_state();
+    BlockHeader* header = static_cast<BlockHeader*>(block) - 1;
+    
+    {
+        std::lock_guard<std::mutex> lock(state.mutex);
+        state.frees += 1;
+        state.in_use_bytes -= header->capacity;
+        if (state.pooling && header->poolable && state.cached_bytes + header->capacity <= state.max_bytes) {
+            state.free_lists[header->capacity].push_back(header);
+            state.cached_bytes += header->capacity;
+            state.cached_blocks += 1;
+            return;
+        }
+    }
+    std::free(header);
+}
+
+// The allocator passed to every GPR SDK call
+gpr_allocator native_allocator() {
+    gpr_allocator allocator;
+    allocator.Alloc = native_alloc;
+    allocator.Free = native_free;
+    return allocator;
+}
+
+// Select the "system" allocator or the "pool" allocator caching up to
+// max_bytes of freed blocks
+void set_native_allocator(const std::string& kind, size_t max_bytes) {
+    if (kind != "system" && kind != "pool") {
+        throw GPRParameterError("Unknown allocator '" + kind + "'. Supported: system, pool", "kind");
+    }
+    AllocatorState& state = allocator_state();
+    std::lock_guard<std::mutex> lock(state.mutex);
+    state.pooling = kind == "pool";
+    state.max_bytes = max_bytes;
+    trim_pool_locked(state, state.pooling ? max_bytes : 0);
+}
+
+// Return all cached blocks to the system
+void trim_native_allocator() {
+    AllocatorState& state = allocator_state();
+    std::lock_guard<std::mutex> lock(state.mutex);
+    trim_pool_locked(state, 0);
+}
+
+py::dict get_native_allocator_stats() {
+    AllocatorState& state = allocator_state();
+    std::lock_guard<std::mutex> lock(state.mutex);
+    py::dict stats;
+    stats["kind"] = state.pooling ? "pool" : "system";
+    stats["max_bytes"] = state.max_bytes;
+    stats["allocations"] = state.allocations;
+    stats["frees"] = state.frees;
+    stats["hits"] = state.hits;
+    stats["misses"] = state.misses;
+    stats["evictions"] = state.evictions;
+    stats["cached_bytes"] = state.cached_bytes;
+    stats["cached_blocks"] = state.cached_blocks;
+    stats["in_use_bytes"] = state.in_use_bytes;
+    stats["peak_in_use_bytes"] = state.peak_in_use_bytes;
+    return stats;
+}
+
+void reset_native_allocator_stats() {
+    AllocatorState& state = allocator_state();
+    std::lock_guard<std::mutex> lock(state.mutex);
+    state.allocations = 0;
+    state.frees = 0;
+    state.hits = 0;
+    state.misses = 0;
+    state.evictions = 0;
+    state.peak_in_use_bytes = state.in_use_bytes;
+}
+
+// Process-wide I/O counters. They make it possible to check how much of a
+// file each operation reads (e.g. that a decode reads the file exactly once).
+std::atomic<uint64_t> g_io_bytes_read(0);
+std::atomic<uint64_t> g_io_read_calls(0);
+
+void record_file_read(size_t bytes) {
+    g_io_bytes_read += bytes;
+    g_io_read_calls += 1;
+}
+
 // Helper function to read file into gpr_buffer
 bool read_file_to_buffer(const std::string& filepath, gpr_buffer* buffer, const gpr_allocator* allocator) {
     if (read_from_file(buffer, filepath.c_str(), allocator->Alloc, allocator->Free) != 0) {
         return false;
     }
+    record_file_read(buffer->size);
     return true;
 }
 
@@ -160,15 +397,29 @@ void cleanup_buffer_safe(gpr_buffer* buffer, const gpr_allocator& allocator) {
     }
 }
 
+// Copy the caller-settable fields of parameters onto dst, which must already
+// hold SDK defaults. Buffers owned by the SDK (GPMF payload, preview image)
+// are left alone, so dst can be destroyed with gpr_parameters_destroy as usual.
+void apply_parameter_overrides(gpr_parameters* dst, const gpr_parameters* parameters) {
+    if (parameters == nullptr) {
+        return;
+    }
+    dst->input_width = parameters->input_width;
+    dst->input_height = parameters->input_height;
+    dst->input_pitch = parameters->input_pitch;
+    dst->fast_encoding = parameters->fast_encoding;
+    dst->compute_md5sum = parameters->compute_md5sum;
+    dst->enable_preview = parameters->enable_preview;
+}
+
 // Enhanced GPR to DNG conversion function with comprehensive error handling
-bool convert_gpr_to_dng(const std::string& input_path, const std::string& output_path) {
+bool convert_gpr_to_dng(const std::string& input_path, const std::string& output_path,
+                        const gpr_parameters* overrides = nullptr) {
     try {
         validate_input_file(input_path);
         
         // Set up allocator
-        gpr_allocator allocator;
-        allocator.Alloc = gpr_global_malloc;
-        allocator.Free = gpr_global_free;
+        gpr_allocator allocator = native_allocator();
         
         // Initialize buffers
         gpr_buffer input_buffer = {nullptr, 0};
@@ -185,6 +436,7 @@ bool convert_gpr_to_dng(const std::string& input_path, const std::string& output
             // Set up default parameters
             gpr_parameters_set_defaults(&parameters);
             parameters_initialized = true;
+            apply_parameter_overrides(&parameters, overrides);
             
             // Perform GPR to DNG conversion
             bool success = gpr_convert_gpr_to_dng(&allocator, &parameters, &input_buffer, &output_buffer);
@@ -255,13 +507,12 @@ bool convert_gpr_to_dng(const std::string& input_path, const std::string& output
 }
 
 // DNG to GPR conversion function
-bool convert_dng_to_gpr(const std::string& input_path, const std::string& output_path) {
+bool convert_dng_to_gpr(const std::string& input_path, const std::string& output_path,
+                        const gpr_parameters* overrides = nullptr) {
     validate_input_file(input_path);
     
     // Set up allocator
-    gpr_allocator allocator;
-    allocator.Alloc = gpr_global_malloc;
-    allocator.Free = gpr_global_free;
+    gpr_allocator allocator = native_allocator();
     
     // Initialize buffers
     gpr_buffer input_buffer = {nullptr, 0};
@@ -276,6 +527,7 @@ bool convert_dng_to_gpr(const std::string& input_path, const std::string& output
         // Set up default parameters
         gpr_parameters parameters;
         gpr_parameters_set_defaults(&parameters);
+        apply_parameter_overrides(&parameters, overrides);
         
         // Perform DNG to GPR conversion
         bool success = gpr_convert_dng_to_gpr(&allocator, &parameters, &input_buffer, &output_buffer);
@@ -337,9 +589,7 @@ bool convert_gpr_to_raw(const std::string& input_path, const std::string& output
     validate_input_file(input_path);
     
     // Set up allocator
-    gpr_allocator allocator;
-    allocator.Alloc = gpr_global_malloc;
-    allocator.Free = gpr_global_free;
+    gpr_allocator allocator = native_allocator();
     
     // Initialize buffers
     gpr_buffer input_buffer = {nullptr, 0};
@@ -404,13 +654,12 @@ bool convert_gpr_to_raw(const std::string& input_path, const std::string& output
 }
 
 // Add a working DNG to DNG function to demonstrate the binding works
-bool convert_dng_to_dng(const std::string& input_path, const std::string& output_path) {
+bool convert_dng_to_dng(const std::string& input_path, const std::string& output_path,
+                        const gpr_parameters* overrides = nullptr) {
     validate_input_file(input_path);
     
     // Set up allocator
-    gpr_allocator allocator;
-    allocator.Alloc = gpr_global_malloc;
-    allocator.Free = gpr_global_free;
+    gpr_allocator allocator = native_allocator();
     
     // Initialize buffers
     gpr_buffer input_buffer = {nullptr, 0};
@@ -425,6 +674,7 @@ bool convert_dng_to_dng(const std::string& input_path, const std::string& output
         // Set up default parameters
         gpr_parameters parameters;
         gpr_parameters_set_defaults(&parameters);
+        apply_parameter_overrides(&parameters, overrides);
         
         // Perform conversion
         bool success = gpr_convert_dng_to_dng(&allocator, &parameters, &input_buffer, &output_buffer);
@@ -481,6 +731,149 @@ bool convert_dng_to_dng(const std::string& input_path, const std::string& output
     }
 }
 
+// In-memory conversion functions operating on buffer-protocol objects
+
+// The conversions supported by the GPR SDK on in-memory buffers
+enum class ConversionKind {
+    GPR_TO_DNG,
+    DNG_TO_GPR,
+    GPR_TO_RAW,
+    DNG_TO_DNG
+};
+
+const char* conversion_name(ConversionKind kind) {
+    switch (kind) {
+        case ConversionKind::GPR_TO_DNG: return "GPR to DNG conversion";
+        case ConversionKind::DNG_TO_GPR: return "DNG to GPR conversion";
+        case ConversionKind::GPR_TO_RAW: return "GPR to RAW conversion";
+        case ConversionKind::DNG_TO_DNG: return "DNG to DNG conversion";
+    }
+    return "conversion";
+}
+
+// Run a conversion between two gpr_buffers. Does not touch Python state, so
+// it can be called with the GIL released. parameters are only read; when
+// none are given, defaults are used. On success the caller owns
+// output->buffer and must free it with allocator.Free.
+void run_conversion(ConversionKind kind, const gpr_allocator& allocator,
+                    gpr_buffer* input, gpr_buffer* output,
+                    const gpr_parameters* parameters = nullptr) {
+    gpr_parameters defaults;
+    if (parameters == nullptr) {
+        gpr_parameters_set_defaults(&defaults);
+        parameters = &defaults;
+    }
+    
+    bool success = false;
+    switch (kind) {
+        case ConversionKind::GPR_TO_DNG:
+            success = gpr_convert_gpr_to_dng(&allocator, parameters, input, output);
+            break;
+        case ConversionKind::DNG_TO_GPR:
+            success = gpr_convert_dng_to_gpr(&allocator, parameters, input, output);
+            break;
+        case ConversionKind::GPR_TO_RAW:
+            success = gpr_convert_gpr_to_raw(&allocator, input, output);
+            break;
+        case ConversionKind::DNG_TO_DNG:
+            success = gpr_convert_dng_to_dng(&allocator, parameters, input, output);
+            break;
+    }
+    
+    if (parameters == &defaults) {
+        gpr_parameters_destroy(&defaults, allocator.Free);
+    }
+    
+    if (!success) {
+        cleanup_buffer_safe(output, allocator);
+        throw GPRConversionError(std::string(conversion_name(kind)) + " failed");
+    }
+    
+    if (output->buffer == nullptr || output->size == 0) {
+        cleanup_buffer_safe(output, allocator);
+        throw GPRConversionError("Conversion produced empty output buffer");
+    }
+}
+
+// RAII wrapper around a contiguous, read-only Py_buffer. Must be created and
+// destroyed with the GIL held.
+class InputBufferView {
+public:
+    explicit InputBufferView(const py::object& data) {
+        if (PyObject_GetBuffer(data.ptr(), &view_, PyBUF_SIMPLE) != 0) {
+            throw py::error_already_set();
+        }
+    }
+    
+    ~InputBufferView() {
+        PyBuffer_Release(&view_);
+    }
+    
+    InputBufferView(const InputBufferView&) = delete;
+    InputBufferView& operator=(const InputBufferView&) = delete;
+    
+    void* data() const { return view_.buf; }
+    size_t size() const { return static_cast<size_t>(view_.len); }
+    
+private:
+    Py_buffer view_;
+};
+
+// Convert the contents of any buffer-protocol object (bytes, bytearray,
+// memoryview, mmap, ...) and return the result as bytes. The input is used
+// in place; nothing is written to or read from the filesystem.
+py::bytes convert_buffer(const py::object& data, ConversionKind kind,
+                         const gpr_parameters* overrides = nullptr) {
+    InputBufferView view(data);
+    if (view.size() == 0) {
+        throw GPRParameterError("Input buffer is empty", "data");
+    }
+    
+    gpr_allocator allocator = native_allocator();
+    
+    // The SDK takes a non-const gpr_buffer but only reads the input
+    gpr_buffer input_buffer = {view.data(), view.size()};
+    gpr_buffer output_buffer = {nullptr, 0};
+    
+    gpr_parameters parameters;
+    gpr_parameters_set_defaults(&parameters);
+    apply_parameter_overrides(&parameters, overrides);
+    
+    try {
+        py::gil_scoped_release release;
+        run_conversion(kind, allocator, &input_buffer, &output_buffer, &parameters);
+    } catch (...) {
+        gpr_parameters_destroy(&parameters, allocator.Free);
+        throw;
+    }
+    gpr_parameters_destroy(&parameters, allocator.Free);
+    
+    try {
+        py::bytes result(static_cast<const char*>(output_buffer.buffer), output_buffer.size);
+        cleanup_buffer_safe(&output_buffer, allocator);
+        return result;
+    } catch (...) {
+        cleanup_buffer_safe(&output_buffer, allocator);
+        throw;
+    }
+}
+
+py::bytes convert_gpr_to_dng_bytes(const py::object& data, const gpr_parameters* parameters) {
+    return convert_buffer(data, ConversionKind::GPR_TO_DNG, parameters);
+}
+
+py::bytes convert_dng_to_gpr_bytes(const py::object& data, const gpr_parameters* parameters) {
+    return convert_buffer(data, ConversionKind::DNG_TO_GPR, parameters);
+}
+
+py::bytes convert_gpr_to_raw_bytes(const py::object& data) {
+    return convert_buffer(data, ConversionKind::GPR_TO_RAW);
+}
+
+py::bytes convert_dng_to_dng_bytes(const py::object& data, const gpr_parameters* parameters) {
+    return convert_buffer(data, ConversionKind::DNG_TO_DNG, parameters);
+}
+
 // NumPy integration functions for raw image data access
 
 // Structure to hold image information
@@ -490,228 +883,2006 @@ struct ImageInfo {
     int channels;
     std::string format;
     size_t data_size;
+    std::string cfa_pattern;
+    int bit_depth;
+    int compression;
+    std::vector<double> black_level;  // Per 2x2 CFA position, row-major from the image origin
+    int white_level;
 };
 
-// Get image information from GPR file
-ImageInfo get_image_info(const std::string& input_path) {
-    validate_input_file(input_path);
+// TIFF/DNG header parsing
+//
+// GPR files are DNG containers, so everything needed to describe the raw
+// image (dimensions, CFA layout, bit depth, compression, black and white
+// levels) is available from
+// the TIFF IFDs at the start of the file. The parser below walks the IFDs
+// through a ByteSource and only reads the handful of bytes it needs instead
+// of loading and decoding the whole file.
+
+// TIFF tags used by the header parser
+const uint16_t TIFF_TAG_NEW_SUBFILE_TYPE = 254;
+const uint16_t TIFF_TAG_IMAGE_WIDTH = 256;
+const uint16_t TIFF_TAG_IMAGE_LENGTH = 257;
+const uint16_t TIFF_TAG_BITS_PER_SAMPLE = 258;
+const uint16_t TIFF_TAG_COMPRESSION = 259;
+const uint16_t TIFF_TAG_PHOTOMETRIC = 262;
+const uint16_t TIFF_TAG_SAMPLES_PER_PIXEL = 277;
+const uint16_t TIFF_TAG_SUB_IFDS = 330;
+const uint16_t TIFF_TAG_CFA_REPEAT_PATTERN_DIM = 33421;
+const uint16_t TIFF_TAG_CFA_PATTERN = 33422;
+const uint16_t DNG_TAG_BLACK_LEVEL_REPEAT_DIM = 50713;
+const uint16_t DNG_TAG_BLACK_LEVEL = 50714;
+const uint16_t DNG_TAG_WHITE_LEVEL = 50717;
+
+const uint16_t TIFF_PHOTOMETRIC_CFA = 32803;
+
+// Limits protecting against corrupted or malicious headers
+const size_t TIFF_MAX_IFDS = 32;
+const uint16_t TIFF_MAX_IFD_ENTRIES = 4096;
+const uint32_t TIFF_MAX_VALUE_COUNT = 1 << 16;
+
+// Random-access source of bytes for the header parser
+class ByteSource {
+public:
+    virtual ~ByteSource() {}
     
-    // Set up allocator
-    gpr_allocator allocator;
-    allocator.Alloc = gpr_global_malloc;
-    allocator.Free = gpr_global_free;
+    // Read exactly size bytes starting at offset. Returns false on a short read.
+    virtual bool read_at(uint64_t offset, void* destination, size_t size) = 0;
+};
+
+// ByteSource reading from a file on disk with seek/read
+class FileByteSource : public ByteSource {
+public:
+    explicit FileByteSource(const std::string& filepath)
+        : file_(filepath, std::ios::in | std::ios::binary) {
+        if (!file_.is_open()) {
+            throw GPRFileError("Input file does not exist or cannot be accessed: " + filepath, filepath, -2);
+        }
+    }
     
-    // Initialize buffer
-    gpr_buffer input_buffer = {nullptr, 0};
+    bool read_at(uint64_t offset, void* destination, size_t size) override {
+        file_.clear();
+        file_.seekg(static_cast<std::streamoff>(offset), std::ios::beg);
+        if (!file_) {
+            return false;
+        }
+        file_.read(static_cast<char*>(destination), static_cast<std::streamsize>(size));
+        record_file_read(static_cast<size_t>(file_.gcount()));
+        return static_cast<size_t>(file_.gcount()) == size;
+    }
     
-    try {
-        // Read input file
-        if (!read_file_to_buffer(input_path, &input_buffer, &allocator)) {
-            throw GPRConversionError("Failed to read input file: " + input_path);
+private:
+    std::ifstream file_;
+};
+
+// ByteSource over a block of memory that is already loaded
+class MemoryByteSource : public ByteSource {
+public:
+    MemoryByteSource(const void* data, size_t size)
+        : data_(static_cast<const uint8_t*>(data)), size_(size) {}
+    
+    bool read_at(uint64_t offset, void* destination, size_t size) override {
+        if (offset > size_ || size > size_ - offset) {
+            return false;
         }
-        
-        // Set up default parameters
-        gpr_parameters parameters;
-        gpr_parameters_set_defaults(&parameters);
-        
-        // Try to get image information from the GPR file
-        // This is a simplified approach - in a real implementation,
-        // we would need to parse the GPR/DNG structure to extract dimensions
-        ImageInfo info;
-        
-        // For now, provide reasonable defaults based on common GPR dimensions
-        // These would normally be extracted from the file metadata
-        info.width = 4000;    // Common GPR width
-        info.height = 3000;   // Common GPR height  
-        info.channels = 1;    // Raw files are typically single channel
-        info.format = "uint16"; // Common raw data format
-        info.data_size = info.width * info.height * info.channels * sizeof(uint16_t);
-        
-        // Clean up
-        gpr_parameters_destroy(&parameters, allocator.Free);
-        if (input_buffer.buffer) {
-            allocator.Free(input_buffer.buffer);
+        std::memcpy(destination, data_ + offset, size);
+        return true;
+    }
+    
+private:
+    const uint8_t* data_;
+    size_t size_;
+};
+
+// ByteSource over a seekable binary Python file object, read with seek()
+// and read(). Offsets are relative to the position of the object when the
+// source is created, and that position is restored afterwards. Must be used
+// with the GIL held.
+class PyFileByteSource : public ByteSource {
+public:
+    explicit PyFileByteSource(const py::object& file)
+        : file_(file), start_(file.attr("tell")().cast<uint64_t>()) {}
+    
+    ~PyFileByteSource() {
+        try {
+            file_.attr("seek")(start_);
+        } catch (...) {
+        }
+    }
+    
+    bool read_at(uint64_t offset, void* destination, size_t size) override {
+        file_.attr("seek")(start_ + offset);
+        size_t done = 0;
+        while (done < size) {
+            py::object chunk = file_.attr("read")(size - done);
+            if (!PyBytes_Check(chunk.ptr())) {
+                throw GPRParameterError("File object must be opened in binary mode", "source");
+            }
+            const size_t length = static_cast<size_t>(PyBytes_GET_SIZE(chunk.ptr()));
+            if (length == 0) {
+                return false;
+            }
+            std::memcpy(static_cast<uint8_t*>(destination) + done, PyBytes_AS_STRING(chunk.ptr()),
+                        std::min(length, size - done));
+            done += length;
+        }
+        return true;
+    }
+
+private:
+    py::object file_;
+    uint64_t start_;
+};
+
+// One 12-byte IFD entry
+struct TiffEntry {
+    uint16_t tag;
+    uint16_t type;
+    uint32_t count;
+    uint8_t value[4];  // Inline value or offset to the value, in file byte order
+};
+
+// Size in bytes of a single value of each TIFF field type
+size_t tiff_type_size(uint16_t type) {
+    switch (type) {
+        case 1: case 2: case 6: case 7: return 1;  // BYTE, ASCII, SBYTE, UNDEFINED
+        case 3: case 8: return 2;                  // SHORT, SSHORT
+        case 4: case 9: case 11: case 13: return 4; // LONG, SLONG, FLOAT, IFD
+        case 5: case 10: case 12: return 8;        // RATIONAL, SRATIONAL, DOUBLE
+        default: return 0;
+    }
+}
+
+class TiffReader {
+public:
+    explicit TiffReader(ByteSource& source) : source_(source), little_endian_(true) {}
+    
+    // Parse the 8-byte TIFF header and return the offset of IFD0
+    uint32_t read_header() {
+        uint8_t header[8];
+        if (!source_.read_at(0, header, sizeof(header))) {
+            throw GPRFormatError("File is too small to contain a TIFF/DNG header", "tiff");
+        }
+        if (header[0] == 'I' && header[1] == 'I') {
+            little_endian_ = true;
+        } else if (header[0] == 'M' && header[1] == 'M') {
+            little_endian_ = false;
+        } else {
+            throw GPRFormatError("Not a TIFF/DNG file (missing byte order mark)", "tiff");
+        }
+        if (u16(header + 2) != 42) {
+            throw GPRFormatError("Not a TIFF/DNG file (bad magic number)", "tiff");
+        }
+        return u32(header + 4);
+    }
+    
+    // Read the entries of the IFD at offset. Returns the offset of the next IFD.
+    uint32_t read_ifd(uint32_t offset, std::vector<TiffEntry>& entries) {
+        uint8_t count_bytes[2];
+        if (!source_.read_at(offset, count_bytes, sizeof(count_bytes))) {
+            throw GPRFormatError("Truncated TIFF/DNG header: cannot read IFD at offset " + std::to_string(offset), "tiff");
+        }
+        uint16_t count = u16(count_bytes);
+        if (count == 0 || count > TIFF_MAX_IFD_ENTRIES) {
+            throw GPRFormatError("Corrupted TIFF/DNG header: invalid IFD entry count " + std::to_string(count), "tiff");
         }
         
-        return info;
+        std::vector<uint8_t> table(static_cast<size_t>(count) * 12 + 4);
+        if (!source_.read_at(static_cast<uint64_t>(offset) + 2, table.data(), table.size())) {
+            throw GPRFormatError("Truncated TIFF/DNG header: incomplete IFD at offset " + std::to_string(offset), "tiff");
+        }
         
-    } catch (const GPRConversionError&) {
-        // Clean up on error
-        if (input_buffer.buffer) {
-            allocator.Free(input_buffer.buffer);
+        entries.clear();
+        entries.reserve(count);
+        for (uint16_t i = 0; i < count; ++i) {
+            const uint8_t* p = table.data() + static_cast<size_t>(i) * 12;
+            TiffEntry entry;
+            entry.tag = u16(p);
+            entry.type = u16(p + 2);
+            entry.count = u32(p + 4);
+            std::memcpy(entry.value, p + 8, 4);
+            entries.push_back(entry);
         }
-        throw;
-    } catch (const std::exception& e) {
-        // Clean up on error
-        if (input_buffer.buffer) {
-            allocator.Free(input_buffer.buffer);
+        return u32(table.data() + static_cast<size_t>(count) * 12);
+    }
+    
+    // Read the raw bytes of an entry's value, following the offset if needed
+    std::vector<uint8_t> read_bytes(const TiffEntry& entry) {
+        size_t type_size = tiff_type_size(entry.type);
+        if (type_size == 0 || entry.count > TIFF_MAX_VALUE_COUNT) {
+            throw GPRFormatError("Corrupted TIFF/DNG header: bad value for tag " + std::to_string(entry.tag), "tiff");
+        }
+        size_t total = type_size * entry.count;
+        std::vector<uint8_t> bytes(total);
+        if (total <= 4) {
+            std::memcpy(bytes.data(), entry.value, total);
+        } else if (!source_.read_at(u32(entry.value), bytes.data(), total)) {
+            throw GPRFormatError("Truncated TIFF/DNG header: cannot read value of tag " + std::to_string(entry.tag), "tiff");
+        }
+        return bytes;
+    }
+    
+    // Read an entry's values as numbers (integer and rational types)
+    std::vector<double> read_numbers(const TiffEntry& entry) {
+        std::vector<uint8_t> bytes = read_bytes(entry);
+        std::vector<double> values;
+        values.reserve(entry.count);
+        for (uint32_t i = 0; i < entry.count; ++i) {
+            switch (entry.type) {
+                case 1: case 7: values.push_back(bytes[i]); break;
+                case 6: values.push_back(static_cast<int8_t>(bytes[i])); break;
+                case 3: values.push_back(u16(&bytes[i * 2])); break;
+                case 8: values.push_back(static_cast<int16_t>(u16(&bytes[i * 2]))); break;
+                case 4: case 13: values.push_back(u32(&bytes[i * 4])); break;
+                case 9: values.push_back(static_cast<int32_t>(u32(&bytes[i * 4]))); break;
+                case 5: {
+                    uint32_t denominator = u32(&bytes[i * 8 + 4]);
+                    values.push_back(denominator ? static_cast<double>(u32(&bytes[i * 8])) / denominator : 0.0);
+                    break;
+                }
+                case 10: {
+                    int32_t denominator = static_cast<int32_t>(u32(&bytes[i * 8 + 4]));
+                    values.push_back(denominator ? static_cast<double>(static_cast<int32_t>(u32(&bytes[i * 8]))) / denominator : 0.0);
+                    break;
+                }
+                default:
+                    throw GPRFormatError("Unsupported TIFF value type " + std::to_string(entry.type) +
+                                         " for tag " + std::to_string(entry.tag), "tiff");
+            }
+        }
+        return values;
+    }
+    
+    // Read the first value of an entry as an unsigned integer
+    uint32_t read_uint(const TiffEntry& entry) {
+        std::vector<double> values = read_numbers(entry);
+        if (values.empty()) {
+            throw GPRFormatError("Corrupted TIFF/DNG header: empty value for tag " + std::to_string(entry.tag), "tiff");
+        }
+        return static_cast<uint32_t>(values[0]);
+    }
+    
+private:
+    uint16_t u16(const uint8_t* p) const {
+        return little_endian_ ? static_cast<uint16_t>(p[0] | (p[1] << 8))
+                              : static_cast<uint16_t>((p[0] << 8) | p[1]);
+    }
+    
+    uint32_t u32(const uint8_t* p) const {
+        return little_endian_
+            ? (static_cast<uint32_t>(p[0]) | (static_cast<uint32_t>(p[1]) << 8) |
+               (static_cast<uint32_t>(p[2]) << 16) | (static_cast<uint32_t>(p[3]) << 24))
+            : ((static_cast<uint32_t>(p[0]) << 24) | (static_cast<uint32_t>(p[1]) << 16) |
+               (static_cast<uint32_t>(p[2]) << 8) | static_cast<uint32_t>(p[3]));
+    }
+    
+    ByteSource& source_;
+    bool little_endian_;
+};
+
+// Description of one image stored in the file
+struct TiffImage {
+    uint32_t new_subfile_type = 0;
+    uint32_t width = 0;
+    uint32_t height = 0;
+    uint32_t bits_per_sample = 0;
+    uint32_t samples_per_pixel = 1;
+    uint32_t compression = 1;
+    uint32_t photometric = 0;
+    std::string cfa_pattern;
+    std::vector<double> black_level;  // 2x2, empty if the tag is missing
+    uint32_t white_level = 0;         // 0 if the tag is missing
+};
+
+// Expand the BlackLevel tag, which repeats over BlackLevelRepeatDim, to one
+// value per position of a 2x2 CFA tile
+std::vector<double> expand_black_level(const std::vector<double>& values, uint32_t repeat_rows,
+                                       uint32_t repeat_cols, uint32_t samples_per_pixel) {
+    std::vector<double> black(4, 0.0);
+    if (repeat_rows == 0 || repeat_cols == 0 || samples_per_pixel == 0 ||
+        values.size() < static_cast<size_t>(repeat_rows) * repeat_cols * samples_per_pixel) {
+        return values.empty() ? black : std::vector<double>(4, values[0]);
+    }
+    for (uint32_t row = 0; row < 2; ++row) {
+        for (uint32_t col = 0; col < 2; ++col) {
+            size_t index = (static_cast<size_t>(row % repeat_rows) * repeat_cols + col % repeat_cols) * samples_per_pixel;
+            black[row * 2 + col] = values[index];
         }
-        throw GPRConversionError("Error getting image info: " + std::string(e.what()));
     }
+    return black;
 }
 
-// Enhanced get_raw_image_data function with comprehensive error handling
-py::array get_raw_image_data(const std::string& input_path, const std::string& dtype) {
-    try {
-        validate_input_file(input_path);
-        
-        // Validate dtype parameter
-        if (dtype != "uint16" && dtype != "float32") {
-            std::vector<std::string> supported = {"uint16", "float32"};
-            std::string supported_str = "";
-            for (size_t i = 0; i < supported.size(); ++i) {
-                if (i > 0) supported_str += ", ";
-                supported_str += supported[i];
+// Build a pattern string such as "RGGB" from the CFAPattern tag
+std::string cfa_pattern_string(const std::vector<uint8_t>& pattern) {
+    static const char colors[] = {'R', 'G', 'B', 'C', 'M', 'Y', 'W'};
+    std::string result;
+    for (uint8_t value : pattern) {
+        result += value < sizeof(colors) ? colors[value] : '?';
+    }
+    return result;
+}
+
+TiffImage parse_tiff_image(TiffReader& reader, const std::vector<TiffEntry>& entries) {
+    TiffImage image;
+    uint32_t repeat_rows = 2, repeat_cols = 2;
+    uint32_t black_repeat_rows = 1, black_repeat_cols = 1;
+    std::vector<uint8_t> cfa;
+    std::vector<double> black;
+    
+    for (const TiffEntry& entry : entries) {
+        switch (entry.tag) {
+            case TIFF_TAG_NEW_SUBFILE_TYPE: image.new_subfile_type = reader.read_uint(entry); break;
+            case TIFF_TAG_IMAGE_WIDTH: image.width = reader.read_uint(entry); break;
+            case TIFF_TAG_IMAGE_LENGTH: image.height = reader.read_uint(entry); break;
+            case TIFF_TAG_BITS_PER_SAMPLE: image.bits_per_sample = reader.read_uint(entry); break;
+            case TIFF_TAG_COMPRESSION: image.compression = reader.read_uint(entry); break;
+            case TIFF_TAG_PHOTOMETRIC: image.photometric = reader.read_uint(entry); break;
+            case TIFF_TAG_SAMPLES_PER_PIXEL: image.samples_per_pixel = reader.read_uint(entry); break;
+            case TIFF_TAG_CFA_REPEAT_PATTERN_DIM: {
+                std::vector<double> dims = reader.read_numbers(entry);
+                if (dims.size() >= 2) {
+                    repeat_rows = static_cast<uint32_t>(dims[0]);
+                    repeat_cols = static_cast<uint32_t>(dims[1]);
+                }
+                break;
+            }
+            case TIFF_TAG_CFA_PATTERN: cfa = reader.read_bytes(entry); break;
+            case DNG_TAG_BLACK_LEVEL_REPEAT_DIM: {
+                std::vector<double> dims = reader.read_numbers(entry);
+                if (dims.size() >= 2) {
+                    black_repeat_rows = static_cast<uint32_t>(dims[0]);
+                    black_repeat_cols = static_cast<uint32_t>(dims[1]);
+                }
+                break;
             }
-            throw GPRParameterError("Unsupported dtype '" + dtype + "'. Supported types: " + supported_str, "dtype");
+            case DNG_TAG_BLACK_LEVEL: black = reader.read_numbers(entry); break;
+            case DNG_TAG_WHITE_LEVEL: image.white_level = reader.read_uint(entry); break;
+            default: break;
         }
-        
-        // Get image information first
-        ImageInfo info;
-        try {
-            info = get_image_info(input_path);
-        } catch (const GPRError&) {
-            throw; // Re-throw GPR errors
-        } catch (const std::exception& e) {
-            throw GPRConversionError("Failed to get image information: " + std::string(e.what()));
+    }
+    
+    if (!cfa.empty() && cfa.size() == static_cast<size_t>(repeat_rows) * repeat_cols) {
+        image.cfa_pattern = cfa_pattern_string(cfa);
+    }
+    if (!black.empty()) {
+        image.black_level = expand_black_level(black, black_repeat_rows, black_repeat_cols, image.samples_per_pixel);
+    }
+    return image;
+}
+
+// Walk IFD0, its SubIFDs and the IFD chain and return the raw CFA image.
+// DNG writers usually store a preview in IFD0 and the raw data in a SubIFD,
+// while GPR files may store the raw image directly in IFD0.
+ImageInfo parse_image_header(ByteSource& source) {
+    TiffReader reader(source);
+    std::vector<uint32_t> pending;
+    std::vector<uint32_t> visited;
+    pending.push_back(reader.read_header());
+    
+    bool found = false;
+    TiffImage best;
+    std::vector<TiffEntry> entries;
+    
+    while (!pending.empty() && visited.size() < TIFF_MAX_IFDS) {
+        uint32_t offset = pending.back();
+        pending.pop_back();
+        if (offset == 0 || std::find(visited.begin(), visited.end(), offset) != visited.end()) {
+            continue;
         }
+        visited.push_back(offset);
         
-        // Validate image info
-        if (info.width <= 0 || info.height <= 0) {
-            throw GPRFormatError("Invalid image dimensions: " + std::to_string(info.width) + "x" + std::to_string(info.height));
+        uint32_t next = reader.read_ifd(offset, entries);
+        if (next != 0) {
+            pending.push_back(next);
+        }
+        for (const TiffEntry& entry : entries) {
+            if (entry.tag == TIFF_TAG_SUB_IFDS) {
+                for (double sub_ifd : reader.read_numbers(entry)) {
+                    pending.push_back(static_cast<uint32_t>(sub_ifd));
+                }
+            }
         }
         
-        // Set up allocator
-        gpr_allocator allocator;
-        allocator.Alloc = gpr_global_malloc;
-        allocator.Free = gpr_global_free;
-        
-        // Initialize buffers
-        gpr_buffer input_buffer = {nullptr, 0};
-        gpr_buffer output_buffer = {nullptr, 0};
-        gpr_parameters parameters;
-        bool parameters_initialized = false;
+        TiffImage image = parse_tiff_image(reader, entries);
+        bool is_raw = image.photometric == TIFF_PHOTOMETRIC_CFA;
+        bool best_is_raw = found && best.photometric == TIFF_PHOTOMETRIC_CFA;
         
-        try {
-            // Read input file
-            if (!read_file_to_buffer(input_path, &input_buffer, &allocator)) {
-                throw GPRFileError("Failed to read input file for data extraction", input_path, -1);
-            }
-            
-            // Set up default parameters
-            gpr_parameters_set_defaults(&parameters);
-            parameters_initialized = true;
+        // Prefer the full-resolution CFA image; otherwise the largest main image
+        if (!found ||
+            (is_raw && !best_is_raw) ||
+            (is_raw == best_is_raw &&
+             static_cast<uint64_t>(image.width) * image.height > static_cast<uint64_t>(best.width) * best.height)) {
+            best = image;
+            found = true;
+        }
+    }
+    
+    if (!found || best.width == 0 || best.height == 0) {
+        throw GPRFormatError("TIFF/DNG header does not describe an image with valid dimensions", "tiff");
+    }
+    if (best.width > static_cast<uint32_t>(std::numeric_limits<int>::max()) ||
+        best.height > static_cast<uint32_t>(std::numeric_limits<int>::max())) {
+        throw GPRFormatError("Invalid image dimensions: " + std::to_string(best.width) + "x" + std::to_string(best.height), "tiff");
+    }
+    
+    ImageInfo info;
+    info.width = static_cast<int>(best.width);
+    info.height = static_cast<int>(best.height);
+    info.channels = static_cast<int>(best.samples_per_pixel);
+    info.format = "uint16";  // Decoded raw data is always 16-bit
+    info.data_size = static_cast<size_t>(info.width) * info.height * info.channels * sizeof(uint16_t);
+    info.cfa_pattern = best.cfa_pattern;
+    info.bit_depth = static_cast<int>(best.bits_per_sample);
+    info.compression = static_cast<int>(best.compression);
+    
+    // Without the DNG level tags the data spans the full range of its bit depth
+    info.black_level = best.black_level.empty() ? std::vector<double>(4, 0.0) : best.black_level;
+    if (best.white_level != 0) {
+        info.white_level = static_cast<int>(std::min<uint32_t>(best.white_level, 65535));
+    } else if (info.bit_depth > 0 && info.bit_depth < 16) {
+        info.white_level = (1 << info.bit_depth) - 1;
+    } else {
+        info.white_level = 65535;
+    }
+    return info;
+}
+
+// Get image information from a GPR/DNG file by walking its TIFF header.
+// Only the header and IFD entries are read, not the image data.
+ImageInfo get_image_info(const std::string& input_path) {
+    validate_input_file(input_path);
+    
+    try {
+        FileByteSource source(input_path);
+        return parse_image_header(source);
+    } catch (const GPRError&) {
+        throw;
+    } catch (const std::exception& e) {
+        throw GPRConversionError("Error getting image info: " + std::string(e.what()));
+    }
+}
+
+// Header of a path, a bytes-like object or a seekable binary file object.
+// Only the header bytes are read from a file object.
+ImageInfo get_image_info_from(const py::object& source) {
+    if (py::isinstance<py::str>(source) || py::hasattr(source, "__fspath__")) {
+        std::string path = py::module_::import("os").attr("fspath")(source).cast<std::string>();
+        py::gil_scoped_release release;
+        return get_image_info(path);
+    }
+    if (PyObject_CheckBuffer(source.ptr())) {
+        InputBufferView view(source);
+        py::gil_scoped_release release;
+        MemoryByteSource bytes(view.data(), view.size());
+        return parse_image_header(bytes);
+    }
+    if (py::hasattr(source, "read") && py::hasattr(source, "seek")) {
+        PyFileByteSource file(source);
+        return parse_image_header(file);
+    }
+    throw GPRParameterError("source must be a path, a bytes-like object or a seekable binary file object",
+                            "source");
+}
+
+// Ownership record for a decoder buffer handed to NumPy. The capsule that
+// holds it returns the memory to the allocator that produced it once the
+// last array referencing the data is released.
+struct OwnedBuffer {
+    void* data;
+    gpr_free free_fn;
+};
+
+py::capsule make_buffer_capsule(void* data, gpr_free free_fn) {
+    auto* owned = new OwnedBuffer{data, free_fn};
+    return py::capsule(owned, [](void* pointer) {
+        auto* owned = static_cast<OwnedBuffer*>(pointer);
+        if (owned->data != nullptr) {
+            owned->free_fn(owned->data);
+        }
+        delete owned;
+    });
+}
+
+// Lets the decoder allocate its output directly inside a caller-provided
+// array. While a target is set on the current thread, the first allocation
+// of exactly the target size is served from it and frees of it are ignored;
+// every other allocation goes to the native allocator.
+struct OutputTarget {
+    void* data = nullptr;
+    size_t size = 0;
+    bool claimed = false;
+};
+
+thread_local OutputTarget t_output_target;
+
+void* output_target_alloc(size_t size) {
+    OutputTarget& target = t_output_target;
+    if (target.data != nullptr && !target.claimed && size == target.size) {
+        target.claimed = true;
+        return target.data;
+    }
+    return native_alloc(size);
+}
+
+void output_target_free(void* block) {
+    if (block != nullptr && block == t_output_target.data) {
+        return;
+    }
+    native_free(block);
+}
+
+class ScopedOutputTarget {
+public:
+    ScopedOutputTarget(void* data, size_t size) {
+        t_output_target.data = data;
+        t_output_target.size = size;
+        t_output_target.claimed = false;
+    }
+    
+    ~ScopedOutputTarget() {
+        t_output_target.data = nullptr;
+        t_output_target.size = 0;
+        t_output_target.claimed = false;
+    }
+    
+    ScopedOutputTarget(const ScopedOutputTarget&) = delete;
+    ScopedOutputTarget& operator=(const ScopedOutputTarget&) = delete;
+};
+
+// Parse the image header of GPR data that is already in memory, so callers
+// only need to read the file once.
+ImageInfo parse_buffer_header(const gpr_buffer* input) {
+    MemoryByteSource source(input->buffer, input->size);
+    return parse_image_header(source);
+}
+
+// Decode GPR data that is already in memory to 16-bit raw pixels described
+// by info. The header dimensions are validated against the size of the
+// decoded output before they are used as an array shape. Does not touch
+// Python state. On success the caller owns output->buffer.
+void decode_raw_buffer(const gpr_allocator& allocator, gpr_buffer* input, gpr_buffer* output,
+                       const ImageInfo& info, const std::string& source_name) {
+    bool success = gpr_convert_gpr_to_raw(&allocator, input, output);
+    if (!success) {
+        cleanup_buffer_safe(output, allocator);
+        std::string context = get_error_context("GPR to raw conversion for data extraction", source_name);
+        throw GPRConversionError("Failed to convert GPR to raw format for data extraction (" + context + ")");
+    }
+    
+    // Validate output buffer
+    if (output->buffer == nullptr || output->size == 0) {
+        cleanup_buffer_safe(output, allocator);
+        throw GPRConversionError("Conversion produced empty output buffer during data extraction");
+    }
+    
+    // The decoder output must hold every row described by the header
+    size_t expected_size = static_cast<size_t>(info.width) * info.height * sizeof(uint16_t);
+    if (output->size < expected_size) {
+        size_t output_size = output->size;
+        cleanup_buffer_safe(output, allocator);
+        throw GPRFormatError("Output buffer size (" + std::to_string(output_size) + 
+                             ") is smaller than expected (" + std::to_string(expected_size) + ")");
+    }
+}
+
+// Raw pixel normalization
+//
+// Converting decoded 16-bit pixels to floating point is a per-pixel
+// multiply-add. Each position of the 2x2 CFA tile may have its own black
+// level, so every row is processed as column pairs with two precomputed
+// scale/offset pairs. This keeps the inner loop branch-free so the compiler
+// can vectorize it. Large images are split into bands of rows across threads.
+
+enum class Normalization {
+    NONE,        // Raw values converted to floating point unchanged
+    FULL_RANGE,  // Divide by 65535
+    SENSOR       // Map the black level to 0 and the white level to 1, clipped
+};
+
+Normalization parse_normalization(const py::object& normalize) {
+    if (normalize.is_none()) {
+        return Normalization::NONE;
+    }
+    if (py::isinstance<py::str>(normalize)) {
+        std::string value = normalize.cast<std::string>();
+        if (value == "sensor") {
+            return Normalization::SENSOR;
+        }
+        if (value == "full_range") {
+            return Normalization::FULL_RANGE;
+        }
+    }
+    throw GPRParameterError("normalize must be 'sensor', 'full_range' or None", "normalize");
+}
+
+// Per CFA position affine transform (value * scale + offset), indexed by
+// row parity * 2 + column parity
+struct NormalizationParams {
+    float scale[4];
+    float offset[4];
+    bool clip;
+};
+
+NormalizationParams make_normalization_params(Normalization mode, const std::vector<double>& black_level,
+                                              double white_level) {
+    NormalizationParams params;
+    params.clip = mode == Normalization::SENSOR;
+    for (int i = 0; i < 4; ++i) {
+        params.scale[i] = 1.0f;
+        params.offset[i] = 0.0f;
+        if (mode == Normalization::FULL_RANGE) {
+            params.scale[i] = 1.0f / 65535.0f;
+        } else if (mode == Normalization::SENSOR) {
+            double black = black_level.size() == 4 ? black_level[i] : 0.0;
+            double range = white_level - black;
+            if (!(range > 0.0)) {
+                throw GPRParameterError("White level (" + std::to_string(white_level) +
+                                        ") must be greater than black level (" + std::to_string(black) + ")",
+                                        "white_level");
+            }
+            params.scale[i] = static_cast<float>(1.0 / range);
+            params.offset[i] = static_cast<float>(-black / range);
+        }
+    }
+    return params;
+}
+
+// Convert a float to IEEE 754 half precision bits, rounding to nearest even.
+// Written with selects instead of branches so loops calling it vectorize.
+inline uint16_t float_to_half(float value) {
+    const uint32_t f16_overflow = (127 + 16) << 23;            // 65536.0f
+    const uint32_t min_normal = 113 << 23;                      // 2^-14
+    const uint32_t denormal_magic_bits = ((127 - 15) + (23 - 10) + 1) << 23;
+    float denormal_magic;
+    std::memcpy(&denormal_magic, &denormal_magic_bits, sizeof(denormal_magic));
+    
+    uint32_t bits;
+    std::memcpy(&bits, &value, sizeof(bits));
+    const uint32_t sign = bits & 0x80000000u;
+    const uint32_t magnitude = bits ^ sign;
+    
+    // Subnormal results: let the FPU round by adding a magic number
+    float magnitude_float;
+    std::memcpy(&magnitude_float, &magnitude, sizeof(magnitude_float));
+    float denormal_sum = magnitude_float + denormal_magic;
+    uint32_t denormal_bits;
+    std::memcpy(&denormal_bits, &denormal_sum, sizeof(denormal_bits));
+    const uint32_t denormal = denormal_bits - denormal_magic_bits;
+    
+    // Normal results: rebias the exponent and round the dropped mantissa bits
+    const uint32_t mantissa_odd = (magnitude >> 13) & 1;
+    const uint32_t normal = (magnitude + (static_cast<uint32_t>(15 - 127) << 23) + 0xfff + mantissa_odd) >> 13;
+    
+    // Overflow becomes infinity, NaN stays NaN
+    const uint32_t special = magnitude > 0x7f800000u ? 0x7e00 : 0x7c00;
+    
+    uint32_t half = magnitude < min_normal ? denormal : normal;
+    half = magnitude >= f16_overflow ? special : half;
+    return static_cast<uint16_t>(half | (sign >> 16));
+}
+
+// Normalize one row. The loop body handles a full CFA column pair so both
+// transforms stay in registers.
+inline void normalize_row(const uint16_t* source, float* destination, int width,
+                          float scale0, float offset0, float scale1, float offset1, bool clip) {
+    // Clipping to [-inf, inf] is a no-op, which keeps a single loop body
+    const float low = clip ? 0.0f : -std::numeric_limits<float>::infinity();
+    const float high = clip ? 1.0f : std::numeric_limits<float>::infinity();
+    int x = 0;
+    for (; x + 1 < width; x += 2) {
+        destination[x] = std::min(std::max(static_cast<float>(source[x]) * scale0 + offset0, low), high);
+        destination[x + 1] = std::min(std::max(static_cast<float>(source[x + 1]) * scale1 + offset1, low), high);
+    }
+    if (x < width) {
+        destination[x] = std::min(std::max(static_cast<float>(source[x]) * scale0 + offset0, low), high);
+    }
+}
+
+// Minimum number of pixels per thread before splitting work is worthwhile
+const size_t NORMALIZE_PIXELS_PER_THREAD = 1 << 18;
+
+// Run fn(row_begin, row_end) over [0, rows) on up to threads threads
+// (0 = one per hardware thread). Work is only split when each band is large
+// enough to amortise starting a thread.
+void parallel_rows(int rows, int width, int threads, const std::function<void(int, int)>& fn) {
+    if (threads <= 0) {
+        threads = static_cast<int>(std::max(1u, std::thread::hardware_concurrency()));
+    }
+    size_t pixels = static_cast<size_t>(rows) * static_cast<size_t>(std::max(width, 1));
+    size_t useful = std::max<size_t>(1, pixels / NORMALIZE_PIXELS_PER_THREAD);
+    threads = static_cast<int>(std::min<size_t>({static_cast<size_t>(threads), useful, static_cast<size_t>(std::max(rows, 1))}));
+    
+    if (threads <= 1) {
+        fn(0, rows);
+        return;
+    }
+    
+    std::vector<std::thread> workers;
+    std::vector<std::exception_ptr> errors(threads);
+    workers.reserve(threads - 1);
+    int band = (rows + threads - 1) / threads;
+    for (int t = 1; t < threads; ++t) {
+        int begin = std::min(rows, t * band);
+        int end = std::min(rows, begin + band);
+        workers.emplace_back([&fn, &errors, t, begin, end]() {
+            try {
+                fn(begin, end);
+            } catch (...) {
+                errors[t] = std::current_exception();
+            }
+        });
+    }
+    try {
+        fn(0, std::min(rows, band));
+    } catch (...) {
+        errors[0] = std::current_exception();
+    }
+    for (std::thread& worker : workers) {
+        worker.join();
+    }
+    for (const std::exception_ptr& error : errors) {
+        if (error) {
+            std::rethrow_exception(error);
+        }
+    }
+}
+
+// Normalize a (height, width) block of 16-bit pixels into float32 output, or
+// float16 bits if half is set. Strides are in elements. row_phase and
+// col_phase give the CFA position of the first pixel, so sub-blocks of an
+// image can be normalized with the image's black levels. Does not touch
+// Python state.
+void normalize_raw_pixels(const uint16_t* source, ptrdiff_t source_stride, void* destination,
+                          ptrdiff_t destination_stride, bool half, int width, int height,
+                          const NormalizationParams& params, int row_phase, int col_phase, int threads) {
+    parallel_rows(height, width, threads, [&](int row_begin, int row_end) {
+        std::vector<float> scratch(half ? width : 0);
+        for (int y = row_begin; y < row_end; ++y) {
+            const int row = ((y + row_phase) & 1) * 2;
+            const int first = row + (col_phase & 1);
+            const int second = row + ((col_phase + 1) & 1);
+            const uint16_t* source_row = source + static_cast<ptrdiff_t>(y) * source_stride;
             
-            // Convert to raw format to get pixel data
-            bool success = gpr_convert_gpr_to_raw(&allocator, &parameters, &input_buffer, &output_buffer);
+            if (half) {
+                normalize_row(source_row, scratch.data(), width, params.scale[first], params.offset[first],
+                              params.scale[second], params.offset[second], params.clip);
+                uint16_t* destination_row = static_cast<uint16_t*>(destination) + static_cast<ptrdiff_t>(y) * destination_stride;
+                for (int x = 0; x < width; ++x) {
+                    destination_row[x] = float_to_half(scratch[x]);
+                }
+            } else {
+                float* destination_row = static_cast<float*>(destination) + static_cast<ptrdiff_t>(y) * destination_stride;
+                normalize_row(source_row, destination_row, width, params.scale[first], params.offset[first],
+                              params.scale[second], params.offset[second], params.clip);
+            }
+        }
+    });
+}
+
+// NumPy dtype for each supported output dtype name
+py::dtype numpy_dtype(const std::string& dtype) {
+    if (dtype == "uint8") {
+        return py::dtype::of<uint8_t>();
+    }
+    if (dtype == "uint16") {
+        return py::dtype::of<uint16_t>();
+    }
+    if (dtype == "float32") {
+        return py::dtype::of<float>();
+    }
+    return py::dtype("float16");
+}
+
+// Validate a dtype name against the supported output types
+void validate_dtype(const std::string& dtype, const std::vector<std::string>& supported) {
+    if (std::find(supported.begin(), supported.end(), dtype) != supported.end()) {
+        return;
+    }
+    std::string supported_str = "";
+    for (size_t i = 0; i < supported.size(); ++i) {
+        if (i > 0) supported_str += ", ";
+        supported_str += supported[i];
+    }
+    throw GPRParameterError("Unsupported dtype '" + dtype + "'. Supported types: " + supported_str, "dtype");
+}
+
+// float16 cannot represent the top of the uint16 range, so it needs scaling
+void validate_float16_normalization(const std::string& dtype, Normalization mode) {
+    if (dtype == "float16" && mode == Normalization::NONE) {
+        throw GPRParameterError("float16 output requires normalize='sensor' or 'full_range'", "normalize");
+    }
+}
+
+// Check that out can receive a decoded image of the requested dtype. The
+// shape is checked once the header has been parsed.
+py::array validate_out_array(const py::object& out, const std::string& dtype, int ndim = 2) {
+    if (!py::isinstance<py::array>(out)) {
+        throw GPRParameterError("out must be a NumPy array", "out");
+    }
+    
+    py::array array = py::reinterpret_borrow<py::array>(out);
+    py::dtype expected = numpy_dtype(dtype);
+    if (!array.dtype().is(expected) && !array.dtype().equal(expected)) {
+        throw GPRParameterError("out must have dtype " + dtype, "out");
+    }
+    if (array.ndim() != ndim) {
+        throw GPRParameterError("out must be a " + std::to_string(ndim) + "-dimensional array", "out");
+    }
+    if (!array.writeable()) {
+        throw GPRParameterError("out must be writeable", "out");
+    }
+    if (!(array.flags() & py::array::c_style)) {
+        throw GPRParameterError("out must be C-contiguous", "out");
+    }
+    return array;
+}
+
+// A native block that grows on demand and keeps its capacity between calls
+class ScratchBuffer {
+public:
+    ScratchBuffer() : data_(nullptr), capacity_(0) {}
+    
+    ~ScratchBuffer() {
+        release();
+    }
+    
+    ScratchBuffer(const ScratchBuffer&) = delete;
+    ScratchBuffer& operator=(const ScratchBuffer&) = delete;
+    
+    void* reserve(size_t size) {
+        if (size > capacity_) {
+            release();
+            data_ = native_alloc(size);
+            if (data_ == nullptr) {
+                throw GPRMemoryError("Failed to allocate buffer of size " + std::to_string(size) + " bytes", size);
+            }
+            capacity_ = size;
+        }
+        return data_;
+    }
+    
+    void release() {
+        native_free(data_);
+        data_ = nullptr;
+        capacity_ = 0;
+    }
+    
+    void* data() const { return data_; }
+    size_t capacity() const { return capacity_; }
+
+private:
+    void* data_;
+    size_t capacity_;
+};
+
+// Input of a context call: a path read into a reusable buffer, or any
+// buffer-protocol object used in place
+class ContextSource {
+public:
+    // Must be constructed with the GIL held
+    explicit ContextSource(const py::object& source) {
+        if (py::isinstance<py::str>(source) || py::hasattr(source, "__fspath__")) {
+            path_ = py::module_::import("os").attr("fspath")(source).cast<std::string>();
+        } else if (PyObject_CheckBuffer(source.ptr())) {
+            view_.reset(new InputBufferView(source));
+            if (view_->size() == 0) {
+                throw GPRParameterError("Input buffer is empty", "source");
+            }
+        } else {
+            throw GPRParameterError("source must be a path or a bytes-like object", "source");
+        }
+    }
+    
+    // Get the input data, reading the file into scratch if needed. Does not
+    // touch Python state.
+    gpr_buffer load(ScratchBuffer& scratch) {
+        if (view_) {
+            return gpr_buffer{view_->data(), view_->size()};
+        }
+        
+        validate_input_file(path_);
+        std::ifstream file(path_, std::ios::in | std::ios::binary | std::ios::ate);
+        if (!file.is_open()) {
+            throw GPRFileError("Input file does not exist or cannot be accessed: " + path_, path_, -2);
+        }
+        size_t size = static_cast<size_t>(file.tellg());
+        void* data = scratch.reserve(size);
+        file.seekg(0, std::ios::beg);
+        file.read(static_cast<char*>(data), static_cast<std::streamsize>(size));
+        record_file_read(static_cast<size_t>(file.gcount()));
+        if (static_cast<size_t>(file.gcount()) != size) {
+            throw GPRFileError("Failed to read input file: " + path_, path_, -1);
+        }
+        return gpr_buffer{data, size};
+    }
+    
+    // Parse only the image header. Does not touch Python state.
+    ImageInfo header() {
+        if (view_) {
+            MemoryByteSource bytes(view_->data(), view_->size());
+            return parse_image_header(bytes);
+        }
+        return get_image_info(path_);
+    }
+    
+    std::string name() const {
+        return view_ ? "<buffer>" : path_;
+    }
+
+private:
+    std::string path_;
+    std::unique_ptr<InputBufferView> view_;
+};
+
+// Read-only memory mapping of a whole file. Pages are loaded on first
+// access, so mapping is cheap even when only the header is parsed. An empty
+// file maps to a null pointer of size 0.
+class MappedFile {
+public:
+    explicit MappedFile(const std::string& path) : data_(nullptr), size_(0) {
+#ifdef _WIN32
+        HANDLE file = CreateFileA(path.c_str(), GENERIC_READ, FILE_SHARE_READ, nullptr,
+                                  OPEN_EXISTING, FILE_ATTRIBUTE_NORMAL, nullptr);
+        if (file == INVALID_HANDLE_VALUE) {
+            DWORD error = GetLastError();
+            if (error == ERROR_ACCESS_DENIED) {
+                throw GPRFileError("Input file cannot be read: " + path, path, -3);
+            }
+            throw GPRFileError("Input file does not exist or cannot be accessed: " + path, path, -2);
+        }
+        LARGE_INTEGER size;
+        if (!GetFileSizeEx(file, &size)) {
+            CloseHandle(file);
+            throw GPRFileError("Failed to get size of input file: " + path, path, -1);
+        }
+        size_ = static_cast<size_t>(size.QuadPart);
+        if (size_ > 0) {
+            HANDLE mapping = CreateFileMappingA(file, nullptr, PAGE_READONLY, 0, 0, nullptr);
+            if (mapping != nullptr) {
+                data_ = MapViewOfFile(mapping, FILE_MAP_READ, 0, 0, 0);
+                // The view keeps the mapping alive
+                CloseHandle(mapping);
+            }
+        }
+        CloseHandle(file);
+#else
+        int fd = open(path.c_str(), O_RDONLY);
+        if (fd < 0) {
+            if (errno == EACCES) {
+                throw GPRFileError("Input file cannot be read: " + path, path, -3);
+            }
+            throw GPRFileError("Input file does not exist or cannot be accessed: " + path, path, -2);
+        }
+        struct stat info;
+        if (fstat(fd, &info) != 0) {
+            close(fd);
+            throw GPRFileError("Failed to get size of input file: " + path, path, -1);
+        }
+        size_ = static_cast<size_t>(info.st_size);
+        if (size_ > 0) {
+            void* data = mmap(nullptr, size_, PROT_READ, MAP_PRIVATE, fd, 0);
+            data_ = data == MAP_FAILED ? nullptr : data;
+        }
+        close(fd);
+#endif
+        if (size_ > 0 && data_ == nullptr) {
+            throw GPRFileError("Failed to map input file: " + path, path, -1);
+        }
+        // Counted as one read of the whole file
+        record_file_read(size_);
+    }
+    
+    ~MappedFile() {
+        if (data_ == nullptr) {
+            return;
+        }
+#ifdef _WIN32
+        UnmapViewOfFile(data_);
+#else
+        munmap(data_, size_);
+#endif
+    }
+    
+    MappedFile(const MappedFile&) = delete;
+    MappedFile& operator=(const MappedFile&) = delete;
+    
+    void* data() const { return data_; }
+    size_t size() const { return size_; }
+
+private:
+    void* data_;
+    size_t size_;
+};
+
+// An open GPR or DNG file: the file is mapped once and its header parsed on
+// first use, and both are kept until close(). The handle exposes the file
+// contents through the read-only buffer protocol, so every function that
+// accepts a bytes-like object works on it without copying. Like mmap,
+// close() refuses to unmap while buffers are exported, which also keeps a
+// conversion running in another thread safe.
+class ImageHandle {
+public:
+    explicit ImageHandle(const std::string& path) : path_(path), exports_(0), info_loaded_(false) {
+        py::gil_scoped_release release;
+        mapping_.reset(new MappedFile(path));
+    }
+    
+    const ImageInfo& info() {
+        ensure_open();
+        if (!info_loaded_) {
+            MemoryByteSource bytes(mapping_->data(), mapping_->size());
+            info_ = parse_image_header(bytes);
+            info_loaded_ = true;
+        }
+        return info_;
+    }
+    
+    void close() {
+        if (exports_ > 0) {
+            throw py::buffer_error("cannot close GPR image handle: exported buffers exist");
+        }
+        mapping_.reset();
+    }
+    
+    bool closed() const { return !mapping_; }
+    const std::string& path() const { return path_; }
+    
+    size_t size() const {
+        return mapping_ ? mapping_->size() : 0;
+    }
+    
+    // Buffer protocol, called with the GIL held
+    static int get_buffer(PyObject* self, Py_buffer* view, int flags) {
+        ImageHandle* handle = py::cast<ImageHandle*>(py::handle(self));
+        if (handle->closed()) {
+            view->obj = nullptr;
+            PyErr_SetString(PyExc_ValueError, "GPR image handle is closed");
+            return -1;
+        }
+        if (PyBuffer_FillInfo(view, self, handle->mapping_->data(),
+                              static_cast<Py_ssize_t>(handle->mapping_->size()), 1, flags) != 0) {
+            return -1;
+        }
+        handle->exports_ += 1;
+        return 0;
+    }
+    
+    static void release_buffer(PyObject* self, Py_buffer*) {
+        py::cast<ImageHandle*>(py::handle(self))->exports_ -= 1;
+    }
+
+private:
+    void ensure_open() const {
+        if (!mapping_) {
+            throw GPRError("GPR image handle is closed");
+        }
+    }
+    
+    std::string path_;
+    std::unique_ptr<MappedFile> mapping_;
+    int exports_;
+    bool info_loaded_;
+    ImageInfo info_;
+};
+
+// Enhanced get_raw_image_data function with comprehensive error handling.
+// source is a path, read once, or a bytes-like object such as an
+// ImageHandle, used in place. It is decoded with the GIL released; the GIL is
+// reacquired only to wrap the result in a NumPy array. uint16 results take
+// ownership of the decoder output without copying it; floating-point
+// results are produced by the normalization kernel. When out is given, the
+// decoder writes into that array instead and it is returned.
+py::array get_raw_image_data(const py::object& source, const std::string& dtype,
+                             const py::object& out, const py::object& normalize) {
+    validate_dtype(dtype, {"uint16", "float32", "float16"});
+    const Normalization mode = parse_normalization(normalize);
+    validate_float16_normalization(dtype, mode);
+    const bool half = dtype == "float16";
+    
+    // Capture the destination array before releasing the GIL
+    py::array out_array;
+    void* out_data = nullptr;
+    ssize_t out_height = 0;
+    ssize_t out_width = 0;
+    if (!out.is_none()) {
+        out_array = validate_out_array(out, dtype);
+        out_data = out_array.mutable_data();
+        out_height = out_array.shape(0);
+        out_width = out_array.shape(1);
+    }
+    const bool decode_into_out = out_data != nullptr && dtype == "uint16";
+    
+    // Set up allocator. Decoding into out routes the output allocation to it.
+    gpr_allocator allocator;
+    allocator.Alloc = decode_into_out ? output_target_alloc : native_alloc;
+    allocator.Free = decode_into_out ? output_target_free : native_free;
+    
+    // Initialize buffers
+    ContextSource input_source(source);
+    const std::string input_path = input_source.name();
+    ScratchBuffer input_data;
+    gpr_buffer output_buffer = {nullptr, 0};
+    ImageInfo info;
+    
+    try {
+        {
+            py::gil_scoped_release release;
             
-            if (!success) {
-                std::string context = get_error_context("GPR to raw conversion for data extraction", input_path);
-                throw GPRConversionError("Failed to convert GPR to raw format for data extraction (" + context + ")");
+            // Read input file (the only read of the file) or use the buffer
+            gpr_buffer input_buffer = input_source.load(input_data);
+            
+            info = parse_buffer_header(&input_buffer);
+            const size_t pixel_count = static_cast<size_t>(info.width) * info.height;
+            
+            if (out_data != nullptr && (out_height != info.height || out_width != info.width)) {
+                throw GPRParameterError("out has shape (" + std::to_string(out_height) + ", " +
+                                        std::to_string(out_width) + ") but the image is (" +
+                                        std::to_string(info.height) + ", " + std::to_string(info.width) + ")",
+                                        "out");
             }
             
-            // Validate output buffer
-            if (output_buffer.buffer == nullptr || output_buffer.size == 0) {
-                throw GPRConversionError("Conversion produced empty output buffer during data extraction");
+            if (decode_into_out) {
+                ScopedOutputTarget target(out_data, pixel_count * sizeof(uint16_t));
+                decode_raw_buffer(allocator, &input_buffer, &output_buffer, info, input_path);
+                
+                // Copy only if the decoder did not allocate its output in out
+                if (output_buffer.buffer != out_data) {
+                    std::memcpy(out_data, output_buffer.buffer, pixel_count * sizeof(uint16_t));
+                    cleanup_buffer_safe(&output_buffer, allocator);
+                }
+                output_buffer = {nullptr, 0};
+            } else {
+                decode_raw_buffer(allocator, &input_buffer, &output_buffer, info, input_path);
+                
+                if (out_data != nullptr) {
+                    normalize_raw_pixels(static_cast<const uint16_t*>(output_buffer.buffer), info.width,
+                                         out_data, info.width, half, info.width, info.height,
+                                         make_normalization_params(mode, info.black_level, info.white_level),
+                                         0, 0, 0);
+                    cleanup_buffer_safe(&output_buffer, allocator);
+                }
             }
             
-            // Check if buffer size matches expected dimensions
-            size_t expected_size = info.width * info.height * sizeof(uint16_t);
-            if (output_buffer.size < expected_size) {
-                throw GPRFormatError("Output buffer size (" + std::to_string(output_buffer.size) + 
-                                   ") is smaller than expected (" + std::to_string(expected_size) + ")");
+            // The compressed input is no longer needed once decoded
+            input_data.release();
+        }
+        
+        if (out_data != nullptr) {
+            return out_array;
+        }
+        
+        // Create NumPy array based on requested dtype
+        py::array result;
+        
+        if (dtype == "uint16") {
+            // Hand the decoder output to NumPy; the capsule frees it
+            try {
+                py::capsule owner = make_buffer_capsule(output_buffer.buffer, allocator.Free);
+                void* data = output_buffer.buffer;
+                output_buffer = {nullptr, 0};
+                result = py::array_t<uint16_t>(
+                    {info.height, info.width},  // shape
+                    {info.width * sizeof(uint16_t), sizeof(uint16_t)},  // strides
+                    static_cast<uint16_t*>(data),  // data pointer
+                    owner  // parent owns the decoder buffer
+                );
+            } catch (const std::exception& e) {
+                throw GPRMemoryError("Failed to create uint16 NumPy array: " + std::string(e.what()));
+            }
+        } else {
+            // Normalize into a new float32 or float16 array
+            NormalizationParams params = make_normalization_params(mode, info.black_level, info.white_level);
+            py::array float_array;
+            try {
+                float_array = py::array(numpy_dtype(dtype), std::vector<ssize_t>{info.height, info.width});
+            } catch (const std::exception& e) {
+                throw GPRMemoryError("Failed to create " + dtype + " array: " + std::string(e.what()));
+            }
+            void* float_data = float_array.mutable_data();
+            const uint16_t* raw_data = static_cast<const uint16_t*>(output_buffer.buffer);
+            
+            {
+                py::gil_scoped_release release;
+                normalize_raw_pixels(raw_data, info.width, float_data, info.width, half,
+                                     info.width, info.height, params, 0, 0, 0);
             }
             
-            // Create NumPy array based on requested dtype
-            py::array result;
+            result = float_array;
             
+            // The data was converted into a new array, so free the decoder output
+            cleanup_buffer_safe(&output_buffer, allocator);
+        }
+        
+        return result;
+        
+    } catch (const GPRError&) {
+        // Clean up on GPR-specific errors
+        cleanup_buffer_safe(&output_buffer, allocator);
+        throw; // Re-throw GPR errors as-is
+    } catch (const std::exception& e) {
+        // Clean up on other errors and wrap them
+        cleanup_buffer_safe(&output_buffer, allocator);
+        
+        std::string context = get_error_context("raw image data extraction", input_path);
+        throw GPRConversionError("Error extracting raw image data: " + std::string(e.what()) + " (" + context + ")");
+    } catch (...) {
+        // Clean up on unknown errors
+        cleanup_buffer_safe(&output_buffer, allocator);
+        
+        std::string context = get_error_context("raw image data extraction", input_path);
+        throw GPRConversionError("Unknown error during raw image data extraction (" + context + ")");
+    }
+}
+
+// Decode a GPR file or bytes-like object and return the (height, width)
+// window at (x, y). The SDK only decodes whole frames, so the whole uint16
+// frame is decoded to a temporary buffer; only the result and the float
+// conversion are window-sized. The CFA phase of (x, y) is passed to the
+// kernel, so 'sensor' normalization uses the black level of each pixel's
+// actual color for any offset.
+py::array get_raw_image_region(const py::object& source, int x, int y, int width, int height,
+                               const std::string& dtype, const py::object& normalize) {
+    validate_dtype(dtype, {"uint16", "float32", "float16"});
+    const Normalization mode = parse_normalization(normalize);
+    validate_float16_normalization(dtype, mode);
+    if (x < 0 || y < 0 || width <= 0 || height <= 0) {
+        throw GPRParameterError("Region needs non-negative x and y and a positive width and height", "region");
+    }
+    
+    ContextSource input_source(source);
+    ImageInfo info;
+    {
+        py::gil_scoped_release release;
+        info = input_source.header();
+    }
+    if (static_cast<int64_t>(x) + width > info.width || static_cast<int64_t>(y) + height > info.height) {
+        throw GPRParameterError("Region (" + std::to_string(x) + ", " + std::to_string(y) + ", " +
+                                std::to_string(width) + ", " + std::to_string(height) +
+                                ") exceeds the " + std::to_string(info.width) + "x" +
+                                std::to_string(info.height) + " image", "region");
+    }
+    
+    py::array result(numpy_dtype(dtype), std::vector<ssize_t>{height, width});
+    void* result_data = result.mutable_data();
+    NormalizationParams params = make_normalization_params(mode, info.black_level, info.white_level);
+    
+    gpr_allocator allocator = native_allocator();
+    ScratchBuffer input_data;
+    gpr_buffer output = {nullptr, 0};
+    {
+        py::gil_scoped_release release;
+        gpr_buffer input = input_source.load(input_data);
+        decode_raw_buffer(allocator, &input, &output, info, input_source.name());
+        input_data.release();
+        
+        const uint16_t* window = static_cast<const uint16_t*>(output.buffer) +
+                                 static_cast<ptrdiff_t>(y) * info.width + x;
+        try {
             if (dtype == "uint16") {
-                // Create uint16 array
-                try {
-                    result = py::array_t<uint16_t>(
-                        {info.height, info.width},  // shape
-                        {info.width * sizeof(uint16_t), sizeof(uint16_t)},  // strides
-                        reinterpret_cast<uint16_t*>(output_buffer.buffer),  // data pointer
-                        py::cast(py::none())  // parent - we'll handle memory management
-                    );
-                } catch (const std::exception& e) {
-                    throw GPRMemoryError("Failed to create uint16 NumPy array: " + std::string(e.what()));
-                }
-            } else if (dtype == "float32") {
-                // Convert uint16 data to float32 and normalize
-                try {
-                    auto float_array = py::array_t<float>(info.height * info.width);
-                    float* float_data = static_cast<float*>(float_array.mutable_ptr());
-                    uint16_t* raw_data = reinterpret_cast<uint16_t*>(output_buffer.buffer);
-                    
-                    if (float_data == nullptr || raw_data == nullptr) {
-                        throw GPRMemoryError("Failed to access array data pointers");
-                    }
-                    
-                    // Convert and normalize to 0-1 range
-                    for (size_t i = 0; i < info.height * info.width; ++i) {
-                        float_data[i] = static_cast<float>(raw_data[i]) / 65535.0f;
-                    }
-                    
-                    result = float_array.reshape({info.height, info.width});
-                } catch (const std::exception& e) {
-                    throw GPRMemoryError("Failed to create or convert float32 array: " + std::string(e.what()));
+                for (int row = 0; row < height; ++row) {
+                    std::memcpy(static_cast<uint16_t*>(result_data) + static_cast<ptrdiff_t>(row) * width,
+                                window + static_cast<ptrdiff_t>(row) * info.width, width * sizeof(uint16_t));
                 }
+            } else {
+                normalize_raw_pixels(window, info.width, result_data, width, dtype == "float16",
+                                     width, height, params, y & 1, x & 1, 0);
+            }
+        } catch (...) {
+            cleanup_buffer_safe(&output, allocator);
+            throw;
+        }
+        cleanup_buffer_safe(&output, allocator);
+    }
+    return result;
+}
+
+// Offsets (row * 2 + col) of R, G1, G2 and B within the 2x2 CFA tile. G1 is
+// the green on the red row, G2 the green on the blue row. An unknown pattern
+// is treated as RGGB, the SDK default.
+std::array<int, 4> bayer_plane_offsets(const std::string& cfa_pattern) {
+    const std::string pattern = cfa_pattern.empty() ? "RGGB" : cfa_pattern;
+    if (pattern != "RGGB" && pattern != "GRBG" && pattern != "GBRG" && pattern != "BGGR") {
+        throw GPRParameterError("Bayer planes need an RGGB, GRBG, GBRG or BGGR CFA pattern, got '" +
+                                cfa_pattern + "'", "cfa_pattern");
+    }
+    const int red = static_cast<int>(pattern.find('R'));
+    const int blue = static_cast<int>(pattern.find('B'));
+    // The green of a row is the other pixel of that row
+    return {{red, red ^ 1, blue ^ 1, blue}};
+}
+
+// Split a (height, width) Bayer mosaic into four contiguous (height / 2,
+// width / 2) planes ordered by offsets, as uint16 or normalized float32 /
+// float16. Each plane holds a single CFA color, so it is normalized with
+// that color's black level. Does not touch Python state.
+void deinterleave_bayer_planes(const uint16_t* source, int width, int height, void* destination,
+                               const std::string& dtype, const NormalizationParams& params,
+                               const std::array<int, 4>& offsets) {
+    const int plane_width = width / 2;
+    const int plane_height = height / 2;
+    const size_t plane_pixels = static_cast<size_t>(plane_width) * plane_height;
+    const size_t element_size = dtype == "float32" ? sizeof(float) : sizeof(uint16_t);
+    
+    parallel_rows(plane_height, width * 2, 0, [&](int row_begin, int row_end) {
+        std::vector<uint16_t> gathered(dtype == "uint16" ? 0 : plane_width);
+        for (int plane = 0; plane < 4; ++plane) {
+            const int offset = offsets[plane];
+            NormalizationParams plane_params = params;
+            for (int i = 0; i < 4; ++i) {
+                plane_params.scale[i] = params.scale[offset];
+                plane_params.offset[i] = params.offset[offset];
             }
+            char* plane_data = static_cast<char*>(destination) + plane * plane_pixels * element_size;
             
-            // Clean up parameters
-            if (parameters_initialized) {
-                gpr_parameters_destroy(&parameters, allocator.Free);
+            for (int y = row_begin; y < row_end; ++y) {
+                const uint16_t* source_row = source + static_cast<ptrdiff_t>(2 * y + (offset >> 1)) * width +
+                                             (offset & 1);
+                uint16_t* gather_row = dtype == "uint16"
+                    ? reinterpret_cast<uint16_t*>(plane_data) + static_cast<ptrdiff_t>(y) * plane_width
+                    : gathered.data();
+                for (int x = 0; x < plane_width; ++x) {
+                    gather_row[x] = source_row[2 * x];
+                }
+                if (dtype != "uint16") {
+                    normalize_raw_pixels(gather_row, plane_width,
+                                         plane_data + static_cast<size_t>(y) * plane_width * element_size,
+                                         plane_width, dtype == "float16", plane_width, 1, plane_params, 0, 0, 1);
+                }
             }
+        }
+    });
+}
+
+// Decode a GPR file or bytes-like object straight to a (4, height / 2,
+// width / 2) array of Bayer planes ordered R, G1, G2, B for the image's CFA
+// pattern. A trailing odd row or column is dropped.
+py::array get_raw_image_planes(const py::object& source, const std::string& dtype,
+                               const py::object& out, const py::object& normalize) {
+    validate_dtype(dtype, {"uint16", "float32", "float16"});
+    const Normalization mode = parse_normalization(normalize);
+    validate_float16_normalization(dtype, mode);
+    
+    ContextSource input_source(source);
+    ImageInfo info;
+    {
+        py::gil_scoped_release release;
+        info = input_source.header();
+    }
+    const std::array<int, 4> offsets = bayer_plane_offsets(info.cfa_pattern);
+    const std::vector<ssize_t> shape = {4, info.height / 2, info.width / 2};
+    
+    py::array result;
+    if (out.is_none()) {
+        result = py::array(numpy_dtype(dtype), shape);
+    } else {
+        result = validate_out_array(out, dtype, 3);
+        if (result.shape(0) != shape[0] || result.shape(1) != shape[1] || result.shape(2) != shape[2]) {
+            throw GPRParameterError("out must have shape (4, " + std::to_string(shape[1]) + ", " +
+                                    std::to_string(shape[2]) + ")", "out");
+        }
+    }
+    void* result_data = result.mutable_data();
+    NormalizationParams params = make_normalization_params(mode, info.black_level, info.white_level);
+    
+    gpr_allocator allocator = native_allocator();
+    ScratchBuffer input_data;
+    gpr_buffer output = {nullptr, 0};
+    {
+        py::gil_scoped_release release;
+        gpr_buffer input = input_source.load(input_data);
+        decode_raw_buffer(allocator, &input, &output, info, input_source.name());
+        input_data.release();
+        try {
+            deinterleave_bayer_planes(static_cast<const uint16_t*>(output.buffer), info.width, info.height,
+                                      result_data, dtype, params, offsets);
+        } catch (...) {
+            cleanup_buffer_safe(&output, allocator);
+            throw;
+        }
+        cleanup_buffer_safe(&output, allocator);
+    }
+    return result;
+}
+
+// Normalize an existing 2-D uint16 array (e.g. a decoded image or a region
+// of one) to float32 or float16 with the multithreaded kernel
+py::array normalize_raw(py::array_t<uint16_t, py::array::c_style | py::array::forcecast> raw,
+                        const std::string& dtype, const py::object& normalize,
+                        const std::vector<double>& black_level, double white_level,
+                        const py::object& out, int threads) {
+    validate_dtype(dtype, {"float32", "float16"});
+    const Normalization mode = parse_normalization(normalize);
+    validate_float16_normalization(dtype, mode);
+    if (raw.ndim() != 2) {
+        throw GPRParameterError("raw must be a 2-dimensional uint16 array", "raw");
+    }
+    if (black_level.size() != 1 && black_level.size() != 4) {
+        throw GPRParameterError("black_level must have 1 or 4 values (one per 2x2 CFA position)", "black_level");
+    }
+    std::vector<double> black = black_level.size() == 4 ? black_level : std::vector<double>(4, black_level[0]);
+    NormalizationParams params = make_normalization_params(mode, black, white_level);
+    
+    const int height = static_cast<int>(raw.shape(0));
+    const int width = static_cast<int>(raw.shape(1));
+    py::array result;
+    if (out.is_none()) {
+        result = py::array(numpy_dtype(dtype), std::vector<ssize_t>{height, width});
+    } else {
+        result = validate_out_array(out, dtype);
+        if (result.shape(0) != height || result.shape(1) != width) {
+            throw GPRParameterError("out must have the same shape as raw", "out");
+        }
+    }
+    
+    const uint16_t* source = raw.data();
+    void* destination = result.mutable_data();
+    {
+        py::gil_scoped_release release;
+        normalize_raw_pixels(source, width, destination, width, dtype == "float16",
+                             width, height, params, 0, 0, threads);
+    }
+    return result;
+}
+
+// Reusable codec contexts
+//
+// GPRDecoder and GPREncoder keep their GPR parameters, a growable buffer for
+// file contents and a scratch buffer for decoded pixels between calls, so
+// processing thousands of files pays the setup and allocation cost once.
+// A context can be used from any thread, but by only one thread at a time:
+// contexts share no state, so each thread should own its own.
+
+// Marks a context busy for the duration of a call and rejects concurrent use
+class ContextGuard {
+public:
+    ContextGuard(std::atomic<bool>& busy, const char* name) : busy_(busy) {
+        if (busy_.exchange(true)) {
+            throw GPRError(std::string(name) + " is already in use by another thread; "
+                           "create one context per thread");
+        }
+    }
+    
+    ~ContextGuard() {
+        busy_ = false;
+    }
+    
+    ContextGuard(const ContextGuard&) = delete;
+    ContextGuard& operator=(const ContextGuard&) = delete;
+
+private:
+    std::atomic<bool>& busy_;
+};
+
+class GPRDecoder {
+public:
+    GPRDecoder(const std::string& dtype, const py::object& normalize)
+        : dtype_(dtype), mode_(parse_normalization(normalize)), busy_(false), decode_count_(0) {
+        validate_dtype(dtype, {"uint16", "float32", "float16"});
+        validate_float16_normalization(dtype, mode_);
+        allocator_ = native_allocator();
+        gpr_parameters_set_defaults(&parameters_);
+        last_info_ = ImageInfo{0, 0, 1, "uint16", 0, "", 0, 1, std::vector<double>(4, 0.0), 65535};
+    }
+    
+    ~GPRDecoder() {
+        gpr_parameters_destroy(&parameters_, allocator_.Free);
+    }
+    
+    // Decode a GPR file or buffer to a (height, width) array of the decoder's
+    // dtype, or into out
+    py::array decode(const py::object& source, const py::object& out) {
+        ContextGuard guard(busy_, "GPRDecoder");
+        ContextSource input_source(source);
+        
+        py::array out_array;
+        void* out_data = nullptr;
+        ssize_t out_height = 0;
+        ssize_t out_width = 0;
+        if (!out.is_none()) {
+            out_array = validate_out_array(out, dtype_);
+            out_data = out_array.mutable_data();
+            out_height = out_array.shape(0);
+            out_width = out_array.shape(1);
+        }
+        const bool integer_output = dtype_ == "uint16";
+        
+        ImageInfo info;
+        gpr_buffer output = {nullptr, 0};
+        
+        {
+            py::gil_scoped_release release;
             
-            // Clean up input buffer
-            cleanup_buffer_safe(&input_buffer, allocator);
+            gpr_buffer input = input_source.load(input_);
+            info = parse_buffer_header(&input);
+            const size_t raw_bytes = static_cast<size_t>(info.width) * info.height * sizeof(uint16_t);
             
-            // For float32, we copied the data, so clean up output buffer
-            // For uint16, the NumPy array owns the data, so don't free it
-            if (dtype == "float32") {
-                cleanup_buffer_safe(&output_buffer, allocator);
+            if (out_data != nullptr && (out_height != info.height || out_width != info.width)) {
+                throw GPRParameterError("out has shape (" + std::to_string(out_height) + ", " +
+                                        std::to_string(out_width) + ") but the image is (" +
+                                        std::to_string(info.height) + ", " + std::to_string(info.width) + ")",
+                                        "out");
             }
             
-            return result;
+            // Decode straight into out (uint16) or into the reusable scratch
+            // buffer (floating point, normalized afterwards)
+            void* target = integer_output ? out_data : pixels_.reserve(raw_bytes);
+            if (target != nullptr) {
+                gpr_allocator target_allocator;
+                target_allocator.Alloc = output_target_alloc;
+                target_allocator.Free = output_target_free;
+                ScopedOutputTarget scope(target, raw_bytes);
+                decode_raw_buffer(target_allocator, &input, &output, info, input_source.name());
+                if (output.buffer != target) {
+                    std::memcpy(target, output.buffer, raw_bytes);
+                    cleanup_buffer_safe(&output, target_allocator);
+                }
+                output = {nullptr, 0};
+            } else {
+                decode_raw_buffer(allocator_, &input, &output, info, input_source.name());
+            }
             
-        } catch (const GPRError&) {
-            // Clean up on GPR-specific errors
-            if (parameters_initialized) {
-                gpr_parameters_destroy(&parameters, allocator.Free);
+            if (!integer_output && out_data != nullptr) {
+                normalize_raw_pixels(static_cast<const uint16_t*>(pixels_.data()), info.width,
+                                     out_data, info.width, dtype_ == "float16", info.width, info.height,
+                                     make_normalization_params(mode_, info.black_level, info.white_level),
+                                     0, 0, 0);
             }
-            cleanup_buffer_safe(&input_buffer, allocator);
-            cleanup_buffer_safe(&output_buffer, allocator);
-            throw; // Re-throw GPR errors as-is
-        } catch (const std::exception& e) {
-            // Clean up on other errors and wrap them
-            if (parameters_initialized) {
-                gpr_parameters_destroy(&parameters, allocator.Free);
+        }
+        
+        last_info_ = info;
+        decode_count_ += 1;
+        
+        if (out_data != nullptr) {
+            return out_array;
+        }
+        
+        if (integer_output) {
+            // Hand the decoder output to NumPy; the capsule frees it
+            try {
+                py::capsule owner = make_buffer_capsule(output.buffer, allocator_.Free);
+                void* data = output.buffer;
+                output = {nullptr, 0};
+                return py::array_t<uint16_t>({info.height, info.width},
+                                             {info.width * sizeof(uint16_t), sizeof(uint16_t)},
+                                             static_cast<uint16_t*>(data), owner);
+            } catch (...) {
+                cleanup_buffer_safe(&output, allocator_);
+                throw;
             }
-            cleanup_buffer_safe(&input_buffer, allocator);
-            cleanup_buffer_safe(&output_buffer, allocator);
-            
-            std::string context = get_error_context("raw image data extraction", input_path);
-            throw GPRConversionError("Error extracting raw image data: " + std::string(e.what()) + " (" + context + ")");
+        }
+        
+        NormalizationParams params = make_normalization_params(mode_, info.black_level, info.white_level);
+        py::array result(numpy_dtype(dtype_), std::vector<ssize_t>{info.height, info.width});
+        void* result_data = result.mutable_data();
+        const uint16_t* pixels = static_cast<const uint16_t*>(pixels_.data());
+        {
+            py::gil_scoped_release release;
+            normalize_raw_pixels(pixels, info.width, result_data, info.width, dtype_ == "float16",
+                                 info.width, info.height, params, 0, 0, 0);
+        }
+        return result;
+    }
+    
+    // Convert a GPR file or buffer to DNG bytes with the decoder's parameters
+    py::bytes to_dng(const py::object& source) {
+        ContextGuard guard(busy_, "GPRDecoder");
+        ContextSource input_source(source);
+        gpr_buffer output = {nullptr, 0};
+        {
+            py::gil_scoped_release release;
+            gpr_buffer input = input_source.load(input_);
+            run_conversion(ConversionKind::GPR_TO_DNG, allocator_, &input, &output, &parameters_);
+        }
+        try {
+            py::bytes result(static_cast<const char*>(output.buffer), output.size);
+            cleanup_buffer_safe(&output, allocator_);
+            return result;
         } catch (...) {
-            // Clean up on unknown errors
-            if (parameters_initialized) {
-                gpr_parameters_destroy(&parameters, allocator.Free);
-            }
-            cleanup_buffer_safe(&input_buffer, allocator);
-            cleanup_buffer_safe(&output_buffer, allocator);
-            
-            std::string context = get_error_context("raw image data extraction", input_path);
-            throw GPRConversionError("Unknown error during raw image data extraction (" + context + ")");
+            cleanup_buffer_safe(&output, allocator_);
+            throw;
         }
+    }
+    
+    // Parse only the header of a GPR file or buffer
+    ImageInfo info(const py::object& source) {
+        ContextSource input_source(source);
+        py::gil_scoped_release release;
+        return input_source.header();
+    }
+    
+    // Free the reusable buffers; they are reallocated by the next call
+    void release() {
+        ContextGuard guard(busy_, "GPRDecoder");
+        input_.release();
+        pixels_.release();
+    }
+    
+    const std::string& dtype() const { return dtype_; }
+    uint64_t decode_count() const { return decode_count_; }
+    const ImageInfo& last_info() const { return last_info_; }
+    size_t buffer_bytes() const { return input_.capacity() + pixels_.capacity(); }
+
+private:
+    std::string dtype_;
+    Normalization mode_;
+    gpr_allocator allocator_;
+    gpr_parameters parameters_;
+    ScratchBuffer input_;
+    ScratchBuffer pixels_;
+    std::atomic<bool> busy_;
+    uint64_t decode_count_;
+    ImageInfo last_info_;
+};
+
+class GPREncoder {
+public:
+    GPREncoder(const std::string& format, bool fast_encoding)
+        : format_(format), busy_(false), encode_count_(0) {
+        if (format != "gpr" && format != "dng") {
+            throw GPRParameterError("Unsupported output format '" + format + "'. Supported: gpr, dng", "format");
+        }
+        allocator_ = native_allocator();
+        gpr_parameters_set_defaults(&parameters_);
+        parameters_.fast_encoding = fast_encoding;
+    }
+    
+    ~GPREncoder() {
+        gpr_parameters_destroy(&parameters_, allocator_.Free);
+    }
+    
+    // Encode a (height, width) uint16 Bayer array and return the file contents
+    py::bytes encode(py::array_t<uint16_t, py::array::c_style | py::array::forcecast> raw) {
+        ContextGuard guard(busy_, "GPREncoder");
+        gpr_buffer output = {nullptr, 0};
+        encode_to_buffer(raw, &output);
+        try {
+            py::bytes result(static_cast<const char*>(output.buffer), output.size);
+            cleanup_buffer_safe(&output, allocator_);
+            return result;
+        } catch (...) {
+            cleanup_buffer_safe(&output, allocator_);
+            throw;
+        }
+    }
+    
+    // Encode a (height, width) uint16 Bayer array and write it to output_path
+    void encode_to_file(py::array_t<uint16_t, py::array::c_style | py::array::forcecast> raw,
+                        const std::string& output_path) {
+        ContextGuard guard(busy_, "GPREncoder");
+        gpr_buffer output = {nullptr, 0};
+        encode_to_buffer(raw, &output);
         
-    } catch (const GPRError&) {
-        throw; // Re-throw GPR errors
-    } catch (const std::exception& e) {
-        // Wrap other errors as GPR errors
-        std::string context = get_error_context("raw image data extraction setup", input_path);
-        throw GPRError("Setup error: " + std::string(e.what()) + " (" + context + ")");
+        py::gil_scoped_release release;
+        bool written = write_buffer_to_file(&output, output_path);
+        cleanup_buffer_safe(&output, allocator_);
+        if (!written) {
+            throw GPRFileError("Failed to write output file: " + output_path, output_path, -1);
+        }
     }
+    
+    const std::string& format() const { return format_; }
+    bool fast_encoding() const { return parameters_.fast_encoding; }
+    uint64_t encode_count() const { return encode_count_; }
+
+private:
+    void encode_to_buffer(const py::array_t<uint16_t, py::array::c_style | py::array::forcecast>& raw,
+                          gpr_buffer* output) {
+        if (raw.ndim() != 2 || raw.shape(0) == 0 || raw.shape(1) == 0) {
+            throw GPRParameterError("raw must be a non-empty 2-dimensional uint16 array", "raw");
+        }
+        
+        parameters_.input_width = static_cast<unsigned int>(raw.shape(1));
+        parameters_.input_height = static_cast<unsigned int>(raw.shape(0));
+        parameters_.input_pitch = static_cast<unsigned int>(raw.shape(1) * sizeof(uint16_t));
+        
+        // The SDK takes a non-const gpr_buffer but only reads the input
+        gpr_buffer input = {const_cast<uint16_t*>(raw.data()), static_cast<size_t>(raw.nbytes())};
+        
+        py::gil_scoped_release release;
+        bool success = format_ == "gpr"
+            ? gpr_convert_raw_to_gpr(&allocator_, &parameters_, &input, output)
+            : gpr_convert_raw_to_dng(&allocator_, &parameters_, &input, output);
+        if (!success || output->buffer == nullptr || output->size == 0) {
+            cleanup_buffer_safe(output, allocator_);
+            throw GPRConversionError("RAW to " + std::string(format_ == "gpr" ? "GPR" : "DNG") + " encoding failed");
+        }
+        encode_count_ += 1;
+    }
+    
+    std::string format_;
+    gpr_allocator allocator_;
+    gpr_parameters parameters_;
+    std::atomic<bool> busy_;
+    uint64_t encode_count_;
+};
+
+// GPR to GPR re-encoding
+//
+// The SDK has no direct GPR to GPR conversion. The input is decoded to 16-bit
+// raw pixels in memory and encoded again with new parameters. The metadata
+// parsed from the input (tuning, EXIF, GPMF) is carried over, so no
+// intermediate DNG or file is needed.
+
+// Re-encode GPR data in memory. Only fast_encoding, compute_md5sum and
+// enable_preview are taken from overrides; the geometry always comes from the
+// input. Does not touch Python state. On success the caller owns
+// output->buffer and must free it with allocator.Free.
+void transcode_gpr_buffer(const gpr_allocator& allocator, gpr_buffer* input, gpr_buffer* output,
+                          const gpr_parameters* overrides, const std::string& source_name) {
+    ImageInfo info = parse_buffer_header(input);
+    
+    gpr_parameters parameters;
+    gpr_parameters_set_defaults(&parameters);
+    gpr_buffer raw = {nullptr, 0};
+    try {
+        if (!gpr_parse_metadata(&allocator, input, &parameters)) {
+            std::string context = get_error_context("GPR metadata parsing", source_name);
+            throw GPRConversionError("Failed to parse GPR metadata (" + context + ")");
+        }
+        decode_raw_buffer(allocator, input, &raw, info, source_name);
+        
+        apply_parameter_overrides(&parameters, overrides);
+        parameters.input_width = static_cast<unsigned int>(info.width);
+        parameters.input_height = static_cast<unsigned int>(info.height);
+        parameters.input_pitch = static_cast<unsigned int>(info.width * sizeof(uint16_t));
+        
+        bool success = gpr_convert_raw_to_gpr(&allocator, &parameters, &raw, output);
+        cleanup_buffer_safe(&raw, allocator);
+        if (!success || output->buffer == nullptr || output->size == 0) {
+            cleanup_buffer_safe(output, allocator);
+            std::string context = get_error_context("GPR to GPR re-encoding", source_name);
+            throw GPRConversionError("GPR to GPR re-encoding failed (" + context + ")");
+        }
+    } catch (...) {
+        cleanup_buffer_safe(&raw, allocator);
+        gpr_parameters_destroy(&parameters, allocator.Free);
+        throw;
+    }
+    gpr_parameters_destroy(&parameters, allocator.Free);
+}
+
+// Re-encode a GPR file. Called with the GIL released.
+bool convert_gpr_to_gpr(const std::string& input_path, const std::string& output_path,
+                        const gpr_parameters* overrides = nullptr) {
+    validate_input_file(input_path);
+    
+    gpr_allocator allocator = native_allocator();
+    gpr_buffer input_buffer = {nullptr, 0};
+    gpr_buffer output_buffer = {nullptr, 0};
+    try {
+        if (!read_file_to_buffer(input_path, &input_buffer, &allocator)) {
+            throw GPRFileError("Failed to read input GPR file", input_path, -1);
+        }
+        transcode_gpr_buffer(allocator, &input_buffer, &output_buffer, overrides, input_path);
+        if (!write_buffer_to_file(&output_buffer, output_path)) {
+            throw GPRFileError("Failed to write output GPR file", output_path, -1);
+        }
+    } catch (...) {
+        cleanup_buffer_safe(&input_buffer, allocator);
+        cleanup_buffer_safe(&output_buffer, allocator);
+        throw;
+    }
+    cleanup_buffer_safe(&input_buffer, allocator);
+    cleanup_buffer_safe(&output_buffer, allocator);
+    return true;
+}
+
+// Re-encode GPR data held in any buffer-protocol object and return the new
+// GPR bytes. The GIL is released while decoding and encoding.
+py::bytes convert_gpr_to_gpr_bytes(const py::object& data, const gpr_parameters* parameters) {
+    InputBufferView view(data);
+    if (view.size() == 0) {
+        throw GPRParameterError("Input buffer is empty", "data");
+    }
+    
+    gpr_allocator allocator = native_allocator();
+    // The SDK takes a non-const gpr_buffer but only reads the input
+    gpr_buffer input_buffer = {view.data(), view.size()};
+    gpr_buffer output_buffer = {nullptr, 0};
+    {
+        py::gil_scoped_release release;
+        transcode_gpr_buffer(allocator, &input_buffer, &output_buffer, parameters, "<buffer>");
+    }
+    
+    try {
+        py::bytes result(static_cast<const char*>(output_buffer.buffer), output_buffer.size);
+        cleanup_buffer_safe(&output_buffer, allocator);
+        return result;
+    } catch (...) {
+        cleanup_buffer_safe(&output_buffer, allocator);
+        throw;
+    }
+}
+
+// NumPy to GPR encoding
+//
+// The Bayer frame is read straight from the array's buffer: the row stride
+// becomes input_pitch, so crops and other views with contiguous rows are
+// encoded without a copy. The CFA layout and bit depth select the SDK pixel
+// format.
+
+GPR_PIXEL_FORMAT parse_pixel_format(const std::string& cfa, int bit_depth) {
+    if (bit_depth != 12 && bit_depth != 14) {
+        throw GPRParameterError("Unsupported bit_depth " + std::to_string(bit_depth) + ". Supported: 12, 14",
+                                "bit_depth");
+    }
+    if (cfa == "RGGB") {
+        return bit_depth == 12 ? PIXEL_FORMAT_RGGB_12 : PIXEL_FORMAT_RGGB_14;
+    }
+    if (cfa == "GBRG") {
+        return bit_depth == 12 ? PIXEL_FORMAT_GBRG_12 : PIXEL_FORMAT_GBRG_14;
+    }
+    throw GPRParameterError("Unsupported cfa '" + cfa + "'. Supported: RGGB, GBRG", "cfa");
+}
+
+// Validate a (height, width) uint16 array and describe its buffer as SDK
+// input, setting the geometry in parameters. Does not copy the pixels.
+gpr_buffer strided_raw_input(const py::array& raw, gpr_parameters* parameters) {
+    py::dtype expected = numpy_dtype("uint16");
+    if (!raw.dtype().is(expected) && !raw.dtype().equal(expected)) {
+        throw GPRParameterError("array must have dtype uint16", "array");
+    }
+    if (raw.ndim() != 2 || raw.shape(0) == 0 || raw.shape(1) == 0) {
+        throw GPRParameterError("array must be a non-empty 2-dimensional array", "array");
+    }
+    const ssize_t height = raw.shape(0);
+    const ssize_t width = raw.shape(1);
+    const ssize_t pitch = height > 1 ? raw.strides(0) : width * static_cast<ssize_t>(sizeof(uint16_t));
+    if (raw.strides(1) != static_cast<ssize_t>(sizeof(uint16_t)) ||
+        pitch < width * static_cast<ssize_t>(sizeof(uint16_t)) || pitch % sizeof(uint16_t) != 0) {
+        throw GPRParameterError("array rows must be contiguous and in ascending order; "
+                                "use numpy.ascontiguousarray for other layouts", "array");
+    }
+    
+    parameters->input_width = static_cast<unsigned int>(width);
+    parameters->input_height = static_cast<unsigned int>(height);
+    parameters->input_pitch = static_cast<unsigned int>(pitch);
+    
+    // The SDK takes a non-const gpr_buffer but only reads the input
+    const size_t size = static_cast<size_t>(pitch) * (height - 1) + width * sizeof(uint16_t);
+    gpr_buffer input = {const_cast<void*>(raw.data()), size};
+    return input;
+}
+
+// Encode a Bayer array to GPR in memory. Only fast_encoding, compute_md5sum
+// and enable_preview are taken from overrides. The GIL is released while
+// encoding. On success the caller owns output->buffer and must free it with
+// allocator.Free.
+void encode_array_to_buffer(const gpr_allocator& allocator, const py::array& raw, const std::string& cfa,
+                            int bit_depth, const gpr_parameters* overrides, gpr_buffer* output) {
+    const GPR_PIXEL_FORMAT pixel_format = parse_pixel_format(cfa, bit_depth);
+    
+    gpr_parameters parameters;
+    gpr_parameters_set_defaults(&parameters);
+    apply_parameter_overrides(&parameters, overrides);
+    gpr_buffer input;
+    try {
+        input = strided_raw_input(raw, &parameters);
+    } catch (...) {
+        gpr_parameters_destroy(&parameters, allocator.Free);
+        throw;
+    }
+    
+    const int32_t saturation = (1 << bit_depth) - 1;
+    parameters.tuning_info.pixel_format = pixel_format;
+    parameters.tuning_info.dgain_saturation_level.level_red = saturation;
+    parameters.tuning_info.dgain_saturation_level.level_green_even = saturation;
+    parameters.tuning_info.dgain_saturation_level.level_green_odd = saturation;
+    parameters.tuning_info.dgain_saturation_level.level_blue = saturation;
+    
+    bool success;
+    {
+        py::gil_scoped_release release;
+        success = gpr_convert_raw_to_gpr(&allocator, &parameters, &input, output);
+    }
+    gpr_parameters_destroy(&parameters, allocator.Free);
+    if (!success || output->buffer == nullptr || output->size == 0) {
+        cleanup_buffer_safe(output, allocator);
+        throw GPRConversionError("Array to GPR encoding failed");
+    }
+}
+
+// Encode a (height, width) uint16 Bayer array and return the GPR bytes
+py::bytes encode_gpr_array(const py::array& raw, const std::string& cfa, int bit_depth,
+                           const gpr_parameters* parameters) {
+    gpr_allocator allocator = native_allocator();
+    gpr_buffer output = {nullptr, 0};
+    encode_array_to_buffer(allocator, raw, cfa, bit_depth, parameters, &output);
+    try {
+        py::bytes result(static_cast<const char*>(output.buffer), output.size);
+        cleanup_buffer_safe(&output, allocator);
+        return result;
+    } catch (...) {
+        cleanup_buffer_safe(&output, allocator);
+        throw;
+    }
+}
+
+// Encode a (height, width) uint16 Bayer array and write the GPR file
+void encode_gpr_array_to_file(const py::array& raw, const std::string& output_path, const std::string& cfa,
+                              int bit_depth, const gpr_parameters* parameters) {
+    gpr_allocator allocator = native_allocator();
+    gpr_buffer output = {nullptr, 0};
+    encode_array_to_buffer(allocator, raw, cfa, bit_depth, parameters, &output);
+    
+    bool written;
+    {
+        py::gil_scoped_release release;
+        written = write_buffer_to_file(&output, output_path);
+    }
+    cleanup_buffer_safe(&output, allocator);
+    if (!written) {
+        throw GPRFileError("Failed to write output GPR file", output_path, -1);
+    }
+}
+
+// Output scales of gpr_convert_gpr_to_rgb. The reduced scales stop the VC-5
+// inverse wavelet transform early instead of downsampling a full decode.
+GPR_RGB_RESOLUTION parse_rgb_resolution(const std::string& resolution) {
+    static const std::map<std::string, GPR_RGB_RESOLUTION> resolutions = {
+        {"full", GPR_RGB_RESOLUTION_FULL},
+        {"half", GPR_RGB_RESOLUTION_HALF},
+        {"quarter", GPR_RGB_RESOLUTION_QUARTER},
+        {"eighth", GPR_RGB_RESOLUTION_EIGHTH},
+        {"sixteenth", GPR_RGB_RESOLUTION_SIXTEENTH},
+    };
+    auto it = resolutions.find(resolution);
+    if (it == resolutions.end()) {
+        throw GPRParameterError("Unsupported resolution '" + resolution +
+                                "'. Supported: full, half, quarter, eighth, sixteenth", "resolution");
+    }
+    return it->second;
+}
+
+// Decode a GPR file or buffer to a (height, width, 3) RGB array at the given
+// scale. bits selects uint8 (8) or uint16 (16) samples.
+py::array get_rgb_image_data(const py::object& source, const std::string& resolution, int bits) {
+    GPR_RGB_RESOLUTION rgb_resolution = parse_rgb_resolution(resolution);
+    if (bits != 8 && bits != 16) {
+        throw GPRParameterError("bits must be 8 or 16, got " + std::to_string(bits), "bits");
+    }
+    
+    ContextSource input_source(source);
+    ScratchBuffer scratch;
+    gpr_allocator allocator = native_allocator();
+    gpr_rgb_buffer output = {nullptr, 0, 0, 0};
+    const size_t sample_size = bits == 8 ? sizeof(uint8_t) : sizeof(uint16_t);
+    
+    {
+        py::gil_scoped_release release;
+        gpr_buffer input = input_source.load(scratch);
+        bool success = gpr_convert_gpr_to_rgb(&allocator, rgb_resolution, bits, &input, &output);
+        scratch.release();
+        
+        const size_t expected = static_cast<size_t>(output.width) * output.height * 3 * sample_size;
+        if (!success || output.buffer == nullptr || expected == 0 || output.size < expected) {
+            if (output.buffer != nullptr) {
+                allocator.Free(output.buffer);
+            }
+            if (!success) {
+                throw GPRConversionError("GPR to RGB conversion failed: " + input_source.name());
+            }
+            throw GPRFormatError("RGB decoder returned " + std::to_string(output.size) +
+                                 " bytes for a " + std::to_string(output.width) + "x" +
+                                 std::to_string(output.height) + " image: " + input_source.name());
+        }
+    }
+    
+    // Hand the decoder output to NumPy; the capsule frees it
+    py::capsule owner;
+    try {
+        owner = make_buffer_capsule(output.buffer, allocator.Free);
+    } catch (...) {
+        allocator.Free(output.buffer);
+        throw;
+    }
+    const ssize_t height = output.height;
+    const ssize_t width = output.width;
+    const ssize_t item = static_cast<ssize_t>(sample_size);
+    return py::array(numpy_dtype(bits == 8 ? "uint8" : "uint16"),
+                     std::vector<ssize_t>{height, width, 3},
+                     std::vector<ssize_t>{width * 3 * item, 3 * item, item},
+                     output.buffer, owner);
 }
 
 PYBIND11_MODULE(_core, m) {
@@ -735,28 +2906,42 @@ PYBIND11_MODULE(_core, m) {
     
     // Bind the gpr_parameters structure
     py::class_<gpr_parameters>(m, "GPRParametersCore", "Core GPR parameters structure")
-        .def(py::init<>(), "Create default GPR parameters")
+        .def(py::init([]() {
+            gpr_parameters params;
+            gpr_parameters_set_defaults(&params);
+            return params;
+        }), "Create GPR parameters initialized to the SDK defaults")
         .def_readwrite("input_width", &gpr_parameters::input_width, "Width of input source in pixels")
         .def_readwrite("input_height", &gpr_parameters::input_height, "Height of input source in pixels")
-        .def_readwrite("input_pitch", &gpr_parameters::input_pitch, "Pitch of input source in pixels")
+        .def_readwrite("input_pitch", &gpr_parameters::input_pitch, "Pitch of input source in bytes")
         .def_readwrite("fast_encoding", &gpr_parameters::fast_encoding, "Enable fast encoding mode")
         .def_readwrite("compute_md5sum", &gpr_parameters::compute_md5sum, "Compute MD5 checksum")
         .def_readwrite("enable_preview", &gpr_parameters::enable_preview, "Enable preview image");
     
     // Bind the ImageInfo structure
     py::class_<ImageInfo>(m, "ImageInfo", "Image information structure")
-        .def(py::init<>(), "Create default ImageInfo")
+        .def(py::init([]() { return ImageInfo{0, 0, 1, "uint16", 0, "", 0, 1, std::vector<double>(4, 0.0), 65535}; }),
+             "Create default ImageInfo")
         .def_readwrite("width", &ImageInfo::width, "Image width in pixels")
         .def_readwrite("height", &ImageInfo::height, "Image height in pixels")
         .def_readwrite("channels", &ImageInfo::channels, "Number of image channels")
         .def_readwrite("format", &ImageInfo::format, "Image data format")
         .def_readwrite("data_size", &ImageInfo::data_size, "Size of image data in bytes")
+        .def_readwrite("cfa_pattern", &ImageInfo::cfa_pattern, "CFA layout such as 'RGGB' (empty if unknown)")
+        .def_readwrite("bit_depth", &ImageInfo::bit_depth, "Bits per sample of the stored image")
+        .def_readwrite("compression", &ImageInfo::compression, "TIFF compression code (1 = none, 7 = JPEG, 9 = VC-5)")
+        .def_readwrite("black_level", &ImageInfo::black_level, "Black level per 2x2 CFA position (row-major)")
+        .def_readwrite("white_level", &ImageInfo::white_level, "Sensor white (saturation) level")
         .def("__repr__", [](const ImageInfo& info) {
             return "ImageInfo(width=" + std::to_string(info.width) + 
                    ", height=" + std::to_string(info.height) + 
                    ", channels=" + std::to_string(info.channels) + 
                    ", format='" + info.format + "'" +
-                   ", data_size=" + std::to_string(info.data_size) + ")";
+                   ", data_size=" + std::to_string(info.data_size) +
+                   ", cfa_pattern='" + info.cfa_pattern + "'" +
+                   ", bit_depth=" + std::to_string(info.bit_depth) +
+                   ", compression=" + std::to_string(info.compression) +
+                   ", white_level=" + std::to_string(info.white_level) + ")";
         });
     
     // Helper functions for gpr_parameters with enhanced error handling
@@ -791,34 +2976,224 @@ PYBIND11_MODULE(_core, m) {
     // String manipulation function for testing
     m.def("greet", &greet, "Greet someone by name");
     
-    // Core GPR conversion functions with enhanced error handling
+    // Core GPR conversion functions with enhanced error handling.
+    // These only touch C-level state, so the GIL is released for the whole
+    // read/convert/write cycle and conversions scale across Python threads.
     m.def("convert_gpr_to_dng", &convert_gpr_to_dng, 
           "Convert GPR file to DNG format. Raises GPRConversionError on failure.",
-          py::arg("input_path"), py::arg("output_path"));
+          py::arg("input_path"), py::arg("output_path"),
+          py::arg("parameters") = nullptr,
+          py::call_guard<py::gil_scoped_release>());
     
     m.def("convert_dng_to_gpr", &convert_dng_to_gpr,
           "Convert DNG file to GPR format. Raises GPRConversionError on failure.", 
-          py::arg("input_path"), py::arg("output_path"));
+          py::arg("input_path"), py::arg("output_path"),
+          py::arg("parameters") = nullptr,
+          py::call_guard<py::gil_scoped_release>());
     
     m.def("convert_gpr_to_raw", &convert_gpr_to_raw,
           "Convert GPR file to RAW format. Raises GPRConversionError on failure.",
-          py::arg("input_path"), py::arg("output_path"));
+          py::arg("input_path"), py::arg("output_path"),
+          py::call_guard<py::gil_scoped_release>());
+    
+    m.def("convert_gpr_to_gpr", &convert_gpr_to_gpr,
+          "Re-encode a GPR file with new parameters, decoding to raw in memory. "
+          "Raises GPRConversionError on failure.",
+          py::arg("input_path"), py::arg("output_path"),
+          py::arg("parameters") = nullptr,
+          py::call_guard<py::gil_scoped_release>());
     
     // Additional conversion function that works with current build
     m.def("convert_dng_to_dng", &convert_dng_to_dng,
           "Convert DNG file to DNG format (reprocess). Raises GPRConversionError on failure.",
-          py::arg("input_path"), py::arg("output_path"));
+          py::arg("input_path"), py::arg("output_path"),
+          py::arg("parameters") = nullptr,
+          py::call_guard<py::gil_scoped_release>());
+    
+    // In-memory conversion functions accepting any buffer-protocol object
+    m.def("convert_gpr_to_dng_bytes", &convert_gpr_to_dng_bytes,
+          "Convert GPR data held in a bytes-like object to DNG and return the DNG bytes. "
+          "Raises GPRConversionError on failure.",
+          py::arg("data"), py::arg("parameters") = nullptr);
+    
+    m.def("convert_dng_to_gpr_bytes", &convert_dng_to_gpr_bytes,
+          "Convert DNG data held in a bytes-like object to GPR and return the GPR bytes. "
+          "Raises GPRConversionError on failure.",
+          py::arg("data"), py::arg("parameters") = nullptr);
+    
+    m.def("convert_gpr_to_raw_bytes", &convert_gpr_to_raw_bytes,
+          "Convert GPR data held in a bytes-like object to RAW and return the RAW bytes. "
+          "Raises GPRConversionError on failure.",
+          py::arg("data"));
+    
+    m.def("convert_gpr_to_gpr_bytes", &convert_gpr_to_gpr_bytes,
+          "Re-encode GPR data held in a bytes-like object with new parameters and return the "
+          "GPR bytes. Raises GPRConversionError on failure.",
+          py::arg("data"), py::arg("parameters") = nullptr);
+    
+    // NumPy to GPR encoding, reading the array's buffer in place
+    m.def("encode_gpr_array", &encode_gpr_array,
+          "Encode a (height, width) uint16 Bayer array with contiguous rows and return the GPR "
+          "bytes. Raises GPRConversionError on failure.",
+          py::arg("array"), py::arg("cfa") = "RGGB", py::arg("bit_depth") = 12,
+          py::arg("parameters") = nullptr);
+    
+    m.def("encode_gpr_array_to_file", &encode_gpr_array_to_file,
+          "Encode a (height, width) uint16 Bayer array with contiguous rows and write it to "
+          "output_path. Raises GPRConversionError on failure.",
+          py::arg("array"), py::arg("output_path"), py::arg("cfa") = "RGGB", py::arg("bit_depth") = 12,
+          py::arg("parameters") = nullptr);
+    
+    m.def("convert_dng_to_dng_bytes", &convert_dng_to_dng_bytes,
+          "Reprocess DNG data held in a bytes-like object and return the DNG bytes. "
+          "Raises GPRConversionError on failure.",
+          py::arg("data"), py::arg("parameters") = nullptr);
     
     // NumPy integration functions for raw image data access
     m.def("get_raw_image_data", &get_raw_image_data,
-          "Extract raw image data as NumPy array from GPR file. "
+          "Extract raw image data as NumPy array from a GPR file path or a bytes-like "
+          "object such as a GPRImageHandle. "
+          "The GIL is released while the file is read and decoded. uint16 arrays own the "
+          "decoder output without copying it. If out is given, the image is decoded into "
+          "that C-contiguous array of matching shape and dtype, which is returned. "
+          "Floating-point dtypes (float32, float16) are scaled according to normalize: "
+          "'sensor' uses the black/white levels from the DNG tags, 'full_range' divides "
+          "by 65535 and None keeps the raw values. "
           "Raises GPRFileError, GPRParameterError, or GPRConversionError on failure.",
-          py::arg("input_path"), py::arg("dtype") = "uint16");
+          py::arg("source"), py::arg("dtype") = "uint16", py::arg("out") = py::none(),
+          py::arg("normalize") = "full_range");
+    
+    m.def("get_raw_image_region", &get_raw_image_region,
+          "Decode a GPR file path or bytes-like object and return the (height, width) window "
+          "at (x, y) as uint16, float32 or float16. The whole frame is decoded; only the window "
+          "is copied or normalized, using the CFA phase of (x, y); normalize works as in "
+          "get_raw_image_data. "
+          "The GIL is released while decoding.",
+          py::arg("source"), py::arg("x"), py::arg("y"), py::arg("width"), py::arg("height"),
+          py::arg("dtype") = "uint16", py::arg("normalize") = "full_range");
+    
+    m.def("get_raw_image_planes", &get_raw_image_planes,
+          "Decode a GPR file path or bytes-like object to a C-contiguous (4, height / 2, width / 2) "
+          "array of Bayer planes ordered R, G1, G2, B (G1 shares rows with R) for the file's CFA "
+          "pattern. dtype, out and normalize work as in get_raw_image_data; each plane is "
+          "normalized with the black level of its color. The GIL is released while decoding.",
+          py::arg("source"), py::arg("dtype") = "uint16", py::arg("out") = py::none(),
+          py::arg("normalize") = "full_range");
+    
+    m.def("get_rgb_image_data", &get_rgb_image_data,
+          "Decode a GPR file or bytes-like object to a (height, width, 3) RGB array. "
+          "resolution is 'full', 'half', 'quarter', 'eighth' or 'sixteenth'; the reduced "
+          "scales skip the finest wavelet levels, so they decode much faster. bits selects "
+          "uint8 (8) or uint16 (16) output. The GIL is released while decoding.",
+          py::arg("source"), py::arg("resolution") = "quarter", py::arg("bits") = 8);
+    
+    m.def("normalize_raw", &normalize_raw,
+          "Convert a 2-D uint16 raw array to float32 or float16. normalize='sensor' maps "
+          "black_level (one value, or four in 2x2 CFA order) to 0 and white_level to 1 "
+          "and clips; 'full_range' divides by 65535; None converts values unchanged. "
+          "Rows are split across threads (0 = one per CPU) with the GIL released.",
+          py::arg("raw"), py::arg("dtype") = "float32", py::arg("normalize") = "sensor",
+          py::arg("black_level") = std::vector<double>{0.0}, py::arg("white_level") = 65535.0,
+          py::arg("out") = py::none(), py::arg("threads") = 0);
+    
+    // Native allocator configuration
+    m.def("set_native_allocator", &set_native_allocator,
+          "Select the allocator used for native buffers: 'system' (malloc/free) or 'pool', "
+          "which keeps up to max_bytes of freed blocks in size-class free lists for reuse.",
+          py::arg("kind"), py::arg("max_bytes") = POOL_DEFAULT_MAX_BYTES);
+    
+    m.def("get_native_allocator_stats", &get_native_allocator_stats,
+          "Get allocator counters: kind, max_bytes, allocations, frees, pool hits/misses, "
+          "evictions, cached_bytes, cached_blocks, in_use_bytes and peak_in_use_bytes");
+    
+    m.def("reset_native_allocator_stats", &reset_native_allocator_stats,
+          "Reset the allocation, free, hit, miss and eviction counters and restart "
+          "peak_in_use_bytes from in_use_bytes");
+    
+    m.def("trim_native_allocator", &trim_native_allocator,
+          "Return all cached pool blocks to the system");
+    
+    // Open image files
+    py::class_<ImageHandle> image_handle(m, "GPRImageHandle", py::buffer_protocol(),
+        "A GPR or DNG file mapped into memory once, with its header parsed on first use. "
+        "Supports the read-only buffer protocol, so it can be passed to any function "
+        "taking a bytes-like object. close() unmaps the file and raises BufferError "
+        "while buffers of it are exported.");
+    // Export the mapping directly so exports can be counted for close()
+    PyTypeObject* image_handle_type = reinterpret_cast<PyTypeObject*>(image_handle.ptr());
+    image_handle_type->tp_as_buffer->bf_getbuffer = &ImageHandle::get_buffer;
+    image_handle_type->tp_as_buffer->bf_releasebuffer = &ImageHandle::release_buffer;
+    image_handle
+        .def(py::init<const std::string&>(), py::arg("path"))
+        .def_property_readonly("info", [](ImageHandle& handle) { return handle.info(); },
+                               "Copy of the parsed image header (cached after the first access)")
+        .def_property_readonly("path", &ImageHandle::path, "Path of the mapped file")
+        .def_property_readonly("size", &ImageHandle::size, "File size in bytes (0 once closed)")
+        .def_property_readonly("closed", &ImageHandle::closed, "Whether close() was called")
+        .def("close", &ImageHandle::close, "Unmap the file. Safe to call more than once.")
+        .def("__len__", &ImageHandle::size)
+        .def("__repr__", [](const ImageHandle& handle) {
+            return "GPRImageHandle('" + handle.path() + "'" +
+                   (handle.closed() ? ", closed=True)" : ", size=" + std::to_string(handle.size()) + ")");
+        });
+    
+    // Reusable codec contexts
+    py::class_<GPRDecoder>(m, "GPRDecoder",
+                           "Reusable GPR decode context. Keeps parameters and buffers between calls; "
+                           "use one decoder per thread.")
+        .def(py::init<const std::string&, const py::object&>(),
+             py::arg("dtype") = "uint16", py::arg("normalize") = "full_range")
+        .def("decode", &GPRDecoder::decode,
+             "Decode a GPR file path or bytes-like object to a (height, width) array, "
+             "or into out. The GIL is released while decoding.",
+             py::arg("source"), py::arg("out") = py::none())
+        .def("to_dng", &GPRDecoder::to_dng,
+             "Convert a GPR file path or bytes-like object to DNG bytes",
+             py::arg("source"))
+        .def("info", &GPRDecoder::info,
+             "Parse the image header of a GPR file path or bytes-like object",
+             py::arg("source"))
+        .def("release", &GPRDecoder::release, "Free the reusable buffers")
+        .def_property_readonly("dtype", &GPRDecoder::dtype, "Output dtype")
+        .def_property_readonly("decode_count", &GPRDecoder::decode_count, "Number of completed decodes")
+        .def_property_readonly("last_info", &GPRDecoder::last_info, "ImageInfo of the last decoded image")
+        .def_property_readonly("buffer_bytes", &GPRDecoder::buffer_bytes, "Bytes held by the reusable buffers");
+    
+    py::class_<GPREncoder>(m, "GPREncoder",
+                           "Reusable encode context for (height, width) uint16 Bayer arrays. "
+                           "Use one encoder per thread.")
+        .def(py::init<const std::string&, bool>(),
+             py::arg("format") = "gpr", py::arg("fast_encoding") = false)
+        .def("encode", &GPREncoder::encode,
+             "Encode a uint16 array and return the GPR or DNG file contents",
+             py::arg("raw"))
+        .def("encode_to_file", &GPREncoder::encode_to_file,
+             "Encode a uint16 array and write it to output_path",
+             py::arg("raw"), py::arg("output_path"))
+        .def_property_readonly("format", &GPREncoder::format, "Output format ('gpr' or 'dng')")
+        .def_property_readonly("fast_encoding", &GPREncoder::fast_encoding, "Whether fast encoding is enabled")
+        .def_property_readonly("encode_count", &GPREncoder::encode_count, "Number of completed encodes");
+    
+    // I/O accounting
+    m.def("get_io_stats", []() {
+        py::dict stats;
+        stats["bytes_read"] = g_io_bytes_read.load();
+        stats["read_calls"] = g_io_read_calls.load();
+        return stats;
+    }, "Get process-wide counters of file bytes read and read calls made by the native code");
+    
+    m.def("reset_io_stats", []() {
+        g_io_bytes_read = 0;
+        g_io_read_calls = 0;
+    }, "Reset the native I/O counters to zero");
     
-    m.def("get_image_info", &get_image_info,
-          "Get image dimensions and metadata from GPR file. "
-          "Raises GPRFileError or GPRConversionError on failure.",
-          py::arg("input_path"));
+    m.def("get_image_info", &get_image_info_from,
+          "Get image dimensions, CFA pattern, bit depth and compression from the "
+          "TIFF/DNG header of a GPR or DNG file without reading the image data. "
+          "source is a path, a bytes-like object, or a seekable binary file object "
+          "from which only the header bytes are read. "
+          "Raises GPRFileError, GPRFormatError or GPRConversionError on failure.",
+          py::arg("source"));
     
     // Version information
     m.attr("__version__") = py::str(VERSION_INFO);
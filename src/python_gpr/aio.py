@@ -0,0 +1,337 @@
+"""
+asyncio API for Python-GPR.
+
+The functions in this module are awaitable versions of convert_image,
+load_gpr_as_numpy and get_info. They run the blocking calls in a bounded
+thread pool; the native conversions and decodes release the GIL, so the
+event loop keeps running and several files are processed in parallel.
+
+Besides the number of worker threads, concurrency is limited by a memory
+budget: each call reserves an estimate of the memory it needs (input
+file, decoded frame and output) and waits until the reservations of the
+calls already running leave room for it. A single call larger than the
+whole budget runs alone.
+
+Cancelling a call that is still waiting for the budget or for a worker
+thread removes it from the queue. A call that has already started runs to
+completion in its thread, but its result is discarded.
+
+Example:
+    from python_gpr import aio
+
+    aio.configure(max_workers=8, memory_budget=2 * 1024 ** 3)
+
+    async def ingest(paths):
+        info = await aio.get_info(paths[0])
+        frame = await aio.load(paths[0], "float32")
+        await aio.batch_convert([(p, p.replace(".GPR", ".DNG")) for p in paths])
+"""
+
+import asyncio
+import collections
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from .core import convert_image, get_info as _get_info, load_gpr_as_numpy
+
+# Default number of worker threads
+DEFAULT_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+# Default memory budget shared by running calls
+DEFAULT_MEMORY_BUDGET = 1024 * 1024 * 1024
+
+# Conversions batch_convert keeps scheduled ahead, per worker thread
+_QUEUE_DEPTH = 4
+
+# Approximate size of the 16-bit raw frame relative to a GPR file (VC-5
+# compresses raw data about 4:1); DNG and RAW files hold uncompressed data
+_GPR_EXPANSION = 4
+
+_config_lock = threading.Lock()
+_max_workers = DEFAULT_MAX_WORKERS
+_memory_budget = DEFAULT_MEMORY_BUDGET
+_executor: Optional[ThreadPoolExecutor] = None
+# One budget per event loop, since asyncio futures belong to a single loop
+_budgets = weakref.WeakKeyDictionary()
+
+
+class _MemoryBudget:
+    """FIFO reservation of bytes for the calls of one event loop."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self._waiters = collections.deque()
+
+    async def acquire(self, nbytes: int) -> int:
+        """Reserve nbytes (at most the whole budget) and return the reserved amount."""
+        nbytes = min(nbytes, self.limit)
+        if nbytes == 0 or (not self._waiters and self.in_use + nbytes <= self.limit):
+            self.in_use += nbytes
+            return nbytes
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (nbytes, waiter)
+        self._waiters.append(entry)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just before the cancellation arrived
+                self.release(nbytes)
+            else:
+                try:
+                    self._waiters.remove(entry)
+                except ValueError:
+                    pass
+                self._wake()
+            raise
+        return nbytes
+
+    def release(self, nbytes: int) -> None:
+        self.in_use -= nbytes
+        self._wake()
+
+    def _wake(self) -> None:
+        """Grant waiting reservations in order while they fit."""
+        while self._waiters:
+            nbytes, waiter = self._waiters[0]
+            if waiter.done():
+                self._waiters.popleft()
+                continue
+            if self.in_use + nbytes > self.limit:
+                break
+            self._waiters.popleft()
+            self.in_use += nbytes
+            waiter.set_result(None)
+
+
+def configure(max_workers: Optional[int] = None, memory_budget: Optional[int] = None) -> None:
+    """
+    Set the worker thread count and memory budget.
+
+    Calls already submitted keep running on the previous thread pool, which
+    shuts down once they finish.
+
+    Args:
+        max_workers: Maximum number of calls running at once
+            (default: number of CPUs, at most 8)
+        memory_budget: Maximum estimated memory in bytes of the calls running
+            at once (default: 1 GiB)
+
+    Raises:
+        ValueError: If max_workers or memory_budget is not a positive integer
+    """
+    global _executor, _max_workers, _memory_budget
+    for name, value in (("max_workers", max_workers), ("memory_budget", memory_budget)):
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value <= 0):
+            raise ValueError(f"{name} must be a positive integer, got {value!r}")
+
+    with _config_lock:
+        if max_workers is not None:
+            _max_workers = max_workers
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+                _executor = None
+        if memory_budget is not None:
+            _memory_budget = memory_budget
+            _budgets.clear()
+
+
+def shutdown(wait: bool = True) -> None:
+    """
+    Shut down the worker threads. They are started again by the next call.
+
+    Args:
+        wait: Wait for running calls to finish
+    """
+    global _executor
+    with _config_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _config_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_max_workers, thread_name_prefix="python-gpr-aio")
+        return _executor
+
+
+def _get_budget(loop: asyncio.AbstractEventLoop) -> _MemoryBudget:
+    with _config_lock:
+        budget = _budgets.get(loop)
+        if budget is None:
+            budget = _budgets[loop] = _MemoryBudget(_memory_budget)
+        return budget
+
+
+def _estimate_sizes(source) -> Tuple[int, int]:
+    """Approximate sizes in bytes of the input and of its 16-bit raw frame."""
+    if isinstance(source, (str, os.PathLike)):
+        try:
+            size = os.path.getsize(source)
+        except OSError:
+            return 0, 0
+        if os.path.splitext(os.fspath(source))[1].lower() != ".gpr":
+            return size, size
+        return size, size * _GPR_EXPANSION
+    if hasattr(source, "read"):
+        return 0, 0
+    # GPR contents in memory
+    size = memoryview(source).nbytes
+    return size, size * _GPR_EXPANSION
+
+
+def _release_later(loop: asyncio.AbstractEventLoop, budget: _MemoryBudget, nbytes: int) -> None:
+    """Release a reservation from a worker thread."""
+    if not loop.is_closed():
+        loop.call_soon_threadsafe(budget.release, nbytes)
+
+
+async def _run(memory: int, function: Callable, *args) -> Any:
+    """Run function(*args) in the thread pool once memory bytes of the budget are free."""
+    loop = asyncio.get_running_loop()
+    budget = _get_budget(loop)
+    reserved = await budget.acquire(memory)
+    try:
+        future = _get_executor().submit(function, *args)
+    except BaseException:
+        budget.release(reserved)
+        raise
+    # Release when the call has really finished (or was cancelled while
+    # queued), not when the awaiting task is cancelled
+    future.add_done_callback(lambda _: _release_later(loop, budget, reserved))
+    return await asyncio.wrap_future(future)
+
+
+async def convert(input_path: str, output_path: str, target_format: Optional[str] = None,
+                  memory: Optional[int] = None) -> None:
+    """
+    Convert a file like convert_image without blocking the event loop.
+
+    Args:
+        input_path: Path to input file
+        output_path: Path for output file
+        target_format: Target format ('gpr', 'dng', 'raw'). If None, inferred from output extension.
+        memory: Bytes to reserve from the memory budget (default: estimated
+            from the input file as input, raw frame and output)
+
+    Raises:
+        As convert_image
+    """
+    if memory is None:
+        size, raw = _estimate_sizes(input_path)
+        memory = size + 2 * raw
+    await _run(memory, convert_image, input_path, output_path, target_format)
+
+
+async def load(filepath, dtype: str = "uint16", normalize: Optional[str] = "full_range",
+               memory: Optional[int] = None):
+    """
+    Decode a GPR file like load_gpr_as_numpy without blocking the event loop.
+
+    Args:
+        filepath: Path to the GPR file, or its contents (see load_gpr_as_numpy)
+        dtype: 'uint16', 'float32' or 'float16'
+        normalize: As for load_gpr_as_numpy
+        memory: Bytes to reserve from the memory budget (default: estimated
+            from the input file as input, raw frame and returned array)
+
+    Returns:
+        NumPy array with shape (height, width)
+
+    Raises:
+        As load_gpr_as_numpy
+    """
+    if memory is None:
+        size, raw = _estimate_sizes(filepath)
+        # float32 output is twice the size of the 16-bit frame
+        memory = size + raw + (2 * raw if dtype == "float32" else raw)
+    return await _run(memory, load_gpr_as_numpy, filepath, dtype, None, normalize)
+
+
+async def get_info(filepath: str) -> dict:
+    """
+    Get image information like get_info without blocking the event loop.
+
+    Only the header is read, so no memory is reserved from the budget.
+
+    Raises:
+        As get_info
+    """
+    return await _run(0, _get_info, filepath)
+
+
+async def batch_convert(pairs: Iterable[Tuple[str, str]], target_format: Optional[str] = None,
+                        return_exceptions: bool = False) -> List[Any]:
+    """
+    Convert many files concurrently within the worker and memory limits.
+
+    pairs is consumed as conversions finish: at most max_workers * 4
+    conversions are scheduled at a time, so the batch size does not bound
+    memory use. Cancelling the batch cancels the conversions that have not
+    started.
+
+    Args:
+        pairs: (input_path, output_path) pairs, e.g. a generator
+        target_format: Target format for all outputs. If None, inferred from
+            each output extension.
+        return_exceptions: Return the exception of a failed conversion in its
+            place in the result list and continue with the others. Otherwise
+            the first error is raised and the conversions that have not
+            started are cancelled.
+
+    Returns:
+        List with None for each successful conversion, in the order of pairs
+
+    Raises:
+        The first conversion error, unless return_exceptions is set
+    """
+    # A sliding window of tasks, so a large batch does not create a task and
+    # a budget reservation for every pair up front
+    window = _max_workers * _QUEUE_DEPTH
+    results: List[Any] = []
+    in_flight = {}
+
+    def collect(done) -> None:
+        for task in sorted(done, key=in_flight.get):
+            index = in_flight.pop(task)
+            error = task.exception()
+            if error is not None:
+                if not return_exceptions:
+                    raise error
+                results[index] = error
+
+    try:
+        for input_path, output_path in pairs:
+            task = asyncio.ensure_future(convert(input_path, output_path, target_format))
+            in_flight[task] = len(results)
+            results.append(None)
+            if len(in_flight) >= window:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                collect(done)
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            collect(done)
+    except BaseException:
+        # Stop the conversions that are still queued
+        for task in in_flight:
+            task.cancel()
+        raise
+    return results
+
+
+__all__ = [
+    "configure",
+    "shutdown",
+    "convert",
+    "load",
+    "get_info",
+    "batch_convert",
+]
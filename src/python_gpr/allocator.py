@@ -0,0 +1,121 @@
+"""
+Native allocator configuration for Python-GPR.
+
+Every buffer the GPR library works with (compressed input, decoded raw
+data, converted output) is allocated by the C++ extension. By default
+these come straight from malloc/free. The "pool" allocator instead keeps
+freed blocks in size-class free lists and hands them out again, which
+avoids returning and re-mapping the same 20-50 MB buffers on every call
+of a batch decode.
+
+Example:
+    import python_gpr
+
+    python_gpr.set_allocator("pool", max_bytes=256 * 1024 * 1024)
+    for path in paths:
+        data = python_gpr.load_gpr_as_numpy(path)
+    print(python_gpr.get_allocator_stats()["hits"])
+"""
+
+from typing import Optional
+
+# Default cap on the memory kept in the pool, matching the native default
+DEFAULT_POOL_MAX_BYTES = 512 * 1024 * 1024
+
+_ALLOCATOR_KINDS = ("system", "pool")
+
+
+def _get_core():
+    try:
+        from . import _core
+        return _core
+    except ImportError:
+        raise NotImplementedError("GPR C++ bindings not available - please build the extension module")
+
+
+def set_allocator(kind: str, max_bytes: Optional[int] = None) -> None:
+    """
+    Select the allocator used for native buffers.
+
+    Buffers allocated before the switch remain valid and are released
+    correctly by whichever allocator is active when they are freed.
+
+    Args:
+        kind: 'system' to use malloc/free directly, or 'pool' to keep freed
+            blocks for reuse by later calls
+        max_bytes: Maximum number of bytes of freed blocks the pool keeps
+            (default: 512 MiB). Ignored for 'system'.
+
+    Raises:
+        ValueError: If kind is unknown or max_bytes is negative
+        NotImplementedError: If GPR bindings are not available
+    """
+    if kind not in _ALLOCATOR_KINDS:
+        raise ValueError(f"Unknown allocator '{kind}'. Supported: {', '.join(_ALLOCATOR_KINDS)}")
+    if max_bytes is None:
+        max_bytes = DEFAULT_POOL_MAX_BYTES
+    if not isinstance(max_bytes, int) or isinstance(max_bytes, bool) or max_bytes < 0:
+        raise ValueError(f"max_bytes must be a non-negative integer, got {max_bytes!r}")
+
+    _get_core().set_native_allocator(kind, max_bytes)
+
+
+def get_allocator() -> str:
+    """
+    Get the name of the active allocator ('system' or 'pool').
+
+    Raises:
+        NotImplementedError: If GPR bindings are not available
+    """
+    return _get_core().get_native_allocator_stats()["kind"]
+
+
+def get_allocator_stats() -> dict:
+    """
+    Get counters of the native allocator.
+
+    Returns:
+        Dictionary with:
+        - kind: Active allocator
+        - max_bytes: Pool size limit
+        - allocations / frees: Number of native allocations and frees
+        - hits / misses: Pool-sized allocations served from / not found in the pool
+        - evictions: Cached blocks released to the system to respect max_bytes
+        - cached_bytes / cached_blocks: Memory currently held by the pool
+        - in_use_bytes: Memory currently allocated and not yet freed
+        - peak_in_use_bytes: Largest in_use_bytes since the last reset
+
+    Raises:
+        NotImplementedError: If GPR bindings are not available
+    """
+    return dict(_get_core().get_native_allocator_stats())
+
+
+def reset_allocator_stats() -> None:
+    """
+    Reset the allocation, free, hit, miss and eviction counters, and
+    restart peak_in_use_bytes from the current in_use_bytes.
+
+    Raises:
+        NotImplementedError: If GPR bindings are not available
+    """
+    _get_core().reset_native_allocator_stats()
+
+
+def trim_allocator() -> None:
+    """
+    Release all blocks cached by the pool back to the system.
+
+    Raises:
+        NotImplementedError: If GPR bindings are not available
+    """
+    _get_core().trim_native_allocator()
+
+
+__all__ = [
+    "set_allocator",
+    "get_allocator",
+    "get_allocator_stats",
+    "reset_allocator_stats",
+    "trim_allocator",
+]
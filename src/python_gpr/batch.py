@@ -0,0 +1,568 @@
+"""
+Parallel batch conversion for Python-GPR.
+
+batch_convert() converts many (input, output) pairs with the conversion
+functions of python_gpr.conversion on a pool of threads or processes. The
+native conversions release the GIL, so threads are usually enough;
+processes isolate workers from each other at the cost of starting them.
+
+Results are streamed as each file finishes, in input order or in
+completion order. A file that fails does not stop the batch: its result
+carries the exception instead. Only a bounded number of files is
+submitted ahead of the consumer, so batches of any size use constant
+memory.
+
+The "pipeline" backend splits each conversion into three stages connected
+by bounded queues: I/O threads read inputs ahead into memory, the worker
+threads convert buffers with the in-memory converters, and I/O threads
+write the outputs behind them. Storage and CPUs then work at the same
+time instead of taking turns, which matters most on slow or high-latency
+storage.
+
+Example:
+    import python_gpr
+
+    batch = python_gpr.batch_convert(pairs, workers=16)
+    for result in batch:
+        if not result.ok:
+            print(f"{result.input_path}: {result.error}")
+    print(f"{batch.stats.files_per_second:.1f} files/s, {batch.stats.mb_per_second:.1f} MB/s")
+"""
+
+import abc
+import collections
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator, Optional, Tuple
+
+from .conversion import (
+    GPRParameters,
+    convert_dng_to_dng,
+    convert_dng_to_dng_bytes,
+    convert_dng_to_gpr,
+    convert_dng_to_gpr_bytes,
+    convert_gpr_to_dng,
+    convert_gpr_to_dng_bytes,
+    convert_gpr_to_gpr,
+    convert_gpr_to_gpr_bytes,
+    convert_gpr_to_raw,
+    convert_gpr_to_raw_bytes,
+    detect_format,
+    _format_from_header,
+)
+
+_BACKENDS = ("thread", "process", "pipeline")
+
+# Conversion function for each (input format, target format)
+_CONVERTERS = {
+    ("gpr", "dng"): convert_gpr_to_dng,
+    ("gpr", "raw"): convert_gpr_to_raw,
+    ("gpr", "gpr"): convert_gpr_to_gpr,
+    ("dng", "gpr"): convert_dng_to_gpr,
+    ("dng", "dng"): convert_dng_to_dng,
+}
+
+# In-memory conversion function for each (input format, target format)
+_BYTES_CONVERTERS = {
+    ("gpr", "dng"): convert_gpr_to_dng_bytes,
+    ("gpr", "raw"): convert_gpr_to_raw_bytes,
+    ("gpr", "gpr"): convert_gpr_to_gpr_bytes,
+    ("dng", "gpr"): convert_dng_to_gpr_bytes,
+    ("dng", "dng"): convert_dng_to_dng_bytes,
+}
+
+# Default pipeline sizing: reader and writer threads each, and buffers
+# waiting between stages per worker
+DEFAULT_IO_THREADS = 2
+_PIPELINE_BUFFERS_PER_WORKER = 2
+
+_EXTENSION_FORMATS = {'.gpr': 'gpr', '.dng': 'dng', '.raw': 'raw'}
+
+# Files submitted ahead of the consumer, per worker
+_QUEUE_DEPTH = 4
+
+
+class BatchResult:
+    """
+    Outcome of converting one file.
+
+    Attributes:
+        index: Position of the pair in the batch
+        input_path / output_path: The converted pair
+        error: Exception raised by the conversion, or None on success
+        bytes_in / bytes_out: Input and output file sizes (0 if unknown)
+        seconds: Time spent converting the file
+    """
+
+    __slots__ = ("index", "input_path", "output_path", "error", "bytes_in", "bytes_out", "seconds")
+
+    def __init__(self, index: int, input_path, output_path, error: Optional[BaseException] = None,
+                 bytes_in: int = 0, bytes_out: int = 0, seconds: float = 0.0):
+        self.index = index
+        self.input_path = input_path
+        self.output_path = output_path
+        self.error = error
+        self.bytes_in = bytes_in
+        self.bytes_out = bytes_out
+        self.seconds = seconds
+
+    @property
+    def ok(self) -> bool:
+        """True if the file was converted."""
+        return self.error is None
+
+    def __repr__(self) -> str:
+        status = "ok" if self.ok else f"error={self.error!r}"
+        return f"BatchResult({self.index}, '{self.input_path}' -> '{self.output_path}', {status})"
+
+
+class BatchStats:
+    """
+    Aggregate counters of a batch, updated as results are consumed.
+
+    Attributes:
+        files: Results consumed so far
+        succeeded / failed: Of which converted / failed
+        bytes_in / bytes_out: Total input and output size of converted files
+        elapsed: Seconds since the batch started (until the last result)
+    """
+
+    def __init__(self):
+        self.files = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.elapsed = 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        """Converted files per second of wall time."""
+        return self.succeeded / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        """Input megabytes (10^6 bytes) converted per second of wall time."""
+        return self.bytes_in / self.elapsed / 1e6 if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        """Counters and rates as a dictionary."""
+        return {
+            'files': self.files,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'elapsed': self.elapsed,
+            'files_per_second': self.files_per_second,
+            'mb_per_second': self.mb_per_second,
+        }
+
+    def __repr__(self) -> str:
+        return (f"BatchStats(files={self.files}, failed={self.failed}, "
+                f"{self.files_per_second:.1f} files/s, {self.mb_per_second:.1f} MB/s)")
+
+
+def _target_format(output_path, target_format: Optional[str]) -> str:
+    if target_format is not None:
+        return target_format
+    ext = os.path.splitext(os.fspath(output_path))[1].lower()
+    if ext not in _EXTENSION_FORMATS:
+        raise ValueError(f"Cannot determine target format from extension: {ext}")
+    return _EXTENSION_FORMATS[ext]
+
+
+def _converter(converters: dict, input_format: str, output_path: str, target_format: Optional[str]):
+    """Conversion function for a pair, chosen from the input and target formats."""
+    key = (input_format, _target_format(output_path, target_format))
+    converter = converters.get(key)
+    if converter is None:
+        raise ValueError(f"Unsupported conversion: {key[0]} to {key[1]}")
+    return converter
+
+
+def _convert_file(input_path, output_path, target_format: Optional[str],
+                  parameters: Optional[GPRParameters]) -> Tuple[int, int, float]:
+    """Convert one file and return (bytes_in, bytes_out, seconds). Runs in a worker."""
+    input_path = os.fspath(input_path)
+    output_path = os.fspath(output_path)
+    converter = _converter(_CONVERTERS, detect_format(input_path), output_path, target_format)
+
+    start = time.perf_counter()
+    converter(input_path, output_path, parameters)
+    seconds = time.perf_counter() - start
+    return os.path.getsize(input_path), os.path.getsize(output_path), seconds
+
+
+def _read_file(path: str) -> bytes:
+    """Read a whole input file (pipeline reader stage)."""
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _write_file(path: str, data: bytes) -> None:
+    """Write a whole output file (pipeline writer stage)."""
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+class BatchConversion(abc.ABC):
+    """
+    Iterator over the results of batch_convert.
+
+    Iterating yields a BatchResult per pair; stats holds the aggregate
+    counters of the results consumed so far. Closing the batch (or leaving
+    a ``with`` block) before it is exhausted cancels the files that have
+    not started and waits for the running ones.
+    """
+
+    def __init__(self, pairs: Iterable[Tuple[str, str]], workers: int, ordered: bool,
+                 target_format: Optional[str], parameters: Optional[GPRParameters]):
+        self.stats = BatchStats()
+        self._pairs = enumerate(pairs)
+        self._workers = workers
+        self._ordered = ordered
+        self._target_format = target_format
+        self._parameters = parameters
+        self._start = time.perf_counter()
+        self._results = self._run()
+
+    def __iter__(self) -> "BatchConversion":
+        return self
+
+    def __next__(self) -> BatchResult:
+        return next(self._results)
+
+    def __enter__(self) -> "BatchConversion":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Cancel files that have not started and shut down the workers."""
+        self._results.close()
+
+    def _record(self, result: BatchResult) -> BatchResult:
+        """Add a result to the statistics."""
+        stats = self.stats
+        stats.files += 1
+        if result.ok:
+            stats.succeeded += 1
+            stats.bytes_in += result.bytes_in
+            stats.bytes_out += result.bytes_out
+        else:
+            stats.failed += 1
+        stats.elapsed = time.perf_counter() - self._start
+        return result
+
+    @abc.abstractmethod
+    def _run(self) -> Iterator[BatchResult]:
+        """Generate the results, submitting pairs as they are consumed."""
+
+
+class _PoolConversion(BatchConversion):
+    """Each worker of a thread or process pool reads, converts and writes one file at a time."""
+
+    def __init__(self, pairs: Iterable[Tuple[str, str]], workers: int, backend: str, ordered: bool,
+                 target_format: Optional[str], parameters: Optional[GPRParameters]):
+        super().__init__(pairs, workers, ordered, target_format, parameters)
+        self._window = workers * _QUEUE_DEPTH
+        executor_class = ThreadPoolExecutor if backend == "thread" else ProcessPoolExecutor
+        self._executor = executor_class(max_workers=workers)
+
+    def close(self) -> None:
+        super().close()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _submit(self):
+        """Submit the next pair, returning (future, index, input, output) or None when done."""
+        for index, (input_path, output_path) in self._pairs:
+            future = self._executor.submit(_convert_file, input_path, output_path,
+                                           self._target_format, self._parameters)
+            return future, index, input_path, output_path
+        return None
+
+    def _collect(self, future, index: int, input_path, output_path) -> BatchResult:
+        try:
+            bytes_in, bytes_out, seconds = future.result()
+            result = BatchResult(index, input_path, output_path, None, bytes_in, bytes_out, seconds)
+        except Exception as e:
+            result = BatchResult(index, input_path, output_path, e)
+        return self._record(result)
+
+    def _run(self) -> Iterator[BatchResult]:
+        try:
+            if self._ordered:
+                in_flight = collections.deque()
+                while True:
+                    while len(in_flight) < self._window:
+                        item = self._submit()
+                        if item is None:
+                            break
+                        in_flight.append(item)
+                    if not in_flight:
+                        return
+                    yield self._collect(*in_flight.popleft())
+            else:
+                in_flight = {}
+                while True:
+                    while len(in_flight) < self._window:
+                        item = self._submit()
+                        if item is None:
+                            break
+                        in_flight[item[0]] = item
+                    if not in_flight:
+                        return
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield self._collect(*in_flight.pop(future))
+        finally:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Marks the end of a pipeline queue
+_DONE = object()
+
+
+class _PipelineConversion(BatchConversion):
+    """
+    Reader, converter and writer threads connected by bounded queues.
+
+    At most read_ahead inputs wait in memory for a converter and at most
+    write_behind outputs wait for a writer, so memory use is bounded by
+    those buffers plus one input and output per thread.
+    """
+
+    def __init__(self, pairs: Iterable[Tuple[str, str]], workers: int, ordered: bool,
+                 target_format: Optional[str], parameters: Optional[GPRParameters],
+                 io_threads: int, read_ahead: int, write_behind: int):
+        super().__init__(pairs, workers, ordered, target_format, parameters)
+        self._io_threads = io_threads
+        self._read_queue = queue.Queue(maxsize=read_ahead)
+        self._write_queue = queue.Queue(maxsize=write_behind)
+        self._result_queue = queue.Queue()
+        self._pairs_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        # Threads of each stage still running; the last one ends the next stage
+        self._remaining = {"read": io_threads, "convert": workers, "write": io_threads}
+        self._remaining_lock = threading.Lock()
+
+    def close(self) -> None:
+        self._stop.set()
+        super().close()
+        self._join()
+
+    def _join(self) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        """Put item into a bounded queue unless the pipeline is stopped."""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue):
+        """Get the next item, or _DONE once the pipeline is stopped."""
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _finish(self, stage: str, next_queue: queue.Queue, consumers: int) -> None:
+        """Called by each thread of a stage when it ends; the last one ends the next stage."""
+        with self._remaining_lock:
+            self._remaining[stage] -= 1
+            last = self._remaining[stage] == 0
+        if last:
+            for _ in range(consumers):
+                if next_queue is self._result_queue:
+                    next_queue.put(_DONE)
+                elif not self._put(next_queue, _DONE):
+                    break
+
+    def _next_pair(self):
+        with self._pairs_lock:
+            return next(self._pairs, None)
+
+    def _read_stage(self) -> None:
+        try:
+            while not self._stop.is_set():
+                item = self._next_pair()
+                if item is None:
+                    break
+                index, (input_path, output_path) = item
+                job = {"index": index, "input_path": input_path, "output_path": output_path,
+                       "error": None, "data": None, "seconds": 0.0}
+                try:
+                    job["data"] = _read_file(os.fspath(input_path))
+                except Exception as e:
+                    job["error"] = e
+                if not self._put(self._read_queue, job):
+                    break
+        finally:
+            self._finish("read", self._read_queue, self._workers)
+
+    def _convert_stage(self) -> None:
+        try:
+            while True:
+                job = self._get(self._read_queue)
+                if job is _DONE:
+                    break
+                if job["error"] is None:
+                    try:
+                        input_path = os.fspath(job["input_path"])
+                        output_path = os.fspath(job["output_path"])
+                        # Sniff the data already read; no file I/O on the convert threads
+                        input_format = _format_from_header(input_path, job["data"])
+                        if input_format is None:
+                            raise ValueError(f"Unknown format for file: {input_path}")
+                        convert = _converter(_BYTES_CONVERTERS, input_format, output_path, self._target_format)
+                        start = time.perf_counter()
+                        output = convert(job["data"], self._parameters)
+                        job["seconds"] = time.perf_counter() - start
+                        job["bytes_in"] = len(job["data"])
+                        job["data"] = output
+                    except Exception as e:
+                        job["error"] = e
+                        job["data"] = None
+                if not self._put(self._write_queue, job):
+                    break
+        finally:
+            self._finish("convert", self._write_queue, self._io_threads)
+
+    def _write_stage(self) -> None:
+        try:
+            while True:
+                job = self._get(self._write_queue)
+                if job is _DONE:
+                    break
+                result = BatchResult(job["index"], job["input_path"], job["output_path"], job["error"])
+                if result.ok:
+                    try:
+                        _write_file(os.fspath(job["output_path"]), job["data"])
+                        result.bytes_in = job["bytes_in"]
+                        result.bytes_out = len(job["data"])
+                        result.seconds = job["seconds"]
+                    except Exception as e:
+                        result.error = e
+                self._result_queue.put(result)
+        finally:
+            self._finish("write", self._result_queue, 1)
+
+    def _start_threads(self) -> None:
+        stages = ((self._read_stage, self._io_threads, "reader"),
+                  (self._convert_stage, self._workers, "converter"),
+                  (self._write_stage, self._io_threads, "writer"))
+        for target, count, name in stages:
+            for i in range(count):
+                thread = threading.Thread(target=target, name=f"python-gpr-{name}-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self) -> Iterator[BatchResult]:
+        self._start_threads()
+        try:
+            pending = {}
+            next_index = 0
+            while True:
+                result = self._result_queue.get()
+                if result is _DONE:
+                    break
+                if not self._ordered:
+                    yield self._record(result)
+                    continue
+                pending[result.index] = result
+                while next_index in pending:
+                    yield self._record(pending.pop(next_index))
+                    next_index += 1
+        finally:
+            self._join()
+
+
+def batch_convert(pairs: Iterable[Tuple[str, str]], workers: Optional[int] = None,
+                  backend: str = "thread", ordered: bool = True,
+                  target_format: Optional[str] = None,
+                  parameters: Optional[GPRParameters] = None,
+                  io_threads: int = DEFAULT_IO_THREADS,
+                  read_ahead: Optional[int] = None,
+                  write_behind: Optional[int] = None) -> BatchConversion:
+    """
+    Convert many files in parallel, streaming the results.
+
+    Each pair is converted with convert_gpr_to_dng, convert_gpr_to_gpr,
+    convert_dng_to_gpr, convert_gpr_to_raw or convert_dng_to_dng (or their
+    *_bytes variants for the pipeline backend), chosen from the input format
+    and the target format. GPR to GPR pairs re-encode the input with
+    parameters.
+
+    Args:
+        pairs: (input_path, output_path) pairs; may be a lazy iterable
+        workers: Number of parallel conversions (default: number of CPUs)
+        backend: 'thread' (the native conversions release the GIL),
+            'process', or 'pipeline' to overlap reading, converting and
+            writing with dedicated I/O threads
+        ordered: Yield results in the order of pairs; otherwise in the order
+            the conversions finish
+        target_format: Target format ('gpr', 'dng', 'raw') for all pairs. If
+            None, inferred from each output extension.
+        parameters: GPRParameters passed to every conversion
+        io_threads: Pipeline only. Number of reader threads and of writer
+            threads (default: 2 each).
+        read_ahead: Pipeline only. Maximum number of inputs read into memory
+            and waiting for a converter (default: 2 per worker).
+        write_behind: Pipeline only. Maximum number of converted outputs
+            waiting for a writer (default: 2 per worker).
+
+    Returns:
+        BatchConversion iterator of BatchResult; its stats attribute reports
+        files/s and MB/s
+
+    Raises:
+        ValueError: If workers, backend or a pipeline size is invalid
+        TypeError: If parameters is not a GPRParameters instance
+
+    Example:
+        >>> batch = batch_convert(zip(gpr_paths, dng_paths), workers=8)
+        >>> failed = [r for r in batch if not r.ok]
+        >>> print(batch.stats)
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if read_ahead is None:
+        read_ahead = workers * _PIPELINE_BUFFERS_PER_WORKER
+    if write_behind is None:
+        write_behind = workers * _PIPELINE_BUFFERS_PER_WORKER
+    for name, value in (("workers", workers), ("io_threads", io_threads),
+                        ("read_ahead", read_ahead), ("write_behind", write_behind)):
+        if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+            raise ValueError(f"{name} must be a positive integer, got {value!r}")
+    if backend not in _BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}'. Supported: {', '.join(_BACKENDS)}")
+    if parameters is not None and not isinstance(parameters, GPRParameters):
+        raise TypeError(f"parameters must be a GPRParameters instance, got {type(parameters).__name__}")
+
+    if backend == "pipeline":
+        return _PipelineConversion(pairs, workers, ordered, target_format, parameters,
+                                   io_threads, read_ahead, write_behind)
+    return _PoolConversion(pairs, workers, backend, ordered, target_format, parameters)
+
+
+__all__ = [
+    "batch_convert",
+    "BatchConversion",
+    "BatchResult",
+    "BatchStats",
+]
@@ -0,0 +1,519 @@
+"""
+Decode cache for Python-GPR.
+
+Interactive tools tend to decode the same few files again and again. With
+the decode cache enabled, GPRImage.to_numpy() and load_gpr_as_numpy() keep
+the arrays they return, keyed on the file (path, device, inode,
+modification time, size) and the decode options (dtype, normalization,
+resolution, layout), and return the kept array for a repeated request. A
+file that is modified or replaced gets a new key, so stale results are
+never returned.
+
+The cache is bounded by the total size of the arrays it holds and evicts
+the least recently used entry first. Cached arrays are shared between
+callers and therefore read-only; use ``array.copy()`` for a writable copy.
+Only decodes of files on disk without an ``out`` array are cached.
+
+The disk cache persists decoded frames between processes as .npy files
+in a directory. Entries are named after a hash of the GPR file contents
+and the decode options, so a modified file never matches an old entry, and
+later loads return read-only np.memmap views of the stored frame instead
+of decoding; a stored frame whose shape or dtype does not match the decode
+options is discarded. The directory is bounded in bytes by removing the least
+recently used entries. Its size is kept as a running total, seeded by a
+scan of the directory when the cache is enabled; the directory is scanned
+again when the total exceeds the limit or after every _RESCAN_WRITES
+writes, to account for entries written by other processes. Entries are
+written to a temporary file and renamed
+into place, so any number of processes can share one directory. When both
+caches are enabled the in-memory cache is consulted first.
+
+Example:
+    import python_gpr
+
+    python_gpr.enable_decode_cache(max_bytes=1024 * 1024 * 1024)
+    frame = python_gpr.load_gpr_as_numpy("sample.gpr")   # decodes
+    frame = python_gpr.load_gpr_as_numpy("sample.gpr")   # served from the cache
+    print(python_gpr.get_decode_cache_stats()["hits"])
+
+    python_gpr.enable_disk_cache("/var/cache/gpr-frames", max_bytes=50 * 1024 ** 3)
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple, Union
+
+# Default cap on the memory held by the cache
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Default cap on the size of the disk cache directory
+DEFAULT_DISK_CACHE_MAX_BYTES = 10 * 1024 * 1024 * 1024
+
+# Changing the stored layout invalidates existing disk cache entries
+_DISK_CACHE_VERSION = 1
+
+# Temporary files older than this were left by a writer that died
+_STALE_TEMP_SECONDS = 24 * 60 * 60
+
+# Content hashes remembered per process, least recently used dropped first
+_MAX_DIGESTS = 4096
+
+# Writes between scans of the disk cache directory
+_RESCAN_WRITES = 256
+
+
+class _DecodeCache:
+    """Thread-safe LRU mapping of decode keys to read-only arrays, bounded by bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            array = self._entries.get(key)
+            if array is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return array
+
+    def put(self, key, array) -> bool:
+        """Store array, making it read-only; return False if it is too large to store."""
+        size = array.nbytes
+        if size > self.max_bytes:
+            return False
+        # Stored arrays are shared between callers
+        array.flags.writeable = False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous.nbytes
+            self._entries[key] = array
+            self.current_bytes += size
+            self._evict(self.max_bytes)
+        return True
+
+    def _evict(self, limit: int) -> None:
+        """Drop least recently used entries until at most limit bytes are held."""
+        while self.current_bytes > limit and self._entries:
+            _, array = self._entries.popitem(last=False)
+            self.current_bytes -= array.nbytes
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": True,
+                "max_bytes": self.max_bytes,
+                "current_bytes": self.current_bytes,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class _DiskCache:
+    """Directory of decoded frames stored as .npy files, bounded by bytes."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Content hashes of files already hashed by this process, by file
+        # identity; an LRU bounded by _MAX_DIGESTS
+        self._digests = OrderedDict()
+        # Size of the directory as of the last scan plus this process's
+        # writes and removals since
+        self.current_bytes = 0
+        self.entries = 0
+        self._writes_since_scan = 0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.invalid = 0
+
+    def _content_digest(self, filepath, file_key: Tuple) -> str:
+        with self._lock:
+            digest = self._digests.get(file_key)
+            if digest is not None:
+                self._digests.move_to_end(file_key)
+        if digest is None:
+            hasher = hashlib.blake2b(digest_size=16)
+            with open(filepath, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    hasher.update(chunk)
+            digest = hasher.hexdigest()
+            with self._lock:
+                self._digests[file_key] = digest
+                while len(self._digests) > _MAX_DIGESTS:
+                    self._digests.popitem(last=False)
+        return digest
+
+    def _entry_path(self, digest: str, options: Tuple) -> str:
+        options_digest = hashlib.blake2b(repr((_DISK_CACHE_VERSION,) + tuple(options)).encode(),
+                                         digest_size=8).hexdigest()
+        return os.path.join(self.directory, f"{digest}-{options_digest}.npy")
+
+    def load(self, filepath, file_key: Tuple, options: Tuple, decode: Callable,
+             expected: Optional[Callable] = None):
+        """
+        Return the stored frame as a read-only memmap, or decode and store it.
+
+        expected, if given, returns the (shape, dtype) the decode produces;
+        a stored frame that does not match is discarded and decoded again.
+        """
+        import numpy as np
+
+        entry = self._entry_path(self._content_digest(filepath, file_key), options)
+        try:
+            array = np.load(entry, mmap_mode="r", allow_pickle=False)
+        except FileNotFoundError:
+            array = None
+        except (OSError, ValueError):
+            # Truncated or otherwise unreadable entry: replace it
+            array = None
+            self._discard(entry)
+        if array is not None and expected is not None and not _matches(array, expected()):
+            array = None
+            self._discard(entry)
+        if array is not None:
+            # The modification time orders entries for pruning
+            try:
+                os.utime(entry)
+            except OSError:
+                pass
+            with self._lock:
+                self.hits += 1
+            return array
+
+        with self._lock:
+            self.misses += 1
+        array = decode()
+        self._store(entry, array)
+        return array
+
+    def _store(self, entry: str, array) -> None:
+        import numpy as np
+
+        if array.nbytes > self.max_bytes:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, array, allow_pickle=False)
+            size = os.path.getsize(temp_path)
+            try:
+                # Another process may have stored the entry meanwhile
+                replaced = os.path.getsize(entry)
+            except OSError:
+                replaced = None
+            # Atomic: readers see the old entry, no entry or the complete new one
+            os.replace(temp_path, entry)
+        except OSError:
+            _remove(temp_path)
+            return
+        with self._lock:
+            self.writes += 1
+            if replaced is None:
+                self.current_bytes += size
+                self.entries += 1
+            else:
+                self.current_bytes += size - replaced
+            self._writes_since_scan += 1
+            rescan = self.current_bytes > self.max_bytes or self._writes_since_scan >= _RESCAN_WRITES
+        if rescan:
+            self.prune(self.max_bytes)
+
+    def _discard(self, entry: str) -> None:
+        """Remove an unreadable or mismatched entry."""
+        try:
+            size = os.path.getsize(entry)
+        except OSError:
+            size = None
+        removed = _remove(entry)
+        with self._lock:
+            self.invalid += 1
+            if removed and size is not None:
+                self.current_bytes = max(0, self.current_bytes - size)
+                self.entries = max(0, self.entries - 1)
+
+    def _scan(self):
+        """(mtime, size, path) of every entry, oldest first."""
+        entries = []
+        now = time.time()
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return entries
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if name.endswith(".npy"):
+                entries.append((st.st_mtime, st.st_size, path))
+            elif name.endswith(".tmp") and now - st.st_mtime > _STALE_TEMP_SECONDS:
+                _remove(path)
+        entries.sort()
+        return entries
+
+    def prune(self, limit: int) -> None:
+        """
+        Scan the directory and remove least recently used entries until at
+        most limit bytes remain, resetting the running total.
+        """
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        evictions = 0
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            # Another process may have removed it already, or (on Windows)
+            # still have it mapped; either way it no longer counts here
+            if _remove(path):
+                evictions += 1
+            total -= size
+            count -= 1
+        with self._lock:
+            self.evictions += evictions
+            self.current_bytes = total
+            self.entries = count
+            self._writes_since_scan = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": True,
+                "directory": self.directory,
+                "max_bytes": self.max_bytes,
+                "current_bytes": self.current_bytes,
+                "entries": self.entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "invalid": self.invalid,
+            }
+
+
+def _matches(array, expected: Tuple) -> bool:
+    """Whether array has the (shape, dtype) in expected; a shape of None matches any."""
+    import numpy as np
+
+    shape, dtype = expected
+    return array.dtype == np.dtype(dtype) and (shape is None or array.shape == tuple(shape))
+
+
+def _remove(path: str) -> bool:
+    """Remove a file, returning whether it was removed."""
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+
+_cache: Optional[_DecodeCache] = None
+_disk_cache: Optional[_DiskCache] = None
+
+
+def _file_key(filepath) -> Optional[Tuple]:
+    """Identity of the file at filepath, or None if it cannot be stat'ed."""
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    return (os.path.realpath(filepath), st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def cached_decode(filepath, options: Tuple, decode: Callable, expected: Optional[Callable] = None):
+    """
+    Return decode() for the file at filepath, through the enabled caches.
+
+    Args:
+        filepath: Path of the decoded file
+        options: Hashable decode options that, with the file, determine the result
+        decode: Function performing the decode on a cache miss
+        expected: Optional function returning the (shape, dtype) of the
+            result, used to check frames loaded from the disk cache (shape
+            None checks the dtype only)
+    """
+    cache = _cache
+    disk_cache = _disk_cache
+    if cache is None and disk_cache is None:
+        return decode()
+    file_key = _file_key(filepath)
+    if file_key is None:
+        return decode()
+
+    if disk_cache is not None:
+        decode_file = decode
+        decode = lambda: disk_cache.load(filepath, file_key, options, decode_file, expected)
+    if cache is None:
+        return decode()
+
+    key = file_key + tuple(options)
+    array = cache.get(key)
+    if array is None:
+        array = decode()
+        cache.put(key, array)
+    return array
+
+
+def enable_decode_cache(max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> None:
+    """
+    Enable the process-wide decode cache, or change its size limit.
+
+    Changing the limit of an enabled cache keeps its entries and statistics,
+    evicting least recently used entries if they exceed the new limit.
+
+    Args:
+        max_bytes: Maximum total size of the cached arrays (default: 512 MiB).
+            Larger arrays are decoded but not cached.
+
+    Raises:
+        ValueError: If max_bytes is negative
+    """
+    global _cache
+    if not isinstance(max_bytes, int) or isinstance(max_bytes, bool) or max_bytes < 0:
+        raise ValueError(f"max_bytes must be a non-negative integer, got {max_bytes!r}")
+
+    if _cache is None:
+        _cache = _DecodeCache(max_bytes)
+    else:
+        with _cache._lock:
+            _cache.max_bytes = max_bytes
+            _cache._evict(max_bytes)
+
+
+def disable_decode_cache() -> None:
+    """Disable the decode cache and release the arrays it holds."""
+    global _cache
+    if _cache is not None:
+        _cache.clear()
+    _cache = None
+
+
+def clear_decode_cache() -> None:
+    """Release all cached arrays, keeping the cache enabled and its statistics."""
+    if _cache is not None:
+        _cache.clear()
+
+
+def get_decode_cache_stats() -> dict:
+    """
+    Get counters of the decode cache.
+
+    Returns:
+        Dictionary with:
+        - enabled: Whether the cache is enabled
+        - max_bytes: Size limit
+        - current_bytes / entries: Arrays currently held
+        - hits / misses: Cached decode requests served from / not found in the cache
+        - evictions: Entries dropped to respect max_bytes
+    """
+    cache = _cache
+    if cache is None:
+        return {"enabled": False, "max_bytes": 0, "current_bytes": 0, "entries": 0,
+                "hits": 0, "misses": 0, "evictions": 0}
+    return cache.stats()
+
+
+def enable_disk_cache(directory: Union[str, "os.PathLike[str]"],
+                      max_bytes: int = DEFAULT_DISK_CACHE_MAX_BYTES) -> None:
+    """
+    Enable the persistent disk cache in directory, or change its size limit.
+
+    The directory is created if needed and may be shared by several
+    processes. Enabling a different directory starts new statistics.
+
+    Args:
+        directory: Directory holding the cached .npy frames
+        max_bytes: Maximum total size of the cached frames (default: 10 GiB).
+            Least recently used frames are removed to stay below it.
+
+    Raises:
+        ValueError: If max_bytes is negative
+        OSError: If the directory cannot be created
+    """
+    global _disk_cache
+    if not isinstance(max_bytes, int) or isinstance(max_bytes, bool) or max_bytes < 0:
+        raise ValueError(f"max_bytes must be a non-negative integer, got {max_bytes!r}")
+
+    directory = os.path.abspath(os.fspath(directory))
+    os.makedirs(directory, exist_ok=True)
+    if _disk_cache is None or _disk_cache.directory != directory:
+        _disk_cache = _DiskCache(directory, max_bytes)
+    else:
+        _disk_cache.max_bytes = max_bytes
+    _disk_cache.prune(max_bytes)
+
+
+def disable_disk_cache() -> None:
+    """Stop using the disk cache. Stored frames are kept on disk."""
+    global _disk_cache
+    _disk_cache = None
+
+
+def clear_disk_cache() -> None:
+    """Remove all frames stored in the enabled disk cache directory."""
+    if _disk_cache is not None:
+        _disk_cache.prune(0)
+
+
+def get_disk_cache_stats() -> dict:
+    """
+    Get counters of the disk cache.
+
+    Returns:
+        Dictionary with:
+        - enabled: Whether the disk cache is enabled
+        - directory / max_bytes: Cache directory and its size limit
+        - current_bytes / entries: Frames stored as of the last scan of the
+          directory, plus the writes and removals of this process since
+        - hits / misses: Lookups in this process served from / not found in the directory
+        - writes: Frames stored by this process
+        - evictions: Frames removed by this process to respect max_bytes
+        - invalid: Unreadable or mismatched frames discarded and decoded again
+    """
+    disk_cache = _disk_cache
+    if disk_cache is None:
+        return {"enabled": False, "directory": None, "max_bytes": 0, "current_bytes": 0,
+                "entries": 0, "hits": 0, "misses": 0, "writes": 0, "evictions": 0, "invalid": 0}
+    return disk_cache.stats()
+
+
+__all__ = [
+    "enable_decode_cache",
+    "disable_decode_cache",
+    "clear_decode_cache",
+    "get_decode_cache_stats",
+    "enable_disk_cache",
+    "disable_disk_cache",
+    "clear_disk_cache",
+    "get_disk_cache_stats",
+]
@@ -0,0 +1,303 @@
+"""
+Command-line interface for Python-GPR.
+
+Installed as the ``python-gpr`` console script and runnable as
+``python -m python_gpr``. Every subcommand processes many files in one
+process with a pool of worker threads (the native calls release the GIL)
+and prints throughput and latency statistics at the end:
+
+    python-gpr convert -j 8 -o dng/ "footage/**/*.GPR"
+    python-gpr info --json clip_0001.GPR
+    python-gpr thumb -r eighth -f png -o thumbs/ *.GPR
+    find /archive -name '*.GPR' | python-gpr verify -j 16
+
+Inputs are paths or glob patterns (``**`` matches subdirectories); with no
+inputs, or ``-``, paths are read from standard input, one per line. The
+exit status is 0 if every file succeeded, 1 if any failed and 2 for usage
+errors.
+"""
+
+import argparse
+import collections
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from .batch import batch_convert
+from .conversion import GPRParameters
+from .core import RESOLUTIONS, decode_preview, get_info, load_gpr_as_numpy
+
+# Files submitted ahead of the output, per worker
+_QUEUE_DEPTH = 4
+
+_THUMBNAIL_FORMATS = ("ppm", "png", "jpg")
+
+
+class _Stats:
+    """Counts, input bytes and per-file latencies of a run."""
+
+    def __init__(self):
+        self.succeeded = 0
+        self.failed = 0
+        self.bytes_in = 0
+        self.latencies: List[float] = []
+        self._start = time.perf_counter()
+
+    def record(self, ok: bool, nbytes: int, seconds: float) -> None:
+        if ok:
+            self.succeeded += 1
+            self.bytes_in += nbytes
+            self.latencies.append(seconds)
+        else:
+            self.failed += 1
+
+    def summary(self, command: str) -> str:
+        elapsed = time.perf_counter() - self._start
+        files = self.succeeded + self.failed
+        rate = self.succeeded / elapsed if elapsed > 0 else 0.0
+        mb_rate = self.bytes_in / elapsed / 1e6 if elapsed > 0 else 0.0
+        lines = [f"{command}: {files} file(s), {self.succeeded} ok, {self.failed} failed "
+                 f"in {elapsed:.2f} s ({rate:.1f} files/s, {mb_rate:.1f} MB/s)"]
+        if self.latencies:
+            latencies = sorted(self.latencies)
+
+            def percentile(p):
+                return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000
+
+            lines.append(f"latency ms: p50 {percentile(50):.1f}, p95 {percentile(95):.1f}, "
+                         f"max {latencies[-1] * 1000:.1f}")
+        return "\n".join(lines)
+
+
+def _expand_inputs(patterns: List[str], stdin=None) -> Iterator[str]:
+    """Yield the paths matching patterns, or listed on stdin for '-' or no patterns."""
+    for pattern in patterns or ["-"]:
+        if pattern == "-":
+            for line in stdin if stdin is not None else sys.stdin:
+                path = line.strip()
+                if path:
+                    yield path
+        elif glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True))
+            if not matches:
+                print(f"python-gpr: no files match {pattern}", file=sys.stderr)
+            yield from matches
+        else:
+            yield pattern
+
+
+def _output_path(input_path: str, output_dir: Optional[str], suffix: str) -> str:
+    stem = os.path.splitext(input_path)[0]
+    if output_dir is not None:
+        stem = os.path.join(output_dir, os.path.basename(stem))
+    return stem + suffix
+
+
+def _run_pool(task: Callable, paths: Iterable, jobs: int) -> Iterator[Tuple[object, object, Optional[Exception], float]]:
+    """Run task(path) on jobs threads; yield (path, result, error, seconds) in input order."""
+    def timed(path):
+        start = time.perf_counter()
+        try:
+            return task(path), None, time.perf_counter() - start
+        except Exception as e:
+            return None, e, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="python-gpr-cli") as executor:
+        in_flight = collections.deque()
+        paths = iter(paths)
+        while True:
+            for path in paths:
+                in_flight.append((path, executor.submit(timed, path)))
+                if len(in_flight) >= jobs * _QUEUE_DEPTH:
+                    break
+            if not in_flight:
+                return
+            path, future = in_flight.popleft()
+            yield (path,) + future.result()
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _report_error(path: str, error: BaseException) -> None:
+    print(f"python-gpr: {path}: {error}", file=sys.stderr)
+
+
+def _unique_outputs(paths: Iterable[str], output_dir: Optional[str], suffix: str,
+                    stats: _Stats) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (input, output) pairs, failing inputs whose output an earlier input already has.
+
+    With an output directory, inputs of the same name in different
+    directories would otherwise overwrite each other's output.
+    """
+    claimed = {}
+    for path in paths:
+        output_path = _output_path(path, output_dir, suffix)
+        key = os.path.normcase(os.path.abspath(output_path))
+        if key in claimed:
+            stats.record(False, 0, 0.0)
+            _report_error(path, ValueError(f"{path} and {claimed[key]} convert to the same output {output_path}"))
+            continue
+        claimed[key] = path
+        yield path, output_path
+
+
+def _cmd_convert(args, paths: Iterable[str], stats: _Stats) -> None:
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+    parameters = GPRParameters(fast_encoding=True) if args.fast else None
+    pairs = _unique_outputs(paths, args.output_dir, "." + args.format, stats)
+    with batch_convert(pairs, workers=args.jobs, backend=args.backend,
+                       target_format=args.format, parameters=parameters) as conversion:
+        for result in conversion:
+            stats.record(result.ok, result.bytes_in, result.seconds)
+            if not result.ok:
+                _report_error(result.input_path, result.error)
+            elif not args.quiet:
+                print(f"{result.input_path} -> {result.output_path}")
+
+
+def _cmd_info(args, paths: Iterable[str], stats: _Stats) -> None:
+    for path, info, error, seconds in _run_pool(get_info, paths, args.jobs):
+        stats.record(error is None, _file_size(path), seconds)
+        if error is not None:
+            _report_error(path, error)
+        elif args.json:
+            print(json.dumps(dict(info, path=path), default=str))
+        else:
+            print(f"{path}: {info['width']}x{info['height']} {info.get('format', '')} "
+                  f"cfa={info.get('cfa_pattern', '')} bits={info.get('bit_depth', '')}")
+
+
+def _write_ppm(path: str, rgb) -> None:
+    height, width, _ = rgb.shape
+    with open(path, "wb") as f:
+        f.write(f"P6\n{width} {height}\n255\n".encode("ascii"))
+        f.write(rgb.tobytes())
+
+
+def _cmd_thumb(args, paths: Iterable[str], stats: _Stats) -> None:
+    if args.format == "ppm":
+        write = _write_ppm
+    else:
+        try:
+            from PIL import Image
+        except ImportError:
+            raise SystemExit("python-gpr: Pillow is required for PNG and JPEG thumbnails: "
+                             "pip install python-gpr[imaging]")
+
+        def write(path, rgb):
+            Image.fromarray(rgb).save(path)
+
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    def thumbnail(pair):
+        path, output_path = pair
+        write(output_path, decode_preview(path, args.resolution, "uint8"))
+
+    pairs = _unique_outputs(paths, args.output_dir, ".thumb." + args.format, stats)
+    for (path, output_path), _, error, seconds in _run_pool(thumbnail, pairs, args.jobs):
+        stats.record(error is None, _file_size(path), seconds)
+        if error is not None:
+            _report_error(path, error)
+        elif not args.quiet:
+            print(f"{path} -> {output_path}")
+
+
+def _verify(path: str) -> str:
+    """Decode the whole frame and check it against the header."""
+    info = get_info(path)
+    frame = load_gpr_as_numpy(path, "uint16", None, None)
+    if frame.shape != (info["height"], info["width"]):
+        raise ValueError(f"decoded {frame.shape[1]}x{frame.shape[0]} frame, header says "
+                         f"{info['width']}x{info['height']}")
+    return f"{info['width']}x{info['height']}"
+
+
+def _cmd_verify(args, paths: Iterable[str], stats: _Stats) -> None:
+    for path, size, error, seconds in _run_pool(_verify, paths, args.jobs):
+        stats.record(error is None, _file_size(path), seconds)
+        if error is not None:
+            _report_error(path, error)
+        elif not args.quiet:
+            print(f"{path}: OK ({size})")
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python-gpr",
+                                     description="Convert and inspect GPR and DNG files.")
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+    subparsers.required = True
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("inputs", nargs="*", metavar="INPUT",
+                        help="Files or glob patterns; '-' or none reads paths from stdin")
+    common.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker threads (default: number of CPUs)")
+    common.add_argument("-q", "--quiet", action="store_true", help="Only print errors and statistics")
+    common.add_argument("--no-stats", action="store_true", help="Do not print statistics")
+
+    convert = subparsers.add_parser("convert", parents=[common], help="Convert files")
+    convert.add_argument("-t", "--format", choices=["dng", "gpr", "raw"], default="dng",
+                         help="Target format (default: dng)")
+    convert.add_argument("-o", "--output-dir", help="Output directory (default: next to each input)")
+    convert.add_argument("--fast", action="store_true", help="Use fast GPR encoding")
+    convert.add_argument("--backend", choices=["thread", "pipeline"], default="thread",
+                         help="Batch engine; 'pipeline' overlaps I/O with conversion (default: thread)")
+    convert.set_defaults(handler=_cmd_convert)
+
+    info = subparsers.add_parser("info", parents=[common], help="Print image information")
+    info.add_argument("--json", action="store_true", help="One JSON object per line")
+    info.set_defaults(handler=_cmd_info)
+
+    thumb = subparsers.add_parser("thumb", parents=[common], help="Write RGB thumbnails")
+    thumb.add_argument("-r", "--resolution", choices=[r for r in RESOLUTIONS if r != "full"],
+                       default="eighth", help="Thumbnail resolution (default: eighth)")
+    thumb.add_argument("-f", "--format", choices=_THUMBNAIL_FORMATS, default="ppm",
+                       help="Image format; png and jpg need Pillow (default: ppm)")
+    thumb.add_argument("-o", "--output-dir", help="Output directory (default: next to each input)")
+    thumb.set_defaults(handler=_cmd_thumb)
+
+    verify = subparsers.add_parser("verify", parents=[common], help="Check that files decode completely")
+    verify.set_defaults(handler=_cmd_verify)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the python-gpr command line.
+
+    Args:
+        argv: Arguments without the program name (default: sys.argv[1:])
+
+    Returns:
+        Exit status: 0 if every file succeeded, 1 otherwise
+    """
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if args.jobs <= 0:
+        parser.error("--jobs must be a positive integer")
+
+    stats = _Stats()
+    try:
+        args.handler(args, _expand_inputs(args.inputs), stats)
+    except KeyboardInterrupt:
+        print("python-gpr: interrupted", file=sys.stderr)
+        stats.failed += 1
+    if not args.no_stats:
+        print(stats.summary(args.command), file=sys.stderr)
+    return 0 if stats.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
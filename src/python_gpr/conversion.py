@@ -5,8 +5,9 @@ This module provides functions for converting between different image formats
 supported by the GPR library, including GPR, DNG, RAW, PPM, and JPG.
 """
 
-from typing import Optional, Dict, Any, Union, Iterator
+from typing import Optional, Dict, Any, Union, Iterable, Iterator, List
 import os
+import struct
 
 
 class GPRParameters:
@@ -20,13 +21,18 @@ class GPRParameters:
     Supported parameters:
     - input_width (int): Width of input source in pixels
     - input_height (int): Height of input source in pixels  
-    - input_pitch (int): Pitch of input source in pixels
+    - input_pitch (int): Pitch of input source in bytes
     - fast_encoding (bool): Enable fast encoding mode
     - compute_md5sum (bool): Compute MD5 checksum during processing
     - enable_preview (bool): Enable preview image generation
     - quality (int): Legacy quality parameter (1-12, default: 12)
     - subband_count (int): Legacy subband count parameter (default: 4)
     - progressive (bool): Legacy progressive encoding parameter (default: False)
+    
+    The core parameters are passed to the native converters (see
+    to_core()); the legacy parameters have no equivalent in the GPR SDK
+    and are kept for compatibility only. A value of 0 for the input
+    geometry keeps the SDK default.
     """
     
     # Define valid parameters with their types and default values
@@ -44,6 +50,10 @@ class GPRParameters:
         'progressive': (bool, False),
     }
     
+    # Parameters copied into the native gpr_parameters structure
+    _CORE_PARAMS = ('input_width', 'input_height', 'input_pitch',
+                    'fast_encoding', 'compute_md5sum', 'enable_preview')
+    
     def __init__(self, **kwargs):
         """
         Initialize GPR parameters.
@@ -57,6 +67,7 @@ class GPRParameters:
         """
         # Initialize all parameters with defaults
         self._params = {}
+        self._core = None
         for param_name, (param_type, default_value) in self._VALID_PARAMS.items():
             self._params[param_name] = default_value
         
@@ -90,6 +101,7 @@ class GPRParameters:
             raise ValueError(f"Parameter '{key}' must be non-negative, got {value}")
         
         self._params[key] = value
+        self._core = None
     
     def __contains__(self, key: str) -> bool:
         """Check if parameter exists using 'in' operator."""
@@ -103,6 +115,10 @@ class GPRParameters:
         """Get number of parameters."""
         return len(self._VALID_PARAMS)
     
+    def __getstate__(self) -> dict:
+        """Pickle the parameter values only; the native copy is rebuilt on demand."""
+        return {'_params': dict(self._params), '_core': None}
+    
     def __repr__(self) -> str:
         """String representation of parameters."""
         params_str = ", ".join(f"{k}={v}" for k, v in self._params.items())
@@ -133,6 +149,7 @@ class GPRParameters:
         if isinstance(other, GPRParameters):
             for key in self._VALID_PARAMS:
                 self._params[key] = other._params[key]
+            self._core = None
         elif isinstance(other, dict):
             for key, value in other.items():
                 self[key] = value  # Use __setitem__ for validation
@@ -147,6 +164,38 @@ class GPRParameters:
         """Convert parameters to dictionary representation."""
         return self._params.copy()
     
+    def to_core(self) -> Any:
+        """
+        Get these parameters as a native ``_core.GPRParametersCore``.
+        
+        The native object starts from the SDK defaults and receives the
+        core parameters; a geometry value of 0 keeps the SDK default. It is
+        built once and reused until a parameter changes, so passing the same
+        GPRParameters to many conversions marshals it only once. Treat the
+        returned object as read-only.
+        
+        Returns:
+            The cached GPRParametersCore instance
+        
+        Raises:
+            NotImplementedError: If GPR bindings are not available
+        """
+        if self._core is None:
+            try:
+                from ._core import GPRParametersCore
+            except ImportError:
+                raise NotImplementedError("GPR C++ bindings not available - please build the extension module")
+            
+            core = GPRParametersCore()
+            for key in ('input_width', 'input_height', 'input_pitch'):
+                if self._params[key]:
+                    setattr(core, key, self._params[key])
+            core.fast_encoding = self._params['fast_encoding']
+            core.compute_md5sum = self._params['compute_md5sum']
+            core.enable_preview = self._params['enable_preview']
+            self._core = core
+        return self._core
+    
     @classmethod
     def get_parameter_info(cls, param_name: str) -> Dict[str, Any]:
         """
@@ -210,6 +259,17 @@ class GPRParameters:
         self['progressive'] = value
 
 
+def _check_parameters(parameters: Optional[GPRParameters]) -> None:
+    """Raise TypeError unless parameters is None or a GPRParameters."""
+    if parameters is not None and not isinstance(parameters, GPRParameters):
+        raise TypeError(f"parameters must be a GPRParameters object or None, got {type(parameters).__name__}")
+
+
+def _core_parameters(parameters: Optional[GPRParameters]) -> Any:
+    """Native parameters for a conversion call, or None for the SDK defaults."""
+    return parameters.to_core() if parameters is not None else None
+
+
 def convert_gpr_to_dng(input_path: str, output_path: str, 
                        parameters: Optional[GPRParameters] = None) -> None:
     """
@@ -218,12 +278,14 @@ def convert_gpr_to_dng(input_path: str, output_path: str,
     Args:
         input_path: Path to input GPR file
         output_path: Path for output DNG file  
-        parameters: Optional conversion parameters (currently unused)
+        parameters: Optional conversion parameters (SDK defaults if None)
         
     Raises:
         FileNotFoundError: If input file does not exist
+        TypeError: If parameters is not a GPRParameters object
         ValueError: If conversion fails
     """
+    _check_parameters(parameters)
     if not os.path.exists(input_path):
         raise FileNotFoundError(f"Input file not found: {input_path}")
     
@@ -231,7 +293,45 @@ def convert_gpr_to_dng(input_path: str, output_path: str,
         from ._core import convert_gpr_to_dng as _convert_gpr_to_dng
         from ._core import GPRConversionError
         
-        _convert_gpr_to_dng(input_path, output_path)
+        _convert_gpr_to_dng(input_path, output_path, _core_parameters(parameters))
+    except ImportError:
+        raise NotImplementedError("GPR C++ bindings not available - please build the extension module")
+    except Exception as e:
+        # Handle any C++ exceptions that get through
+        if "GPRConversionError" in str(type(e)):
+            raise ValueError(str(e)) from e
+        else:
+            raise ValueError(f"Conversion failed: {str(e)}") from e
+
+
+def convert_gpr_to_gpr(input_path: str, output_path: str,
+                       parameters: Optional[GPRParameters] = None) -> None:
+    """
+    Re-encode a GPR file with new parameters.
+    
+    The image is decoded to raw pixels in memory and encoded again; the
+    metadata of the input is kept and no intermediate DNG is written. The
+    input geometry parameters are ignored, the image size is taken from
+    the input.
+    
+    Args:
+        input_path: Path to input GPR file
+        output_path: Path for output GPR file
+        parameters: Optional encoding parameters (SDK defaults if None)
+        
+    Raises:
+        FileNotFoundError: If input file does not exist
+        TypeError: If parameters is not a GPRParameters object
+        ValueError: If conversion fails
+    """
+    _check_parameters(parameters)
+    if not os.path.exists(input_path):
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+    
+    try:
+        from ._core import convert_gpr_to_gpr as _convert_gpr_to_gpr
+        
+        _convert_gpr_to_gpr(input_path, output_path, _core_parameters(parameters))
     except ImportError:
         raise NotImplementedError("GPR C++ bindings not available - please build the extension module")
     except Exception as e:
@@ -250,12 +350,14 @@ def convert_dng_to_gpr(input_path: str, output_path: str,
     Args:
         input_path: Path to input DNG file
         output_path: Path for output GPR file
-        parameters: Optional conversion parameters (currently unused)
+        parameters: Optional conversion parameters (SDK defaults if None)
         
     Raises:
         FileNotFoundError: If input file does not exist
+        TypeError: If parameters is not a GPRParameters object
         ValueError: If conversion fails
     """
+    _check_parameters(parameters)
     if not os.path.exists(input_path):
         raise FileNotFoundError(f"Input file not found: {input_path}")
     
@@ -263,7 +365,7 @@ def convert_dng_to_gpr(input_path: str, output_path: str,
         from ._core import convert_dng_to_gpr as _convert_dng_to_gpr
         from ._core import GPRConversionError
         
-        _convert_dng_to_gpr(input_path, output_path)
+        _convert_dng_to_gpr(input_path, output_path, _core_parameters(parameters))
     except ImportError:
         raise NotImplementedError("GPR C++ bindings not available - please build the extension module")
     except Exception as e:
@@ -282,12 +384,15 @@ def convert_gpr_to_raw(input_path: str, output_path: str,
     Args:
         input_path: Path to input GPR file (or DNG file)
         output_path: Path for output RAW file
-        parameters: Optional conversion parameters (currently unused)
+        parameters: Optional conversion parameters (accepted for API symmetry;
+                    GPR decoding has no tunable parameters)
         
     Raises:
         FileNotFoundError: If input file does not exist
+        TypeError: If parameters is not a GPRParameters object
         ValueError: If conversion fails
     """
+    _check_parameters(parameters)
     if not os.path.exists(input_path):
         raise FileNotFoundError(f"Input file not found: {input_path}")
     
@@ -314,12 +419,14 @@ def convert_dng_to_dng(input_path: str, output_path: str,
     Args:
         input_path: Path to input DNG file
         output_path: Path for output DNG file
-        parameters: Optional conversion parameters (currently unused)
+        parameters: Optional conversion parameters (SDK defaults if None)
         
     Raises:
         FileNotFoundError: If input file does not exist
+        TypeError: If parameters is not a GPRParameters object
         ValueError: If conversion fails
     """
+    _check_parameters(parameters)
     if not os.path.exists(input_path):
         raise FileNotFoundError(f"Input file not found: {input_path}")
     
@@ -327,7 +434,7 @@ def convert_dng_to_dng(input_path: str, output_path: str,
         from ._core import convert_dng_to_dng as _convert_dng_to_dng
         from ._core import GPRConversionError
         
-        _convert_dng_to_dng(input_path, output_path)
+        _convert_dng_to_dng(input_path, output_path, _core_parameters(parameters))
     except ImportError:
         raise NotImplementedError("GPR C++ bindings not available - please build the extension module")
     except Exception as e:
@@ -338,10 +445,262 @@ def convert_dng_to_dng(input_path: str, output_path: str,
             raise ValueError(f"Conversion failed: {str(e)}") from e
 
 
+def _convert_bytes(function_name: str, data: Any,
+                   parameters: Optional[GPRParameters] = None) -> bytes:
+    """
+    Run one of the in-memory ``_core`` conversions on a bytes-like object.
+    
+    Args:
+        function_name: Name of the ``_core`` conversion function to call
+        data: Any object supporting the buffer protocol
+        parameters: Conversion parameters passed to the native function, or
+            None to call it with the SDK defaults
+    
+    Returns:
+        The converted file contents
+    """
+    try:
+        memoryview(data)
+    except TypeError:
+        raise TypeError(
+            f"Expected a bytes-like object (bytes, bytearray, memoryview, mmap), "
+            f"got {type(data).__name__}"
+        ) from None
+    _check_parameters(parameters)
+    
+    try:
+        from . import _core
+        convert = getattr(_core, function_name)
+    except ImportError:
+        raise NotImplementedError("GPR C++ bindings not available - please build the extension module")
+    args = (data,) if parameters is None else (data, parameters.to_core())
+    
+    try:
+        return convert(*args)
+    except Exception as e:
+        # Handle any C++ exceptions that get through
+        if "GPRConversionError" in str(type(e)):
+            raise ValueError(str(e)) from e
+        else:
+            raise ValueError(f"Conversion failed: {str(e)}") from e
+
+
+def convert_gpr_to_dng_bytes(data: Any, parameters: Optional[GPRParameters] = None) -> bytes:
+    """
+    Convert GPR data held in memory to DNG format.
+    
+    Args:
+        data: GPR file contents as any buffer-protocol object
+              (bytes, bytearray, memoryview, mmap)
+        parameters: Optional conversion parameters (SDK defaults if None)
+    
+    Returns:
+        DNG file contents
+    
+    Raises:
+        TypeError: If data does not support the buffer protocol or
+            parameters is not a GPRParameters object
+        ValueError: If conversion fails
+    """
+    return _convert_bytes("convert_gpr_to_dng_bytes", data, parameters)
+
+
+def convert_gpr_to_gpr_bytes(data: Any, parameters: Optional[GPRParameters] = None) -> bytes:
+    """
+    Re-encode GPR data held in memory with new parameters.
+    
+    Args:
+        data: GPR file contents as any buffer-protocol object
+        parameters: Optional encoding parameters (SDK defaults if None);
+            the image size is always taken from the input
+    
+    Returns:
+        GPR file contents
+    
+    Raises:
+        TypeError: If data does not support the buffer protocol or
+            parameters is not a GPRParameters object
+        ValueError: If conversion fails
+    """
+    return _convert_bytes("convert_gpr_to_gpr_bytes", data, parameters)
+
+
+def convert_dng_to_gpr_bytes(data: Any, parameters: Optional[GPRParameters] = None) -> bytes:
+    """
+    Convert DNG data held in memory to GPR format.
+    
+    Args:
+        data: DNG file contents as any buffer-protocol object
+        parameters: Optional conversion parameters (SDK defaults if None)
+    
+    Returns:
+        GPR file contents
+    
+    Raises:
+        TypeError: If data does not support the buffer protocol or
+            parameters is not a GPRParameters object
+        ValueError: If conversion fails
+    """
+    return _convert_bytes("convert_dng_to_gpr_bytes", data, parameters)
+
+
+def convert_gpr_to_raw_bytes(data: Any, parameters: Optional[GPRParameters] = None) -> bytes:
+    """
+    Convert GPR data held in memory to RAW format.
+    
+    Args:
+        data: GPR file contents as any buffer-protocol object
+        parameters: Optional conversion parameters (accepted for API symmetry;
+                    GPR decoding has no tunable parameters)
+    
+    Returns:
+        RAW pixel data
+    
+    Raises:
+        TypeError: If data does not support the buffer protocol or
+            parameters is not a GPRParameters object
+        ValueError: If conversion fails
+    """
+    _check_parameters(parameters)
+    return _convert_bytes("convert_gpr_to_raw_bytes", data)
+
+
+def convert_dng_to_dng_bytes(data: Any, parameters: Optional[GPRParameters] = None) -> bytes:
+    """
+    Convert DNG data held in memory to DNG format (reprocess).
+    
+    Args:
+        data: DNG file contents as any buffer-protocol object
+        parameters: Optional conversion parameters (SDK defaults if None)
+    
+    Returns:
+        DNG file contents
+    
+    Raises:
+        TypeError: If data does not support the buffer protocol or
+            parameters is not a GPRParameters object
+        ValueError: If conversion fails
+    """
+    return _convert_bytes("convert_dng_to_dng_bytes", data, parameters)
+
+
+# Format of each known file extension, used when the contents are not conclusive
+_EXTENSION_FORMATS = {
+    '.gpr': 'gpr',
+    '.dng': 'dng',
+    '.raw': 'raw',
+    '.ppm': 'ppm',
+    '.jpg': 'jpg',
+    '.jpeg': 'jpg',
+}
+
+# Bytes read from the start of a file to detect its format. GPR and DNG
+# writers put IFD0 right after the 8-byte TIFF header, so its entries (and
+# usually those of the raw SubIFD) fit.
+_SNIFF_BYTES = 4096
+
+# TIFF tags and values that tell GPR from DNG
+_TIFF_TAG_COMPRESSION = 259
+_TIFF_TAG_SUB_IFDS = 330
+_DNG_TAG_DNG_VERSION = 50706
+_TIFF_COMPRESSION_VC5 = 9
+_TIFF_SHORT = 3
+_TIFF_MAX_IFDS = 32
+
+
+def _scan_tiff(header: bytes) -> tuple:
+    """
+    Walk the IFDs of a TIFF header held in memory.
+    
+    Returns:
+        (vc5, dng_version, complete): whether an image uses VC-5 compression,
+        whether a DNGVersion tag was found, and whether every IFD lay inside
+        header
+    """
+    order = '<' if header[:2] == b'II' else '>'
+    pending = [struct.unpack_from(order + 'I', header, 4)[0]]
+    visited = set()
+    vc5 = dng_version = False
+    complete = True
+    
+    while pending and len(visited) < _TIFF_MAX_IFDS:
+        offset = pending.pop()
+        if offset == 0 or offset in visited:
+            continue
+        visited.add(offset)
+        if offset + 2 > len(header):
+            complete = False
+            continue
+        count = struct.unpack_from(order + 'H', header, offset)[0]
+        end = offset + 2 + 12 * count
+        if end + 4 > len(header):
+            complete = False
+            continue
+        
+        for entry in range(offset + 2, end, 12):
+            tag, value_type, value_count = struct.unpack_from(order + 'HHI', header, entry)
+            if tag == _DNG_TAG_DNG_VERSION:
+                dng_version = True
+            elif tag == _TIFF_TAG_COMPRESSION:
+                code_format = 'H' if value_type == _TIFF_SHORT else 'I'
+                if struct.unpack_from(order + code_format, header, entry + 8)[0] == _TIFF_COMPRESSION_VC5:
+                    vc5 = True
+            elif tag == _TIFF_TAG_SUB_IFDS:
+                # One offset is stored in the entry, more are stored elsewhere
+                location = entry + 8 if value_count == 1 else struct.unpack_from(order + 'I', header, entry + 8)[0]
+                if location + 4 * value_count > len(header):
+                    complete = False
+                    continue
+                pending.extend(struct.unpack_from(f'{order}{value_count}I', header, location))
+        pending.append(struct.unpack_from(order + 'I', header, end)[0])
+    
+    return vc5, dng_version, complete
+
+
+def _sniff_format(header: bytes, extension_format: Optional[str]) -> Optional[str]:
+    """Format from the first bytes of a file, falling back to extension_format."""
+    if header.startswith(b'\xff\xd8\xff'):
+        return 'jpg'
+    if header[:2] in (b'P3', b'P6') and header[2:3].isspace():
+        return 'ppm'
+    if header[:4] not in (b'II*\x00', b'MM\x00*') or len(header) < 8:
+        # RAW files have no signature
+        return extension_format
+    
+    try:
+        vc5, dng_version, complete = _scan_tiff(header)
+    except struct.error:
+        return extension_format
+    if vc5:
+        return 'gpr'
+    if complete:
+        # A TIFF that is not a DNG is not supported, whatever its name
+        return 'dng' if dng_version else None
+    # The raw image lies beyond the sniffed bytes, so its compression is unknown
+    return extension_format if extension_format in ('gpr', 'dng') else 'dng'
+
+
+def _read_header(filepath: str) -> bytes:
+    with open(filepath, 'rb') as f:
+        return f.read(_SNIFF_BYTES)
+
+
+def _format_from_header(filepath: str, data: bytes) -> Optional[str]:
+    """Format of filepath from its contents, or from data holding at least its first _SNIFF_BYTES."""
+    extension_format = _EXTENSION_FORMATS.get(os.path.splitext(os.fspath(filepath))[1].lower())
+    return _sniff_format(data[:_SNIFF_BYTES], extension_format)
+
+
 def detect_format(filepath: str) -> str:
     """
     Detect the format of an image file.
     
+    The first few kilobytes of the file are read in one call and checked
+    for the TIFF header, the DNGVersion tag and VC-5 compression (GPR), and
+    for JPEG and PPM signatures, so misnamed files are detected correctly.
+    The file extension decides when the contents are not conclusive, e.g.
+    for RAW files.
+    
     Args:
         filepath: Path to the image file
         
@@ -355,30 +714,48 @@ def detect_format(filepath: str) -> str:
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"File not found: {filepath}")
     
-    # Simple format detection based on file extension
-    # Will be replaced with proper format detection using GPR library
-    ext = os.path.splitext(filepath)[1].lower()
-    
-    format_map = {
-        '.gpr': 'gpr',
-        '.dng': 'dng', 
-        '.raw': 'raw',
-        '.ppm': 'ppm',
-        '.jpg': 'jpg',
-        '.jpeg': 'jpg',
-    }
+    detected = _format_from_header(filepath, _read_header(filepath))
+    if detected is None:
+        raise ValueError(f"Unknown format for file: {filepath}")
+    return detected
+
+
+def detect_formats(paths: Iterable[str]) -> List[Optional[str]]:
+    """
+    Detect the formats of many files, as detect_format does.
     
-    if ext in format_map:
-        return format_map[ext]
+    Each file is opened once and read with a single small read.
     
-    raise ValueError(f"Unknown format for file: {filepath}")
+    Args:
+        paths: Paths of the image files
+    
+    Returns:
+        The format of each path in order, or None for files that do not
+        exist, cannot be read or have an unknown format
+    """
+    formats = []
+    for path in paths:
+        try:
+            header = _read_header(path)
+        except OSError:
+            formats.append(None)
+            continue
+        formats.append(_format_from_header(path, header))
+    return formats
 
 
 __all__ = [
     "GPRParameters",
     "convert_gpr_to_dng",
+    "convert_gpr_to_gpr",
     "convert_dng_to_gpr", 
     "convert_gpr_to_raw",
     "convert_dng_to_dng",
+    "convert_gpr_to_dng_bytes",
+    "convert_gpr_to_gpr_bytes",
+    "convert_dng_to_gpr_bytes",
+    "convert_gpr_to_raw_bytes",
+    "convert_dng_to_dng_bytes",
     "detect_format",
+    "detect_formats",
 ]
\ No newline at end of file
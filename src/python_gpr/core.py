@@ -5,9 +5,14 @@ This module will contain the main high-level API for working with GPR images,
 including image loading, manipulation, and basic operations.
 """
 
-from typing import Optional, Union, Tuple
+from typing import TYPE_CHECKING, BinaryIO, Iterator, Optional, Union, Tuple
 import os
 
+from .cache import cached_decode
+
+if TYPE_CHECKING:
+    from .conversion import GPRParameters
+
 try:
     import numpy as np
     HAS_NUMPY = True
@@ -20,6 +25,104 @@ except ImportError:
     np = DummyNumPy()
 
 
+# Output scales of the RGB decoder, from full size down to 1/16 of each side
+_RESOLUTION_SCALES = {"full": 1, "half": 2, "quarter": 4, "eighth": 8, "sixteenth": 16}
+RESOLUTIONS = tuple(_RESOLUTION_SCALES)
+
+# Sample bits of the RGB decoder for each supported dtype
+_RGB_BITS = {"uint8": 8, "uint16": 16}
+
+
+def _check_rgb_request(resolution: str, dtype: str) -> int:
+    """Validate a reduced-resolution request and return the RGB sample bits."""
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Unsupported resolution '{resolution}'. Supported: {', '.join(RESOLUTIONS)}")
+    if dtype not in _RGB_BITS:
+        raise ValueError(f"Unsupported dtype '{dtype}' for RGB output. Supported: {', '.join(_RGB_BITS)}")
+    return _RGB_BITS[dtype]
+
+
+# CFA layouts and sample bits the GPR encoder accepts
+_ENCODE_CFA_PATTERNS = ("RGGB", "GBRG")
+_ENCODE_BIT_DEPTHS = (12, 14)
+
+
+def _check_encode_request(array: np.ndarray, cfa: str, bit_depth: int,
+                          parameters: Optional["GPRParameters"]) -> None:
+    """Validate the arguments of encode_gpr and save_gpr."""
+    from .conversion import _check_parameters
+    
+    if not HAS_NUMPY:
+        raise ImportError("NumPy is required for this functionality. Please install numpy: pip install numpy")
+    if not isinstance(array, np.ndarray):
+        raise TypeError(f"array must be a NumPy array, got {type(array).__name__}")
+    if cfa not in _ENCODE_CFA_PATTERNS:
+        raise ValueError(f"Unsupported cfa '{cfa}'. Supported: {', '.join(_ENCODE_CFA_PATTERNS)}")
+    if bit_depth not in _ENCODE_BIT_DEPTHS:
+        raise ValueError(f"Unsupported bit_depth {bit_depth!r}. Supported: 12, 14")
+    _check_parameters(parameters)
+
+
+def _expected_array(width: int, height: int, dtype: str, layout: str) -> Tuple:
+    """(shape, dtype) a decode returns; the shape is None where the RGB decoder's rounding decides it."""
+    if layout == "rgb":
+        return None, dtype
+    if layout == "planes":
+        return (4, height // 2, width // 2), dtype
+    return (height, width), dtype
+
+
+# Array layouts returned by GPRImage.to_numpy
+LAYOUTS = ("mosaic", "planes", "rgb")
+
+# Names of the Bayer planes, in the order they are returned
+BAYER_PLANES = ("R", "G1", "G2", "B")
+
+
+def _bayer_plane_offsets(cfa_pattern: str) -> Tuple[Tuple[int, int], ...]:
+    """
+    (row, column) of R, G1, G2 and B within the 2x2 CFA tile.
+    
+    G1 is the green on the red row and G2 the green on the blue row. An
+    unknown (empty) pattern is treated as RGGB, the SDK default.
+    """
+    pattern = cfa_pattern or "RGGB"
+    if pattern not in ("RGGB", "GRBG", "GBRG", "BGGR"):
+        raise ValueError(f"Bayer planes need an RGGB, GRBG, GBRG or BGGR CFA pattern, got '{cfa_pattern}'")
+    red = pattern.index("R")
+    blue = pattern.index("B")
+    # The green of a row is the other pixel of that row
+    return tuple(divmod(offset, 2) for offset in (red, red ^ 1, blue ^ 1, blue))
+
+
+def _image_info_to_dict(info) -> dict:
+    """Convert a native ImageInfo structure into a plain dictionary."""
+    return {
+        'width': info.width,
+        'height': info.height,
+        'channels': info.channels,
+        'format': info.format,
+        'data_size': info.data_size,
+        'cfa_pattern': info.cfa_pattern,
+        'bit_depth': info.bit_depth,
+        'compression': info.compression,
+        'black_level': list(info.black_level),
+        'white_level': info.white_level,
+    }
+
+
+def _open_handle(filepath: str):
+    """Map a file with the native GPRImageHandle, or return None without bindings."""
+    try:
+        from ._core import GPRImageHandle
+    except ImportError:
+        return None
+    try:
+        return GPRImageHandle(os.fspath(filepath))
+    except Exception as e:
+        raise ValueError(f"Failed to open GPR file: {str(e)}") from e
+
+
 class GPRImage:
     """
     Represents a GPR image file.
@@ -27,6 +130,14 @@ class GPRImage:
     This class provides a high-level interface for working with GPR image files,
     including loading, format conversion, and metadata access.
     
+    With the C++ bindings available, the file is memory-mapped once when the
+    image is opened and its header is parsed once; all later operations use
+    that mapping instead of re-reading the file. close() unmaps it.
+    
+    Images can also be created from file contents held in memory
+    (from_bytes) or from a seekable binary file object (from_file); open_gpr
+    accepts all three. Their filepath is None.
+    
     Supports context manager protocol for automatic resource cleanup:
     
     with GPRImage("image.gpr") as img:
@@ -48,12 +159,85 @@ class GPRImage:
         if not os.path.exists(filepath):
             raise FileNotFoundError(f"GPR file not found: {filepath}")
         
+        self._init_state(filepath)
+        self._handle = _open_handle(filepath)
+    
+    def _init_state(self, filepath: Optional[str]) -> None:
+        """Set the attributes shared by all sources."""
         self.filepath = filepath
         self._width: Optional[int] = None
         self._height: Optional[int] = None
         self._info: Optional[dict] = None
         self._closed: bool = False
+        self._handle = None
+        # File contents held in memory (from_bytes, or a fully read file object)
+        self._buffer = None
+        # File object whose header is read lazily (from_file)
+        self._fileobj = None
+        self._file_start = 0
+    
+    @classmethod
+    def from_bytes(cls, data: Union[bytes, bytearray, memoryview]) -> "GPRImage":
+        """
+        Create an image from GPR file contents held in memory.
+        
+        The data is used in place, not copied, and must not be modified
+        while the image is open.
+        
+        Args:
+            data: Any buffer-protocol object (bytes, bytearray, memoryview, mmap)
+        
+        Returns:
+            GPRImage instance with filepath None
         
+        Raises:
+            TypeError: If data does not support the buffer protocol
+        """
+        try:
+            memoryview(data)
+        except TypeError:
+            raise TypeError(
+                f"Expected a bytes-like object (bytes, bytearray, memoryview, mmap), "
+                f"got {type(data).__name__}"
+            ) from None
+        
+        image = cls.__new__(cls)
+        image._init_state(None)
+        image._buffer = data
+        return image
+    
+    @classmethod
+    def from_file(cls, fileobj: BinaryIO) -> "GPRImage":
+        """
+        Create an image from a seekable binary file object.
+        
+        The image starts at the current position of fileobj. Header
+        information (width, height, get_image_info) is read with seek() and
+        read() without loading the rest of the file; the whole image is read
+        once, on the first decode or conversion. The file object is not
+        closed by close().
+        
+        Args:
+            fileobj: Seekable file object opened in binary mode
+        
+        Returns:
+            GPRImage instance with filepath None
+        
+        Raises:
+            TypeError: If fileobj is not a seekable file object
+        """
+        if not (hasattr(fileobj, "read") and hasattr(fileobj, "seek") and hasattr(fileobj, "tell")):
+            raise TypeError(f"Expected a seekable binary file object, got {type(fileobj).__name__}")
+        seekable = getattr(fileobj, "seekable", None)
+        if seekable is not None and not seekable():
+            raise TypeError("File object must be seekable")
+        
+        image = cls.__new__(cls)
+        image._init_state(None)
+        image._fileobj = fileobj
+        image._file_start = fileobj.tell()
+        return image
+    
     def __enter__(self):
         """Enter context manager."""
         return self
@@ -64,9 +248,45 @@ class GPRImage:
         return False
     
     def close(self) -> None:
-        """Close the image and free any associated resources."""
+        """
+        Close the image and unmap the file.
+        
+        Raises:
+            BufferError: If a memoryview of the file contents is still held
+                or a conversion of it is running in another thread
+        """
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        self._buffer = None
+        self._fileobj = None
         self._closed = True
-        # Any cleanup logic will go here when C++ bindings are integrated
+    
+    @property
+    def _source(self):
+        """The mapped file or in-memory contents if available, otherwise the file path."""
+        if self._handle is not None:
+            return self._handle
+        if self._fileobj is not None and self._buffer is None:
+            self._load_file_object()
+        if self._buffer is not None:
+            return self._buffer
+        return self.filepath
+    
+    def _load_file_object(self) -> None:
+        """Read the whole image from the file object into memory, once."""
+        self._fileobj.seek(self._file_start)
+        data = self._fileobj.read()
+        if not isinstance(data, (bytes, bytearray)):
+            raise ValueError("File object must be opened in binary mode")
+        self._buffer = data
+    
+    @property
+    def _name(self) -> str:
+        """File path, or a placeholder for images without one."""
+        if self.filepath is not None:
+            return str(self.filepath)
+        return "<file object>" if self._fileobj is not None else "<bytes>"
     
     def _ensure_not_closed(self) -> None:
         """Ensure the image is not closed."""
@@ -122,6 +342,9 @@ class GPRImage:
             ValueError: If the image is closed or conversion fails
         """
         self._ensure_not_closed()
+        if self._handle is not None or self.filepath is None:
+            self._write_file(output_path, self.to_dng_bytes())
+            return
         try:
             from .conversion import convert_gpr_to_dng
             convert_gpr_to_dng(self.filepath, output_path)
@@ -139,6 +362,9 @@ class GPRImage:
             ValueError: If the image is closed or conversion fails
         """
         self._ensure_not_closed()
+        if self._handle is not None or self.filepath is None:
+            self._write_file(output_path, self.to_raw_bytes())
+            return
         try:
             from .conversion import convert_gpr_to_raw
             convert_gpr_to_raw(self.filepath, output_path)
@@ -163,40 +389,310 @@ class GPRImage:
         """
         self.convert_to_raw(output_path)
     
-    def to_numpy(self, dtype: str = "uint16") -> np.ndarray:
+    def _read_bytes(self):
+        """The contents of the image file: the mapping or memory if available, else read from disk."""
+        source = self._source
+        if not isinstance(source, (str, os.PathLike)):
+            return source
+        with open(self.filepath, 'rb') as f:
+            return f.read()
+    
+    @staticmethod
+    def _write_file(output_path: str, data: bytes) -> None:
+        """Write converted file contents to output_path."""
+        try:
+            with open(output_path, 'wb') as f:
+                f.write(data)
+        except OSError as e:
+            raise ValueError(f"Failed to write output file: {output_path}: {str(e)}") from e
+    
+    def to_dng_bytes(self) -> bytes:
+        """
+        Convert GPR image to DNG format in memory.
+        
+        Returns:
+            DNG file contents
+        
+        Raises:
+            ValueError: If the image is closed or conversion fails
+        """
+        self._ensure_not_closed()
+        from .conversion import convert_gpr_to_dng_bytes
+        return convert_gpr_to_dng_bytes(self._read_bytes())
+    
+    def to_raw_bytes(self) -> bytes:
+        """
+        Convert GPR image to RAW format in memory.
+        
+        Returns:
+            RAW pixel data
+        
+        Raises:
+            ValueError: If the image is closed or conversion fails
+        """
+        self._ensure_not_closed()
+        from .conversion import convert_gpr_to_raw_bytes
+        return convert_gpr_to_raw_bytes(self._read_bytes())
+    
+    def to_numpy(self, dtype: str = "uint16", out: Optional[np.ndarray] = None,
+                 normalize: Optional[str] = "full_range",
+                 resolution: str = "full", layout: Optional[str] = None) -> np.ndarray:
         """
         Extract raw image data as a NumPy array.
         
         Args:
-            dtype: Data type for the returned array. Supported: 'uint16', 'float32'
+            dtype: Data type for the returned array. Supported: 'uint16', 'float32',
+                'float16'; 'uint8' or 'uint16' for reduced resolutions
+            out: Optional C-contiguous array of the returned shape and the
+                requested dtype to decode into. Reusing one array across frames
+                avoids allocating a new one per decode. Full resolution only.
+            normalize: Scaling of floating-point output. 'sensor' maps the black
+                and white levels from the DNG tags to 0 and 1 (clipped),
+                'full_range' divides by 65535 and None keeps the raw values.
+                Ignored for uint16.
+            resolution: 'full', or 'half', 'quarter', 'eighth' or 'sixteenth'
+                for an image scaled down by 2, 4, 8 or 16 per side (see
+                decode_preview). Reduced resolutions are RGB only: the SDK
+                skips wavelet levels only in its RGB conversion, so there is
+                no reduced-resolution Bayer data.
+            layout: 'mosaic' for the CFA data as stored, 'planes' for the
+                four Bayer planes R, G1, G2, B (see BAYER_PLANES), which the
+                decoder writes directly in planar order, or 'rgb' for a
+                demosaiced image ('uint8' or 'uint16'). The default is
+                'mosaic' at full resolution and 'rgb' at reduced ones;
+                'mosaic' and 'planes' need full resolution.
             
         Returns:
-            NumPy array containing the raw image data with shape (height, width)
+            NumPy array containing the raw image data with shape (height, width),
+            or ``out`` if it was given. The 'planes' layout has shape
+            (4, height // 2, width // 2). The 'rgb' layout has shape
+            (height // scale, width // scale, 3). Arrays served by
+            the decode caches (see enable_decode_cache and enable_disk_cache)
+            are read-only.
             
         Raises:
             ImportError: If NumPy is not available
             NotImplementedError: If GPR bindings are not available
-            ValueError: If conversion fails, unsupported dtype, or image is closed
+            ValueError: If conversion fails, unsupported dtype, or image is closed,
+                or a Bayer layout is requested at a reduced resolution
         """
         self._ensure_not_closed()
         
         if not HAS_NUMPY:
             raise ImportError("NumPy is required for this functionality. Please install numpy: pip install numpy")
         
+        if layout is None:
+            layout = "mosaic" if resolution == "full" else "rgb"
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unsupported layout '{layout}'. Supported: {', '.join(LAYOUTS)}")
+        if resolution != "full" and layout != "rgb":
+            raise ValueError(f"The '{layout}' layout is only available at full resolution; reduced "
+                             f"resolutions are decoded to RGB only (layout='rgb')")
+        
+        if out is None and self.filepath is not None:
+            return cached_decode(self.filepath, (dtype, normalize, resolution, layout),
+                                 lambda: self._decode(dtype, None, normalize, resolution, layout),
+                                 lambda: _expected_array(self.width, self.height, dtype, layout))
+        return self._decode(dtype, out, normalize, resolution, layout)
+    
+    def _decode(self, dtype: str, out: Optional[np.ndarray], normalize: Optional[str],
+                resolution: str, layout: str) -> np.ndarray:
+        """Decode the image for to_numpy, bypassing the decode cache."""
+        if layout == "rgb":
+            if out is not None:
+                raise ValueError("out is not supported for the 'rgb' layout")
+            return decode_preview(self._source, resolution, dtype)
+        
         try:
+            if layout == "planes":
+                from ._core import get_raw_image_planes
+                return get_raw_image_planes(self._source, dtype, out, normalize)
             from ._core import get_raw_image_data
-            return get_raw_image_data(self.filepath, dtype)
+            return get_raw_image_data(self._source, dtype, out, normalize)
         except ImportError:
             raise NotImplementedError("GPR C++ bindings not available - please build the extension module")
         except Exception as e:
             raise ValueError(f"Failed to extract raw image data: {str(e)}") from e
     
+    def to_bayer_planes(self, dtype: str = "uint16", normalize: Optional[str] = "full_range",
+                        contiguous: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Split the CFA data into its R, G1, G2 and B planes.
+        
+        G1 is the green on the red rows and G2 the green on the blue rows,
+        following the file's cfa_pattern. By default the planes are strided
+        views of one decoded mosaic, so splitting copies nothing; with
+        contiguous=True the decoder writes the planes directly in planar
+        order (see to_numpy(layout='planes')) and the planes are views of
+        that array.
+        
+        Args:
+            dtype: 'uint16', 'float32' or 'float16'
+            normalize: As for to_numpy. 'sensor' applies each plane's own
+                black level. Ignored for uint16.
+            contiguous: Return C-contiguous planes instead of strided views
+        
+        Returns:
+            Tuple (r, g1, g2, b) of arrays with shape (height // 2, width // 2)
+        
+        Raises:
+            ImportError: If NumPy is not available
+            NotImplementedError: If GPR bindings are not available
+            ValueError: If decoding fails, the CFA pattern is not a Bayer
+                pattern, or the image is closed
+        """
+        if contiguous:
+            return tuple(self.to_numpy(dtype, normalize=normalize, layout="planes"))
+        
+        offsets = _bayer_plane_offsets(self.get_image_info()["cfa_pattern"])
+        mosaic = self.to_numpy(dtype, normalize=normalize)
+        rows, cols = mosaic.shape[0] // 2, mosaic.shape[1] // 2
+        return tuple(mosaic[row::2, col::2][:rows, :cols] for row, col in offsets)
+    
+    def iter_strips(self, rows: int = 256, dtype: str = "uint16",
+                    normalize: Optional[str] = "full_range") -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Iterate over the image in horizontal bands of rows.
+        
+        The GPR codec decodes whole frames, so the frame is decoded once to
+        uint16 when iteration starts; floating-point strips are then
+        normalized one band at a time, so peak memory is the uint16 frame
+        plus one strip rather than a full float copy of the frame.
+        
+        Args:
+            rows: Height of each strip; the last strip may be shorter
+            dtype: 'uint16', 'float32' or 'float16'
+            normalize: As for to_numpy. 'sensor' applies the black level of
+                each pixel's CFA position, also for odd strip heights.
+                Ignored for uint16.
+        
+        Yields:
+            Tuples (y, strip) of the first row of the strip and an array of
+            shape (strip_rows, width). uint16 strips are views of the decoded
+            frame; floating-point strips are new arrays.
+        
+        Raises:
+            ImportError: If NumPy is not available
+            NotImplementedError: If GPR bindings are not available
+            ValueError: If rows or dtype are invalid, decoding fails, or the
+                image is closed
+        """
+        self._ensure_not_closed()
+        
+        if not HAS_NUMPY:
+            raise ImportError("NumPy is required for this functionality. Please install numpy: pip install numpy")
+        if not isinstance(rows, int) or isinstance(rows, bool) or rows <= 0:
+            raise ValueError(f"rows must be a positive integer, got {rows!r}")
+        if dtype not in ("uint16", "float32", "float16"):
+            raise ValueError(f"Unsupported dtype '{dtype}'. Supported: uint16, float32, float16")
+        if dtype == "float16" and normalize is None:
+            raise ValueError("float16 output requires normalize='sensor' or 'full_range'")
+        
+        return self._strips(rows, dtype, normalize)
+    
+    def _strips(self, rows: int, dtype: str, normalize: Optional[str]) -> Iterator[Tuple[int, np.ndarray]]:
+        """Generator behind iter_strips."""
+        try:
+            from ._core import get_raw_image_data, normalize_raw
+            raw = get_raw_image_data(self._source, "uint16")
+        except ImportError:
+            raise NotImplementedError("GPR C++ bindings not available - please build the extension module")
+        except Exception as e:
+            raise ValueError(f"Failed to extract raw image data: {str(e)}") from e
+        
+        info = self.get_image_info()
+        black_level = info['black_level'] if len(info['black_level']) == 4 else [0.0] * 4
+        # Black levels in CFA order for strips starting on an odd row
+        shifted_black_level = black_level[2:] + black_level[:2]
+        
+        for y in range(0, raw.shape[0], rows):
+            band = raw[y:y + rows]
+            if dtype == "uint16":
+                yield y, band
+            else:
+                yield y, normalize_raw(band, dtype, normalize,
+                                       shifted_black_level if y & 1 else black_level,
+                                       info['white_level'])
+    
+    def read_region(self, x: int, y: int, width: int, height: int, dtype: str = "uint16",
+                    normalize: Optional[str] = "full_range",
+                    resolution: str = "full") -> np.ndarray:
+        """
+        Extract a rectangular window of the image as a NumPy array.
+        
+        The GPR codec has no region decode: a full-resolution read decodes
+        the whole uint16 frame into a temporary buffer, and only the result
+        and its floating-point conversion are window-sized. With a reduced
+        resolution the region is cropped from the RGB decode at that scale,
+        which skips the finer wavelet levels, so the decode itself shrinks
+        with the scale.
+        
+        Args:
+            x: Left edge of the region in full-resolution pixels
+            y: Top edge of the region in full-resolution pixels
+            width: Region width in full-resolution pixels
+            height: Region height in full-resolution pixels
+            dtype: As for to_numpy ('uint8' or 'uint16' for reduced resolutions)
+            normalize: As for to_numpy. 'sensor' applies the black level of
+                each pixel's CFA position for any x and y. Ignored for uint16.
+            resolution: 'full' for Bayer data, or a reduced resolution (see
+                to_numpy) to crop the region from an RGB image decoded at
+                that scale; there is no reduced-resolution Bayer data. The
+                region is given in full-resolution pixels and divided by the
+                scale.
+        
+        Returns:
+            Array of shape (height, width) at full resolution, or
+            (height // scale, width // scale, 3) at a reduced resolution.
+            With an odd x or y the CFA pattern of a full-resolution region is
+            shifted from the image's cfa_pattern accordingly.
+        
+        Raises:
+            ImportError: If NumPy is not available
+            NotImplementedError: If GPR bindings are not available
+            ValueError: If the region is outside the image, decoding fails,
+                or the image is closed
+        """
+        self._ensure_not_closed()
+        
+        if not HAS_NUMPY:
+            raise ImportError("NumPy is required for this functionality. Please install numpy: pip install numpy")
+        
+        if resolution != "full":
+            _check_rgb_request(resolution, dtype)
+            if x < 0 or y < 0 or width <= 0 or height <= 0:
+                raise ValueError("Region needs non-negative x and y and a positive width and height")
+            if x + width > self.width or y + height > self.height:
+                raise ValueError(f"Region ({x}, {y}, {width}, {height}) exceeds the "
+                                 f"{self.width}x{self.height} image")
+            scale = _RESOLUTION_SCALES[resolution]
+            rgb = decode_preview(self._source, resolution, dtype)
+            # Copy so that the full preview is released
+            return rgb[y // scale:(y + height) // scale, x // scale:(x + width) // scale].copy()
+        
+        try:
+            from ._core import get_raw_image_region
+            return get_raw_image_region(self._source, x, y, width, height, dtype, normalize)
+        except ImportError:
+            raise NotImplementedError("GPR C++ bindings not available - please build the extension module")
+        except Exception as e:
+            raise ValueError(f"Failed to extract image region: {str(e)}") from e
+    
+    def crop(self, x: int, y: int, width: int, height: int, dtype: str = "uint16",
+             normalize: Optional[str] = "full_range",
+             resolution: str = "full") -> np.ndarray:
+        """
+        Extract a rectangular window of the image (alias for read_region).
+        """
+        return self.read_region(x, y, width, height, dtype, normalize, resolution)
+    
     def get_image_info(self) -> dict:
         """
         Get detailed image information including dimensions and metadata.
         
         Returns:
-            Dictionary containing image information (width, height, channels, format, data_size)
+            Dictionary containing image information (width, height, channels, format, data_size,
+            cfa_pattern, bit_depth, compression)
             
         Raises:
             NotImplementedError: If GPR bindings are not available
@@ -205,15 +701,16 @@ class GPRImage:
         self._ensure_not_closed()
         
         try:
+            if self._handle is not None:
+                return _image_info_to_dict(self._handle.info)
             from ._core import get_image_info
-            info = get_image_info(self.filepath)
-            return {
-                'width': info.width,
-                'height': info.height,
-                'channels': info.channels,
-                'format': info.format,
-                'data_size': info.data_size
-            }
+            if self._buffer is not None:
+                return _image_info_to_dict(get_image_info(self._buffer))
+            if self._fileobj is not None:
+                # Only the header is read
+                self._fileobj.seek(self._file_start)
+                return _image_info_to_dict(get_image_info(self._fileobj))
+            return _image_info_to_dict(get_image_info(self.filepath))
         except ImportError:
             raise NotImplementedError("GPR C++ bindings not available - please build the extension module")
         except Exception as e:
@@ -231,6 +728,8 @@ class GPRImage:
             ValueError: If metadata extraction fails or image is closed
         """
         self._ensure_not_closed()
+        if self.filepath is None:
+            raise NotImplementedError("Metadata is only available for images opened from a path")
         
         try:
             from .metadata import GPRMetadata
@@ -244,27 +743,30 @@ class GPRImage:
     def __repr__(self) -> str:
         """String representation of the GPRImage."""
         if self._closed:
-            return f"GPRImage('{self.filepath}', closed=True)"
+            return f"GPRImage('{self._name}', closed=True)"
         try:
-            return f"GPRImage('{self.filepath}', {self.width}x{self.height})"
+            return f"GPRImage('{self._name}', {self.width}x{self.height})"
         except (NotImplementedError, ValueError):
-            return f"GPRImage('{self.filepath}')"
+            return f"GPRImage('{self._name}')"
 
 
-def open_gpr(filepath: str) -> GPRImage:
+def open_gpr(source: Union[str, "os.PathLike[str]", bytes, bytearray, memoryview, BinaryIO]) -> GPRImage:
     """
     Open a GPR image file.
     
     Convenience function that creates a GPRImage instance.
     
     Args:
-        filepath: Path to the GPR file
+        source: Path to the GPR file, GPR file contents as a bytes-like object
+            (see GPRImage.from_bytes), or a seekable binary file object (see
+            GPRImage.from_file)
         
     Returns:
         GPRImage instance
         
     Raises:
         FileNotFoundError: If the file does not exist
+        TypeError: If source is none of the supported types
         ValueError: If the file is not a valid GPR format
         
     Example:
@@ -275,11 +777,19 @@ def open_gpr(filepath: str) -> GPRImage:
         # Or use as context manager
         >>> with open_gpr("sample.gpr") as img:
         ...     data = img.to_numpy()
+        
+        # Or from memory
+        >>> img = open_gpr(blob)
     """
-    return GPRImage(filepath)
+    if isinstance(source, (str, os.PathLike)):
+        return GPRImage(source)
+    if hasattr(source, "read"):
+        return GPRImage.from_file(source)
+    return GPRImage.from_bytes(source)
 
 
-def convert_image(input_path: str, output_path: str, target_format: Optional[str] = None) -> None:
+def convert_image(input_path: str, output_path: str, target_format: Optional[str] = None,
+                  parameters: Optional["GPRParameters"] = None) -> None:
     """
     Convert between supported image formats.
     
@@ -290,9 +800,11 @@ def convert_image(input_path: str, output_path: str, target_format: Optional[str
         input_path: Path to input file
         output_path: Path for output file
         target_format: Target format ('gpr', 'dng', 'raw'). If None, inferred from output extension.
+        parameters: Optional GPRParameters passed to the conversion function
         
     Raises:
         FileNotFoundError: If input file does not exist
+        TypeError: If parameters is not a GPRParameters object
         ValueError: If conversion fails or unsupported format
         NotImplementedError: If conversion bindings are not available
         
@@ -303,15 +815,9 @@ def convert_image(input_path: str, output_path: str, target_format: Optional[str
     if not os.path.exists(input_path):
         raise FileNotFoundError(f"Input file not found: {input_path}")
     
-    # Detect input format
-    try:
-        from .conversion import detect_format
-        input_format = detect_format(input_path)
-    except Exception:
-        # Fallback to extension-based detection
-        input_ext = os.path.splitext(input_path)[1].lower()
-        format_map = {'.gpr': 'gpr', '.dng': 'dng', '.raw': 'raw'}
-        input_format = format_map.get(input_ext, 'unknown')
+    # Detect input format; unsupported contents raise ValueError whatever the extension
+    from .conversion import detect_format
+    input_format = detect_format(input_path)
     
     # Determine target format
     if target_format is None:
@@ -324,7 +830,7 @@ def convert_image(input_path: str, output_path: str, target_format: Optional[str
     # Import conversion functions
     try:
         from .conversion import (
-            convert_gpr_to_dng, convert_gpr_to_raw,
+            convert_gpr_to_dng, convert_gpr_to_raw, convert_gpr_to_gpr,
             convert_dng_to_gpr, convert_dng_to_dng
         )
     except ImportError:
@@ -332,13 +838,15 @@ def convert_image(input_path: str, output_path: str, target_format: Optional[str
     
     # Perform conversion
     if input_format == 'gpr' and target_format == 'dng':
-        convert_gpr_to_dng(input_path, output_path)
+        convert_gpr_to_dng(input_path, output_path, parameters)
     elif input_format == 'gpr' and target_format == 'raw':
-        convert_gpr_to_raw(input_path, output_path)
+        convert_gpr_to_raw(input_path, output_path, parameters)
+    elif input_format == 'gpr' and target_format == 'gpr':
+        convert_gpr_to_gpr(input_path, output_path, parameters)
     elif input_format == 'dng' and target_format == 'gpr':
-        convert_dng_to_gpr(input_path, output_path)
+        convert_dng_to_gpr(input_path, output_path, parameters)
     elif input_format == 'dng' and target_format == 'dng':
-        convert_dng_to_dng(input_path, output_path)
+        convert_dng_to_dng(input_path, output_path, parameters)
     else:
         raise ValueError(f"Unsupported conversion: {input_format} to {target_format}")
 
@@ -398,16 +906,26 @@ def get_gpr_info(filepath: str) -> dict:
     return get_info(filepath)
 
 
-def load_gpr_as_numpy(filepath: str, dtype: str = "uint16") -> np.ndarray:
+def load_gpr_as_numpy(filepath: Union[str, "os.PathLike[str]", bytes, bytearray, memoryview, BinaryIO],
+                      dtype: str = "uint16",
+                      out: Optional[np.ndarray] = None,
+                      normalize: Optional[str] = "full_range") -> np.ndarray:
     """
     Load a GPR file directly as a NumPy array.
     
     Args:
-        filepath: Path to the GPR file
-        dtype: Data type for the returned array. Supported: 'uint16', 'float32'
+        filepath: Path to the GPR file, or its contents as a bytes-like object
+            or a seekable binary file object (see open_gpr)
+        dtype: Data type for the returned array. Supported: 'uint16', 'float32', 'float16'
+        out: Optional C-contiguous array of shape (height, width) and the
+            requested dtype to decode into instead of allocating a new array
+        normalize: Scaling of floating-point output: 'sensor', 'full_range'
+            or None (see GPRImage.to_numpy). Ignored for uint16.
         
     Returns:
-        NumPy array containing the raw image data with shape (height, width)
+        NumPy array containing the raw image data with shape (height, width),
+        or ``out`` if it was given. Arrays served by the decode caches (see
+        enable_decode_cache and enable_disk_cache) are read-only.
         
     Raises:
         FileNotFoundError: If the file does not exist
@@ -415,6 +933,10 @@ def load_gpr_as_numpy(filepath: str, dtype: str = "uint16") -> np.ndarray:
         ValueError: If conversion fails or unsupported dtype
         NotImplementedError: If GPR bindings are not available
     """
+    if not isinstance(filepath, (str, os.PathLike)):
+        with open_gpr(filepath) as img:
+            return img.to_numpy(dtype, out, normalize)
+    
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"GPR file not found: {filepath}")
     
@@ -423,13 +945,149 @@ def load_gpr_as_numpy(filepath: str, dtype: str = "uint16") -> np.ndarray:
     
     try:
         from ._core import get_raw_image_data
-        return get_raw_image_data(filepath, dtype)
+        if out is None:
+            def expected():
+                # Only needed to check a frame served by the disk cache
+                from ._core import get_image_info
+                info = get_image_info(filepath)
+                return _expected_array(info.width, info.height, dtype, "mosaic")
+            
+            return cached_decode(filepath, (dtype, normalize, "full", "mosaic"),
+                                 lambda: get_raw_image_data(filepath, dtype, None, normalize), expected)
+        return get_raw_image_data(filepath, dtype, out, normalize)
     except ImportError:
         raise NotImplementedError("GPR C++ bindings not available - please build the extension module")
     except Exception as e:
         raise ValueError(f"Failed to load GPR file as NumPy array: {str(e)}") from e
 
 
+def decode_preview(source: Union[str, "os.PathLike[str]", bytes, bytearray, memoryview],
+                   resolution: str = "quarter", dtype: str = "uint8") -> np.ndarray:
+    """
+    Decode a GPR image to RGB at full or reduced resolution.
+    
+    The reduced resolutions stop the VC-5 inverse wavelet transform after
+    the coarser levels instead of decoding everything and downsampling, so
+    thumbnails and quick-looks cost a fraction of a full decode. The SDK
+    only skips wavelet levels in its RGB conversion, so there is no
+    reduced-resolution Bayer decode.
+    
+    Args:
+        source: Path to a GPR file, or GPR file contents as a bytes-like object
+        resolution: 'full', 'half', 'quarter', 'eighth' or 'sixteenth'
+        dtype: 'uint8' or 'uint16' samples
+    
+    Returns:
+        NumPy array of shape (height // scale, width // scale, 3)
+    
+    Raises:
+        FileNotFoundError: If source is a path that does not exist
+        ImportError: If NumPy is not available
+        ValueError: If decoding fails, or resolution or dtype is unsupported
+        NotImplementedError: If GPR bindings are not available
+    
+    Example:
+        >>> thumb = decode_preview("sample.gpr", "eighth")
+        >>> thumb.shape
+        (375, 500, 3)
+    """
+    bits = _check_rgb_request(resolution, dtype)
+    if isinstance(source, (str, os.PathLike)) and not os.path.exists(source):
+        raise FileNotFoundError(f"GPR file not found: {source}")
+    
+    if not HAS_NUMPY:
+        raise ImportError("NumPy is required for this functionality. Please install numpy: pip install numpy")
+    
+    try:
+        from ._core import get_rgb_image_data
+        return get_rgb_image_data(source, resolution, bits)
+    except ImportError:
+        raise NotImplementedError("GPR C++ bindings not available - please build the extension module")
+    except Exception as e:
+        raise ValueError(f"Failed to decode GPR preview: {str(e)}") from e
+
+
+def encode_gpr(array: np.ndarray, cfa: str = "RGGB", bit_depth: int = 12,
+               parameters: Optional["GPRParameters"] = None) -> bytes:
+    """
+    Encode a Bayer frame held in a NumPy array as a GPR file in memory.
+    
+    The encoder reads the array's buffer in place, using its row stride as
+    the input pitch, so a crop or other view with contiguous rows is
+    encoded without copying. The image size is taken from the array; the
+    geometry fields of parameters are ignored.
+    
+    Args:
+        array: uint16 array of shape (height, width) whose rows are
+            contiguous, with samples in the low bit_depth bits
+        cfa: CFA layout of the frame: 'RGGB' or 'GBRG'
+        bit_depth: Sample bits: 12 or 14
+        parameters: Optional encoding parameters (SDK defaults if None)
+    
+    Returns:
+        The GPR file contents
+    
+    Raises:
+        ImportError: If NumPy is not available
+        TypeError: If array is not a NumPy array or parameters is not a
+            GPRParameters object
+        ValueError: If cfa or bit_depth is unsupported, the array has the
+            wrong dtype, shape or layout, or encoding fails
+        NotImplementedError: If GPR bindings are not available
+    
+    Example:
+        >>> frame = np.zeros((3000, 4000), dtype=np.uint16)
+        >>> gpr_bytes = encode_gpr(frame[8:-8, 8:-8], cfa="RGGB", bit_depth=12)
+    """
+    _check_encode_request(array, cfa, bit_depth, parameters)
+    try:
+        from ._core import encode_gpr_array
+    except ImportError:
+        raise NotImplementedError("GPR C++ bindings not available - please build the extension module")
+    
+    core_parameters = parameters.to_core() if parameters is not None else None
+    try:
+        return encode_gpr_array(array, cfa, bit_depth, core_parameters)
+    except Exception as e:
+        raise ValueError(f"Failed to encode array as GPR: {str(e)}") from e
+
+
+def save_gpr(array: np.ndarray, output_path: str, cfa: str = "RGGB", bit_depth: int = 12,
+             parameters: Optional["GPRParameters"] = None) -> None:
+    """
+    Encode a Bayer frame held in a NumPy array and write it as a GPR file.
+    
+    Takes the same arguments as encode_gpr, which describes how the array
+    is read; the encoded file is written without passing through Python.
+    
+    Args:
+        array: uint16 array of shape (height, width) whose rows are contiguous
+        output_path: Path for the output GPR file
+        cfa: CFA layout of the frame: 'RGGB' or 'GBRG'
+        bit_depth: Sample bits: 12 or 14
+        parameters: Optional encoding parameters (SDK defaults if None)
+    
+    Raises:
+        ImportError: If NumPy is not available
+        TypeError: If array is not a NumPy array or parameters is not a
+            GPRParameters object
+        ValueError: If the arguments are invalid, encoding fails or the
+            file cannot be written
+        NotImplementedError: If GPR bindings are not available
+    """
+    _check_encode_request(array, cfa, bit_depth, parameters)
+    try:
+        from ._core import encode_gpr_array_to_file
+    except ImportError:
+        raise NotImplementedError("GPR C++ bindings not available - please build the extension module")
+    
+    core_parameters = parameters.to_core() if parameters is not None else None
+    try:
+        encode_gpr_array_to_file(array, os.fspath(output_path), cfa, bit_depth, core_parameters)
+    except Exception as e:
+        raise ValueError(f"Failed to save array as GPR: {str(e)}") from e
+
+
 def get_gpr_image_info(filepath: str) -> dict:
     """
     Get detailed information about a GPR image file.
@@ -438,7 +1096,8 @@ def get_gpr_image_info(filepath: str) -> dict:
         filepath: Path to the GPR file
         
     Returns:
-        Dictionary containing image information (width, height, channels, format, data_size)
+        Dictionary containing image information (width, height, channels, format, data_size,
+        cfa_pattern, bit_depth, compression). Only the file header is read.
         
     Raises:
         FileNotFoundError: If the file does not exist
@@ -450,14 +1109,7 @@ def get_gpr_image_info(filepath: str) -> dict:
     
     try:
         from ._core import get_image_info
-        info = get_image_info(filepath)
-        return {
-            'width': info.width,
-            'height': info.height,
-            'channels': info.channels,
-            'format': info.format,
-            'data_size': info.data_size
-        }
+        return _image_info_to_dict(get_image_info(filepath))
     except ImportError:
         raise NotImplementedError("GPR C++ bindings not available - please build the extension module")
     except Exception as e:
@@ -471,5 +1123,11 @@ __all__ = [
     "get_info",
     "get_gpr_info",
     "load_gpr_as_numpy",
+    "decode_preview",
+    "encode_gpr",
+    "save_gpr",
     "get_gpr_image_info",
+    "RESOLUTIONS",
+    "LAYOUTS",
+    "BAYER_PLANES",
 ]
\ No newline at end of file
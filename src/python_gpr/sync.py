@@ -0,0 +1,317 @@
+"""
+Incremental directory-tree conversion for Python-GPR.
+
+sync_tree() mirrors a tree of GPR/DNG files into a tree of converted files,
+converting only the inputs that changed since the previous run. A manifest
+in the destination directory records, for each input, its size,
+modification time and content hash, the conversion options and the size of
+the output that was written.
+
+An input is up to date when its manifest entry matches the current options
+and output, and either its size and modification time are unchanged or its
+content hash is (a file that was only touched is not converted again).
+
+Outputs are converted into a temporary file next to their destination and
+renamed into place, so an interrupted run never leaves a partial output
+under its final name. The manifest is rewritten the same way every few
+seconds and at the end of the run; after a crash the next run removes the
+leftover temporary files and converts again anything not yet recorded.
+
+Example:
+    import python_gpr
+
+    report = python_gpr.sync_tree("/archive/gpr", "/archive/dng", workers=8)
+    print(f"{len(report.converted)} converted, {len(report.unchanged)} up to date")
+    for path, error in report.failed.items():
+        print(f"{path}: {error}")
+"""
+
+import hashlib
+import json
+import os
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+
+from .batch import _CONVERTERS, _EXTENSION_FORMATS
+from .conversion import GPRParameters
+from .core import convert_image
+
+# File name of the manifest in the destination directory
+MANIFEST_NAME = ".python-gpr-manifest.json"
+
+_MANIFEST_VERSION = 1
+
+# Suffix of the temporary files outputs are converted into
+_TEMP_SUFFIX = ".python-gpr-tmp"
+
+# Seconds between manifest checkpoints during a run
+_MANIFEST_SAVE_INTERVAL = 5.0
+
+# Files submitted ahead of the workers, per worker
+_QUEUE_DEPTH = 4
+
+
+class SyncReport:
+    """
+    Outcome of a sync_tree run. Paths are relative to the source directory.
+
+    Attributes:
+        converted: Inputs converted in this run
+        unchanged: Inputs whose output was already up to date
+        failed: Inputs that could not be converted, with their exception
+        removed: Inputs that no longer exist and were dropped from the manifest
+        elapsed: Seconds the run took
+    """
+
+    def __init__(self):
+        self.converted: List[str] = []
+        self.unchanged: List[str] = []
+        self.failed: Dict[str, BaseException] = {}
+        self.removed: List[str] = []
+        self.elapsed = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """True if no input failed."""
+        return not self.failed
+
+    def __repr__(self) -> str:
+        return (f"SyncReport(converted={len(self.converted)}, unchanged={len(self.unchanged)}, "
+                f"failed={len(self.failed)}, removed={len(self.removed)})")
+
+
+def _file_digest(path: str) -> str:
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _options_digest(target_format: str, parameters: Optional[GPRParameters]) -> str:
+    """Digest of everything besides the input that determines the output."""
+    # Legacy parameters never reach the converters, so they do not invalidate outputs
+    values = None if parameters is None else {k: parameters[k] for k in GPRParameters._CORE_PARAMS}
+    options = json.dumps([_MANIFEST_VERSION, target_format, values], sort_keys=True)
+    return hashlib.blake2b(options.encode(), digest_size=8).hexdigest()
+
+
+def _load_manifest(path: str) -> dict:
+    """Manifest entries by input path; a missing or unreadable manifest is empty."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("version") != _MANIFEST_VERSION:
+        return {}
+    files = manifest.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def _save_manifest(path: str, files: dict) -> None:
+    temp_path = f"{path}.{uuid.uuid4().hex[:12]}{_TEMP_SUFFIX}"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": _MANIFEST_VERSION, "files": files}, f, sort_keys=True)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _remove_temp_files(dst_dir: str) -> None:
+    """Remove temporary files left behind by an interrupted run."""
+    for dirpath, _, filenames in os.walk(dst_dir):
+        for name in filenames:
+            if name.endswith(_TEMP_SUFFIX):
+                try:
+                    os.remove(os.path.join(dirpath, name))
+                except OSError:
+                    pass
+
+
+def _output_current(entry: dict, output_path: str) -> bool:
+    try:
+        return os.path.getsize(output_path) == entry["output_size"]
+    except OSError:
+        return False
+
+
+def _sync_file(input_path: str, output_path: str, target_format: str,
+               parameters: Optional[GPRParameters], entry: Optional[dict]) -> dict:
+    """
+    Convert one input unless its content matches entry; return its new manifest entry.
+
+    Runs in a worker thread. The returned entry has "converted" set if the
+    output was written.
+    """
+    st = os.stat(input_path)
+    digest = _file_digest(input_path)
+    if entry is not None and entry.get("digest") == digest and _output_current(entry, output_path):
+        return dict(entry, size=st.st_size, mtime_ns=st.st_mtime_ns, converted=False)
+
+    directory, name = os.path.split(output_path)
+    os.makedirs(directory, exist_ok=True)
+    temp_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex[:12]}{_TEMP_SUFFIX}")
+    try:
+        convert_image(input_path, temp_path, target_format, parameters)
+        output_size = os.path.getsize(temp_path)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "digest": digest,
+            "output_size": output_size, "converted": True}
+
+
+def _find_inputs(src_dir: str, dst_dir: str, source_formats) -> List[str]:
+    """Relative paths of the convertible files under src_dir, skipping dst_dir."""
+    skip = os.path.realpath(dst_dir)
+    inputs = []
+    for dirpath, dirnames, filenames in os.walk(src_dir):
+        dirnames[:] = sorted(d for d in dirnames if os.path.realpath(os.path.join(dirpath, d)) != skip)
+        for name in sorted(filenames):
+            if _EXTENSION_FORMATS.get(os.path.splitext(name)[1].lower()) in source_formats:
+                inputs.append(os.path.relpath(os.path.join(dirpath, name), src_dir))
+    return inputs
+
+
+def sync_tree(src_dir: str, dst_dir: str, target_format: str = "dng", workers: Optional[int] = None,
+              parameters: Optional[GPRParameters] = None) -> SyncReport:
+    """
+    Convert the files under src_dir that changed since the last run into dst_dir.
+
+    Every GPR or DNG file that can be converted to target_format is
+    converted with convert_image to the same relative path under dst_dir,
+    with the extension replaced by target_format. Failures are reported and
+    retried by the next run. Outputs of inputs that were deleted are left
+    in place. Runs must not overlap on the same dst_dir.
+
+    Args:
+        src_dir: Root of the input tree
+        dst_dir: Root of the output tree; holds the manifest
+        target_format: Target format ('gpr', 'dng', 'raw')
+        workers: Number of parallel conversions (default: number of CPUs)
+        parameters: GPRParameters for every conversion; changing the core
+            parameters converts every file again
+
+    Returns:
+        SyncReport listing converted, unchanged, failed and removed inputs
+
+    Raises:
+        FileNotFoundError: If src_dir does not exist
+        ValueError: If target_format or workers is invalid, or the trees
+            are the same directory
+        TypeError: If parameters is not a GPRParameters instance
+    """
+    start = time.perf_counter()
+    src_dir = os.fspath(src_dir)
+    dst_dir = os.fspath(dst_dir)
+    if not os.path.isdir(src_dir):
+        raise FileNotFoundError(f"Source directory not found: {src_dir}")
+    if os.path.realpath(src_dir) == os.path.realpath(dst_dir):
+        raise ValueError("src_dir and dst_dir must be different directories")
+    source_formats = {source for source, target in _CONVERTERS if target == target_format}
+    if not source_formats:
+        raise ValueError(f"Unsupported target format: {target_format}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if not isinstance(workers, int) or isinstance(workers, bool) or workers <= 0:
+        raise ValueError(f"workers must be a positive integer, got {workers!r}")
+    if parameters is not None and not isinstance(parameters, GPRParameters):
+        raise TypeError(f"parameters must be a GPRParameters instance, got {type(parameters).__name__}")
+
+    report = SyncReport()
+    os.makedirs(dst_dir, exist_ok=True)
+    _remove_temp_files(dst_dir)
+    manifest_path = os.path.join(dst_dir, MANIFEST_NAME)
+    old_entries = _load_manifest(manifest_path)
+    options = _options_digest(target_format, parameters)
+
+    entries = {}
+    jobs = []
+    outputs = {}
+    for relpath in _find_inputs(src_dir, dst_dir, source_formats):
+        key = relpath.replace(os.sep, "/")
+        output = os.path.splitext(key)[0] + "." + target_format
+        if output in outputs:
+            report.failed[key] = ValueError(f"{key} and {outputs[output]} convert to the same output {output}")
+            continue
+        outputs[output] = key
+
+        input_path = os.path.join(src_dir, relpath)
+        output_path = os.path.join(dst_dir, *output.split("/"))
+        entry = old_entries.get(key)
+        if entry is not None and (entry.get("options") != options or entry.get("output") != output):
+            entry = None
+        if entry is not None:
+            try:
+                st = os.stat(input_path)
+            except OSError as e:
+                report.failed[key] = e
+                continue
+            if (entry.get("size"), entry.get("mtime_ns")) == (st.st_size, st.st_mtime_ns) \
+                    and _output_current(entry, output_path):
+                entries[key] = entry
+                report.unchanged.append(key)
+                continue
+            # Keep the entry so a later run can still skip the file if this one fails
+            entries[key] = entry
+        jobs.append((key, input_path, output_path, output, entry))
+
+    report.removed = sorted(set(old_entries) - set(outputs.values()))
+
+    def record(key: str, output: str, result: dict) -> None:
+        converted = result.pop("converted")
+        result.update(options=options, output=output)
+        entries[key] = result
+        (report.converted if converted else report.unchanged).append(key)
+
+    jobs = iter(jobs)
+    last_save = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="python-gpr-sync")
+    try:
+        in_flight = {}
+        while True:
+            for key, input_path, output_path, output, entry in jobs:
+                future = executor.submit(_sync_file, input_path, output_path, target_format,
+                                         parameters, entry)
+                in_flight[future] = (key, output)
+                if len(in_flight) >= workers * _QUEUE_DEPTH:
+                    break
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            # In submission order, so an interrupt does not drop earlier results
+            for future in [f for f in in_flight if f in done]:
+                key, output = in_flight.pop(future)
+                try:
+                    record(key, output, future.result())
+                except Exception as e:
+                    report.failed[key] = e
+            if time.monotonic() - last_save >= _MANIFEST_SAVE_INTERVAL:
+                _save_manifest(manifest_path, entries)
+                last_save = time.monotonic()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        _save_manifest(manifest_path, entries)
+
+    report.converted.sort()
+    report.unchanged.sort()
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+__all__ = [
+    "sync_tree",
+    "SyncReport",
+]
@@ -0,0 +1,286 @@
+"""
+Tests for the asyncio API in python_gpr.aio.
+
+The blocking calls are replaced by functions that wait on events, which
+makes it possible to observe how many run at once, how the memory budget
+limits them and what cancellation does to queued work.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from python_gpr import aio
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+MiB = 1024 * 1024
+
+
+class BlockingConversion:
+    """Stand-in for convert_image that records concurrency and blocks until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.started = []
+
+    def __call__(self, input_path, output_path, target_format=None):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            self.started.append(input_path)
+        try:
+            if not self.release.wait(10):
+                raise TimeoutError("conversion was never released")
+            if "bad" in input_path:
+                raise ValueError(f"Unsupported conversion: {input_path}")
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+class AioTestCase(unittest.TestCase):
+    """Reset the module configuration around each test."""
+
+    def setUp(self):
+        self.addCleanup(aio.configure, aio.DEFAULT_MAX_WORKERS, aio.DEFAULT_MEMORY_BUDGET)
+        self.addCleanup(aio.shutdown)
+        self.conversion = BlockingConversion()
+        # Unblock workers first when a test fails
+        self.addCleanup(self.conversion.release.set)
+        patcher = patch.object(aio, "convert_image", self.conversion)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def wait_for_started(self, count):
+        for _ in range(500):
+            if len(self.conversion.started) >= count:
+                return
+            await asyncio.sleep(0.01)
+        self.fail(f"only {len(self.conversion.started)} of {count} conversions started")
+
+
+class TestConfiguration(AioTestCase):
+    """Test argument validation."""
+
+    def test_invalid_configuration(self):
+        for kwargs in ({"max_workers": 0}, {"memory_budget": -1}, {"max_workers": 1.5}):
+            with self.assertRaises(ValueError):
+                aio.configure(**kwargs)
+
+
+class TestConcurrency(AioTestCase):
+    """Test the worker and memory limits."""
+
+    def test_worker_limit(self):
+        aio.configure(max_workers=2)
+
+        async def main():
+            tasks = [asyncio.ensure_future(aio.convert(f"in{i}.gpr", f"out{i}.dng", memory=0))
+                     for i in range(6)]
+            await self.wait_for_started(2)
+            await asyncio.sleep(0.05)
+            self.conversion.release.set()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(main())
+        self.assertEqual(self.conversion.max_running, 2)
+        self.assertEqual(len(self.conversion.started), 6)
+
+    def test_memory_budget_limits_concurrency(self):
+        aio.configure(max_workers=8, memory_budget=100 * MiB)
+
+        async def main():
+            tasks = [asyncio.ensure_future(aio.convert(f"in{i}.gpr", f"out{i}.dng", memory=40 * MiB))
+                     for i in range(6)]
+            await self.wait_for_started(2)
+            await asyncio.sleep(0.05)
+            self.assertEqual(len(self.conversion.started), 2)
+            self.conversion.release.set()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(main())
+        self.assertEqual(self.conversion.max_running, 2)
+
+    def test_call_larger_than_budget_runs_alone(self):
+        aio.configure(memory_budget=10 * MiB)
+
+        async def main():
+            self.conversion.release.set()
+            await asyncio.gather(aio.convert("big.gpr", "big.dng", memory=50 * MiB),
+                                 aio.convert("small.gpr", "small.dng", memory=MiB))
+
+        asyncio.run(main())
+        self.assertEqual(self.conversion.max_running, 1)
+
+    def test_batch_schedules_a_window(self):
+        aio.configure(max_workers=2)
+        consumed = []
+
+        def pairs():
+            for i in range(100):
+                consumed.append(i)
+                yield f"in{i}.gpr", f"out{i}.dng"
+
+        async def main():
+            batch = asyncio.ensure_future(aio.batch_convert(pairs()))
+            await self.wait_for_started(2)
+            await asyncio.sleep(0.05)
+            self.assertEqual(len(consumed), 2 * aio._QUEUE_DEPTH)
+            self.conversion.release.set()
+            return await batch
+
+        self.assertEqual(asyncio.run(main()), [None] * 100)
+        self.assertEqual(self.conversion.max_running, 2)
+
+    def test_event_loop_is_not_blocked(self):
+        async def main():
+            task = asyncio.ensure_future(aio.convert("in.gpr", "out.dng", memory=0))
+            await self.wait_for_started(1)
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            self.assertLess(time.perf_counter() - start, 1.0)
+            self.conversion.release.set()
+            await task
+
+        asyncio.run(main())
+
+
+class TestCancellation(AioTestCase):
+    """Test that cancellation stops queued work."""
+
+    def test_cancel_queued_calls(self):
+        aio.configure(max_workers=1)
+
+        async def main():
+            tasks = [asyncio.ensure_future(aio.convert(f"in{i}.gpr", f"out{i}.dng", memory=0))
+                     for i in range(4)]
+            await self.wait_for_started(1)
+            for task in tasks[1:]:
+                task.cancel()
+            # Let the loop deliver the cancellations before the worker is free
+            await asyncio.sleep(0.05)
+            self.conversion.release.set()
+            await tasks[0]
+            results = await asyncio.gather(*tasks[1:], return_exceptions=True)
+            self.assertTrue(all(isinstance(r, asyncio.CancelledError) for r in results))
+
+        asyncio.run(main())
+        aio.shutdown()
+        self.assertEqual(self.conversion.started, ["in0.gpr"])
+
+    def test_cancel_while_waiting_for_budget(self):
+        aio.configure(memory_budget=10 * MiB)
+
+        async def main():
+            first = asyncio.ensure_future(aio.convert("a.gpr", "a.dng", memory=10 * MiB))
+            waiting = asyncio.ensure_future(aio.convert("b.gpr", "b.dng", memory=10 * MiB))
+            await self.wait_for_started(1)
+            waiting.cancel()
+            self.conversion.release.set()
+            await first
+            with self.assertRaises(asyncio.CancelledError):
+                await waiting
+            # The budget is fully available again
+            await asyncio.wait_for(aio.convert("c.gpr", "c.dng", memory=10 * MiB), 5)
+
+        asyncio.run(main())
+        self.assertEqual(self.conversion.started, ["a.gpr", "c.gpr"])
+
+    def test_batch_errors(self):
+        pairs = [("in0.gpr", "out0.dng"), ("bad.gpr", "bad.dng"), ("in2.gpr", "out2.dng")]
+
+        async def main():
+            self.conversion.release.set()
+            results = await aio.batch_convert(pairs, return_exceptions=True)
+            self.assertIsNone(results[0])
+            self.assertIsInstance(results[1], ValueError)
+            with self.assertRaises(ValueError):
+                await aio.batch_convert(pairs)
+
+        asyncio.run(main())
+
+    def test_cancel_batch(self):
+        aio.configure(max_workers=1)
+        pairs = [(f"in{i}.gpr", f"out{i}.dng") for i in range(5)]
+
+        async def main():
+            batch = asyncio.ensure_future(aio.batch_convert(pairs))
+            await self.wait_for_started(1)
+            batch.cancel()
+            await asyncio.sleep(0.05)
+            self.conversion.release.set()
+            with self.assertRaises(asyncio.CancelledError):
+                await batch
+
+        asyncio.run(main())
+        aio.shutdown()
+        self.assertEqual(self.conversion.started, ["in0.gpr"])
+
+
+class TestMemoryEstimate(unittest.TestCase):
+    """Test the default reservation sizes."""
+
+    def test_estimates(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            gpr = Path(temp_dir) / "image.gpr"
+            gpr.write_bytes(b"\0" * 1000)
+            dng = Path(temp_dir) / "image.dng"
+            dng.write_bytes(b"\0" * 1000)
+            self.assertEqual(aio._estimate_sizes(str(gpr)), (1000, 4000))
+            self.assertEqual(aio._estimate_sizes(dng), (1000, 1000))
+            self.assertEqual(aio._estimate_sizes(os.path.join(temp_dir, "missing.gpr")), (0, 0))
+            self.assertEqual(aio._estimate_sizes(bytearray(10)), (10, 40))
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestAioOnRealData(unittest.TestCase):
+    """Test the awaitable functions on real data."""
+
+    def test_load_and_info(self):
+        expected = _core.get_raw_image_data(str(REAL_GPR_FILE), "uint16")
+
+        async def main():
+            return await asyncio.gather(aio.load(str(REAL_GPR_FILE)), aio.get_info(str(REAL_GPR_FILE)))
+
+        frame, info = asyncio.run(main())
+        np.testing.assert_array_equal(frame, expected)
+        self.assertEqual(info["width"], expected.shape[1])
+
+    def test_batch_convert(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pairs = [(str(REAL_GPR_FILE), os.path.join(temp_dir, f"out{i}.dng")) for i in range(3)]
+            results = asyncio.run(aio.batch_convert(pairs))
+            self.assertEqual(results, [None, None, None])
+            for _, output_path in pairs:
+                self.assertGreater(os.path.getsize(output_path), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
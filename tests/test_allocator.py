@@ -0,0 +1,163 @@
+"""
+Tests for the pluggable native allocator.
+
+The "pool" allocator keeps freed native buffers in size-class free lists
+so repeated decodes reuse them; its hit/miss counters show how often
+that happens.
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    from .test_data import SyntheticDataGenerator
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from test_data import SyntheticDataGenerator
+
+from python_gpr.allocator import (
+    set_allocator,
+    get_allocator,
+    get_allocator_stats,
+    reset_allocator_stats,
+    trim_allocator,
+)
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+MiB = 1024 * 1024
+
+
+class TestAllocatorValidation(unittest.TestCase):
+    """Test argument validation of set_allocator."""
+
+    def test_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            set_allocator("arena")
+
+    def test_invalid_max_bytes(self):
+        with self.assertRaises(ValueError):
+            set_allocator("pool", max_bytes=-1)
+        with self.assertRaises(ValueError):
+            set_allocator("pool", max_bytes=1.5)
+
+    @unittest.skipIf(CORE_AVAILABLE, "Bindings are available")
+    def test_not_implemented_without_bindings(self):
+        with self.assertRaises(NotImplementedError):
+            set_allocator("pool")
+        with self.assertRaises(NotImplementedError):
+            get_allocator_stats()
+
+
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+class TestPoolAllocator(unittest.TestCase):
+    """Test pooling through the file read buffers of native calls."""
+
+    def setUp(self):
+        self.addCleanup(trim_allocator)
+        self.addCleanup(set_allocator, "system")
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        # A header followed by data that does not decode: each call reads the
+        # whole file into a native buffer and frees it again on the error path
+        self.path = os.path.join(self.temp_dir.name, "image.gpr")
+        with open(self.path, "wb") as f:
+            f.write(SyntheticDataGenerator.create_dng_header(64, 48))
+            f.write(b"\x00" * (2 * MiB))
+
+    def _read_file(self):
+        try:
+            _core.get_raw_image_data(self.path, "uint16")
+        except Exception:
+            pass
+
+    def test_select_allocator(self):
+        set_allocator("pool", max_bytes=64 * MiB)
+        self.assertEqual(get_allocator(), "pool")
+        self.assertEqual(get_allocator_stats()["max_bytes"], 64 * MiB)
+        set_allocator("system")
+        self.assertEqual(get_allocator(), "system")
+
+    def test_pool_reuses_buffers(self):
+        set_allocator("pool", max_bytes=64 * MiB)
+        reset_allocator_stats()
+        for _ in range(5):
+            self._read_file()
+        stats = get_allocator_stats()
+        self.assertGreaterEqual(stats["misses"], 1)
+        self.assertGreaterEqual(stats["hits"], 4)
+        self.assertGreater(stats["cached_bytes"], 2 * MiB)
+
+    def test_system_allocator_does_not_cache(self):
+        set_allocator("system")
+        reset_allocator_stats()
+        for _ in range(3):
+            self._read_file()
+        stats = get_allocator_stats()
+        self.assertEqual(stats["hits"], 0)
+        self.assertEqual(stats["cached_bytes"], 0)
+        self.assertEqual(stats["allocations"], stats["frees"])
+        self.assertGreater(stats["peak_in_use_bytes"], 2 * MiB)
+        reset_allocator_stats()
+        self.assertEqual(get_allocator_stats()["peak_in_use_bytes"],
+                         get_allocator_stats()["in_use_bytes"])
+
+    def test_max_bytes_limits_cache(self):
+        set_allocator("pool", max_bytes=1 * MiB)
+        self._read_file()
+        self.assertEqual(get_allocator_stats()["cached_bytes"], 0)
+
+    def test_trim_and_switch_release_cache(self):
+        set_allocator("pool", max_bytes=64 * MiB)
+        self._read_file()
+        self.assertGreater(get_allocator_stats()["cached_bytes"], 0)
+        trim_allocator()
+        self.assertEqual(get_allocator_stats()["cached_blocks"], 0)
+
+        self._read_file()
+        set_allocator("system")
+        self.assertEqual(get_allocator_stats()["cached_bytes"], 0)
+
+
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestPoolAllocatorDecode(unittest.TestCase):
+    """Test the pool on real decodes."""
+
+    def setUp(self):
+        self.addCleanup(trim_allocator)
+        self.addCleanup(set_allocator, "system")
+
+    def test_batch_decode_hits_pool(self):
+        set_allocator("pool")
+        gc.collect()
+        in_use = get_allocator_stats()["in_use_bytes"]
+        reset_allocator_stats()
+
+        for _ in range(4):
+            data = _core.get_raw_image_data(str(REAL_GPR_FILE), "uint16")
+            del data
+        gc.collect()
+
+        stats = get_allocator_stats()
+        self.assertGreater(stats["hits"], 0)
+        # Arrays return their decoder buffers when they are released
+        self.assertEqual(stats["in_use_bytes"], in_use)
+
+
+if __name__ == '__main__':
+    unittest.main()
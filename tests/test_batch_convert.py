@@ -0,0 +1,302 @@
+"""
+Tests for parallel batch conversion.
+
+batch_convert() streams one BatchResult per pair, in input or completion
+order, records per-file errors without stopping the batch and keeps
+aggregate throughput counters.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    from .test_data import SyntheticDataGenerator
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from test_data import SyntheticDataGenerator
+
+from python_gpr import batch
+from python_gpr.batch import batch_convert, BatchStats
+from python_gpr.conversion import GPRParameters
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+
+class FakeConverter:
+    """Writes twice the input to the output; sleeps longer for earlier files."""
+
+    def __init__(self, count):
+        self.count = count
+        self.lock = threading.Lock()
+        self.calls = []
+
+    def __call__(self, input_path, output_path, parameters=None):
+        with self.lock:
+            self.calls.append((input_path, parameters))
+        index = int(Path(input_path).stem.split("_")[1])
+        time.sleep(0.01 * (self.count - index))
+        if "broken" in input_path:
+            raise ValueError(f"Failed to convert {input_path}")
+        data = Path(input_path).read_bytes()
+        Path(output_path).write_bytes(data * 2)
+
+
+class FakeBytesConverter:
+    """In-memory counterpart of FakeConverter; blocks while gate is cleared."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, data, parameters=None):
+        with self.lock:
+            self.calls.append((data, parameters))
+        if not self.gate.wait(10):
+            raise TimeoutError("conversion was never released")
+        if data.startswith(b"broken"):
+            raise ValueError("Failed to convert data")
+        return data * 2
+
+
+class BatchTestCase(unittest.TestCase):
+    """Create GPR inputs and patch the GPR to DNG converter."""
+
+    COUNT = 8
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.pairs = []
+        for i in range(self.COUNT):
+            name = f"broken_{i}" if i == 3 else f"image_{i}"
+            input_path = os.path.join(self.temp_dir.name, f"{name}.gpr")
+            Path(input_path).write_bytes(b"x" * (1000 + i))
+            self.pairs.append((input_path, os.path.join(self.temp_dir.name, f"{name}.dng")))
+
+        self.converter = FakeConverter(self.COUNT)
+        patcher = patch.dict(batch._CONVERTERS, {("gpr", "dng"): self.converter})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class TestBatchConvert(BatchTestCase):
+    """Test ordering, errors and statistics with the thread backend."""
+
+    def test_ordered_results(self):
+        results = list(batch_convert(self.pairs, workers=4))
+        self.assertEqual([r.index for r in results], list(range(self.COUNT)))
+        self.assertEqual([r.input_path for r in results], [p[0] for p in self.pairs])
+
+    def test_unordered_results(self):
+        results = list(batch_convert(self.pairs, workers=self.COUNT, ordered=False))
+        self.assertEqual(sorted(r.index for r in results), list(range(self.COUNT)))
+        # Later files finish first with the fake converter
+        self.assertNotEqual([r.index for r in results], list(range(self.COUNT)))
+
+    def test_errors_do_not_abort(self):
+        results = list(batch_convert(self.pairs, workers=2))
+        failed = [r for r in results if not r.ok]
+        self.assertEqual([r.index for r in failed], [3])
+        self.assertIsInstance(failed[0].error, ValueError)
+        self.assertEqual(sum(r.ok for r in results), self.COUNT - 1)
+
+    def test_stats(self):
+        conversion = batch_convert(self.pairs, workers=4)
+        results = list(conversion)
+        stats = conversion.stats
+        self.assertEqual((stats.files, stats.succeeded, stats.failed), (self.COUNT, self.COUNT - 1, 1))
+        self.assertEqual(stats.bytes_in, sum(r.bytes_in for r in results if r.ok))
+        self.assertEqual(stats.bytes_out, 2 * stats.bytes_in)
+        self.assertGreater(stats.files_per_second, 0)
+        self.assertGreater(stats.mb_per_second, 0)
+        self.assertEqual(stats.to_dict()["failed"], 1)
+
+    def test_lazy_pairs_and_parameters(self):
+        params = GPRParameters(fast_encoding=True)
+        results = list(batch_convert(iter(self.pairs[:2]), workers=1, parameters=params))
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(p is params for _, p in self.converter.calls))
+
+    def test_unsupported_conversion(self):
+        (result,) = batch_convert([(self.pairs[0][0], "out.jpg")], workers=1, target_format="jpg")
+        self.assertIsInstance(result.error, ValueError)
+
+    def test_close_cancels_pending(self):
+        with batch_convert(self.pairs, workers=1) as conversion:
+            next(conversion)
+        self.assertLess(len(self.converter.calls), self.COUNT)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            batch_convert(self.pairs, workers=0)
+        with self.assertRaises(ValueError):
+            batch_convert(self.pairs, backend="gpu")
+        with self.assertRaises(TypeError):
+            batch_convert(self.pairs, parameters={"fast_encoding": True})
+
+    def test_base_class_is_abstract(self):
+        with self.assertRaises(TypeError):
+            batch.BatchConversion(self.pairs, 1, True, None, None)
+
+
+class TestPipelineBackend(unittest.TestCase):
+    """Test the read/convert/write pipeline with an in-memory fake converter."""
+
+    COUNT = 12
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.pairs = []
+        for i in range(self.COUNT):
+            input_path = os.path.join(self.temp_dir.name, f"image_{i}.gpr")
+            Path(input_path).write_bytes((b"broken" if i == 5 else b"image") + b"x" * i)
+            self.pairs.append((input_path, os.path.join(self.temp_dir.name, f"image_{i}.dng")))
+
+        self.converter = FakeBytesConverter()
+        self.addCleanup(self.converter.gate.set)
+        patcher = patch.dict(batch._BYTES_CONVERTERS, {("gpr", "dng"): self.converter})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.reads = []
+        read_file = batch._read_file
+
+        def counting_read(path):
+            self.reads.append(path)
+            return read_file(path)
+
+        patcher = patch.object(batch, "_read_file", counting_read)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_ordered_results_and_outputs(self):
+        results = list(batch_convert(self.pairs, workers=3, backend="pipeline"))
+        self.assertEqual([r.index for r in results], list(range(self.COUNT)))
+        for result in results:
+            if result.ok:
+                data = Path(result.input_path).read_bytes()
+                self.assertEqual(Path(result.output_path).read_bytes(), data * 2)
+                self.assertEqual((result.bytes_in, result.bytes_out), (len(data), 2 * len(data)))
+        self.assertEqual([r.index for r in results if not r.ok], [5])
+
+    def test_formats_are_sniffed_from_read_data(self):
+        # The convert stage must not open the inputs a second time
+        with patch.object(batch, "detect_format", side_effect=AssertionError("file opened")):
+            results = list(batch_convert(self.pairs, workers=3, backend="pipeline"))
+        self.assertEqual(sum(r.ok for r in results), self.COUNT - 1)
+        self.assertEqual(len(self.reads), self.COUNT)
+
+    def test_unordered_results(self):
+        results = list(batch_convert(self.pairs, workers=3, backend="pipeline", ordered=False))
+        self.assertEqual(sorted(r.index for r in results), list(range(self.COUNT)))
+
+    def test_read_and_write_errors(self):
+        pairs = [(os.path.join(self.temp_dir.name, "missing.gpr"), os.path.join(self.temp_dir.name, "a.dng")),
+                 (self.pairs[0][0], os.path.join(self.temp_dir.name, "no_dir", "b.dng")),
+                 self.pairs[1]]
+        conversion = batch_convert(pairs, workers=2, backend="pipeline", io_threads=1)
+        results = list(conversion)
+        self.assertIsInstance(results[0].error, FileNotFoundError)
+        self.assertIsInstance(results[1].error, FileNotFoundError)
+        self.assertTrue(results[2].ok)
+        self.assertEqual((conversion.stats.succeeded, conversion.stats.failed), (1, 2))
+
+    def test_parameters(self):
+        params = GPRParameters(fast_encoding=True)
+        list(batch_convert(self.pairs[:2], workers=1, backend="pipeline", parameters=params))
+        self.assertTrue(all(p is params for _, p in self.converter.calls))
+
+    def test_read_ahead_is_bounded(self):
+        self.converter.gate.clear()
+        conversion = batch_convert(self.pairs, workers=1, backend="pipeline",
+                                   io_threads=1, read_ahead=2, write_behind=1)
+        consumer = threading.Thread(target=lambda: list(conversion))
+        consumer.start()
+        time.sleep(0.3)
+        # One buffer in the converter, two queued, one held by the reader
+        self.assertLessEqual(len(self.reads), 4)
+        self.converter.gate.set()
+        consumer.join(10)
+        self.assertEqual(conversion.stats.files, self.COUNT)
+
+    def test_close_stops_pipeline(self):
+        with batch_convert(self.pairs, workers=1, backend="pipeline", io_threads=1,
+                           read_ahead=1, write_behind=1) as conversion:
+            next(conversion)
+        self.assertLess(len(self.converter.calls), self.COUNT)
+        self.assertFalse(any(thread.is_alive() for thread in conversion._threads))
+
+    def test_invalid_sizes(self):
+        for kwargs in ({"io_threads": 0}, {"read_ahead": 0}, {"write_behind": -1}, {"read_ahead": 1.5}):
+            with self.assertRaises(ValueError):
+                batch_convert(self.pairs, backend="pipeline", **kwargs)
+
+
+class TestProcessBackend(unittest.TestCase):
+    """Test that per-file errors come back from worker processes."""
+
+    def test_errors_from_processes(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_path = os.path.join(temp_dir, "image.gpr")
+            Path(input_path).write_bytes(SyntheticDataGenerator.create_dng_header(64, 48))
+            pairs = [(os.path.join(temp_dir, "missing.gpr"), os.path.join(temp_dir, "out0.dng")),
+                     (input_path, os.path.join(temp_dir, "out1.txt"))]
+            results = list(batch_convert(pairs, workers=2, backend="process",
+                                         parameters=GPRParameters(fast_encoding=True)))
+        self.assertEqual([r.index for r in results], [0, 1])
+        self.assertIsInstance(results[0].error, FileNotFoundError)
+        self.assertIsInstance(results[1].error, ValueError)
+
+    def test_parameters_pickle_without_native_copy(self):
+        import pickle
+        params = GPRParameters(fast_encoding=True)
+        params._core = object()
+        restored = pickle.loads(pickle.dumps(params))
+        self.assertTrue(restored["fast_encoding"])
+        self.assertIsNone(restored._core)
+
+
+class TestBatchStats(unittest.TestCase):
+    """Test rates of an empty batch."""
+
+    def test_empty(self):
+        stats = BatchStats()
+        self.assertEqual((stats.files_per_second, stats.mb_per_second), (0.0, 0.0))
+        self.assertEqual(list(batch_convert([], workers=1)), [])
+
+
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestBatchConvertOnRealData(unittest.TestCase):
+    """Convert real data with every backend."""
+
+    def test_backends(self):
+        for backend in ("thread", "process", "pipeline"):
+            with tempfile.TemporaryDirectory() as temp_dir:
+                pairs = [(str(REAL_GPR_FILE), os.path.join(temp_dir, f"out{i}.dng")) for i in range(4)]
+                conversion = batch_convert(pairs, workers=2, backend=backend)
+                results = list(conversion)
+                self.assertTrue(all(r.ok for r in results), results)
+                print(f"\n{backend}: {conversion.stats}")
+
+
+if __name__ == '__main__':
+    unittest.main()
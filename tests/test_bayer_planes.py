@@ -0,0 +1,124 @@
+"""
+Tests for splitting the CFA mosaic into Bayer planes.
+
+GPRImage.to_bayer_planes() returns R, G1, G2 and B as strided views of one
+decoded mosaic; to_numpy(layout="planes") has the decoder write the four
+planes contiguously in the same order.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    from .test_data import SyntheticDataGenerator
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from test_data import SyntheticDataGenerator
+
+from python_gpr.core import GPRImage, BAYER_PLANES, _bayer_plane_offsets
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+
+class TestPlaneOffsets(unittest.TestCase):
+    """Test the CFA position of each plane."""
+
+    def test_patterns(self):
+        self.assertEqual(BAYER_PLANES, ("R", "G1", "G2", "B"))
+        self.assertEqual(_bayer_plane_offsets("RGGB"), ((0, 0), (0, 1), (1, 0), (1, 1)))
+        self.assertEqual(_bayer_plane_offsets("GRBG"), ((0, 1), (0, 0), (1, 1), (1, 0)))
+        self.assertEqual(_bayer_plane_offsets("GBRG"), ((1, 0), (1, 1), (0, 0), (0, 1)))
+        self.assertEqual(_bayer_plane_offsets("BGGR"), ((1, 1), (1, 0), (0, 1), (0, 0)))
+
+    def test_unknown_pattern_defaults_to_rggb(self):
+        self.assertEqual(_bayer_plane_offsets(""), _bayer_plane_offsets("RGGB"))
+
+    def test_non_bayer_pattern(self):
+        with self.assertRaises(ValueError):
+            _bayer_plane_offsets("RGBG")
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+class TestLayoutValidation(unittest.TestCase):
+    """Test argument validation of to_numpy(layout=...)."""
+
+    def setUp(self):
+        with tempfile.NamedTemporaryFile(suffix=".gpr", delete=False) as f:
+            f.write(SyntheticDataGenerator.create_dng_header(64, 48))
+        self.addCleanup(os.unlink, f.name)
+        self.img = GPRImage(f.name)
+        self.addCleanup(self.img.close)
+
+    def test_unknown_layout(self):
+        with self.assertRaises(ValueError):
+            self.img.to_numpy(layout="interleaved")
+
+    def test_planes_need_full_resolution(self):
+        with self.assertRaises(ValueError):
+            self.img.to_numpy("uint8", resolution="quarter", layout="planes")
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestBayerPlanesOnRealData(unittest.TestCase):
+    """Test plane views and planar decoding against the mosaic."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.mosaic = _core.get_raw_image_data(str(REAL_GPR_FILE), "uint16")
+        cls.offsets = _bayer_plane_offsets(_core.get_image_info(str(REAL_GPR_FILE)).cfa_pattern)
+
+    def test_views_share_one_buffer(self):
+        with GPRImage(str(REAL_GPR_FILE)) as img:
+            planes = img.to_bayer_planes()
+        base = planes[0].base
+        for plane, (row, col) in zip(planes, self.offsets):
+            self.assertIs(plane.base, base)
+            np.testing.assert_array_equal(plane, self.mosaic[row::2, col::2])
+
+    def test_planar_decode_matches_views(self):
+        with GPRImage(str(REAL_GPR_FILE)) as img:
+            planar = img.to_numpy(layout="planes")
+            views = img.to_bayer_planes()
+        height, width = self.mosaic.shape
+        self.assertEqual(planar.shape, (4, height // 2, width // 2))
+        self.assertTrue(planar.flags["C_CONTIGUOUS"])
+        for plane, view in zip(planar, views):
+            np.testing.assert_array_equal(plane, view)
+
+    def test_planar_sensor_normalization(self):
+        expected = _core.get_raw_image_data(str(REAL_GPR_FILE), "float32", None, "sensor")
+        with GPRImage(str(REAL_GPR_FILE)) as img:
+            planes = img.to_bayer_planes("float32", normalize="sensor", contiguous=True)
+        for plane, (row, col) in zip(planes, self.offsets):
+            np.testing.assert_array_equal(plane, expected[row::2, col::2])
+
+    def test_planar_decode_into_out(self):
+        height, width = self.mosaic.shape
+        out = np.empty((4, height // 2, width // 2), dtype=np.uint16)
+        self.assertIs(_core.get_raw_image_planes(str(REAL_GPR_FILE), "uint16", out), out)
+        with self.assertRaises(_core.GPRParameterError):
+            _core.get_raw_image_planes(str(REAL_GPR_FILE), "uint16", np.empty((4, 2, 2), dtype=np.uint16))
+
+
+if __name__ == '__main__':
+    unittest.main()
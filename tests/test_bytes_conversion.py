@@ -0,0 +1,153 @@
+"""
+Tests for the in-memory (buffer-protocol) conversion API.
+
+These tests verify that the *_bytes conversion functions accept any
+buffer-protocol object, validate their input and map native errors,
+without touching the filesystem.
+"""
+
+import mmap
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import python_gpr
+from python_gpr.conversion import (
+    convert_gpr_to_dng_bytes,
+    convert_dng_to_gpr_bytes,
+    convert_gpr_to_raw_bytes,
+    convert_dng_to_dng_bytes,
+)
+from python_gpr.core import GPRImage
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+
+def make_fake_core(**functions):
+    """Create a stand-in for the _core extension module."""
+    module = types.ModuleType("python_gpr._core")
+    for name, func in functions.items():
+        setattr(module, name, func)
+    return module
+
+
+class TestBytesConversionValidation(unittest.TestCase):
+    """Test argument validation of the bytes conversion functions."""
+
+    def test_rejects_non_buffer_input(self):
+        """Objects without the buffer protocol should raise TypeError."""
+        for func in (convert_gpr_to_dng_bytes, convert_dng_to_gpr_bytes,
+                     convert_gpr_to_raw_bytes, convert_dng_to_dng_bytes):
+            with self.assertRaises(TypeError):
+                func("not bytes")
+            with self.assertRaises(TypeError):
+                func(12345)
+
+    @unittest.skipIf(CORE_AVAILABLE, "Bindings are available")
+    def test_not_implemented_without_bindings(self):
+        """Without the extension module the functions raise NotImplementedError."""
+        with self.assertRaises(NotImplementedError):
+            convert_gpr_to_dng_bytes(b"data")
+
+
+class TestBytesConversionDispatch(unittest.TestCase):
+    """Test the bytes conversion functions against a fake native module."""
+
+    def setUp(self):
+        self.calls = []
+
+        def fake_convert(tag):
+            def convert(data):
+                self.calls.append((tag, bytes(memoryview(data))))
+                return tag.encode() + b":" + bytes(memoryview(data))
+            return convert
+
+        self.fake_core = make_fake_core(
+            convert_gpr_to_dng_bytes=fake_convert("dng"),
+            convert_dng_to_gpr_bytes=fake_convert("gpr"),
+            convert_gpr_to_raw_bytes=fake_convert("raw"),
+            convert_dng_to_dng_bytes=fake_convert("dng2"),
+        )
+        for patcher in (patch.dict(sys.modules, {"python_gpr._core": self.fake_core}),
+                        patch.object(python_gpr, "_core", self.fake_core, create=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_dispatches_to_matching_native_function(self):
+        """Each wrapper calls the matching native function."""
+        self.assertEqual(convert_gpr_to_dng_bytes(b"abc"), b"dng:abc")
+        self.assertEqual(convert_dng_to_gpr_bytes(b"abc"), b"gpr:abc")
+        self.assertEqual(convert_gpr_to_raw_bytes(b"abc"), b"raw:abc")
+        self.assertEqual(convert_dng_to_dng_bytes(b"abc"), b"dng2:abc")
+
+    def test_accepts_buffer_protocol_objects(self):
+        """bytes, bytearray, memoryview and mmap are all accepted."""
+        payload = b"payload"
+        with tempfile.TemporaryFile() as f:
+            f.write(payload)
+            f.flush()
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                inputs = [payload, bytearray(payload), memoryview(payload), mapped]
+                for data in inputs:
+                    self.assertEqual(convert_gpr_to_dng_bytes(data), b"dng:" + payload)
+            finally:
+                mapped.close()
+
+    def test_native_errors_become_value_errors(self):
+        """Errors raised by the native function are reported as ValueError."""
+        def failing(data):
+            raise RuntimeError("decoder exploded")
+
+        self.fake_core.convert_gpr_to_dng_bytes = failing
+        with self.assertRaises(ValueError) as cm:
+            convert_gpr_to_dng_bytes(b"abc")
+        self.assertIn("decoder exploded", str(cm.exception))
+
+    def test_gpr_image_bytes_methods(self):
+        """GPRImage exposes in-memory conversions of its file contents."""
+        with tempfile.NamedTemporaryFile(suffix=".gpr", delete=False) as f:
+            f.write(b"contents")
+        try:
+            with GPRImage(f.name) as img:
+                self.assertEqual(img.to_dng_bytes(), b"dng:contents")
+                self.assertEqual(img.to_raw_bytes(), b"raw:contents")
+            with self.assertRaises(ValueError):
+                img.to_dng_bytes()
+        finally:
+            Path(f.name).unlink()
+
+
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestBytesConversionNative(unittest.TestCase):
+    """Test the native bytes conversion functions on real data."""
+
+    def test_gpr_to_dng_bytes_matches_file_conversion(self):
+        """Converting in memory gives the same result as converting via files."""
+        data = REAL_GPR_FILE.read_bytes()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = Path(temp_dir) / "output.dng"
+            _core.convert_gpr_to_dng(str(REAL_GPR_FILE), str(output_path))
+            self.assertEqual(_core.convert_gpr_to_dng_bytes(data), output_path.read_bytes())
+
+    def test_empty_buffer_rejected(self):
+        """An empty buffer is a parameter error, not a crash."""
+        with self.assertRaises(Exception):
+            _core.convert_gpr_to_dng_bytes(b"")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,204 @@
+"""
+Tests for the python-gpr command line.
+
+The subcommands are run in-process through cli.main() with the decoding
+and conversion functions replaced, so they do not need the native module.
+"""
+
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from python_gpr import batch, cli
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+
+def fake_info(path):
+    if "broken" in path:
+        raise ValueError("Failed to get image info")
+    return {"width": 64, "height": 48, "format": "gpr", "cfa_pattern": "RGGB", "bit_depth": 12}
+
+
+def fake_convert(input_path, output_path, parameters=None):
+    Path(output_path).write_bytes(Path(input_path).read_bytes() * 2)
+
+
+class CLITestCase(unittest.TestCase):
+    """Create input files and run the command line in-process."""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.dir = Path(temp_dir.name)
+        self.inputs = []
+        for relpath in ("a.GPR", "b.GPR", "day1/c.GPR"):
+            path = self.dir / relpath
+            path.parent.mkdir(exist_ok=True)
+            path.write_bytes(b"x" * 100)
+            self.inputs.append(str(path))
+
+    def run_cli(self, *argv, stdin=None):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr), \
+                patch.object(sys, "stdin", io.StringIO(stdin or "")):
+            status = cli.main(list(argv))
+        return status, stdout.getvalue(), stderr.getvalue()
+
+
+class TestInputs(CLITestCase):
+    """Test glob and stdin input lists."""
+
+    def test_recursive_glob(self):
+        paths = list(cli._expand_inputs([str(self.dir / "**" / "*.GPR")]))
+        self.assertEqual(sorted(paths), sorted(self.inputs))
+
+    def test_stdin(self):
+        stdin = io.StringIO(f"{self.inputs[0]}\n\n  {self.inputs[1]}  \n")
+        self.assertEqual(list(cli._expand_inputs(["-"], stdin)), self.inputs[:2])
+        stdin = io.StringIO(self.inputs[2])
+        self.assertEqual(list(cli._expand_inputs([], stdin)), self.inputs[2:])
+
+    def test_literal_path_and_unmatched_glob(self):
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            paths = list(cli._expand_inputs(["missing.gpr", str(self.dir / "*.dng")]))
+        self.assertEqual(paths, ["missing.gpr"])
+        self.assertIn("no files match", stderr.getvalue())
+
+
+class TestCommands(CLITestCase):
+    """Test each subcommand's output, statistics and exit status."""
+
+    def test_convert(self):
+        output_dir = self.dir / "out"
+        with patch.dict(batch._CONVERTERS, {("gpr", "dng"): fake_convert}):
+            status, stdout, stderr = self.run_cli("convert", "-j", "2", "-o", str(output_dir),
+                                                  str(self.dir / "*.GPR"))
+        self.assertEqual(status, 0)
+        self.assertEqual(sorted(os.listdir(output_dir)), ["a.dng", "b.dng"])
+        self.assertEqual(len(stdout.splitlines()), 2)
+        self.assertIn("convert: 2 file(s), 2 ok, 0 failed", stderr)
+        self.assertIn("latency ms: p50", stderr)
+
+    def test_same_name_in_different_directories(self):
+        other = self.dir / "day2" / "a.GPR"
+        other.parent.mkdir()
+        other.write_bytes(b"y" * 100)
+        output_dir = self.dir / "out"
+        with patch.dict(batch._CONVERTERS, {("gpr", "dng"): fake_convert}):
+            status, stdout, stderr = self.run_cli("convert", "-o", str(output_dir), self.inputs[0], str(other))
+        self.assertEqual(status, 1)
+        self.assertEqual((output_dir / "a.dng").read_bytes(), b"x" * 200)
+        self.assertIn(f"{other}: {other} and {self.inputs[0]} convert to the same output", stderr)
+        self.assertIn("1 ok, 1 failed", stderr)
+
+    @unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+    def test_thumb_same_name_in_different_directories(self):
+        other = self.dir / "day2" / "a.GPR"
+        other.parent.mkdir()
+        other.write_bytes(b"y" * 100)
+        rgb = np.zeros((6, 8, 3), dtype=np.uint8)
+        with patch.object(cli, "decode_preview", return_value=rgb) as decode:
+            status, _, stderr = self.run_cli("thumb", "-o", str(self.dir / "thumbs"), self.inputs[0], str(other))
+        self.assertEqual(status, 1)
+        decode.assert_called_once()
+        self.assertIn("convert to the same output", stderr)
+
+    def test_convert_failure_sets_status(self):
+        status, _, stderr = self.run_cli("convert", "-q", str(self.dir / "missing.GPR"))
+        self.assertEqual(status, 1)
+        self.assertIn("missing.GPR", stderr)
+        self.assertIn("1 failed", stderr)
+
+    def test_info_json_from_stdin(self):
+        broken = self.dir / "broken.GPR"
+        broken.write_bytes(b"")
+        with patch.object(cli, "get_info", fake_info):
+            status, stdout, stderr = self.run_cli("info", "--json", "--no-stats",
+                                                  stdin="\n".join(self.inputs + [str(broken)]))
+        self.assertEqual(status, 1)
+        records = [json.loads(line) for line in stdout.splitlines()]
+        self.assertEqual([r["path"] for r in records], self.inputs)
+        self.assertEqual(records[0]["width"], 64)
+        self.assertIn("broken.GPR: Failed to get image info", stderr)
+        self.assertNotIn("file(s)", stderr)
+
+    @unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+    def test_thumb_ppm(self):
+        rgb = np.arange(6 * 8 * 3, dtype=np.uint8).reshape(6, 8, 3)
+        with patch.object(cli, "decode_preview", return_value=rgb) as decode:
+            status, stdout, _ = self.run_cli("thumb", "-r", "sixteenth", "-o", str(self.dir / "thumbs"),
+                                             self.inputs[0])
+        self.assertEqual(status, 0)
+        decode.assert_called_once_with(self.inputs[0], "sixteenth", "uint8")
+        data = (self.dir / "thumbs" / "a.thumb.ppm").read_bytes()
+        self.assertEqual(data, b"P6\n8 6\n255\n" + rgb.tobytes())
+
+    @unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+    def test_verify(self):
+        def fake_load(path, dtype, out, normalize):
+            return np.zeros((48, 64) if "a.GPR" in path else (47, 64), np.uint16)
+
+        with patch.object(cli, "get_info", fake_info), patch.object(cli, "load_gpr_as_numpy", fake_load):
+            status, stdout, stderr = self.run_cli("verify", *self.inputs[:2])
+        self.assertEqual(status, 1)
+        self.assertIn("a.GPR: OK (64x48)", stdout)
+        self.assertIn("header says 64x48", stderr)
+
+    def test_invalid_jobs(self):
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit) as cm:
+                cli.main(["info", "-j", "0", "x.gpr"])
+        self.assertEqual(cm.exception.code, 2)
+
+
+class TestModuleEntryPoint(unittest.TestCase):
+    """Test python -m python_gpr."""
+
+    def test_help(self):
+        env = dict(os.environ, PYTHONPATH=str(Path(__file__).parent.parent / "src"))
+        result = subprocess.run([sys.executable, "-W", "ignore", "-m", "python_gpr", "--help"],
+                                capture_output=True, text=True, env=env, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        for command in ("convert", "info", "thumb", "verify"):
+            self.assertIn(command, result.stdout)
+
+
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestCLIOnRealData(CLITestCase):
+    """Run the subcommands on real data."""
+
+    def test_commands(self):
+        path = str(REAL_GPR_FILE)
+        self.assertEqual(self.run_cli("info", path)[0], 0)
+        self.assertEqual(self.run_cli("verify", path)[0], 0)
+        self.assertEqual(self.run_cli("thumb", "-o", str(self.dir), path)[0], 0)
+        self.assertEqual(self.run_cli("convert", "-o", str(self.dir), path)[0], 0)
+        self.assertTrue((self.dir / (REAL_GPR_FILE.stem + ".dng")).exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
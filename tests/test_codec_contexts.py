@@ -0,0 +1,168 @@
+"""
+Tests for the reusable GPRDecoder / GPREncoder context objects.
+
+A context keeps its parameters and buffers between calls, so decoding or
+encoding many files only pays the setup cost once. Each thread uses its
+own context.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    from .test_data import SyntheticDataGenerator
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from test_data import SyntheticDataGenerator
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+class TestContextConstruction(unittest.TestCase):
+    """Test context construction and argument validation."""
+
+    def test_decoder_defaults(self):
+        decoder = _core.GPRDecoder()
+        self.assertEqual(decoder.dtype, "uint16")
+        self.assertEqual(decoder.decode_count, 0)
+        self.assertEqual(decoder.buffer_bytes, 0)
+
+    def test_decoder_invalid_arguments(self):
+        with self.assertRaises(_core.GPRParameterError):
+            _core.GPRDecoder("int8")
+        with self.assertRaises(_core.GPRParameterError):
+            _core.GPRDecoder("float16", None)
+        with self.assertRaises(_core.GPRParameterError):
+            _core.GPRDecoder("float32", "linear")
+
+    def test_encoder_defaults(self):
+        encoder = _core.GPREncoder()
+        self.assertEqual(encoder.format, "gpr")
+        self.assertFalse(encoder.fast_encoding)
+        self.assertTrue(_core.GPREncoder("dng", fast_encoding=True).fast_encoding)
+
+    def test_encoder_invalid_arguments(self):
+        with self.assertRaises(_core.GPRParameterError):
+            _core.GPREncoder("jpg")
+
+    @unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+    def test_encoder_rejects_non_2d_input(self):
+        with self.assertRaises(_core.GPRParameterError):
+            _core.GPREncoder().encode(np.zeros(16, dtype=np.uint16))
+
+
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+class TestDecoderSources(unittest.TestCase):
+    """Test the sources a decoder accepts."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.header = SyntheticDataGenerator.create_dng_header(640, 480, cfa_pattern="GBRG")
+        self.path = Path(self.temp_dir.name) / "image.gpr"
+        self.path.write_bytes(self.header)
+        self.decoder = _core.GPRDecoder()
+
+    def test_info_from_path_and_buffer(self):
+        for source in (str(self.path), self.path, self.header, bytearray(self.header)):
+            info = self.decoder.info(source)
+            self.assertEqual((info.width, info.height), (640, 480))
+            self.assertEqual(info.cfa_pattern, "GBRG")
+
+    def test_invalid_sources(self):
+        with self.assertRaises(_core.GPRParameterError):
+            self.decoder.decode(12345)
+        with self.assertRaises(_core.GPRParameterError):
+            self.decoder.decode(b"")
+        with self.assertRaises(_core.GPRFileError):
+            self.decoder.decode(os.path.join(self.temp_dir.name, "missing.gpr"))
+
+    def test_failed_decode_leaves_decoder_usable(self):
+        for _ in range(2):
+            with self.assertRaises(Exception):
+                self.decoder.decode(str(self.path))
+        self.assertEqual(self.decoder.decode_count, 0)
+        self.assertEqual(self.decoder.info(str(self.path)).width, 640)
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestContextsOnRealData(unittest.TestCase):
+    """Test decoding and encoding real data with contexts."""
+
+    def test_decode_matches_one_shot_api(self):
+        expected = _core.get_raw_image_data(str(REAL_GPR_FILE), "uint16")
+        decoder = _core.GPRDecoder()
+        np.testing.assert_array_equal(decoder.decode(str(REAL_GPR_FILE)), expected)
+        np.testing.assert_array_equal(decoder.decode(REAL_GPR_FILE.read_bytes()), expected)
+        self.assertEqual(decoder.decode_count, 2)
+        self.assertEqual(decoder.last_info.width, expected.shape[1])
+
+    def test_buffers_are_reused(self):
+        decoder = _core.GPRDecoder("float32", "sensor")
+        decoder.decode(str(REAL_GPR_FILE))
+        held = decoder.buffer_bytes
+        self.assertGreater(held, 0)
+        for _ in range(3):
+            decoder.decode(str(REAL_GPR_FILE))
+        self.assertEqual(decoder.buffer_bytes, held)
+        decoder.release()
+        self.assertEqual(decoder.buffer_bytes, 0)
+
+    def test_float_decode_matches_one_shot_api(self):
+        expected = _core.get_raw_image_data(str(REAL_GPR_FILE), "float32", None, "sensor")
+        decoder = _core.GPRDecoder("float32", "sensor")
+        out = np.empty_like(expected)
+        self.assertIs(decoder.decode(str(REAL_GPR_FILE), out), out)
+        np.testing.assert_array_equal(out, expected)
+
+    def test_to_dng_matches_bytes_conversion(self):
+        data = REAL_GPR_FILE.read_bytes()
+        decoder = _core.GPRDecoder()
+        self.assertEqual(decoder.to_dng(data), _core.convert_gpr_to_dng_bytes(data))
+
+    def test_one_decoder_per_thread(self):
+        expected = _core.get_raw_image_data(str(REAL_GPR_FILE), "uint16")
+        decoders = [_core.GPRDecoder() for _ in range(4)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda d: d.decode(str(REAL_GPR_FILE)), decoders))
+        for result in results:
+            np.testing.assert_array_equal(result, expected)
+
+    def test_encode_round_trip(self):
+        raw = _core.get_raw_image_data(str(REAL_GPR_FILE), "uint16")
+        encoder = _core.GPREncoder()
+        encoded = encoder.encode(raw)
+        self.assertEqual(encoder.encode_count, 1)
+        decoded = _core.GPRDecoder().decode(encoded)
+        self.assertEqual(decoded.shape, raw.shape)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "encoded.gpr")
+            encoder.encode_to_file(raw, output_path)
+            self.assertEqual(Path(output_path).read_bytes(), encoded)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -96,11 +96,12 @@ class TestGPRImage(unittest.TestCase):
         """Test that conversion methods raise NotImplementedError."""
         gpr_img = GPRImage(self.temp_file.name)
         
-        with self.assertRaises(NotImplementedError):
-            gpr_img.to_dng("output.dng")
-            
-        with self.assertRaises(NotImplementedError):
-            gpr_img.to_raw("output.raw")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with self.assertRaises(NotImplementedError):
+                gpr_img.to_dng(os.path.join(temp_dir, "output.dng"))
+                
+            with self.assertRaises(NotImplementedError):
+                gpr_img.to_raw(os.path.join(temp_dir, "output.raw"))
 
 
 class TestGPRInfo(unittest.TestCase):
@@ -245,6 +245,117 @@ class SyntheticDataGenerator:
                 full_data = (dummy_data * ((pixel_count // len(dummy_data)) + 1))[:pixel_count]
                 f.write(full_data)
     
+    # TIFF field types used by create_dng_header: (type code, struct format)
+    _TIFF_TYPES = {
+        "BYTE": (1, "B"),
+        "ASCII": (2, "s"),
+        "SHORT": (3, "H"),
+        "LONG": (4, "I"),
+        "RATIONAL": (5, "II"),
+    }
+    
+    @staticmethod
+    def _pack_ifd(entries: List[Tuple[int, str, list]], offset: int,
+                  next_offset: int, byte_order: str) -> bytes:
+        """Pack a TIFF IFD located at offset, with out-of-line values after it."""
+        entries = sorted(entries, key=lambda entry: entry[0])
+        table_size = 2 + 12 * len(entries) + 4
+        table = struct.pack(byte_order + "H", len(entries))
+        extra = b""
+        
+        for tag, type_name, values in entries:
+            type_code, fmt = SyntheticDataGenerator._TIFF_TYPES[type_name]
+            if type_name == "ASCII":
+                data = values.encode("ascii") + b"\x00"
+                count = len(data)
+            elif type_name == "RATIONAL":
+                data = b"".join(struct.pack(byte_order + fmt, *value) for value in values)
+                count = len(values)
+            else:
+                data = struct.pack(byte_order + fmt * len(values), *values)
+                count = len(values)
+            
+            if len(data) <= 4:
+                value_field = data.ljust(4, b"\x00")
+            else:
+                value_field = struct.pack(byte_order + "I", offset + table_size + len(extra))
+                extra += data + (b"\x00" if len(data) % 2 else b"")
+            table += struct.pack(byte_order + "HHI", tag, type_code, count) + value_field
+        
+        table += struct.pack(byte_order + "I", next_offset)
+        return table + extra
+    
+    @staticmethod
+    def create_dng_header(width: int = 64, height: int = 48, cfa_pattern: str = "RGGB",
+                          bits_per_sample: int = 16, compression: int = 9,
+                          byte_order: str = "<", raw_in_sub_ifd: bool = False,
+                          black_level: Optional[List[int]] = None,
+                          white_level: Optional[int] = None) -> bytes:
+        """Create the TIFF/DNG header of a GPR-like file.
+        
+        Only the header and IFDs are generated; there is no image data, which is
+        enough to exercise header parsing and format sniffing.
+        
+        Args:
+            width: Width of the raw image
+            height: Height of the raw image
+            cfa_pattern: CFA layout such as 'RGGB' (empty for no CFA tags)
+            bits_per_sample: BitsPerSample of the raw image
+            compression: TIFF compression code (9 = VC-5 as used by GPR, 1 = none)
+            byte_order: '<' for little endian ('II'), '>' for big endian ('MM')
+            raw_in_sub_ifd: Store a preview in IFD0 and the raw image in a SubIFD
+            black_level: BlackLevel values, one or four (2x2 repeat), or None to omit
+            white_level: WhiteLevel value, or None to omit
+        
+        Returns:
+            The header bytes
+        """
+        color_codes = {"R": 0, "G": 1, "B": 2}
+        raw_entries = [
+            (254, "LONG", [0]),
+            (256, "LONG", [width]),
+            (257, "LONG", [height]),
+            (258, "SHORT", [bits_per_sample]),
+            (259, "SHORT", [compression]),
+            (262, "SHORT", [32803]),
+            (277, "SHORT", [1]),
+        ]
+        if cfa_pattern:
+            raw_entries.append((33421, "SHORT", [2, 2]))
+            raw_entries.append((33422, "BYTE", [color_codes[c] for c in cfa_pattern]))
+        if black_level is not None:
+            if len(black_level) == 4:
+                raw_entries.append((50713, "SHORT", [2, 2]))
+            raw_entries.append((50714, "LONG", list(black_level)))
+        if white_level is not None:
+            raw_entries.append((50717, "LONG", [white_level]))
+        
+        dng_entries = [
+            (271, "ASCII", "GoPro"),
+            (50706, "BYTE", [1, 4, 0, 0]),
+        ]
+        
+        magic = b"II" if byte_order == "<" else b"MM"
+        header = magic + struct.pack(byte_order + "HI", 42, 8)
+        pack_ifd = SyntheticDataGenerator._pack_ifd
+        
+        if not raw_in_sub_ifd:
+            return header + pack_ifd(raw_entries + dng_entries, 8, 0, byte_order)
+        
+        preview_entries = [
+            (254, "LONG", [1]),
+            (256, "LONG", [max(width // 8, 1)]),
+            (257, "LONG", [max(height // 8, 1)]),
+            (258, "SHORT", [8, 8, 8]),
+            (259, "SHORT", [1]),
+            (262, "SHORT", [2]),
+            (277, "SHORT", [3]),
+        ] + dng_entries
+        # Pack once to learn the size of IFD0, then again with the SubIFD offset
+        ifd0_size = len(pack_ifd(preview_entries + [(330, "LONG", [0])], 8, 0, byte_order))
+        ifd0 = pack_ifd(preview_entries + [(330, "LONG", [8 + ifd0_size])], 8, 0, byte_order)
+        return header + ifd0 + pack_ifd(raw_entries, 8 + ifd0_size, 0, byte_order)
+    
     @staticmethod
     def create_test_data_set(output_dir: Path) -> List[str]:
         """Create a comprehensive set of synthetic test data.
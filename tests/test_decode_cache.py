@@ -0,0 +1,230 @@
+"""
+Tests for the process-wide decode cache.
+
+With the cache enabled, repeated decodes of an unchanged file with the same
+options return the same read-only array; the cache is bounded by bytes and
+evicts the least recently used entries.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    from .test_data import SyntheticDataGenerator
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from test_data import SyntheticDataGenerator
+
+from python_gpr.cache import (
+    cached_decode,
+    enable_decode_cache,
+    disable_decode_cache,
+    clear_decode_cache,
+    get_decode_cache_stats,
+)
+from python_gpr.core import GPRImage, load_gpr_as_numpy
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+KiB = 1024
+
+
+class TestCacheConfiguration(unittest.TestCase):
+    """Test enabling, disabling and validating the cache."""
+
+    def setUp(self):
+        self.addCleanup(disable_decode_cache)
+
+    def test_disabled_by_default(self):
+        disable_decode_cache()
+        self.assertFalse(get_decode_cache_stats()["enabled"])
+
+    def test_enable(self):
+        enable_decode_cache(max_bytes=64 * KiB)
+        stats = get_decode_cache_stats()
+        self.assertTrue(stats["enabled"])
+        self.assertEqual(stats["max_bytes"], 64 * KiB)
+        self.assertEqual(stats["entries"], 0)
+
+    def test_invalid_max_bytes(self):
+        with self.assertRaises(ValueError):
+            enable_decode_cache(max_bytes=-1)
+        with self.assertRaises(ValueError):
+            enable_decode_cache(max_bytes=1.5)
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+class TestCachedDecode(unittest.TestCase):
+    """Test keys, LRU eviction and statistics with a counting decode function."""
+
+    def setUp(self):
+        self.addCleanup(disable_decode_cache)
+        enable_decode_cache(max_bytes=64 * KiB)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.paths = []
+        for i in range(4):
+            path = os.path.join(self.temp_dir.name, f"image{i}.gpr")
+            with open(path, "wb") as f:
+                f.write(b"contents %d" % i)
+            self.paths.append(path)
+        self.decodes = 0
+
+    def _decode(self, path, dtype="uint16", size=4 * KiB):
+        def decode():
+            self.decodes += 1
+            return np.zeros(size // 2, dtype=np.uint16)
+        return cached_decode(path, (dtype,), decode)
+
+    def test_hit_returns_read_only_array(self):
+        first = self._decode(self.paths[0])
+        second = self._decode(self.paths[0])
+        self.assertIs(first, second)
+        self.assertFalse(first.flags.writeable)
+        self.assertEqual(self.decodes, 1)
+        stats = get_decode_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["current_bytes"], 4 * KiB)
+
+    def test_options_are_part_of_key(self):
+        self._decode(self.paths[0], "uint16")
+        self._decode(self.paths[0], "float32")
+        self.assertEqual(self.decodes, 2)
+
+    def test_modified_file_is_decoded_again(self):
+        self._decode(self.paths[0])
+        st = os.stat(self.paths[0])
+        with open(self.paths[0], "ab") as f:
+            f.write(b"more")
+        os.utime(self.paths[0], ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        self._decode(self.paths[0])
+        self.assertEqual(self.decodes, 2)
+
+    def test_lru_eviction(self):
+        enable_decode_cache(max_bytes=12 * KiB)
+        for path in self.paths[:3]:
+            self._decode(path)
+        # Touch the oldest entry so the second one is evicted next
+        self._decode(self.paths[0])
+        self._decode(self.paths[3])
+        stats = get_decode_cache_stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["entries"], 3)
+        self.assertLessEqual(stats["current_bytes"], 12 * KiB)
+
+        decodes = self.decodes
+        self._decode(self.paths[0])
+        self.assertEqual(self.decodes, decodes)
+        self._decode(self.paths[1])
+        self.assertEqual(self.decodes, decodes + 1)
+
+    def test_oversized_arrays_are_not_cached(self):
+        array = self._decode(self.paths[0], size=128 * KiB)
+        self.assertEqual(get_decode_cache_stats()["entries"], 0)
+        # Not shared with anyone, so the caller may write to it
+        self.assertTrue(array.flags.writeable)
+
+    def test_shrinking_limit_evicts(self):
+        for path in self.paths:
+            self._decode(path)
+        enable_decode_cache(max_bytes=8 * KiB)
+        stats = get_decode_cache_stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["max_bytes"], 8 * KiB)
+
+    def test_clear_and_disable(self):
+        self._decode(self.paths[0])
+        clear_decode_cache()
+        self.assertEqual(get_decode_cache_stats()["entries"], 0)
+        self._decode(self.paths[0])
+        self.assertEqual(self.decodes, 2)
+
+        disable_decode_cache()
+        first = self._decode(self.paths[0])
+        self.assertTrue(first.flags.writeable)
+        self.assertEqual(self.decodes, 3)
+
+    def test_missing_file_bypasses_cache(self):
+        self._decode(os.path.join(self.temp_dir.name, "missing.gpr"))
+        self.assertEqual(get_decode_cache_stats()["misses"], 0)
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+class TestGPRImageCaching(unittest.TestCase):
+    """Test which GPRImage decodes go through the cache."""
+
+    def setUp(self):
+        self.addCleanup(disable_decode_cache)
+        enable_decode_cache()
+        with tempfile.NamedTemporaryFile(suffix=".gpr", delete=False) as f:
+            f.write(SyntheticDataGenerator.create_dng_header(64, 48))
+        self.addCleanup(os.unlink, f.name)
+        self.path = f.name
+
+        patcher = patch.object(GPRImage, "_decode", autospec=True,
+                               side_effect=lambda *args: np.zeros((48, 64), dtype=np.uint16))
+        self.decode = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_repeated_to_numpy(self):
+        with GPRImage(self.path) as img:
+            first = img.to_numpy()
+        with GPRImage(self.path) as img:
+            self.assertIs(img.to_numpy(), first)
+            img.to_numpy("float32", normalize="sensor")
+        self.assertEqual(self.decode.call_count, 2)
+
+    def test_out_and_memory_sources_bypass_cache(self):
+        with GPRImage(self.path) as img:
+            out = np.empty((48, 64), dtype=np.uint16)
+            img.to_numpy(out=out)
+            img.to_numpy(out=out)
+        with GPRImage.from_bytes(Path(self.path).read_bytes()) as img:
+            img.to_numpy()
+            img.to_numpy()
+        self.assertEqual(self.decode.call_count, 4)
+        self.assertEqual(get_decode_cache_stats()["entries"], 0)
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestDecodeCacheOnRealData(unittest.TestCase):
+    """Test load_gpr_as_numpy with the cache on real data."""
+
+    def setUp(self):
+        self.addCleanup(disable_decode_cache)
+
+    def test_repeated_load(self):
+        expected = _core.get_raw_image_data(str(REAL_GPR_FILE), "uint16")
+        enable_decode_cache()
+        first = load_gpr_as_numpy(str(REAL_GPR_FILE))
+        second = load_gpr_as_numpy(str(REAL_GPR_FILE))
+        self.assertIs(first, second)
+        np.testing.assert_array_equal(first, expected)
+        with self.assertRaises(ValueError):
+            first[0, 0] = 1
+        self.assertEqual(get_decode_cache_stats()["hits"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
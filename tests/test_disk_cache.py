@@ -0,0 +1,263 @@
+"""
+Tests for the persistent disk cache of decoded frames.
+
+Frames are stored as .npy files named after the GPR file contents and the
+decode options, loaded back as read-only memmaps, pruned least recently
+used first, and written atomically so processes can share a directory.
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from python_gpr import cache
+from python_gpr.cache import (
+    cached_decode,
+    enable_decode_cache,
+    disable_decode_cache,
+    enable_disk_cache,
+    disable_disk_cache,
+    clear_disk_cache,
+    get_disk_cache_stats,
+)
+from python_gpr.core import load_gpr_as_numpy
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+KiB = 1024
+
+
+def _frame(seed):
+    return np.arange(2 * KiB, dtype=np.uint16).reshape(32, 64) + seed
+
+
+def _write_entry(cache_dir, path, seed):
+    """Decode and store one frame from another process."""
+    enable_disk_cache(cache_dir)
+    cached_decode(path, ("uint16",), lambda: _frame(seed))
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+class TestDiskCache(unittest.TestCase):
+    """Test storing, loading and pruning frames with a counting decode function."""
+
+    def setUp(self):
+        self.addCleanup(disable_disk_cache)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.cache_dir = os.path.join(self.temp_dir.name, "cache")
+        enable_disk_cache(self.cache_dir, max_bytes=64 * KiB)
+        self.paths = []
+        for i in range(4):
+            path = os.path.join(self.temp_dir.name, f"image{i}.gpr")
+            with open(path, "wb") as f:
+                f.write(b"contents %d" % i)
+            self.paths.append(path)
+        self.decodes = 0
+
+    def _decode(self, path, dtype="uint16", seed=0):
+        def decode():
+            self.decodes += 1
+            return _frame(seed)
+        return cached_decode(path, (dtype,), decode)
+
+    def _entries(self):
+        return sorted(name for name in os.listdir(self.cache_dir) if name.endswith(".npy"))
+
+    def _newest_entry(self):
+        return max(self._entries(), key=lambda name: os.path.getmtime(os.path.join(self.cache_dir, name)))
+
+    def test_hit_returns_memmap(self):
+        first = self._decode(self.paths[0])
+        second = self._decode(self.paths[0])
+        self.assertEqual(self.decodes, 1)
+        self.assertIsInstance(second, np.memmap)
+        self.assertFalse(second.flags.writeable)
+        np.testing.assert_array_equal(second, first)
+        stats = get_disk_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["writes"]), (1, 1, 1))
+        self.assertEqual(stats["entries"], 1)
+
+    def test_persists_across_enables(self):
+        self._decode(self.paths[0])
+        disable_disk_cache()
+        enable_disk_cache(self.cache_dir)
+        self._decode(self.paths[0])
+        self.assertEqual(self.decodes, 1)
+
+    def test_keyed_on_content_and_options(self):
+        self._decode(self.paths[0])
+        self._decode(self.paths[0], "float32")
+        # Same contents under another name share the entry
+        copy = os.path.join(self.temp_dir.name, "copy.gpr")
+        Path(copy).write_bytes(Path(self.paths[0]).read_bytes())
+        self._decode(copy)
+        self.assertEqual(self.decodes, 2)
+
+        Path(self.paths[0]).write_bytes(b"modified contents")
+        self._decode(self.paths[0], seed=1)
+        self.assertEqual(self.decodes, 3)
+
+    def test_corrupt_entry_is_replaced(self):
+        self._decode(self.paths[0])
+        (entry,) = self._entries()
+        with open(os.path.join(self.cache_dir, entry), "r+b") as f:
+            f.truncate(100)
+        result = self._decode(self.paths[0])
+        self.assertEqual(self.decodes, 2)
+        np.testing.assert_array_equal(result, _frame(0))
+        self.assertEqual(get_disk_cache_stats()["invalid"], 1)
+        self.assertIsInstance(self._decode(self.paths[0]), np.memmap)
+
+    def test_mismatched_entry_is_replaced(self):
+        def decode():
+            self.decodes += 1
+            return _frame(0)
+
+        cached_decode(self.paths[0], ("uint16",), decode)
+        stored = cached_decode(self.paths[0], ("uint16",), decode, lambda: ((32, 64), "uint16"))
+        self.assertIsInstance(stored, np.memmap)
+        del stored
+
+        # A stored frame of another shape or dtype is a miss
+        for mismatch in (((64, 32), "uint16"), ((32, 64), "float32")):
+            with self.subTest(expected=mismatch):
+                decodes = self.decodes
+                cached_decode(self.paths[0], ("uint16",), decode, lambda: mismatch)
+                self.assertEqual(self.decodes, decodes + 1)
+        self.assertEqual(get_disk_cache_stats()["invalid"], 2)
+
+    def test_digest_memo_is_bounded(self):
+        with patch.object(cache, "_MAX_DIGESTS", 2):
+            for path in self.paths:
+                self._decode(path)
+            digests = cache._disk_cache._digests
+            self.assertEqual(len(digests), 2)
+            self.assertEqual([key[0] for key in digests], [os.path.realpath(p) for p in self.paths[2:]])
+
+    def test_lru_pruning(self):
+        entry_size = _frame(0).nbytes + 128
+        enable_disk_cache(self.cache_dir, max_bytes=3 * entry_size)
+        for i, path in enumerate(self.paths[:3]):
+            self._decode(path)
+            entry = os.path.join(self.cache_dir, self._newest_entry())
+            os.utime(entry, (time.time() - 100 + i, time.time() - 100 + i))
+        # A hit makes the first entry the most recently used
+        self._decode(self.paths[0])
+        self._decode(self.paths[3])
+        stats = get_disk_cache_stats()
+        self.assertEqual(stats["entries"], 3)
+        self.assertEqual(stats["evictions"], 1)
+
+        decodes = self.decodes
+        self._decode(self.paths[0])
+        self.assertEqual(self.decodes, decodes)
+        self._decode(self.paths[1])
+        self.assertEqual(self.decodes, decodes + 1)
+
+    def test_clear(self):
+        self._decode(self.paths[0])
+        self._decode(self.paths[1])
+        clear_disk_cache()
+        self.assertEqual(self._entries(), [])
+        self.assertEqual(get_disk_cache_stats()["current_bytes"], 0)
+
+    def test_stale_temp_files_are_removed(self):
+        stale = os.path.join(self.cache_dir, "leftover.tmp")
+        Path(stale).write_bytes(b"partial")
+        os.utime(stale, (0, 0))
+        enable_disk_cache(self.cache_dir)
+        self.assertFalse(os.path.exists(stale))
+
+    def test_writes_keep_a_running_total(self):
+        scans = []
+        real_scan = cache._DiskCache._scan
+        with patch.object(cache._DiskCache, "_scan", lambda dc: scans.append(1) or real_scan(dc)):
+            for path in self.paths[:3]:
+                self._decode(path)
+            stats = get_disk_cache_stats()
+        self.assertEqual(scans, [])
+        self.assertEqual(stats["entries"], 3)
+        self.assertEqual(stats["current_bytes"],
+                         sum(os.path.getsize(os.path.join(self.cache_dir, name)) for name in self._entries()))
+
+    def test_rescan_counts_other_writers(self):
+        self._decode(self.paths[0])
+        # An entry stored by another process is only seen by a scan
+        other = os.path.join(self.cache_dir, "other.npy")
+        np.save(other, _frame(1))
+        self.assertEqual(get_disk_cache_stats()["entries"], 1)
+        with patch.object(cache, "_RESCAN_WRITES", 2):
+            self._decode(self.paths[1])
+        stats = get_disk_cache_stats()
+        self.assertEqual(stats["entries"], 3)
+        self.assertEqual(stats["current_bytes"],
+                         sum(os.path.getsize(os.path.join(self.cache_dir, name)) for name in self._entries()))
+
+    def test_memory_cache_is_consulted_first(self):
+        self.addCleanup(disable_decode_cache)
+        enable_decode_cache()
+        first = self._decode(self.paths[0])
+        self.assertIs(self._decode(self.paths[0]), first)
+        self.assertEqual(get_disk_cache_stats()["hits"], 0)
+
+    def test_invalid_max_bytes(self):
+        with self.assertRaises(ValueError):
+            enable_disk_cache(self.cache_dir, max_bytes=-1)
+
+    def test_concurrent_writers(self):
+        context = multiprocessing.get_context("spawn")
+        processes = [context.Process(target=_write_entry, args=(self.cache_dir, self.paths[0], 0))
+                     for _ in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+            self.assertEqual(process.exitcode, 0)
+        self.assertEqual(len(self._entries()), 1)
+        self.assertEqual([name for name in os.listdir(self.cache_dir) if name.endswith(".tmp")], [])
+        np.testing.assert_array_equal(self._decode(self.paths[0]), _frame(0))
+        self.assertEqual(self.decodes, 0)
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestDiskCacheOnRealData(unittest.TestCase):
+    """Test load_gpr_as_numpy with the disk cache on real data."""
+
+    def test_repeated_load(self):
+        self.addCleanup(disable_disk_cache)
+        expected = _core.get_raw_image_data(str(REAL_GPR_FILE), "uint16")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            enable_disk_cache(cache_dir)
+            load_gpr_as_numpy(str(REAL_GPR_FILE))
+            cached = load_gpr_as_numpy(str(REAL_GPR_FILE))
+            self.assertIsInstance(cached, np.memmap)
+            np.testing.assert_array_equal(cached, expected)
+            del cached
+            disable_disk_cache()
+
+
+if __name__ == '__main__':
+    unittest.main()
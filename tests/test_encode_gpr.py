@@ -0,0 +1,139 @@
+"""
+Tests for encoding NumPy arrays as GPR.
+
+encode_gpr() and save_gpr() pass the array itself to the native encoder,
+which reads its buffer in place using the row stride as the input pitch.
+"""
+
+import os
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import python_gpr
+from python_gpr.conversion import GPRParameters
+from python_gpr.core import encode_gpr, save_gpr
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+class TestEncodeDispatch(unittest.TestCase):
+    """Test the Python wrappers against a fake native module."""
+
+    def setUp(self):
+        self.calls = []
+
+        def encode_gpr_array(array, cfa, bit_depth, parameters):
+            self.calls.append((array, cfa, bit_depth, parameters))
+            return b"encoded"
+
+        def encode_gpr_array_to_file(array, output_path, cfa, bit_depth, parameters):
+            self.calls.append((array, cfa, bit_depth, parameters))
+            if array.shape[0] == 1:
+                raise RuntimeError("Failed to write output GPR file")
+            Path(output_path).write_bytes(b"encoded")
+
+        fake_core = types.ModuleType("python_gpr._core")
+        fake_core.GPRParametersCore = types.SimpleNamespace
+        fake_core.encode_gpr_array = encode_gpr_array
+        fake_core.encode_gpr_array_to_file = encode_gpr_array_to_file
+        for patcher in (patch.dict(sys.modules, {"python_gpr._core": fake_core}),
+                        patch.object(python_gpr, "_core", fake_core, create=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.frame = np.zeros((48, 64), dtype=np.uint16)
+
+    def test_array_is_passed_without_copy(self):
+        view = self.frame[2:-2, 4:-4]
+        self.assertEqual(encode_gpr(view, "GBRG", 14, GPRParameters(fast_encoding=True)), b"encoded")
+        array, cfa, bit_depth, parameters = self.calls[0]
+        self.assertIs(array, view)
+        self.assertEqual((cfa, bit_depth), ("GBRG", 14))
+        self.assertTrue(parameters.fast_encoding)
+
+    def test_defaults(self):
+        encode_gpr(self.frame)
+        self.assertEqual(self.calls[0][1:], ("RGGB", 12, None))
+
+    def test_save(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = Path(temp_dir) / "frame.gpr"
+            save_gpr(self.frame, output_path)
+            self.assertEqual(output_path.read_bytes(), b"encoded")
+            with self.assertRaises(ValueError):
+                save_gpr(self.frame[:1], os.path.join(temp_dir, "broken.gpr"))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(TypeError):
+            encode_gpr(self.frame.tolist())
+        with self.assertRaises(ValueError):
+            encode_gpr(self.frame, cfa="BGGR")
+        with self.assertRaises(ValueError):
+            encode_gpr(self.frame, bit_depth=16)
+        with self.assertRaises(TypeError):
+            encode_gpr(self.frame, parameters={"fast_encoding": True})
+        self.assertEqual(self.calls, [])
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+class TestEncodeValidation(unittest.TestCase):
+    """Test the array checks of the native encoder."""
+
+    def test_rejected_layouts(self):
+        frame = np.zeros((48, 64), dtype=np.uint16)
+        for array in (frame[:, ::2], frame[::-1], frame.T, frame.astype(np.int32), frame[0]):
+            with self.subTest(shape=array.shape, strides=array.strides, dtype=array.dtype):
+                with self.assertRaises(ValueError):
+                    encode_gpr(array)
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestEncodeOnRealData(unittest.TestCase):
+    """Encode a real frame and decode the result."""
+
+    def setUp(self):
+        self.frame = python_gpr.load_gpr_as_numpy(str(REAL_GPR_FILE))
+
+    def test_round_trip(self):
+        data = encode_gpr(self.frame, bit_depth=12, parameters=GPRParameters(fast_encoding=True))
+        decoded = python_gpr.load_gpr_as_numpy(data)
+        self.assertEqual(decoded.shape, self.frame.shape)
+
+    def test_view_matches_copy(self):
+        view = self.frame[16:-16, 32:-32]
+        self.assertFalse(view.flags.c_contiguous)
+        self.assertEqual(encode_gpr(view), encode_gpr(np.ascontiguousarray(view)))
+
+    def test_save(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "frame.GPR")
+            save_gpr(self.frame, output_path, cfa="RGGB", bit_depth=12)
+            info = _core.get_image_info(output_path)
+            self.assertEqual((info.height, info.width), self.frame.shape)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+Tests for content-based format detection.
+
+detect_format() and detect_formats() read the start of each file once and
+tell GPR (VC-5 compressed DNG) from plain DNG by their TIFF tags, falling
+back to the file extension when the contents are not conclusive.
+"""
+
+import builtins
+import os
+import struct
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    from .test_data import SyntheticDataGenerator
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from test_data import SyntheticDataGenerator
+
+from python_gpr import conversion
+from python_gpr.conversion import detect_format, detect_formats
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+
+class TestDetectFormat(unittest.TestCase):
+    """Test detection from file contents."""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.dir = temp_dir.name
+
+    def write(self, name, data):
+        path = os.path.join(self.dir, name)
+        Path(path).write_bytes(data)
+        return path
+
+    def test_vc5_is_gpr_whatever_its_name(self):
+        header = SyntheticDataGenerator.create_dng_header(compression=9)
+        self.assertEqual(detect_format(self.write("clip.GPR", header)), "gpr")
+        self.assertEqual(detect_format(self.write("renamed.dng", header)), "gpr")
+
+    def test_uncompressed_dng_is_dng_whatever_its_name(self):
+        header = SyntheticDataGenerator.create_dng_header(compression=1)
+        self.assertEqual(detect_format(self.write("image.dng", header)), "dng")
+        self.assertEqual(detect_format(self.write("renamed.gpr", header)), "dng")
+        self.assertEqual(detect_format(self.write("renamed.raw", header)), "dng")
+
+    def test_big_endian_and_sub_ifd(self):
+        for byte_order in ("<", ">"):
+            for compression, expected in ((9, "gpr"), (1, "dng")):
+                header = SyntheticDataGenerator.create_dng_header(
+                    compression=compression, byte_order=byte_order, raw_in_sub_ifd=True)
+                with self.subTest(byte_order=byte_order, compression=compression):
+                    self.assertEqual(detect_format(self.write("image.dng", header)), expected)
+
+    def test_plain_tiff_is_unknown_whatever_its_name(self):
+        # One IFD with an uncompressed image and no DNGVersion tag
+        tiff = b"II*\x00" + struct.pack("<IH", 8, 1) + struct.pack("<HHIHH", 259, 3, 1, 1, 0) + bytes(4)
+        path = self.write("x.dng", tiff)
+        self.assertIsNone(conversion._sniff_format(tiff, "dng"))
+        self.assertEqual(detect_formats([path]), [None])
+        with self.assertRaises(ValueError):
+            detect_format(path)
+
+    def test_truncated_header(self):
+        header = SyntheticDataGenerator.create_dng_header(compression=9, raw_in_sub_ifd=True)
+        # The raw SubIFD is cut off, so the extension decides between GPR and DNG
+        self.assertEqual(detect_format(self.write("clip.gpr", header[:40])), "gpr")
+        self.assertEqual(detect_format(self.write("clip.dng", header[:40])), "dng")
+        self.assertEqual(detect_format(self.write("clip.xyz", header[:40])), "dng")
+
+    def test_signatures(self):
+        self.assertEqual(detect_format(self.write("photo.dat", b"\xff\xd8\xff\xe0" + bytes(16))), "jpg")
+        self.assertEqual(detect_format(self.write("frame.dat", b"P6\n8 6\n255\n")), "ppm")
+        self.assertEqual(detect_format(self.write("sensor.raw", bytes(64))), "raw")
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            detect_format(self.write("data.xyz", b"dummy content"))
+        with self.assertRaises(FileNotFoundError):
+            detect_format(os.path.join(self.dir, "missing.gpr"))
+
+    def test_single_read(self):
+        path = self.write("clip.gpr", SyntheticDataGenerator.create_dng_header(raw_in_sub_ifd=True))
+        reads = []
+        real_open = builtins.open
+
+        def counting_open(*args, **kwargs):
+            f = real_open(*args, **kwargs)
+            real_read = f.read
+            f.read = lambda *a: reads.append(a) or real_read(*a)
+            return f
+
+        with patch.object(conversion, "open", counting_open, create=True):
+            self.assertEqual(detect_formats([path, path]), ["gpr", "gpr"])
+        self.assertEqual(reads, [(conversion._SNIFF_BYTES,)] * 2)
+
+
+class TestDetectFormats(unittest.TestCase):
+    """Test batch detection."""
+
+    def test_order_and_failures(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            gpr = Path(temp_dir, "a.dng")
+            gpr.write_bytes(SyntheticDataGenerator.create_dng_header(compression=9))
+            dng = Path(temp_dir, "b.gpr")
+            dng.write_bytes(SyntheticDataGenerator.create_dng_header(compression=1))
+            unknown = Path(temp_dir, "c.xyz")
+            unknown.write_bytes(b"dummy content")
+            paths = [gpr, Path(temp_dir, "missing.gpr"), dng, unknown]
+            self.assertEqual(detect_formats(paths), ["gpr", None, "dng", None])
+            self.assertEqual(detect_formats(iter([])), [])
+
+
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestDetectFormatOnRealData(unittest.TestCase):
+    """Detect the format of a real GPR file."""
+
+    def test_real_gpr(self):
+        self.assertEqual(detect_format(str(REAL_GPR_FILE)), "gpr")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+"""
+Tests for opening GPR images from memory and from file objects.
+
+GPRImage.from_bytes uses a buffer in place and GPRImage.from_file reads
+the header of a seekable file object with seek()/read(), loading the
+whole image only when it is decoded. open_gpr dispatches on the source.
+"""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    from .test_data import SyntheticDataGenerator
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from test_data import SyntheticDataGenerator
+
+from python_gpr.core import GPRImage, open_gpr, load_gpr_as_numpy
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+
+class CountingBytesIO(io.BytesIO):
+    """BytesIO that counts the bytes returned by read()."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.bytes_read = 0
+
+    def read(self, *args):
+        data = super().read(*args)
+        self.bytes_read += len(data)
+        return data
+
+
+class TestSourceDispatch(unittest.TestCase):
+    """Test open_gpr dispatch and argument validation."""
+
+    def setUp(self):
+        self.header = SyntheticDataGenerator.create_dng_header(640, 480)
+
+    def test_bytes_like_sources(self):
+        for source in (self.header, bytearray(self.header), memoryview(self.header)):
+            img = open_gpr(source)
+            self.assertIsNone(img.filepath)
+            self.assertIs(img._buffer, source)
+
+    def test_file_object_source(self):
+        f = io.BytesIO(self.header)
+        img = open_gpr(f)
+        self.assertIsNone(img.filepath)
+        self.assertIs(img._fileobj, f)
+
+    def test_path_source(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "image.gpr"
+            path.write_bytes(self.header)
+            with open_gpr(path) as img:
+                self.assertEqual(img.filepath, path)
+
+    def test_invalid_sources(self):
+        with self.assertRaises(TypeError):
+            open_gpr(12345)
+        with self.assertRaises(TypeError):
+            GPRImage.from_bytes("not bytes")
+        with self.assertRaises(TypeError):
+            GPRImage.from_file(self.header)
+
+    def test_close_drops_references(self):
+        img = GPRImage.from_bytes(self.header)
+        img.close()
+        self.assertIsNone(img._buffer)
+        self.assertTrue(img.is_closed)
+        self.assertIn("<bytes>", repr(img))
+
+
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+class TestLazyHeader(unittest.TestCase):
+    """Test header access without loading the whole image."""
+
+    def setUp(self):
+        self.header = SyntheticDataGenerator.create_dng_header(1920, 1080, cfa_pattern="GBRG")
+        # Image data that is never read for header access
+        self.contents = self.header + b"\x00" * (1024 * 1024)
+
+    def test_from_bytes_info(self):
+        with GPRImage.from_bytes(self.contents) as img:
+            self.assertEqual(img.dimensions, (1920, 1080))
+            self.assertEqual(img.get_image_info()["cfa_pattern"], "GBRG")
+
+    def test_file_object_reads_header_only(self):
+        f = CountingBytesIO(self.contents)
+        with open_gpr(f) as img:
+            self.assertEqual(img.dimensions, (1920, 1080))
+        self.assertGreater(f.bytes_read, 0)
+        self.assertLess(f.bytes_read, len(self.header) + 4096)
+
+    def test_file_object_at_offset(self):
+        f = CountingBytesIO(b"prefix" + self.contents)
+        f.seek(6)
+        img = GPRImage.from_file(f)
+        self.assertEqual(img.width, 1920)
+        # The position is left where it was
+        self.assertEqual(f.tell(), 6)
+
+    def test_native_info_sources(self):
+        for source in (self.contents, memoryview(self.contents), io.BytesIO(self.contents)):
+            info = _core.get_image_info(source)
+            self.assertEqual((info.width, info.height), (1920, 1080))
+
+    def test_text_file_object(self):
+        with self.assertRaises(_core.GPRParameterError):
+            _core.get_image_info(io.StringIO("text"))
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestDecodeFromMemory(unittest.TestCase):
+    """Test that in-memory sources decode like the file."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.data = REAL_GPR_FILE.read_bytes()
+        cls.expected = _core.get_raw_image_data(str(REAL_GPR_FILE), "uint16")
+
+    def test_from_bytes_decode(self):
+        with GPRImage.from_bytes(self.data) as img:
+            np.testing.assert_array_equal(img.to_numpy(), self.expected)
+            self.assertEqual(img.to_dng_bytes(), _core.convert_gpr_to_dng_bytes(self.data))
+
+    def test_file_object_is_read_once(self):
+        f = CountingBytesIO(self.data)
+        with open_gpr(f) as img:
+            np.testing.assert_array_equal(img.to_numpy(), self.expected)
+            img.to_numpy("float32", normalize="sensor")
+            with tempfile.TemporaryDirectory() as temp_dir:
+                img.convert_to_dng(os.path.join(temp_dir, "image.dng"))
+        self.assertLess(f.bytes_read, 2 * len(self.data))
+
+    def test_load_gpr_as_numpy(self):
+        np.testing.assert_array_equal(load_gpr_as_numpy(self.data), self.expected)
+        with open(REAL_GPR_FILE, "rb") as f:
+            np.testing.assert_array_equal(load_gpr_as_numpy(f), self.expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
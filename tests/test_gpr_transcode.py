@@ -0,0 +1,143 @@
+"""
+Tests for re-encoding GPR files without a DNG intermediate.
+
+convert_gpr_to_gpr and convert_gpr_to_gpr_bytes decode to raw pixels in
+memory and encode again with new parameters; convert_image and
+batch_convert dispatch GPR to GPR pairs to them.
+"""
+
+import os
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import python_gpr
+from python_gpr import batch
+from python_gpr.batch import batch_convert
+from python_gpr.conversion import GPRParameters, convert_gpr_to_gpr, convert_gpr_to_gpr_bytes
+from python_gpr.core import convert_image
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+
+class TestTranscodeDispatch(unittest.TestCase):
+    """Test the Python wrappers against a fake native module."""
+
+    def setUp(self):
+        self.calls = []
+
+        def record(name):
+            def convert(*args):
+                self.calls.append((name, args))
+                if args[0] == b"broken":
+                    raise RuntimeError("GPR to GPR re-encoding failed")
+                if name == "convert_gpr_to_gpr":
+                    Path(args[1]).write_bytes(b"converted")
+                    return True
+                return b"converted"
+            return convert
+
+        fake_core = types.ModuleType("python_gpr._core")
+        fake_core.GPRParametersCore = types.SimpleNamespace
+        fake_core.GPRConversionError = RuntimeError
+        for name in ("convert_gpr_to_gpr", "convert_gpr_to_gpr_bytes"):
+            setattr(fake_core, name, record(name))
+        for patcher in (patch.dict(sys.modules, {"python_gpr._core": fake_core}),
+                        patch.object(python_gpr, "_core", fake_core, create=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.dir = temp_dir.name
+        self.path = os.path.join(self.dir, "input.GPR")
+        Path(self.path).write_bytes(b"contents")
+
+    def test_file_conversion_passes_core_parameters(self):
+        output_path = os.path.join(self.dir, "out.gpr")
+        convert_gpr_to_gpr(self.path, output_path, GPRParameters(fast_encoding=True))
+        name, args = self.calls[0]
+        self.assertEqual((name, args[:2]), ("convert_gpr_to_gpr", (self.path, output_path)))
+        self.assertTrue(args[2].fast_encoding)
+
+    def test_bytes_conversion(self):
+        self.assertEqual(convert_gpr_to_gpr_bytes(b"data"), b"converted")
+        self.assertEqual(self.calls, [("convert_gpr_to_gpr_bytes", (b"data",))])
+        with self.assertRaises(ValueError):
+            convert_gpr_to_gpr_bytes(b"broken")
+        with self.assertRaises(TypeError):
+            convert_gpr_to_gpr_bytes("not bytes")
+
+    def test_missing_input(self):
+        with self.assertRaises(FileNotFoundError):
+            convert_gpr_to_gpr(os.path.join(self.dir, "missing.GPR"), os.path.join(self.dir, "out.gpr"))
+
+    def test_convert_image_dispatch(self):
+        convert_image(self.path, os.path.join(self.dir, "out.gpr"), parameters=GPRParameters())
+        self.assertEqual(self.calls[0][0], "convert_gpr_to_gpr")
+
+    def test_batch_convert(self):
+        pairs = [(self.path, os.path.join(self.dir, f"out{i}.gpr")) for i in range(3)]
+        self.assertTrue(all(r.ok for r in batch_convert(pairs, workers=2)))
+        self.assertEqual([name for name, _ in self.calls], ["convert_gpr_to_gpr"] * 3)
+
+        self.calls.clear()
+        self.assertIs(batch._BYTES_CONVERTERS[("gpr", "gpr")], convert_gpr_to_gpr_bytes)
+        results = list(batch_convert(pairs, workers=2, backend="pipeline"))
+        self.assertTrue(all(r.ok for r in results), results)
+        self.assertEqual(Path(pairs[0][1]).read_bytes(), b"converted")
+
+
+class TestPackageExports(unittest.TestCase):
+    """Test that native functions do not replace the Python wrappers."""
+
+    def test_wrappers_are_exported(self):
+        self.assertIs(python_gpr.convert_gpr_to_gpr_bytes, python_gpr.conversion.convert_gpr_to_gpr_bytes)
+        for name in python_gpr.conversion.__all__:
+            with self.subTest(name=name):
+                self.assertIs(getattr(python_gpr, name), getattr(python_gpr.conversion, name))
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestTranscodeOnRealData(unittest.TestCase):
+    """Re-encode real data and compare with the two-step DNG path."""
+
+    def test_matches_two_step_path(self):
+        data = REAL_GPR_FILE.read_bytes()
+        params = GPRParameters(fast_encoding=True)
+        direct = convert_gpr_to_gpr_bytes(data, params)
+        two_step = python_gpr.conversion.convert_dng_to_gpr_bytes(
+            python_gpr.conversion.convert_gpr_to_dng_bytes(data), params)
+        np.testing.assert_array_equal(_core.get_raw_image_data(direct), _core.get_raw_image_data(two_step))
+
+    def test_file_conversion(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "out.GPR")
+            convert_gpr_to_gpr(str(REAL_GPR_FILE), output_path, GPRParameters(fast_encoding=True))
+            info = _core.get_image_info(output_path)
+            expected = _core.get_image_info(str(REAL_GPR_FILE))
+            self.assertEqual((info.width, info.height), (expected.width, expected.height))
+
+
+if __name__ == '__main__':
+    unittest.main()
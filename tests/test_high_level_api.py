@@ -8,6 +8,7 @@ and convenience functions.
 import unittest
 import tempfile
 import os
+import shutil
 from unittest.mock import patch, MagicMock
 
 # Test imports - handle import errors gracefully
@@ -35,9 +36,7 @@ class TestHighLevelAPI(unittest.TestCase):
     
     def tearDown(self):
         """Clean up test fixtures."""
-        if os.path.exists(self.test_file):
-            os.remove(self.test_file)
-        os.rmdir(self.temp_dir)
+        shutil.rmtree(self.temp_dir)
     
     @unittest.skipIf(not CORE_AVAILABLE, f"Core module not available: {IMPORT_ERROR if not CORE_AVAILABLE else ''}")
     def test_gpr_image_context_manager(self):
@@ -87,18 +86,21 @@ class TestHighLevelAPI(unittest.TestCase):
         """Test enhanced conversion methods."""
         img = GPRImage(self.test_file)
         
+        output_dng = os.path.join(self.temp_dir, "output.dng")
+        output_raw = os.path.join(self.temp_dir, "output.raw")
+        
         # Test that both old and new method names work
         with self.assertRaises(NotImplementedError):
-            img.to_dng("output.dng")
+            img.to_dng(output_dng)
         
         with self.assertRaises(NotImplementedError):
-            img.convert_to_dng("output.dng")
+            img.convert_to_dng(output_dng)
         
         with self.assertRaises(NotImplementedError):
-            img.to_raw("output.raw")
+            img.to_raw(output_raw)
         
         with self.assertRaises(NotImplementedError):
-            img.convert_to_raw("output.raw")
+            img.convert_to_raw(output_raw)
     
     @unittest.skipIf(not CORE_AVAILABLE, f"Core module not available: {IMPORT_ERROR if not CORE_AVAILABLE else ''}")
     def test_gpr_image_repr(self):
@@ -142,12 +144,12 @@ class TestHighLevelAPI(unittest.TestCase):
         """Test convert_image format detection and validation."""
         # Test with unsupported output format
         with self.assertRaises(ValueError) as cm:
-            convert_image(self.test_file, "output.unknown")
+            convert_image(self.test_file, os.path.join(self.temp_dir, "output.unknown"))
         self.assertIn("Cannot determine target format", str(cm.exception))
         
         # Test with explicit target format
         with self.assertRaises(NotImplementedError):
-            convert_image(self.test_file, "output.dng", target_format="dng")
+            convert_image(self.test_file, os.path.join(self.temp_dir, "output.dng"), target_format="dng")
     
     @unittest.skipIf(not CORE_AVAILABLE, f"Core module not available: {IMPORT_ERROR if not CORE_AVAILABLE else ''}")
     def test_get_info_convenience_function(self):
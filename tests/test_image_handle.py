@@ -0,0 +1,153 @@
+"""
+Tests for the native image handle behind GPRImage.
+
+A GPRImage maps its file once when opened and parses the header once;
+properties, decodes and conversions are served from that mapping, and
+close() unmaps it.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    from .test_data import SyntheticDataGenerator
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from test_data import SyntheticDataGenerator
+
+from python_gpr.core import GPRImage
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+class TestImageHandle(unittest.TestCase):
+    """Test _core.GPRImageHandle directly."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.contents = SyntheticDataGenerator.create_dng_header(640, 480, cfa_pattern="GBRG")
+        self.path = os.path.join(self.temp_dir.name, "image.gpr")
+        with open(self.path, "wb") as f:
+            f.write(self.contents)
+
+    def test_buffer_protocol(self):
+        handle = _core.GPRImageHandle(self.path)
+        self.assertEqual(len(handle), len(self.contents))
+        with memoryview(handle) as view:
+            self.assertTrue(view.readonly)
+            self.assertEqual(view.tobytes(), self.contents)
+        handle.close()
+
+    def test_info_is_parsed_once(self):
+        handle = _core.GPRImageHandle(self.path)
+        self.addCleanup(handle.close)
+        info = handle.info
+        self.assertEqual((info.width, info.height, info.cfa_pattern), (640, 480, "GBRG"))
+        # A copy is returned, so the cached header cannot be modified
+        info.width = 1
+        self.assertEqual(handle.info.width, 640)
+
+    def test_close_releases_mapping(self):
+        handle = _core.GPRImageHandle(self.path)
+        handle.close()
+        self.assertTrue(handle.closed)
+        self.assertEqual(handle.size, 0)
+        handle.close()
+        with self.assertRaises(ValueError):
+            memoryview(handle)
+        with self.assertRaises(_core.GPRError):
+            handle.info
+
+    def test_close_with_exported_buffer(self):
+        handle = _core.GPRImageHandle(self.path)
+        view = memoryview(handle)
+        with self.assertRaises(BufferError):
+            handle.close()
+        view.release()
+        handle.close()
+        self.assertTrue(handle.closed)
+
+    def test_missing_file(self):
+        with self.assertRaises(_core.GPRFileError):
+            _core.GPRImageHandle(os.path.join(self.temp_dir.name, "missing.gpr"))
+
+
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+class TestGPRImageHandle(unittest.TestCase):
+    """Test that GPRImage reads its file once."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.path = os.path.join(self.temp_dir.name, "image.gpr")
+        with open(self.path, "wb") as f:
+            f.write(SyntheticDataGenerator.create_dng_header(1920, 1080))
+
+    def test_single_read_for_header_access(self):
+        _core.reset_io_stats()
+        with GPRImage(self.path) as img:
+            self.assertEqual(img.dimensions, (1920, 1080))
+            self.assertEqual(img.get_image_info()["width"], 1920)
+            self.assertEqual(img.get_image_info()["height"], 1080)
+        self.assertEqual(_core.get_io_stats()["read_calls"], 1)
+
+    def test_close_is_deterministic(self):
+        img = GPRImage(self.path)
+        handle = img._handle
+        img.close()
+        self.assertTrue(handle.closed)
+        self.assertTrue(img.is_closed)
+        with self.assertRaises(ValueError):
+            img.get_image_info()
+
+    def test_close_while_buffer_exported(self):
+        img = GPRImage(self.path)
+        view = memoryview(img._handle)
+        with self.assertRaises(BufferError):
+            img.close()
+        view.release()
+        img.close()
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestGPRImageHandleDecode(unittest.TestCase):
+    """Test decoding and converting real data from the mapping."""
+
+    def test_operations_share_one_read(self):
+        expected = _core.get_raw_image_data(str(REAL_GPR_FILE), "uint16")
+        _core.reset_io_stats()
+        with GPRImage(str(REAL_GPR_FILE)) as img:
+            np.testing.assert_array_equal(img.to_numpy(), expected)
+            img.to_numpy("float32", normalize="sensor")
+            dng = img.to_dng_bytes()
+            with tempfile.TemporaryDirectory() as temp_dir:
+                output_path = os.path.join(temp_dir, "image.dng")
+                img.convert_to_dng(output_path)
+                self.assertEqual(Path(output_path).read_bytes(), dng)
+        self.assertEqual(_core.get_io_stats()["read_calls"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+Tests for header-only image information parsing.
+
+get_image_info walks the TIFF/DNG IFDs at the start of a GPR or DNG file
+and reports the real dimensions, CFA pattern, bit depth and compression
+without reading or decoding the image data.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    from .test_data import SyntheticDataGenerator
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from test_data import SyntheticDataGenerator
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+class TestHeaderParsing(unittest.TestCase):
+    """Test get_image_info on synthetic TIFF/DNG headers."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(self._cleanup_temp_dir)
+
+    def _cleanup_temp_dir(self):
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, name, data, padding=0):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+            f.write(b"\x00" * padding)
+        return path
+
+    def test_raw_in_ifd0(self):
+        """GPR-style files with the raw image in IFD0."""
+        path = self._write("image.gpr", SyntheticDataGenerator.create_dng_header(4000, 3000))
+        info = _core.get_image_info(path)
+        self.assertEqual(info.width, 4000)
+        self.assertEqual(info.height, 3000)
+        self.assertEqual(info.channels, 1)
+        self.assertEqual(info.cfa_pattern, "RGGB")
+        self.assertEqual(info.bit_depth, 16)
+        self.assertEqual(info.compression, 9)
+        self.assertEqual(info.format, "uint16")
+        self.assertEqual(info.data_size, 4000 * 3000 * 2)
+
+    def test_raw_in_sub_ifd(self):
+        """DNG-style files with a preview in IFD0 and the raw image in a SubIFD."""
+        header = SyntheticDataGenerator.create_dng_header(
+            5568, 4872, cfa_pattern="GBRG", bits_per_sample=12, compression=1,
+            raw_in_sub_ifd=True,
+        )
+        info = _core.get_image_info(self._write("image.dng", header))
+        self.assertEqual((info.width, info.height), (5568, 4872))
+        self.assertEqual(info.cfa_pattern, "GBRG")
+        self.assertEqual(info.bit_depth, 12)
+        self.assertEqual(info.compression, 1)
+
+    def test_big_endian(self):
+        """Motorola byte order headers are supported."""
+        header = SyntheticDataGenerator.create_dng_header(320, 240, cfa_pattern="BGGR", byte_order=">")
+        info = _core.get_image_info(self._write("image.gpr", header))
+        self.assertEqual((info.width, info.height), (320, 240))
+        self.assertEqual(info.cfa_pattern, "BGGR")
+
+    def test_image_data_is_not_required(self):
+        """Only the header is needed, whatever follows it."""
+        header = SyntheticDataGenerator.create_dng_header(64, 48)
+        short = _core.get_image_info(self._write("short.gpr", header))
+        padded = _core.get_image_info(self._write("padded.gpr", header, padding=1 << 20))
+        self.assertEqual((short.width, short.height), (padded.width, padded.height))
+
+    def test_not_a_tiff_file(self):
+        """Files without a TIFF header raise a format error."""
+        path = self._write("dummy.gpr", b"GPR\x00" + b"\x00" * 100)
+        with self.assertRaises(_core.GPRFormatError):
+            _core.get_image_info(path)
+
+    def test_truncated_header(self):
+        """A header cut off inside an IFD raises a format error."""
+        header = SyntheticDataGenerator.create_dng_header(64, 48)
+        path = self._write("truncated.gpr", header[:20])
+        with self.assertRaises(_core.GPRFormatError):
+            _core.get_image_info(path)
+
+    def test_missing_file(self):
+        """Missing files raise a file error."""
+        with self.assertRaises(_core.GPRFileError):
+            _core.get_image_info(os.path.join(self.temp_dir, "missing.gpr"))
+
+
+class TestSyntheticHeaderGenerator(unittest.TestCase):
+    """Sanity checks for the synthetic header generator used above."""
+
+    def test_byte_order_marks(self):
+        self.assertTrue(SyntheticDataGenerator.create_dng_header().startswith(b"II*\x00"))
+        self.assertTrue(SyntheticDataGenerator.create_dng_header(byte_order=">").startswith(b"MM\x00*"))
+
+    def test_header_is_small(self):
+        """The header of even a large image is only a few hundred bytes."""
+        header = SyntheticDataGenerator.create_dng_header(8000, 6000, raw_in_sub_ifd=True)
+        self.assertLess(len(header), 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
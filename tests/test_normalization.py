@@ -0,0 +1,215 @@
+"""
+Tests for raw-to-floating-point normalization.
+
+Floating-point output uses the black and white levels from the DNG tags
+('sensor'), a fixed 65535 scale ('full_range') or no scaling (None), and
+is produced by a multithreaded kernel that also supports float16.
+"""
+
+import os
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    from .test_data import SyntheticDataGenerator
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from test_data import SyntheticDataGenerator
+
+import python_gpr
+from python_gpr.core import GPRImage, load_gpr_as_numpy
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+
+def sensor_reference(raw, black_level, white_level):
+    """Per-CFA-position sensor normalization computed with NumPy."""
+    black = np.empty(raw.shape, dtype=np.float64)
+    black[0::2, 0::2] = black_level[0]
+    black[0::2, 1::2] = black_level[1]
+    black[1::2, 0::2] = black_level[2]
+    black[1::2, 1::2] = black_level[3]
+    return np.clip((raw - black) / (white_level - black), 0.0, 1.0)
+
+
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+class TestLevelParsing(unittest.TestCase):
+    """Test black/white level parsing from the DNG header."""
+    
+    def _info(self, **kwargs):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "image.gpr")
+            with open(path, "wb") as f:
+                f.write(SyntheticDataGenerator.create_dng_header(64, 48, **kwargs))
+            return _core.get_image_info(path)
+    
+    def test_per_channel_levels(self):
+        info = self._info(black_level=[256, 258, 260, 262], white_level=4000)
+        self.assertEqual(list(info.black_level), [256, 258, 260, 262])
+        self.assertEqual(info.white_level, 4000)
+    
+    def test_single_black_level(self):
+        info = self._info(black_level=[128], white_level=16383)
+        self.assertEqual(list(info.black_level), [128] * 4)
+        self.assertEqual(info.white_level, 16383)
+    
+    def test_defaults_from_bit_depth(self):
+        """Without level tags the full range of the bit depth is used."""
+        info = self._info(bits_per_sample=12)
+        self.assertEqual(list(info.black_level), [0] * 4)
+        self.assertEqual(info.white_level, 4095)
+        self.assertEqual(self._info(bits_per_sample=16).white_level, 65535)
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+class TestNormalizeKernel(unittest.TestCase):
+    """Test _core.normalize_raw against NumPy references."""
+    
+    BLACK = [200, 210, 220, 230]
+    WHITE = 4095
+    
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.raw = rng.integers(0, 4096, size=(37, 51), dtype=np.uint16)
+    
+    def test_sensor(self):
+        result = _core.normalize_raw(self.raw, "float32", "sensor", self.BLACK, self.WHITE)
+        self.assertEqual(result.dtype, np.float32)
+        np.testing.assert_allclose(result, sensor_reference(self.raw, self.BLACK, self.WHITE),
+                                   rtol=1e-5, atol=1e-6)
+        self.assertGreaterEqual(result.min(), 0.0)
+        self.assertLessEqual(result.max(), 1.0)
+    
+    def test_full_range(self):
+        result = _core.normalize_raw(self.raw, "float32", "full_range")
+        np.testing.assert_allclose(result, self.raw / 65535.0, rtol=1e-6)
+    
+    def test_no_normalization(self):
+        result = _core.normalize_raw(self.raw, "float32", None)
+        np.testing.assert_array_equal(result, self.raw.astype(np.float32))
+    
+    def test_float16_matches_numpy_rounding(self):
+        """float16 output is rounded exactly like NumPy's float32 -> float16 cast."""
+        expected32 = _core.normalize_raw(self.raw, "float32", "sensor", self.BLACK, self.WHITE)
+        result = _core.normalize_raw(self.raw, "float16", "sensor", self.BLACK, self.WHITE)
+        self.assertEqual(result.dtype, np.float16)
+        np.testing.assert_array_equal(result, expected32.astype(np.float16))
+    
+    def test_float16_rounding_exhaustive(self):
+        """Every uint16 value, including results in the subnormal half range."""
+        values = np.arange(65536, dtype=np.uint32).astype(np.uint16).reshape(256, 256)
+        for white_level in (65535.0, 1e8):
+            expected = _core.normalize_raw(values, "float32", "sensor", [0], white_level)
+            result = _core.normalize_raw(values, "float16", "sensor", [0], white_level)
+            np.testing.assert_array_equal(result.view(np.uint16),
+                                          expected.astype(np.float16).view(np.uint16))
+    
+    def test_threads_give_identical_results(self):
+        raw = np.random.default_rng(2).integers(0, 65536, size=(1024, 600), dtype=np.uint16)
+        single = _core.normalize_raw(raw, "float32", "sensor", self.BLACK, 65535, threads=1)
+        multi = _core.normalize_raw(raw, "float32", "sensor", self.BLACK, 65535, threads=4)
+        np.testing.assert_array_equal(single, multi)
+    
+    def test_out(self):
+        out = np.empty(self.raw.shape, dtype=np.float16)
+        self.assertIs(_core.normalize_raw(self.raw, "float16", "full_range", out=out), out)
+    
+    def test_strided_input(self):
+        """Non-contiguous input such as a cropped view is accepted."""
+        view = self.raw[1:, 1::2]
+        result = _core.normalize_raw(view, "float32", "full_range")
+        np.testing.assert_allclose(result, view / 65535.0, rtol=1e-6)
+    
+    def test_invalid_arguments(self):
+        with self.assertRaises(_core.GPRParameterError):
+            _core.normalize_raw(self.raw, "float16", None)
+        with self.assertRaises(_core.GPRParameterError):
+            _core.normalize_raw(self.raw, "float32", "sensor", [4095], 4095)
+        with self.assertRaises(_core.GPRParameterError):
+            _core.normalize_raw(self.raw, "float32", "sensor", [0, 0], 4095)
+        with self.assertRaises(_core.GPRParameterError):
+            _core.normalize_raw(self.raw, "float32", "linear")
+        with self.assertRaises(_core.GPRParameterError):
+            _core.normalize_raw(self.raw, "uint8", "sensor")
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+class TestNormalizeDispatch(unittest.TestCase):
+    """Test that the Python API passes normalize through to the native decoder."""
+    
+    def setUp(self):
+        self.calls = []
+        
+        def get_raw_image_data(path, dtype="uint16", out=None, normalize="full_range"):
+            self.calls.append((dtype, normalize))
+            return np.zeros((2, 2), dtype=dtype)
+        
+        fake_core = types.ModuleType("python_gpr._core")
+        fake_core.get_raw_image_data = get_raw_image_data
+        for patcher in (patch.dict(sys.modules, {"python_gpr._core": fake_core}),
+                        patch.object(python_gpr, "_core", fake_core, create=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        
+        with tempfile.NamedTemporaryFile(suffix=".gpr", delete=False) as f:
+            f.write(b"contents")
+        self.path = f.name
+        self.addCleanup(os.unlink, self.path)
+    
+    def test_default_is_full_range(self):
+        load_gpr_as_numpy(self.path, "float32")
+        self.assertEqual(self.calls, [("float32", "full_range")])
+    
+    def test_normalize_passed_through(self):
+        with GPRImage(self.path) as img:
+            img.to_numpy("float16", normalize="sensor")
+            img.to_numpy("float32", normalize=None)
+        self.assertEqual(self.calls, [("float16", "sensor"), ("float32", None)])
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestNormalizedDecode(unittest.TestCase):
+    """Test normalized decoding of real data."""
+    
+    def test_sensor_normalization_uses_header_levels(self):
+        info = _core.get_image_info(str(REAL_GPR_FILE))
+        raw = _core.get_raw_image_data(str(REAL_GPR_FILE), "uint16")
+        result = _core.get_raw_image_data(str(REAL_GPR_FILE), "float32", None, "sensor")
+        np.testing.assert_allclose(result, sensor_reference(raw, list(info.black_level), info.white_level),
+                                   rtol=1e-5, atol=1e-6)
+    
+    def test_full_range_matches_previous_behaviour(self):
+        raw = _core.get_raw_image_data(str(REAL_GPR_FILE), "uint16")
+        result = _core.get_raw_image_data(str(REAL_GPR_FILE), "float32")
+        np.testing.assert_allclose(result, raw / 65535.0, rtol=1e-6)
+    
+    def test_float16(self):
+        result = load_gpr_as_numpy(str(REAL_GPR_FILE), "float16", normalize="sensor")
+        self.assertEqual(result.dtype, np.float16)
+        self.assertLessEqual(float(result.max()), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
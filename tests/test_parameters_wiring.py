@@ -0,0 +1,183 @@
+"""
+Tests for passing GPRParameters to the native converters.
+
+GPRParameters.to_core() marshals the core parameters into a native
+GPRParametersCore once and caches it until a parameter changes; the
+conversion functions hand that object to the C++ converters.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import python_gpr
+from python_gpr.conversion import (
+    GPRParameters,
+    convert_dng_to_gpr,
+    convert_gpr_to_dng,
+    convert_gpr_to_raw,
+    convert_dng_to_gpr_bytes,
+    convert_gpr_to_raw_bytes,
+)
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+class TestToCore(unittest.TestCase):
+    """Test marshalling GPRParameters into GPRParametersCore."""
+
+    def test_defaults_match_sdk(self):
+        expected = _core.gpr_parameters_create_default()
+        core = GPRParameters().to_core()
+        for name in GPRParameters._CORE_PARAMS:
+            self.assertEqual(getattr(core, name), getattr(expected, name), name)
+
+    def test_values_are_copied(self):
+        params = GPRParameters(input_width=4000, input_height=3000, input_pitch=8000,
+                               fast_encoding=True, compute_md5sum=True, enable_preview=True)
+        core = params.to_core()
+        self.assertEqual((core.input_width, core.input_height, core.input_pitch), (4000, 3000, 8000))
+        self.assertTrue(core.fast_encoding)
+        self.assertTrue(core.compute_md5sum)
+        self.assertTrue(core.enable_preview)
+
+    def test_cached_until_changed(self):
+        params = GPRParameters(fast_encoding=True)
+        core = params.to_core()
+        self.assertIs(params.to_core(), core)
+
+        params['fast_encoding'] = False
+        changed = params.to_core()
+        self.assertIsNot(changed, core)
+        self.assertFalse(changed.fast_encoding)
+
+        params.update(GPRParameters(enable_preview=True))
+        self.assertTrue(params.to_core().enable_preview)
+        params.quality = 10
+        self.assertIsNot(params.to_core(), changed)
+
+
+class TestParameterDispatch(unittest.TestCase):
+    """Test that the conversion functions pass native parameters through."""
+
+    def setUp(self):
+        self.calls = []
+
+        def record(name):
+            def convert(*args):
+                self.calls.append((name, args))
+                return b"converted"
+            return convert
+
+        fake_core = types.ModuleType("python_gpr._core")
+        fake_core.GPRParametersCore = types.SimpleNamespace
+        fake_core.GPRConversionError = RuntimeError
+        for name in ("convert_gpr_to_dng", "convert_dng_to_gpr", "convert_gpr_to_raw",
+                     "convert_dng_to_gpr_bytes", "convert_gpr_to_raw_bytes"):
+            setattr(fake_core, name, record(name))
+        for patcher in (patch.dict(sys.modules, {"python_gpr._core": fake_core}),
+                        patch.object(python_gpr, "_core", fake_core, create=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        with tempfile.NamedTemporaryFile(suffix=".dng", delete=False) as f:
+            f.write(b"contents")
+        self.path = f.name
+        self.addCleanup(os.unlink, self.path)
+
+    def test_defaults_pass_none(self):
+        convert_gpr_to_dng(self.path, "out.dng")
+        self.assertEqual(self.calls, [("convert_gpr_to_dng", (self.path, "out.dng", None))])
+
+    def test_file_conversion_passes_core_parameters(self):
+        params = GPRParameters(fast_encoding=True)
+        convert_dng_to_gpr(self.path, "out.gpr", params)
+        convert_dng_to_gpr(self.path, "out.gpr", params)
+        (_, first), (_, second) = self.calls
+        self.assertTrue(first[2].fast_encoding)
+        # Marshalled once for both calls
+        self.assertIs(first[2], second[2])
+
+    def test_bytes_conversion_passes_core_parameters(self):
+        self.assertEqual(convert_dng_to_gpr_bytes(b"data", GPRParameters(compute_md5sum=True)),
+                         b"converted")
+        name, args = self.calls[0]
+        self.assertEqual(name, "convert_dng_to_gpr_bytes")
+        self.assertTrue(args[1].compute_md5sum)
+
+    def test_decoding_takes_no_native_parameters(self):
+        convert_gpr_to_raw(self.path, "out.raw", GPRParameters())
+        convert_gpr_to_raw_bytes(b"data", GPRParameters())
+        self.assertEqual([args for _, args in self.calls],
+                         [(self.path, "out.raw"), (b"data",)])
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(TypeError):
+            convert_dng_to_gpr(self.path, "out.gpr", {"fast_encoding": True})
+        with self.assertRaises(TypeError):
+            convert_dng_to_gpr_bytes(b"data", {"fast_encoding": True})
+        self.assertEqual(self.calls, [])
+
+
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestEncodingThroughput(unittest.TestCase):
+    """Compare DNG to GPR throughput with fast and normal encoding."""
+
+    REPEAT = 3
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dng = _core.convert_gpr_to_dng_bytes(REAL_GPR_FILE.read_bytes())
+
+    def _encode(self, params):
+        """Return the encoded bytes and the best throughput in MB/s."""
+        best = float("inf")
+        for _ in range(self.REPEAT):
+            start = time.perf_counter()
+            encoded = convert_dng_to_gpr_bytes(self.dng, params)
+            best = min(best, time.perf_counter() - start)
+        return encoded, len(self.dng) / best / 1e6
+
+    def test_fast_and_normal_encoding(self):
+        normal, normal_rate = self._encode(GPRParameters(fast_encoding=False))
+        fast, fast_rate = self._encode(GPRParameters(fast_encoding=True))
+        print(f"\nDNG to GPR: normal {normal_rate:.1f} MB/s ({len(normal)} bytes), "
+              f"fast {fast_rate:.1f} MB/s ({len(fast)} bytes)")
+
+        expected_shape = _core.get_image_info(str(REAL_GPR_FILE))
+        for encoded in (normal, fast):
+            info = _core.GPRDecoder().info(encoded)
+            self.assertEqual((info.width, info.height),
+                             (expected_shape.width, expected_shape.height))
+
+    def test_file_conversion_with_fast_encoding(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dng_path = os.path.join(temp_dir, "input.dng")
+            gpr_path = os.path.join(temp_dir, "output.gpr")
+            Path(dng_path).write_bytes(self.dng)
+
+            start = time.perf_counter()
+            convert_dng_to_gpr(dng_path, gpr_path, GPRParameters(fast_encoding=True))
+            elapsed = time.perf_counter() - start
+            print(f"\nDNG to GPR file, fast encoding: {len(self.dng) / elapsed / 1e6:.1f} MB/s")
+            self.assertGreater(os.path.getsize(gpr_path), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+"""
+Tests for reduced-resolution RGB decoding.
+
+decode_preview and GPRImage.to_numpy(resolution=...) use the SDK's RGB
+decoder, which stops the inverse wavelet transform early for the half,
+quarter, eighth and sixteenth scales.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import python_gpr
+from python_gpr.core import GPRImage, decode_preview, RESOLUTIONS
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+SCALES = {"full": 1, "half": 2, "quarter": 4, "eighth": 8, "sixteenth": 16}
+
+
+class TestPreviewValidation(unittest.TestCase):
+    """Test argument validation of decode_preview."""
+
+    def test_unsupported_resolution(self):
+        with self.assertRaises(ValueError):
+            decode_preview(b"data", "third")
+
+    def test_unsupported_dtype(self):
+        with self.assertRaises(ValueError):
+            decode_preview(b"data", "quarter", "float32")
+
+    def test_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            decode_preview("does_not_exist.gpr")
+
+    def test_resolutions(self):
+        self.assertEqual(RESOLUTIONS, tuple(SCALES))
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+class TestResolutionDispatch(unittest.TestCase):
+    """Test that to_numpy routes reduced resolutions to the RGB decoder."""
+
+    def setUp(self):
+        self.calls = []
+
+        def get_rgb_image_data(source, resolution="quarter", bits=8):
+            self.calls.append(("rgb", resolution, bits))
+            return np.zeros((2, 2, 3), dtype=np.uint8 if bits == 8 else np.uint16)
+
+        def get_raw_image_data(path, dtype="uint16", out=None, normalize="full_range"):
+            self.calls.append(("raw", dtype))
+            return np.zeros((2, 2), dtype=dtype)
+
+        fake_core = types.ModuleType("python_gpr._core")
+        fake_core.get_rgb_image_data = get_rgb_image_data
+        fake_core.get_raw_image_data = get_raw_image_data
+        for patcher in (patch.dict(sys.modules, {"python_gpr._core": fake_core}),
+                        patch.object(python_gpr, "_core", fake_core, create=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        with tempfile.NamedTemporaryFile(suffix=".gpr", delete=False) as f:
+            f.write(b"contents")
+        self.path = f.name
+        self.addCleanup(os.unlink, self.path)
+
+    def test_full_resolution_is_bayer(self):
+        with GPRImage(self.path) as img:
+            self.assertEqual(img.to_numpy().shape, (2, 2))
+        self.assertEqual(self.calls, [("raw", "uint16")])
+
+    def test_reduced_resolution_is_rgb(self):
+        with GPRImage(self.path) as img:
+            img.to_numpy(resolution="quarter")
+            img.to_numpy("uint8", resolution="sixteenth")
+        self.assertEqual(self.calls, [("rgb", "quarter", 16), ("rgb", "sixteenth", 8)])
+
+    def test_reduced_resolution_has_no_bayer_layout(self):
+        with GPRImage(self.path) as img:
+            for layout in ("mosaic", "planes"):
+                with self.subTest(layout=layout):
+                    with self.assertRaisesRegex(ValueError, "only available at full resolution"):
+                        img.to_numpy(resolution="half", layout=layout)
+            img.to_numpy("uint8", resolution="half", layout="rgb")
+            img.to_numpy("uint8", layout="rgb")
+        self.assertEqual(self.calls, [("rgb", "half", 8), ("rgb", "full", 8)])
+
+    def test_reduced_resolution_rejects_out(self):
+        with GPRImage(self.path) as img:
+            with self.assertRaises(ValueError):
+                img.to_numpy(out=np.zeros((2, 2, 3), dtype=np.uint16), resolution="half")
+            with self.assertRaises(ValueError):
+                img.to_numpy("float32", resolution="half")
+        self.assertEqual(self.calls, [])
+
+
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+class TestNativeValidation(unittest.TestCase):
+    """Test argument validation of _core.get_rgb_image_data."""
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(_core.GPRParameterError):
+            _core.get_rgb_image_data(b"data", "third")
+        with self.assertRaises(_core.GPRParameterError):
+            _core.get_rgb_image_data(b"data", "quarter", 12)
+        with self.assertRaises(_core.GPRParameterError):
+            _core.get_rgb_image_data(b"", "quarter")
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestReducedResolutionDecode(unittest.TestCase):
+    """Test reduced-resolution decoding of real data."""
+
+    @classmethod
+    def setUpClass(cls):
+        info = _core.get_image_info(str(REAL_GPR_FILE))
+        cls.width, cls.height = info.width, info.height
+
+    def test_shapes_and_dtypes(self):
+        for resolution, scale in SCALES.items():
+            with self.subTest(resolution=resolution):
+                rgb = decode_preview(str(REAL_GPR_FILE), resolution)
+                self.assertEqual(rgb.dtype, np.uint8)
+                self.assertEqual(rgb.ndim, 3)
+                self.assertEqual(rgb.shape[2], 3)
+                self.assertLessEqual(abs(rgb.shape[0] - self.height // scale), 1)
+                self.assertLessEqual(abs(rgb.shape[1] - self.width // scale), 1)
+
+    def test_bytes_source_and_uint16(self):
+        from_path = decode_preview(str(REAL_GPR_FILE), "eighth", "uint16")
+        from_bytes = decode_preview(REAL_GPR_FILE.read_bytes(), "eighth", "uint16")
+        self.assertEqual(from_path.dtype, np.uint16)
+        np.testing.assert_array_equal(from_path, from_bytes)
+
+    def test_to_numpy_matches_decode_preview(self):
+        with GPRImage(str(REAL_GPR_FILE)) as img:
+            np.testing.assert_array_equal(img.to_numpy("uint8", resolution="quarter"),
+                                          decode_preview(str(REAL_GPR_FILE), "quarter"))
+
+    def test_reduced_resolution_is_faster(self):
+        def best_time(resolution):
+            best = float("inf")
+            for _ in range(3):
+                start = time.perf_counter()
+                decode_preview(str(REAL_GPR_FILE), resolution)
+                best = min(best, time.perf_counter() - start)
+            return best
+
+        full = best_time("full")
+        eighth = best_time("eighth")
+        print(f"\nRGB decode: full {full * 1e3:.1f} ms, eighth {eighth * 1e3:.1f} ms")
+        self.assertLess(eighth, full)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+Tests for region-of-interest reads with GPRImage.read_region.
+
+Only the requested window is copied or normalized, with the CFA phase of
+the window origin, so crops match the same window of a full decode.
+"""
+
+import os
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    from .test_data import SyntheticDataGenerator
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from test_data import SyntheticDataGenerator
+
+import python_gpr
+from python_gpr.allocator import get_allocator_stats, reset_allocator_stats
+from python_gpr.core import GPRImage
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+class TestRegionValidation(unittest.TestCase):
+    """Test region bounds checking, which happens before decoding."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.path = os.path.join(self.temp_dir.name, "image.gpr")
+        with open(self.path, "wb") as f:
+            f.write(SyntheticDataGenerator.create_dng_header(640, 480))
+
+    def test_native_bounds(self):
+        for region in [(-1, 0, 8, 8), (0, 0, 0, 8), (633, 0, 8, 8), (0, 473, 8, 8)]:
+            with self.subTest(region=region):
+                with self.assertRaises(_core.GPRParameterError):
+                    _core.get_raw_image_region(self.path, *region)
+
+    def test_native_invalid_dtype(self):
+        with self.assertRaises(_core.GPRParameterError):
+            _core.get_raw_image_region(self.path, 0, 0, 8, 8, "uint8")
+
+    def test_gpr_image_bounds(self):
+        with GPRImage(self.path) as img:
+            with self.assertRaises(ValueError):
+                img.read_region(600, 0, 64, 64)
+            with self.assertRaises(ValueError):
+                img.read_region(600, 0, 64, 64, "uint8", resolution="quarter")
+            with self.assertRaises(ValueError):
+                img.read_region(0, 0, 64, 64, "float32", resolution="quarter")
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+class TestRegionDispatch(unittest.TestCase):
+    """Test which decoder read_region uses."""
+
+    def setUp(self):
+        self.calls = []
+
+        def get_rgb_image_data(source, resolution="quarter", bits=8):
+            self.calls.append(("rgb", resolution, bits))
+            return np.zeros((480 // 4, 640 // 4, 3), dtype=np.uint8)
+
+        def get_raw_image_region(source, x, y, width, height, dtype="uint16", normalize="full_range"):
+            self.calls.append(("region", x, y, width, height))
+            return np.zeros((height, width), dtype=dtype)
+
+        fake_core = types.ModuleType("python_gpr._core")
+        fake_core.get_rgb_image_data = get_rgb_image_data
+        fake_core.get_raw_image_region = get_raw_image_region
+        for patcher in (patch.dict(sys.modules, {"python_gpr._core": fake_core}),
+                        patch.object(python_gpr, "_core", fake_core, create=True),
+                        patch.object(GPRImage, "get_image_info",
+                                     lambda img: {"width": 640, "height": 480})):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = os.path.join(temp_dir.name, "image.gpr")
+        with open(self.path, "wb") as f:
+            f.write(SyntheticDataGenerator.create_dng_header(640, 480))
+
+    def test_reduced_resolution_uses_the_preview_decoder(self):
+        with GPRImage(self.path) as img:
+            region = img.read_region(64, 32, 128, 64, "uint8", resolution="quarter")
+        self.assertEqual(region.shape, (16, 32, 3))
+        self.assertEqual(self.calls, [("rgb", "quarter", 8)])
+
+    def test_crop_is_read_region(self):
+        with GPRImage(self.path) as img:
+            self.assertEqual(img.crop(2, 4, 16, 8).shape, (8, 16))
+            self.assertEqual(img.read_region(2, 4, 16, 8).shape, (8, 16))
+        self.assertEqual(self.calls, [("region", 2, 4, 16, 8)] * 2)
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestRegionDecode(unittest.TestCase):
+    """Test regions of real data against slices of a full decode."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.full = _core.get_raw_image_data(str(REAL_GPR_FILE), "uint16")
+        cls.info = _core.get_image_info(str(REAL_GPR_FILE))
+
+    def test_uint16_region(self):
+        with GPRImage(str(REAL_GPR_FILE)) as img:
+            region = img.read_region(100, 200, 512, 512)
+        self.assertEqual(region.shape, (512, 512))
+        self.assertTrue(region.flags.c_contiguous)
+        np.testing.assert_array_equal(region, self.full[200:712, 100:612])
+
+    def test_sensor_normalization_keeps_cfa_phase(self):
+        expected = _core.normalize_raw(self.full, "float32", "sensor",
+                                       list(self.info.black_level), self.info.white_level)
+        with GPRImage(str(REAL_GPR_FILE)) as img:
+            for x, y in [(0, 0), (1, 0), (0, 1), (101, 33)]:
+                with self.subTest(x=x, y=y):
+                    region = img.read_region(x, y, 64, 48, "float32", normalize="sensor")
+                    np.testing.assert_array_equal(region, expected[y:y + 48, x:x + 64])
+
+    def test_float16_region(self):
+        with GPRImage(str(REAL_GPR_FILE)) as img:
+            region = img.read_region(10, 10, 32, 32, "float16", normalize="sensor")
+        self.assertEqual(region.dtype, np.float16)
+        self.assertEqual(region.shape, (32, 32))
+
+    def test_reduced_resolution_region(self):
+        with GPRImage(str(REAL_GPR_FILE)) as img:
+            preview = img.to_numpy("uint8", resolution="quarter")
+            region = img.read_region(400, 200, 512, 256, "uint8", resolution="quarter")
+        self.assertEqual(region.shape, (64, 128, 3))
+        np.testing.assert_array_equal(region, preview[50:114, 100:228])
+
+    def test_reduced_resolution_decode_allocates_less(self):
+        def peak_bytes(resolution, dtype):
+            with GPRImage(str(REAL_GPR_FILE)) as img:
+                reset_allocator_stats()
+                img.read_region(0, 0, 512, 512, dtype, resolution=resolution)
+                return get_allocator_stats()["peak_in_use_bytes"]
+
+        self.assertLess(peak_bytes("quarter", "uint16"), peak_bytes("full", "uint16"))
+
+
+if __name__ == '__main__':
+    unittest.main()
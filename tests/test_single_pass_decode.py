@@ -0,0 +1,104 @@
+"""
+I/O accounting tests for raw decoding.
+
+get_raw_image_data parses the image header from the same buffer it
+decodes, so a decode should read the file exactly once. The native
+I/O counters make the number of bytes read per decode measurable.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    from .test_data import SyntheticDataGenerator
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from test_data import SyntheticDataGenerator
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+class TestIOStats(unittest.TestCase):
+    """Test the native I/O counters."""
+
+    def setUp(self):
+        _core.reset_io_stats()
+
+    def test_reset(self):
+        """Resetting clears both counters."""
+        stats = _core.get_io_stats()
+        self.assertEqual(stats["bytes_read"], 0)
+        self.assertEqual(stats["read_calls"], 0)
+
+    def test_header_parse_reads_only_header(self):
+        """get_image_info reads a few hundred bytes of a large file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "image.gpr")
+            with open(path, "wb") as f:
+                f.write(SyntheticDataGenerator.create_dng_header(4000, 3000))
+                f.write(b"\x00" * (1 << 20))
+
+            _core.reset_io_stats()
+            _core.get_image_info(path)
+            stats = _core.get_io_stats()
+
+        self.assertGreater(stats["read_calls"], 0)
+        self.assertLess(stats["bytes_read"], 4096)
+
+
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestSinglePassDecode(unittest.TestCase):
+    """Benchmark the bytes read by each decode."""
+
+    def test_decode_reads_file_once(self):
+        """A decode reads exactly the file size, in a single read."""
+        file_size = REAL_GPR_FILE.stat().st_size
+
+        _core.reset_io_stats()
+        _core.get_raw_image_data(str(REAL_GPR_FILE), "uint16")
+        stats = _core.get_io_stats()
+
+        self.assertEqual(stats["bytes_read"], file_size)
+        self.assertEqual(stats["read_calls"], 1)
+
+    def test_bytes_read_per_decode(self):
+        """Repeated decodes read the file once each and report throughput."""
+        file_size = REAL_GPR_FILE.stat().st_size
+        decodes = 3
+
+        _core.reset_io_stats()
+        start = time.perf_counter()
+        for _ in range(decodes):
+            data = _core.get_raw_image_data(str(REAL_GPR_FILE), "uint16")
+        elapsed = time.perf_counter() - start
+        stats = _core.get_io_stats()
+
+        bytes_per_decode = stats["bytes_read"] / decodes
+        self.assertEqual(bytes_per_decode, file_size)
+        print(f"\n{bytes_per_decode / 1e6:.2f} MB read per decode, "
+              f"{decodes / elapsed:.2f} decodes/s, shape {data.shape}")
+
+    def test_shape_matches_header(self):
+        """The decoded array has the dimensions reported by the header."""
+        info = _core.get_image_info(str(REAL_GPR_FILE))
+        data = _core.get_raw_image_data(str(REAL_GPR_FILE), "uint16")
+        self.assertEqual(data.shape, (info.height, info.width))
+
+
+if __name__ == '__main__':
+    unittest.main()
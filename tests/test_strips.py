@@ -0,0 +1,106 @@
+"""
+Tests for iterating over an image in horizontal strips.
+
+GPRImage.iter_strips() decodes the frame once to uint16 and normalizes one
+strip at a time, so floating-point output never needs a full-frame copy.
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+import unittest
+from pathlib import Path
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    from .test_data import SyntheticDataGenerator
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from test_data import SyntheticDataGenerator
+
+from python_gpr.core import GPRImage
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+class TestStripValidation(unittest.TestCase):
+    """Test that invalid arguments are rejected before decoding."""
+
+    def setUp(self):
+        with tempfile.NamedTemporaryFile(suffix=".gpr", delete=False) as f:
+            f.write(SyntheticDataGenerator.create_dng_header(64, 48))
+        self.addCleanup(os.unlink, f.name)
+        self.img = GPRImage(f.name)
+        self.addCleanup(self.img.close)
+
+    def test_invalid_rows(self):
+        for rows in (0, -1, 2.5, True):
+            with self.assertRaises(ValueError):
+                self.img.iter_strips(rows)
+
+    def test_invalid_dtype(self):
+        with self.assertRaises(ValueError):
+            self.img.iter_strips(16, "uint8")
+        with self.assertRaises(ValueError):
+            self.img.iter_strips(16, "float16", normalize=None)
+
+    def test_closed_image(self):
+        self.img.close()
+        with self.assertRaises(ValueError):
+            self.img.iter_strips()
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestStripsOnRealData(unittest.TestCase):
+    """Test that strips reassemble to the full decode."""
+
+    def test_uint16_strips_are_views(self):
+        with GPRImage(str(REAL_GPR_FILE)) as img:
+            expected = img.to_numpy()
+            strips = list(img.iter_strips(256))
+        self.assertEqual([y for y, _ in strips], list(range(0, expected.shape[0], 256)))
+        base = strips[0][1].base
+        for _, strip in strips:
+            self.assertIs(strip.base, base)
+        np.testing.assert_array_equal(np.concatenate([strip for _, strip in strips]), expected)
+
+    def test_sensor_normalization_with_odd_rows(self):
+        with GPRImage(str(REAL_GPR_FILE)) as img:
+            expected = img.to_numpy("float32", normalize="sensor")
+            strips = [strip for _, strip in img.iter_strips(37, "float32", "sensor")]
+        self.assertTrue(all(strip.dtype == np.float32 for strip in strips))
+        np.testing.assert_array_equal(np.concatenate(strips), expected)
+
+    def test_peak_memory_is_one_strip(self):
+        with GPRImage(str(REAL_GPR_FILE)) as img:
+            frame_bytes = img.width * img.height * 4
+            tracemalloc.start()
+            try:
+                for _, strip in img.iter_strips(128, "float32"):
+                    del strip
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        self.assertLess(peak, frame_bytes // 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
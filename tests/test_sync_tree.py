@@ -0,0 +1,222 @@
+"""
+Tests for incremental directory-tree conversion.
+
+sync_tree() converts only the inputs whose size, modification time or
+content changed, writes outputs atomically and records progress in a
+manifest so an interrupted run resumes where it stopped.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from python_gpr import sync
+from python_gpr.conversion import GPRParameters
+from python_gpr.sync import MANIFEST_NAME, sync_tree
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+
+class FakeConvertImage:
+    """Writes twice the input to the output; fails on inputs starting with 'broken'."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = []
+        self.interrupt_on = None
+
+    def __call__(self, input_path, output_path, target_format=None, parameters=None):
+        with self.lock:
+            self.calls.append(os.path.basename(input_path))
+        data = Path(input_path).read_bytes()
+        Path(output_path).write_bytes(data[:3])
+        if self.interrupt_on and input_path.endswith(self.interrupt_on):
+            raise KeyboardInterrupt
+        if data.startswith(b"broken"):
+            raise ValueError(f"Failed to convert {input_path}")
+        Path(output_path).write_bytes(data * 2)
+
+
+class SyncTreeTestCase(unittest.TestCase):
+    """Create a source tree and patch convert_image."""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.src = Path(temp_dir.name) / "src"
+        self.dst = Path(temp_dir.name) / "dst"
+        for relpath in ("a.gpr", "b.GPR", "day1/c.gpr", "day1/night/d.gpr"):
+            self.write(relpath, f"content of {relpath}".encode())
+        self.write("notes.txt", b"not an image")
+
+        self.convert = FakeConvertImage()
+        patcher = patch.object(sync, "convert_image", self.convert)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write(self, relpath, data):
+        path = self.src / relpath
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        return path
+
+    def sync(self, **kwargs):
+        self.convert.calls.clear()
+        return sync_tree(self.src, self.dst, workers=2, **kwargs)
+
+    def manifest(self):
+        return json.loads((self.dst / MANIFEST_NAME).read_text())["files"]
+
+
+class TestSyncTree(SyncTreeTestCase):
+    """Test which files are converted on repeated runs."""
+
+    def test_first_run_converts_everything(self):
+        report = self.sync()
+        self.assertEqual(report.converted, ["a.gpr", "b.GPR", "day1/c.gpr", "day1/night/d.gpr"])
+        self.assertTrue(report.ok)
+        self.assertEqual((self.dst / "day1/night/d.dng").read_bytes(), b"content of day1/night/d.gpr" * 2)
+        self.assertTrue((self.dst / "b.dng").exists())
+        entry = self.manifest()["day1/c.gpr"]
+        self.assertEqual(entry["output"], "day1/c.dng")
+        self.assertEqual(entry["size"], len(b"content of day1/c.gpr"))
+
+    def test_second_run_skips_everything(self):
+        self.sync()
+        with patch.object(sync, "_file_digest", side_effect=AssertionError("hashed")):
+            report = self.sync()
+        self.assertEqual(report.converted, [])
+        self.assertEqual(len(report.unchanged), 4)
+        self.assertEqual(self.convert.calls, [])
+
+    def test_changed_file_is_converted(self):
+        self.sync()
+        self.write("day1/c.gpr", b"new content")
+        report = self.sync()
+        self.assertEqual(report.converted, ["day1/c.gpr"])
+        self.assertEqual((self.dst / "day1/c.dng").read_bytes(), b"new content" * 2)
+
+    def test_touched_file_is_hashed_not_converted(self):
+        self.sync()
+        path = self.src / "a.gpr"
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 10 ** 9))
+        report = self.sync()
+        self.assertEqual(report.converted, [])
+        self.assertIn("a.gpr", report.unchanged)
+        self.assertEqual(self.manifest()["a.gpr"]["mtime_ns"], path.stat().st_mtime_ns)
+
+    def test_missing_output_is_converted(self):
+        self.sync()
+        (self.dst / "a.dng").unlink()
+        self.assertEqual(self.sync().converted, ["a.gpr"])
+
+    def test_parameters_change(self):
+        self.sync()
+        self.assertEqual(len(self.sync(parameters=GPRParameters(fast_encoding=True)).converted), 4)
+        # Legacy parameters do not reach the converters
+        self.assertEqual(self.sync(parameters=GPRParameters(fast_encoding=True, quality=3)).converted, [])
+
+    def test_removed_input(self):
+        self.sync()
+        (self.src / "a.gpr").unlink()
+        report = self.sync()
+        self.assertEqual(report.removed, ["a.gpr"])
+        self.assertNotIn("a.gpr", self.manifest())
+
+    def test_output_collision(self):
+        self.write("a.dng", b"dng")
+        report = sync_tree(self.src, self.dst, target_format="dng", workers=1)
+        self.assertEqual(list(report.failed), ["a.gpr"])
+        self.assertIsInstance(report.failed["a.gpr"], ValueError)
+
+    def test_destination_inside_source(self):
+        dst = self.src / "converted"
+        sync_tree(self.src, dst, workers=1)
+        self.assertEqual(sync_tree(self.src, dst, workers=1).converted, [])
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(FileNotFoundError):
+            sync_tree(self.src / "missing", self.dst)
+        with self.assertRaises(ValueError):
+            sync_tree(self.src, self.src)
+        with self.assertRaises(ValueError):
+            sync_tree(self.src, self.dst, target_format="jpg")
+        with self.assertRaises(ValueError):
+            sync_tree(self.src, self.dst, workers=0)
+        with self.assertRaises(TypeError):
+            sync_tree(self.src, self.dst, parameters={"fast_encoding": True})
+
+
+class TestSyncTreeRecovery(SyncTreeTestCase):
+    """Test failures, atomic outputs and resuming an interrupted run."""
+
+    def test_failure_keeps_previous_output(self):
+        self.sync()
+        self.write("a.gpr", b"broken now")
+        report = self.sync()
+        self.assertIsInstance(report.failed["a.gpr"], ValueError)
+        self.assertEqual((self.dst / "a.dng").read_bytes(), b"content of a.gpr" * 2)
+        self.assertEqual(list(self.dst.glob("*" + sync._TEMP_SUFFIX)), [])
+        # Retried by the next run
+        self.write("a.gpr", b"fixed")
+        self.assertEqual(self.sync().converted, ["a.gpr"])
+
+    def test_interrupted_run_resumes(self):
+        self.convert.interrupt_on = "c.gpr"
+        with self.assertRaises(KeyboardInterrupt):
+            sync_tree(self.src, self.dst, workers=1)
+        self.assertFalse((self.dst / "day1/c.dng").exists())
+        self.assertEqual(sorted(self.manifest()), ["a.gpr", "b.GPR"])
+
+        self.convert.interrupt_on = None
+        report = self.sync()
+        self.assertEqual(report.converted, ["day1/c.gpr", "day1/night/d.gpr"])
+        self.assertEqual(report.unchanged, ["a.gpr", "b.GPR"])
+
+    def test_leftover_temp_files_are_removed(self):
+        self.sync()
+        stale = self.dst / "day1" / (".c.dng.0123456789ab" + sync._TEMP_SUFFIX)
+        stale.write_bytes(b"partial")
+        self.sync()
+        self.assertFalse(stale.exists())
+
+    def test_unreadable_manifest_converts_again(self):
+        self.sync()
+        (self.dst / MANIFEST_NAME).write_text("{not json")
+        self.assertEqual(len(self.sync().converted), 4)
+
+
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestSyncTreeOnRealData(unittest.TestCase):
+    """Sync a tree of real GPR files."""
+
+    def test_sync(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            src = Path(temp_dir) / "src"
+            src.mkdir()
+            for name in ("one.GPR", "two.GPR"):
+                (src / name).write_bytes(REAL_GPR_FILE.read_bytes())
+            dst = Path(temp_dir) / "dst"
+            report = sync_tree(src, dst, workers=2)
+            self.assertEqual(report.converted, ["one.GPR", "two.GPR"], report.failed)
+            self.assertGreater((dst / "one.dng").stat().st_size, 0)
+            self.assertEqual(len(sync_tree(src, dst, workers=2).unchanged), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Thread-scaling tests for the native conversion and decode functions.
+
+The C++ entry points release the GIL around file I/O and the GPR codec,
+so running them from several Python threads should overlap the work
+instead of serialising it.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestGILRelease(unittest.TestCase):
+    """Test that native calls let other Python threads run."""
+
+    def _assert_other_threads_run(self, func):
+        """Run func in a worker thread and check the main thread keeps making progress."""
+        done = threading.Event()
+
+        def worker():
+            try:
+                func()
+            finally:
+                done.set()
+
+        thread = threading.Thread(target=worker)
+        ticks = 0
+        thread.start()
+        while not done.is_set():
+            ticks += 1
+            time.sleep(0.001)
+        thread.join()
+
+        # With the GIL held for the whole call the main thread would only get
+        # a handful of ticks in before the native call finished.
+        self.assertGreater(ticks, 5)
+
+    def test_decode_releases_gil(self):
+        """get_raw_image_data should not block other threads."""
+        self._assert_other_threads_run(
+            lambda: _core.get_raw_image_data(str(REAL_GPR_FILE), "uint16")
+        )
+
+    def test_convert_releases_gil(self):
+        """convert_gpr_to_dng should not block other threads."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "output.dng")
+            self._assert_other_threads_run(
+                lambda: _core.convert_gpr_to_dng(str(REAL_GPR_FILE), output_path)
+            )
+
+
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+@unittest.skipUnless((os.cpu_count() or 1) >= 2, "Thread scaling needs at least two CPUs")
+class TestThreadScaling(unittest.TestCase):
+    """Test that decodes scale across threads."""
+
+    def _time_decodes(self, threads, count):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(
+                lambda _: _core.get_raw_image_data(str(REAL_GPR_FILE), "uint16"),
+                range(count),
+            ))
+        return time.perf_counter() - start
+
+    def test_parallel_decode_speedup(self):
+        """Two threads should finish a batch of decodes clearly faster than one."""
+        # Warm up caches and the allocator
+        self._time_decodes(1, 1)
+
+        sequential = self._time_decodes(1, 4)
+        parallel = self._time_decodes(2, 4)
+
+        self.assertLess(parallel, sequential * 0.8,
+                        f"Expected parallel speedup, got {sequential:.3f}s vs {parallel:.3f}s")
+
+
+if __name__ == '__main__':
+    unittest.main()
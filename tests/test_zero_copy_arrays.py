@@ -0,0 +1,171 @@
+"""
+Tests for buffer ownership of decoded arrays and the out= parameter.
+
+uint16 arrays returned by get_raw_image_data own the decoder output
+through a capsule that frees it with the GPR allocator, and out= lets
+callers decode into a reused array instead of allocating per frame.
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path so we can import the module
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    from .test_data import SyntheticDataGenerator
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from test_data import SyntheticDataGenerator
+
+import python_gpr
+from python_gpr.core import GPRImage, load_gpr_as_numpy
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from python_gpr import _core
+    CORE_AVAILABLE = True
+except ImportError:
+    CORE_AVAILABLE = False
+
+REAL_GPR_FILE = Path(__file__).parent / "data" / "2024_10_08_10-37-22.GPR"
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+class TestOutParameterDispatch(unittest.TestCase):
+    """Test that the Python API passes out= through to the native decoder."""
+    
+    def setUp(self):
+        self.calls = []
+        
+        def get_raw_image_data(path, dtype="uint16", out=None, normalize="full_range"):
+            self.calls.append((path, dtype, out))
+            if out is not None:
+                out[...] = 7
+                return out
+            return np.zeros((2, 2), dtype=dtype)
+        
+        fake_core = types.ModuleType("python_gpr._core")
+        fake_core.get_raw_image_data = get_raw_image_data
+        for patcher in (patch.dict(sys.modules, {"python_gpr._core": fake_core}),
+                        patch.object(python_gpr, "_core", fake_core, create=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        
+        with tempfile.NamedTemporaryFile(suffix=".gpr", delete=False) as f:
+            f.write(b"contents")
+        self.path = f.name
+        self.addCleanup(os.unlink, self.path)
+    
+    def test_to_numpy_out(self):
+        """GPRImage.to_numpy returns the array it decoded into."""
+        out = np.empty((2, 2), dtype=np.uint16)
+        with GPRImage(self.path) as img:
+            result = img.to_numpy(out=out)
+        self.assertIs(result, out)
+        self.assertTrue((out == 7).all())
+        self.assertEqual(self.calls, [(self.path, "uint16", out)])
+    
+    def test_load_gpr_as_numpy_out(self):
+        """load_gpr_as_numpy returns the array it decoded into."""
+        out = np.empty((2, 2), dtype=np.float32)
+        self.assertIs(load_gpr_as_numpy(self.path, "float32", out=out), out)
+        self.assertEqual(self.calls[0][1], "float32")
+    
+    def test_without_out(self):
+        """Without out a new array is returned."""
+        result = load_gpr_as_numpy(self.path)
+        self.assertEqual(result.shape, (2, 2))
+        self.assertIsNone(self.calls[0][2])
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+class TestOutParameterValidation(unittest.TestCase):
+    """Test that unsuitable out arrays are rejected before decoding."""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(self._cleanup_temp_dir)
+        self.path = os.path.join(self.temp_dir, "image.gpr")
+        with open(self.path, "wb") as f:
+            f.write(SyntheticDataGenerator.create_dng_header(64, 48))
+    
+    def _cleanup_temp_dir(self):
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _assert_rejected(self, out, dtype="uint16"):
+        with self.assertRaises(_core.GPRParameterError):
+            _core.get_raw_image_data(self.path, dtype, out)
+    
+    def test_not_an_array(self):
+        self._assert_rejected([[0] * 64] * 48)
+    
+    def test_wrong_dtype(self):
+        self._assert_rejected(np.empty((48, 64), dtype=np.float32))
+        self._assert_rejected(np.empty((48, 64), dtype=np.uint16), dtype="float32")
+    
+    def test_wrong_shape(self):
+        self._assert_rejected(np.empty((64, 48), dtype=np.uint16))
+        self._assert_rejected(np.empty(48 * 64, dtype=np.uint16))
+    
+    def test_read_only(self):
+        out = np.empty((48, 64), dtype=np.uint16)
+        out.flags.writeable = False
+        self._assert_rejected(out)
+    
+    def test_not_contiguous(self):
+        self._assert_rejected(np.empty((48, 128), dtype=np.uint16)[:, ::2])
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not available")
+@unittest.skipUnless(CORE_AVAILABLE, "_core module not available - build first with CMake")
+@unittest.skipUnless(REAL_GPR_FILE.exists(), "Real GPR test data not available")
+class TestZeroCopyDecode(unittest.TestCase):
+    """Test ownership and out= decoding on real data."""
+    
+    def test_uint16_array_owns_decoder_buffer(self):
+        """The array is backed by a capsule, not an unowned pointer."""
+        data = _core.get_raw_image_data(str(REAL_GPR_FILE), "uint16")
+        self.assertIsNotNone(data.base)
+        self.assertFalse(data.flags.owndata)
+        
+        # Views keep the buffer alive after the original array is gone
+        view = data[:4, :4]
+        expected = view.copy()
+        del data
+        gc.collect()
+        np.testing.assert_array_equal(view, expected)
+    
+    def test_out_matches_fresh_decode(self):
+        """Decoding into out gives the same pixels as a fresh decode."""
+        for dtype in ("uint16", "float32"):
+            expected = _core.get_raw_image_data(str(REAL_GPR_FILE), dtype)
+            out = np.zeros_like(expected)
+            result = _core.get_raw_image_data(str(REAL_GPR_FILE), dtype, out)
+            self.assertIs(result, out)
+            np.testing.assert_array_equal(out, expected)
+    
+    def test_out_reused_across_frames(self):
+        """The same out array can be reused for repeated decodes."""
+        out = _core.get_raw_image_data(str(REAL_GPR_FILE), "uint16").copy()
+        out[...] = 0
+        for _ in range(3):
+            self.assertIs(load_gpr_as_numpy(str(REAL_GPR_FILE), out=out), out)
+        self.assertGreater(int(out.max()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()